@@ -353,6 +353,7 @@ async def resolve_public_checklist_access(
             cl_id=checklist.id,
             payload={"checklist_name": checklist.name},
         )
+        await notification_crud.session.commit()
 
     collaborators = await checklist_collaborator_crud.list(
         checklist_id=link.checklist_id
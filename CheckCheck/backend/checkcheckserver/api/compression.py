@@ -0,0 +1,272 @@
+import zlib
+from typing import Callable, Dict, List, Optional, Protocol, Sequence
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from checkcheckserver.log import get_logger
+
+# Negotiated ``Content-Encoding`` for ``/api/*`` responses. Kept free of config
+# imports, like ``single_flight``: ``app.py`` passes the configured encodings,
+# threshold and levels in.
+
+log = get_logger()
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - a declared dependency
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - a declared dependency
+    zstandard = None
+
+# Never compressed: the live sync stream must reach the client event by event
+# (see ``APICompressionMiddleware``).
+SYNC_STREAM_PATH = "/api/sync"
+
+# Bodies from this size on are compressed in a worker thread, so a large delta
+# bootstrap does not stall every other request on the event loop.
+_THREAD_OFFLOAD_SIZE = 256 * 1024
+
+# Besides ``text/*`` and ``*+json``.
+_COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, keeping the stream open."""
+
+    def finish(self) -> bytes:
+        """Emit the rest and end the stream."""
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+_COMPRESSORS: Dict[str, Callable[[int], Compressor]] = {"gzip": _GzipCompressor}
+if brotli is not None:
+    _COMPRESSORS["br"] = _BrotliCompressor
+if zstandard is not None:
+    _COMPRESSORS["zstd"] = _ZstdCompressor
+
+
+def available_encodings() -> List[str]:
+    return [encoding for encoding in ("br", "zstd", "gzip") if encoding in _COMPRESSORS]
+
+
+def make_compressor(encoding: str, level: int) -> Compressor:
+    return _COMPRESSORS[encoding](level)
+
+
+def negotiate_encoding(
+    accept_encoding: str, offered: Sequence[str]
+) -> Optional[str]:
+    """Pick the coding from ``offered`` the client accepts with the highest
+    q-value; ties go to the earlier entry of ``offered``. ``None`` means send
+    the body as is."""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in offered:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in _COMPRESSIBLE_MEDIA_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+class APICompressionMiddleware:
+    """Compress ``/api/*`` responses with the best coding the client accepts
+    (``Accept-Encoding``), out of ``encodings`` in server preference order.
+
+    Pure-ASGI, like ``APINoStoreCacheMiddleware``: nothing is buffered beyond
+    the first body message. A single-message body smaller than
+    ``minimum_size`` goes out as is; a streamed body (the NDJSON delta feed) is
+    compressed message by message, each flushed so the client can parse it
+    without waiting for the rest. Responses that already carry a
+    ``Content-Encoding``, and those whose type does not compress (anything but
+    JSON, MessagePack and text), pass through untouched. The ``/api/sync`` SSE
+    stream is never wrapped at all: a compressor would hold back its events and
+    keepalives until enough bytes piled up.
+
+    Every response that could have been compressed carries ``Vary:
+    Accept-Encoding``, compressed or not (too small, or no coding accepted), so
+    a shared cache never hands one client's coding to another.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str],
+        minimum_size: int,
+        levels: Dict[str, int],
+    ) -> None:
+        self.app = app
+        self.encodings = [e for e in encodings if e in _COMPRESSORS]
+        for encoding in encodings:
+            if encoding not in _COMPRESSORS:
+                log.warning(
+                    f"Response compression '{encoding}' is configured but its "
+                    "package is not installed; it is not offered"
+                )
+        self.minimum_size = minimum_size
+        self.levels = levels
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if (
+            not path.startswith("/api/")
+            or path == SYNC_STREAM_PATH
+            or path.startswith(SYNC_STREAM_PATH + "/")
+        ):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        responder = _CompressingResponder(
+            send, encoding, self.levels.get(encoding), self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoding: Optional[str],
+        level: Optional[int],
+        minimum_size: int,
+    ):
+        self._send = send
+        self._encoding = encoding
+        self._level = level
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._compressor: Optional[Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message shows whether to compress.
+            self._start = message
+            return
+        if self._start is not None:
+            start, self._start = self._start, None
+            if message["type"] == "http.response.body" and self._is_negotiable(
+                start
+            ):
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if self._should_compress(message):
+                    self._compressor = make_compressor(self._encoding, self._level)
+                    del headers["content-length"]
+                    headers["content-encoding"] = self._encoding
+            await self._send(start)
+        if self._compressor is None or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if more_body and not body:
+            return
+        if len(body) >= _THREAD_OFFLOAD_SIZE:
+            data = await anyio.to_thread.run_sync(self._compress, body, more_body)
+        else:
+            data = self._compress(body, more_body)
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+
+    def _is_negotiable(self, start: Message) -> bool:
+        # Whether the coding of this response depends on Accept-Encoding.
+        headers = Headers(raw=start["headers"])
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        return is_compressible(headers.get("content-type", ""))
+
+    def _should_compress(self, message: Message) -> bool:
+        if self._encoding is None:
+            return False
+        if message.get("more_body", False):
+            return True
+        return len(message.get("body", b"")) >= self._minimum_size
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.compress(body)
+        if more_body:
+            return data + self._compressor.flush()
+        return data + self._compressor.finish()
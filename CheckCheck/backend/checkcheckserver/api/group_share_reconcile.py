@@ -193,7 +193,10 @@ async def reconcile_group_share(
 
     Returns ``{total, added, skipped}`` for the endpoint's summary toast (``added``
     = members newly granted/invited or re-levelled by this call; ``skipped`` =
-    members left unchanged, e.g. an explicit share or an already-correct level)."""
+    members left unchanged, e.g. an explicit share or an already-correct level).
+
+    Commits once: every member's rows and the batch's sync events land in one
+    transaction."""
     shares_on_checklist = await checklist_group_share_crud.list_for_checklist(
         checklist_id=checklist.id
     )
@@ -240,6 +243,7 @@ async def reconcile_group_share(
         await sync_crud.create(
             SyncNotification(cl_id=checklist.id, upd_prop="share_removed")
         )
+    await checklist_collaborator_crud.session.commit()
     return {"total": total, "added": added, "skipped": skipped}
 
 
@@ -261,7 +265,8 @@ async def reconcile_user(
 
     Pre-existing snapshot shares from before living membership are plain
     collaborator rows with ``via_group IS NULL`` → treated as explicit → never
-    touched here, so this is a safe no-op for already-shared users.
+    touched here, so this is a safe no-op for already-shared users. Commits once
+    for all cards.
     """
     user_groups = list(user.oidc_groups or [])
     # Group shares targeting any group the user is currently in.
@@ -299,3 +304,4 @@ async def reconcile_user(
         # collaborator row (advancing the global seq) and emits a per-recipient
         # 'card_shared' poke to this user, and each removal pins its own
         # 'checklist_deleted'. The user's next pull picks all of it up.
+    await checklist_collaborator_crud.session.commit()
@@ -0,0 +1,118 @@
+import datetime
+import enum
+import functools
+import uuid
+from typing import Any, Optional
+
+import msgpack
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# MessagePack variant of the sync-heavy read endpoints, picked with
+# ``Accept: application/msgpack``. The body is the endpoint's response model,
+# dumped field for field like its JSON (same keys, aliases applied), with two
+# compact encodings:
+#
+# * a UUID is a 16-byte ``bin`` (its big-endian bytes, ``uuid.UUID.bytes``);
+# * a timestamp is an ``int``: microseconds since the Unix epoch, UTC (the
+#   naive datetimes the models carry are UTC, see ``naive_utc_now``).
+#
+# Map keys are always strings: an id keying a map (``GET /api/item``) is its
+# canonical text form, as in the JSON. Unpackers reject ``bin`` map keys by
+# default (``strict_map_key``), and the packer cannot tell a key from a value,
+# so an endpoint returning such a map converts its keys before packing.
+#
+# JSON stays the default: a client that does not ask for MessagePack, or asks
+# for JSON with a higher weight, gets JSON. Either answer carries ``Vary:
+# Accept``, so a shared cache keeps the two apart.
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = (
+    MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack",
+    "application/x-msgpack",
+)
+
+# Media ranges a JSON response satisfies, least specific first.
+_JSON_MEDIA_RANGES = ("*/*", "application/*", "application/json")
+
+# For an endpoint's ``responses=``, so the OpenAPI document lists the variant.
+MSGPACK_RESPONSE_DOC = {200: {"content": {MSGPACK_MEDIA_TYPE: {}}}}
+
+# For a ``Response`` an endpoint builds itself in either format.
+VARY_ACCEPT = {"Vary": "Accept"}
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_NAIVE_EPOCH = _EPOCH.replace(tzinfo=None)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def accepts_msgpack(request: Request, response: Optional[Response] = None) -> bool:
+    """Whether the client's ``Accept`` lists MessagePack, at no lower weight
+    than JSON. Pass the endpoint's injected ``response`` when it returns its
+    model for JSON: its headers, ``Vary: Accept`` among them, go on that body."""
+    if response is not None:
+        response.headers.add_vary_header("Accept")
+    msgpack_quality, json_quality = 0.0, 0.0
+    # JSON's weight comes from its most specific match in the header.
+    json_specificity = -1
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in _MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in _JSON_MEDIA_RANGES:
+            specificity = _JSON_MEDIA_RANGES.index(media_type)
+            if specificity > json_specificity:
+                json_specificity, json_quality = specificity, quality
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def _encode_default(value: Any) -> Any:
+    # Called by the packer for every id and timestamp, so the common types come
+    # first and naive datetimes skip the tz conversion.
+    if type(value) is uuid.UUID:
+        return value.bytes
+    if isinstance(value, datetime.datetime):
+        epoch = _EPOCH if value.tzinfo is not None else _NAIVE_EPOCH
+        return (value - epoch) // _MICROSECOND
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def packb(data: Any) -> bytes:
+    """``data`` (a model dump in python mode) as MessagePack."""
+    return msgpack.packb(data, default=_encode_default, use_bin_type=True)
+
+
+def dump_model_msgpack(model: Any) -> bytes:
+    return packb(model.model_dump(by_alias=True))
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def msgpack_response(content: Any, response_model: Any) -> Response:
+    """``content`` as its endpoint's ``response_model`` would render it, but as
+    MessagePack. Validated the way FastAPI validates a return value (ORM rows
+    read by attribute), so the keys match the JSON body."""
+    adapter = _adapter(response_model)
+    data = adapter.dump_python(
+        adapter.validate_python(content, from_attributes=True), by_alias=True
+    )
+    return Response(
+        content=packb(data), media_type=MSGPACK_MEDIA_TYPE, headers=VARY_ACCEPT
+    )
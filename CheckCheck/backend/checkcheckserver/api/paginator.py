@@ -1,7 +1,23 @@
-from typing import Optional, Generic, TypeVar, List, Annotated, Literal, Callable, Type
+from typing import (
+    Optional,
+    Generic,
+    TypeVar,
+    List,
+    Annotated,
+    Literal,
+    Callable,
+    Type,
+    Sequence,
+    Tuple,
+    Any,
+)
+import base64
+import datetime
 import inspect
+import json
+import uuid
 from pydantic import BaseModel, Field
-from fastapi import Query
+from fastapi import HTTPException, Query, status
 from sqlmodel import desc
 from checkcheckserver.config import Config
 
@@ -15,6 +31,7 @@ from checkcheckserver.log import get_logger
 log = get_logger()
 
 from checkcheckserver.model._base_model import BaseTable
+from checkcheckserver.db._keyset import append_seek_to_query
 
 GenericCheckCheckModel = TypeVar("GenericCheckCheckModel")
 
@@ -36,6 +53,84 @@ class PaginatedResponse(BaseModel, Generic[GenericCheckCheckModel]):
     items: List[GenericCheckCheckModel] = Field(
         description=f"List of items returned in the response following given criteria"
     )
+    next_page: Optional[str] = Field(
+        default=None,
+        description="Listings with keyset pagination only: pass it back as `page` "
+        "for the next page. Null on the last page.",
+    )
+
+
+def _encode_key(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_key(value: Any, python_type: type) -> Any:
+    if python_type is uuid.UUID:
+        return uuid.UUID(hex=value)
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is bool:
+        if not isinstance(value, bool):
+            raise ValueError(value)
+        return value
+    if python_type in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return python_type(value)
+    if not isinstance(value, python_type):
+        raise ValueError(value)
+    return value
+
+
+def encode_page_token(offset: int, keys: Sequence[Any]) -> str:
+    """The opaque ``next_page`` token: the sort keys of a page's last row and
+    the offset the next page starts at (so it can still report one)."""
+    raw = json.dumps(
+        [offset, [_encode_key(key) for key in keys]], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_page_token(page: str) -> Tuple[int, List[Any]]:
+    """Offset and raw sort keys of a ``page`` token. The keys are typed against
+    the listing's sort columns by ``parse_page_keys``. The token is opaque to
+    clients; a tampered one can only seek within the caller's own listing, so
+    it is validated but not signed."""
+    try:
+        raw = base64.urlsafe_b64decode(page + "=" * (-len(page) % 4))
+        offset, keys = json.loads(raw)
+        if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+            raise ValueError(page)
+        if not isinstance(keys, list):
+            raise ValueError(page)
+        return offset, keys
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid page token",
+        )
+
+
+def parse_page_keys(page: str, sort_keys: Sequence) -> Tuple[int, List[Any]]:
+    """Offset and sort keys of a ``page`` token, each key converted to the
+    Python type of its column in ``sort_keys``."""
+    offset, keys = decode_page_token(page)
+    try:
+        if len(keys) != len(sort_keys):
+            raise ValueError(page)
+        return offset, [
+            _decode_key(key, column.type.python_type)
+            for key, column in zip(keys, sort_keys)
+        ]
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid page token",
+        )
 
 
 class QueryParamsInterface:
@@ -52,6 +147,8 @@ class QueryParamsInterface:
     limit: Optional[int] = 100
     order_by: Optional[str] = None
     order_desc: bool = False
+    # Keyset pagination (``create_query_params_class(keyset=True)``) only.
+    page: Optional[str] = None
     non_sortable_attributes: List[str] = ["ai_dataversion_id"]
 
     def __init__(offset: Optional[int], limit: int, order_by: str, order_desc: bool):
@@ -87,6 +184,44 @@ class QueryParamsInterface:
             sqlmodel_query = sqlmodel_query.order_by(order_field)
         return sqlmodel_query
 
+    def append_keyset_to_query(
+        self,
+        sqlmodel_query: sqlEpression.Select,
+        sort_keys: Sequence,
+        descending: bool = True,
+    ):
+        """Order by ``sort_keys`` and cut the page: after the ``page`` token's
+        row if there is one, else at ``offset``. ``order_by`` is not applied, the
+        listing's sort keys are what the token encodes."""
+        if self.page is not None:
+            _, after = parse_page_keys(self.page, sort_keys)
+            sqlmodel_query = append_seek_to_query(
+                sqlmodel_query, sort_keys, after=after, descending=descending
+            )
+        else:
+            sqlmodel_query = append_seek_to_query(
+                sqlmodel_query, sort_keys, descending=descending
+            ).offset(self.offset)
+        if self.limit:
+            sqlmodel_query = sqlmodel_query.limit(self.limit)
+        return sqlmodel_query
+
+    def page_offset(self) -> int:
+        """Where the requested page starts in the whole listing."""
+        if self.page is not None:
+            return decode_page_token(self.page)[0]
+        return self.offset or 0
+
+    def next_page_token(
+        self, last_keys: Sequence[Any], count: int, total_count: int
+    ) -> Optional[str]:
+        """The ``next_page`` token after a page of ``count`` rows ending in
+        ``last_keys``, or None if it was the last page."""
+        next_offset = self.page_offset() + count
+        if count == 0 or next_offset >= total_count:
+            return None
+        return encode_page_token(next_offset, last_keys)
+
 
 def create_query_params_class(
     base_class: BaseTable,
@@ -95,6 +230,7 @@ def create_query_params_class(
     default_order_by_attr: str = None,
     non_sortable_attributes: List[str] = None,
     no_ordering: bool = False,
+    keyset: bool = False,
 ) -> Type[QueryParamsInterface]:
     if non_sortable_attributes is None:
         non_sortable_attributes = []
@@ -131,39 +267,78 @@ def create_query_params_class(
         ],
         "order_desc": Annotated[bool, Query(description="Flip the sorting order")],
     }
+    page_annotation = Annotated[
+        Optional[str],
+        Query(
+            description="Continuation token: the previous page's `next_page`. "
+            "Seeks to the next page instead of counting `offset` rows, so deep "
+            "pages stay cheap and rows moving between requests are neither "
+            "skipped nor repeated. Replaces `offset`.",
+        ),
+    ]
 
     if no_ordering or len(model_order_by_attributes) in [0, 1]:
 
-        def __init__func_wrapper(self, offset, limit):
+        def __init__func_wrapper(self, offset, limit, page=None):
             self.offset = offset
             self.limit = limit
+            self.page = page
 
-        init_func: Callable = lambda self, offset, limit: __init__func_wrapper(
-            self, offset, limit
-        )
         del init_annotations["order_by"]
         del init_annotations["order_desc"]
-        init_default = (default_offset, default_limit)
+        if keyset:
+            init_func: Callable = lambda self, offset, limit, page: (
+                __init__func_wrapper(self, offset, limit, page)
+            )
+            init_annotations["page"] = page_annotation
+            init_default = (default_offset, default_limit, None)
+        else:
+            init_func: Callable = lambda self, offset, limit: __init__func_wrapper(
+                self, offset, limit
+            )
+            init_default = (default_offset, default_limit)
     else:
 
-        def __init__func_wrapper(self, offset, limit, order_by, order_desc):
+        def __init__func_wrapper(self, offset, limit, order_by, order_desc, page=None):
             self.offset = offset
             self.limit = limit
             self.order_by = order_by
             self.order_desc = order_desc
+            self.page = page
 
-        init_func: Callable = (
-            lambda self, offset, limit, order_by, order_desc: __init__func_wrapper(
-                self, offset, limit, order_by, order_desc
+        if keyset:
+            init_func: Callable = (
+                lambda self, offset, limit, order_by, order_desc, page: (
+                    __init__func_wrapper(
+                        self, offset, limit, order_by, order_desc, page
+                    )
+                )
             )
-        )
-        init_default = (default_offset, default_limit, default_order_by_attr, False)
+            init_annotations["page"] = page_annotation
+            init_default = (
+                default_offset,
+                default_limit,
+                default_order_by_attr,
+                False,
+                None,
+            )
+        else:
+            init_func: Callable = (
+                lambda self, offset, limit, order_by, order_desc: __init__func_wrapper(
+                    self, offset, limit, order_by, order_desc
+                )
+            )
+            init_default = (default_offset, default_limit, default_order_by_attr, False)
     init_func.__defaults__ = init_default
     init_func.__annotations__ = init_annotations
 
     class_attrs = {
         "__init__": init_func,
+        "page": None,
         "order": QueryParamsInterface.order,
         "append_to_query": QueryParamsInterface.append_to_query,
+        "append_keyset_to_query": QueryParamsInterface.append_keyset_to_query,
+        "page_offset": QueryParamsInterface.page_offset,
+        "next_page_token": QueryParamsInterface.next_page_token,
     }
     return type(f"{base_class.__name__}QueryParams", (), class_attrs)
@@ -428,6 +428,8 @@ async def auth_oidc_callback(
             )
         except Exception as e:  # noqa: BLE001
             log.error(f"Group-share reconcile on login failed for {user.id}: {e}", exc_info=True)
+            # Drop the half-staged reconcile so the login's own writes commit.
+            await checklist_collaborator_crud.session.rollback()
     user_auth = await user_auth_crud.create(
         UserAuthCreate(
             user_id=user.id,
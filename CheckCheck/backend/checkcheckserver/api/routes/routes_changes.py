@@ -1,7 +1,23 @@
-from typing import List, Optional
+from typing import (
+    AsyncIterator,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+import base64
+import heapq
+import json
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from checkcheckserver.db.user import User
 from checkcheckserver.api.auth.security import get_current_user
@@ -9,14 +25,31 @@ from checkcheckserver.api.access import (
     attach_my_permission,
     ChecklistAccessLevel,
 )
+from checkcheckserver.api.msgpack_response import (
+    MSGPACK_MEDIA_TYPE,
+    VARY_ACCEPT,
+    accepts_msgpack,
+    dump_model_msgpack,
+)
+from checkcheckserver.api.single_flight import SingleFlight
+from checkcheckserver.db._session import get_async_session, get_async_session_context
 from checkcheckserver.db.checklist import CheckListCRUD
 from checkcheckserver.db.checklist_item import CheckListItemCRUD
 from checkcheckserver.db.checklist_label import ChecklistLabelCRUD
-from checkcheckserver.db.checklist_collaborator import CheckListCollaboratorCRUD
-from checkcheckserver.db.checklist_position import CheckListPositionCRUD
 from checkcheckserver.db.label import LabelCRUD
-from checkcheckserver.db.sync_seq import get_current_server_seq
+from checkcheckserver.db.sync_seq import (
+    FEED_KIND_CHECKLIST,
+    FEED_KIND_ITEM,
+    FEED_KIND_LABEL,
+    FeedKey,
+)
+from checkcheckserver.db.sync_feed import ChangesScope, resolve_changes_scope
+from checkcheckserver.db.sync_watermark import SyncCursorState, get_sync_cursor_state
+from checkcheckserver.model._base_model import uses_sequence_allocator
 from checkcheckserver.model.changes import ChangesResponse
+from checkcheckserver.model.checklist import CheckList, CheckListApiWithSubObj
+from checkcheckserver.model.checklist_item import CheckListItemRead
+from checkcheckserver.model.label import LabelReadAPI
 from checkcheckserver.config import Config
 from checkcheckserver.log import get_logger
 
@@ -26,6 +59,19 @@ log = get_logger()
 
 fast_api_changes_router: APIRouter = APIRouter()
 
+# After a ``changes_available`` poke every open tab / device of a user pulls at
+# about the same moment, with the same cursor. Identical concurrent pulls share
+# one computation and one serialised body (see ``get_changes``).
+changes_single_flight: SingleFlight[bytes] = SingleFlight()
+
+# Streamed variant of the feed (``Accept: application/x-ndjson``), see
+# ``_stream_changes``. Rows per line and per fetch from the server-side cursor.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_NDJSON_CHUNK_SIZE = 200
+
+# Largest page a paged pull (``limit``) may ask for.
+MAX_CHANGES_PAGE_SIZE = 5000
+
 
 def _parse_known_ids(known: Optional[str]) -> List[uuid.UUID]:
     """Parse the caller's comma-separated ``known`` checklist ids (the cards it
@@ -45,6 +91,37 @@ def _parse_known_ids(known: Optional[str]) -> List[uuid.UUID]:
     return parsed
 
 
+def _encode_page_token(since: int, last: FeedKey, start_seq: int) -> str:
+    raw = json.dumps(
+        [since, last.seq, last.kind, last.id.hex, start_seq], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def _parse_page_token(page: str) -> Tuple[int, FeedKey, Optional[int]]:
+    """The cursor a paged pull started from, the last row it has returned so
+    far and the high-water mark when its first page was read (missing from
+    tokens handed out before it was added). The token is opaque to clients; a
+    tampered one can only page through the caller's own feed, so it is validated
+    but not signed."""
+    try:
+        raw = base64.urlsafe_b64decode(page + "=" * (-len(page) % 4))
+        since, seq, kind, last_id, *start = json.loads(raw)
+        if len(start) > 1 or not all(
+            isinstance(v, int) for v in (since, seq, kind, *start)
+        ):
+            raise ValueError(page)
+        start_seq = start[0] if start else None
+        if kind not in (FEED_KIND_CHECKLIST, FEED_KIND_ITEM, FEED_KIND_LABEL):
+            raise ValueError(page)
+        return since, FeedKey(seq, kind, uuid.UUID(hex=last_id)), start_seq
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid page token",
+        )
+
+
 @fast_api_changes_router.get(
     "/changes",
     response_model=ChangesResponse,
@@ -56,138 +133,507 @@ def _parse_known_ids(known: Optional[str]) -> List[uuid.UUID]:
         "monotonic `server_seq` stamped on every syncable write; it is client-"
         "owned and per-device (the server keeps no per-client state). A `since` "
         "greater than the server's high-water mark (client ahead of a reset/"
-        "restored DB) returns `full_resync=true` with the full accessible state.\n\n"
+        "restored DB), or older than the oldest cursor the server can still "
+        "answer, returns `full_resync=true` with the full accessible state.\n\n"
         "**Access changes** — cards the caller just gained access to are shipped "
         "in full (card + all items), since their rows predate the grant. Cards the "
-        "caller lost access to are returned in `removed_checklist_ids`; to compute "
-        "that, pass the ids the client currently caches as a comma-separated "
-        "`known` query param."
+        "caller lost access to since the cursor are returned in "
+        "`removed_checklist_ids`, from a server-side access log.\n\n"
+        "**Empty pulls** — a cursor at or above the caller's watermark (the "
+        "highest `server_seq` of a write visible to them, including access "
+        "losses) is answered with an empty delta without scanning.\n\n"
+        "**Streaming** — with `Accept: application/x-ndjson` the delta is sent as "
+        "newline-delimited JSON while it is read: a `{next_cursor, full_resync}` "
+        "header line, then lines like `{\"checklists\": [...]}` holding up to 200 "
+        "rows of one `ChangesResponse` field each, then `{\"done\": true}`. "
+        "Meant for a fresh device's `since=0` bootstrap; a stream that ends "
+        "without the `done` line is incomplete and its cursor must not be kept.\n\n"
+        "**Paging** — with `limit` the delta is returned in pages of at most that "
+        "many checklists, items and labels, ordered by `server_seq`. While "
+        "`has_more` is true, pass `next_page` back as `page` (with the same "
+        "`limit`); `next_cursor` stays at the starting cursor until the last page, "
+        "which carries the removals. A `full_resync` pull and a stream are never "
+        "paged.\n\n"
+        "**MessagePack** — with `Accept: application/msgpack` a (non-streamed) "
+        "response is the same `ChangesResponse` as MessagePack: ids as 16-byte "
+        "binaries, timestamps as integer microseconds since the Unix epoch (UTC)."
     ),
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}}},
 )
 async def get_changes(
+    request: Request,
     since: int = Query(
         0,
         description="The caller's sync cursor (a server_seq). 0 = full bootstrap.",
     ),
     known: Optional[str] = Query(
         None,
+        deprecated=True,
         description=(
-            "Comma-separated checklist ids the client currently has cached. Used "
-            "to compute removed_checklist_ids (access revocations). Omit on the "
-            "first pull."
+            "Comma-separated checklist ids the client currently has cached. No "
+            "longer needed: access revocations come from a server-side log. Any "
+            "of these ids the caller can no longer see is still reported in "
+            "removed_checklist_ids."
         ),
     ),
-    checklist_crud: CheckListCRUD = Depends(CheckListCRUD.get_crud),
-    checklist_item_crud: CheckListItemCRUD = Depends(CheckListItemCRUD.get_crud),
-    checklist_label_crud: ChecklistLabelCRUD = Depends(ChecklistLabelCRUD.get_crud),
-    checklist_collaborator_crud: CheckListCollaboratorCRUD = Depends(
-        CheckListCollaboratorCRUD.get_crud
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_CHANGES_PAGE_SIZE,
+        description=(
+            "Page size: return at most this many rows (checklists, items and "
+            "labels together) and set `has_more` if more are left. Omit for the "
+            "whole delta in one response."
+        ),
     ),
-    checklist_position_crud: CheckListPositionCRUD = Depends(
-        CheckListPositionCRUD.get_crud
+    page: Optional[str] = Query(
+        None,
+        description=(
+            "Continuation token: the previous page's `next_page`. Replaces `since` "
+            "while paging."
+        ),
     ),
-    label_crud: LabelCRUD = Depends(LabelCRUD.get_crud),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ) -> ChangesResponse:
-    user_id = current_user.id
-
     # Read the high-water mark FIRST so next_cursor can never sit above a row this
     # pull misses (at worst a mid-pull commit is re-delivered next time).
-    current_seq = await get_current_server_seq(checklist_crud.session)
-
-    full_resync = False
-    if since < 0 or since > current_seq:
-        # Client ahead of the server (DB reset/restore) or a nonsense cursor:
-        # rebuild from scratch.
-        full_resync = True
-        since = 0
-
-    # Cards the caller can currently see (owner + accepted collaborator).
-    accessible_ids = set(await checklist_crud.list_access_ids(user_id=user_id))
-
-    # Access just (re)granted since the cursor → ship the whole tree for these.
-    # Keyed off the caller's position-row creation (granted_seq), which every grant
-    # path stamps — including ownership transfer to a non-collaborator, which the
-    # old accepted-collaborator-seq signal missed (review finding 1).
-    gain_ids = set(
-        await checklist_position_crud.list_gained_access_checklist_ids(
-            user_id=user_id, since=since
+    user_id = current_user.id
+    after: Optional[FeedKey] = None
+    start_seq: Optional[int] = None
+    if page is not None:
+        since, after, start_seq = _parse_page_token(page)
+    cursor_state = await get_sync_cursor_state(session, user_id, since)
+    current_seq, watermark = cursor_state.server_seq, cursor_state.watermark
+    if start_seq is None:
+        start_seq = current_seq
+    stream = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    binary = not stream and accepts_msgpack(request)
+    media_type = MSGPACK_MEDIA_TYPE if binary else "application/json"
+    full_resync = _needs_full_resync(since, cursor_state)
+    if full_resync:
+        # Rebuild from scratch, computed as if since=0. Never paged: the client
+        # replaces its whole cache with the response.
+        since, limit, after = 0, None, None
+    elif watermark is None or watermark <= since:
+        # Nothing the caller can see changed since their cursor: skip the scans
+        # (see db/sync_watermark.py). Access losses bump the watermark too.
+        if stream:
+            return StreamingResponse(
+                _empty_stream(current_seq),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=VARY_ACCEPT,
+            )
+        return Response(
+            content=_empty_changes(current_seq, binary),
+            media_type=media_type,
+            headers=VARY_ACCEPT,
         )
-    ) & accessible_ids
-
-    # Cards whose card-level state (row / this user's position / labels /
-    # collaborator permission) changed. Union with gain_ids for the card-level
-    # payload.
-    changed_card_ids = set(
-        await checklist_crud.list_changed_checklist_ids_for_user(
-            user_id=user_id, since=since
+    known_ids = frozenset(_parse_known_ids(known))
+    # Hand the request's connection back to the pool while this pull waits for
+    # (or runs) the shared computation, which uses a session of its own.
+    await session.close()
+
+    if stream:
+        return StreamingResponse(
+            _stream_changes(user_id, since, known_ids, current_seq, full_resync),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=VARY_ACCEPT,
         )
+
+    # Pulls for the same user, cursor, page, known set *and* high-water mark have the
+    # same answer, so a pull joins one already in flight. The high-water mark is
+    # part of the key: a pull poked by a newer commit never joins a computation
+    # that started before that commit and could miss it.
+    async def compute() -> bytes:
+        # Its own session: the computation outlives whichever request started
+        # it if that client goes away.
+        async with get_async_session_context() as compute_session:
+            if limit is None:
+                changes = await _compute_changes(
+                    compute_session,
+                    user_id,
+                    since,
+                    known_ids,
+                    current_seq,
+                    full_resync,
+                )
+            else:
+                changes = await _compute_changes_page(
+                    compute_session,
+                    user_id,
+                    since,
+                    known_ids,
+                    current_seq,
+                    start_seq,
+                    limit,
+                    after,
+                )
+            # Serialised once for everyone sharing the pull, inside the session
+            # (rendering may still touch ORM attributes).
+            return _encode_changes(changes, binary)
+
+    body = await changes_single_flight.do(
+        (
+            user_id,
+            since,
+            full_resync,
+            known_ids,
+            current_seq,
+            start_seq,
+            limit,
+            after,
+            binary,
+        ),
+        compute,
+    )
+    return Response(content=body, media_type=media_type, headers=VARY_ACCEPT)
+
+
+def _needs_full_resync(since: int, cursor_state: SyncCursorState) -> bool:
+    # A client ahead of the server (DB reset/restore), a nonsense cursor, or one
+    # older than the feed can answer exactly (see ``SyncSequence.min_cursor``).
+    # since=0 is a bootstrap, which caches nothing to reconcile.
+    if since < 0 or since > cursor_state.server_seq:
+        return True
+    return 0 < since < cursor_state.min_cursor
+
+
+def _changes_header(current_seq: int, full_resync: bool = False) -> dict:
+    return {"next_cursor": current_seq, "full_resync": full_resync}
+
+
+def _encode_changes(changes: ChangesResponse, binary: bool = False) -> bytes:
+    if binary:
+        return dump_model_msgpack(changes)
+    return changes.model_dump_json(by_alias=True).encode()
+
+
+def _empty_changes(current_seq: int, binary: bool = False) -> bytes:
+    return _encode_changes(
+        ChangesResponse(
+            **_changes_header(current_seq),
+            checklists=[],
+            items=[],
+            labels=[],
+            checklist_tombstones=[],
+            item_tombstones=[],
+            label_tombstones=[],
+            removed_checklist_ids=[],
+        ),
+        binary,
     )
-    card_ids_to_emit = changed_card_ids | gain_ids
 
-    checklists = await checklist_crud.list_full_by_ids_for_user(
-        checklist_ids=list(card_ids_to_emit), user_id=user_id
+
+class _ChangesScope(NamedTuple):
+    """What a pull returns, as ids: resolved before any row is loaded."""
+
+    since: int
+    full_resync: bool
+    gain_ids: Set[uuid.UUID]
+    card_ids: List[uuid.UUID]
+    has_items: bool
+    has_labels: bool
+    checklist_tombstones: List[uuid.UUID]
+    item_tombstones: List[uuid.UUID]
+    label_tombstones: List[uuid.UUID]
+    removed_checklist_ids: List[uuid.UUID]
+
+
+async def _resolve_scope(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    since: int,
+    known_ids: FrozenSet[uuid.UUID],
+    full_resync: bool,
+) -> _ChangesScope:
+    scope = await resolve_changes_scope(session, user_id, since)
+    # Cards whose card-level state changed, plus the cards gained since the
+    # cursor, whose whole tree ships.
+    return _ChangesScope(
+        since=since,
+        full_resync=full_resync,
+        gain_ids=scope.gain_ids,
+        card_ids=list(scope.changed_card_ids | scope.gain_ids),
+        has_items=scope.has_items,
+        has_labels=scope.has_labels,
+        **_removals(scope, known_ids)._asdict(),
     )
-    # Per-user labels + effective permission, batched like the grid route. The
-    # eager-loaded (unscoped) labels are replaced with the caller's own set.
-    labels_by_checklist = (
-        await checklist_label_crud.list_labels_for_user_by_checklist(
-            checklist_ids=list(card_ids_to_emit), user_id=user_id
-        )
+
+
+class _Removals(NamedTuple):
+    checklist_tombstones: List[uuid.UUID]
+    item_tombstones: List[uuid.UUID]
+    label_tombstones: List[uuid.UUID]
+    removed_checklist_ids: List[uuid.UUID]
+
+
+def _removals(scope: ChangesScope, known_ids: FrozenSet[uuid.UUID]) -> _Removals:
+    # Access revocations: cards the caller lost since the cursor (the access log),
+    # plus any ids an older client still reports as ``known``, minus those
+    # regained or reported as tombstoned.
+    tombstone_set = set(scope.checklist_tombstones)
+    removed_checklist_ids = [
+        cl_id
+        for cl_id in dict.fromkeys([*scope.lost_ids, *known_ids])
+        if cl_id not in scope.accessible_ids and cl_id not in tombstone_set
+    ]
+    return _Removals(
+        checklist_tombstones=scope.checklist_tombstones,
+        item_tombstones=scope.item_tombstones,
+        label_tombstones=scope.label_tombstones,
+        removed_checklist_ids=removed_checklist_ids,
     )
-    collaborator_permissions = (
-        await checklist_collaborator_crud.permissions_for_user_by_checklist(
-            checklist_ids=list(card_ids_to_emit), user_id=user_id
-        )
+
+
+async def _attach_user_view(
+    session: AsyncSession,
+    rows: List[Tuple[CheckList, Optional[str]]],
+    user_id: uuid.UUID,
+) -> List[CheckList]:
+    # Per-user labels + effective permission for ``list_full_by_ids_for_user``'s
+    # rows. The labels are set as loaded state, so the cards stay clean and
+    # nothing is written back.
+    checklists = [checklist for checklist, _ in rows]
+    labels_by_checklist = await ChecklistLabelCRUD(
+        session
+    ).list_labels_for_user_by_checklist(
+        checklist_ids=[checklist.id for checklist in checklists], user_id=user_id
     )
-    for checklist in checklists:
-        checklist.labels = labels_by_checklist.get(checklist.id, [])
+    for checklist, collaborator_permission in rows:
+        set_committed_value(
+            checklist, "labels", labels_by_checklist.get(checklist.id, [])
+        )
         if checklist.owner_id == user_id:
             attach_my_permission(checklist, ChecklistAccessLevel.owner)
         else:
             attach_my_permission(
-                checklist,
-                collaborator_permissions.get(checklist.id, ChecklistAccessLevel.view),
+                checklist, collaborator_permission or ChecklistAccessLevel.view
             )
+    return checklists
 
-    # Items: changed items for accessible cards the caller already had, plus the
-    # full tree for gained-access cards. Item changes surface independently of the
-    # card row, so scan every accessible (non-gain) card, not only changed cards.
-    items = await checklist_item_crud.list_changed_items(
-        since=since,
-        changed_checklist_ids=list(accessible_ids - gain_ids),
-        full_checklist_ids=list(gain_ids),
+
+async def _load_checklists(
+    session: AsyncSession, checklist_ids: List[uuid.UUID], user_id: uuid.UUID
+) -> List[CheckList]:
+    if not checklist_ids:
+        return []
+    rows = await CheckListCRUD(session).list_full_by_ids_for_user(
+        checklist_ids=checklist_ids, user_id=user_id
     )
+    return await _attach_user_view(session, rows, user_id)
+
+
+async def _compute_changes(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    since: int,
+    known_ids: FrozenSet[uuid.UUID],
+    current_seq: int,
+    full_resync: bool,
+) -> ChangesResponse:
+    scope = await _resolve_scope(session, user_id, since, known_ids, full_resync)
+
+    checklists = await _load_checklists(session, scope.card_ids, user_id)
+    # Items: changed items of every accessible card, plus the full tree of
+    # gained-access cards. Item changes surface independently of the card row.
+    items = []
+    if scope.has_items:
+        items = await CheckListItemCRUD(session).list_changed_items(
+            since=scope.since,
+            access=CheckListCRUD(session).access_cte(user_id),
+        )
+    labels = []
+    if scope.has_labels:
+        labels = await LabelCRUD(session).list_changed(
+            user_id=user_id, since=scope.since
+        )
 
-    # Tombstones.
-    checklist_tombstones = await checklist_crud.list_tombstoned_checklist_ids_for_user(
-        user_id=user_id, since=since
+    return ChangesResponse(
+        **_changes_header(current_seq, scope.full_resync),
+        checklists=checklists,
+        items=items,
+        labels=labels,
+        checklist_tombstones=scope.checklist_tombstones,
+        item_tombstones=scope.item_tombstones,
+        label_tombstones=scope.label_tombstones,
+        removed_checklist_ids=scope.removed_checklist_ids,
     )
-    item_tombstones = await checklist_item_crud.list_tombstoned_item_ids(
-        checklist_ids=list(accessible_ids), since=since
+
+
+# ── Paged variant (limit / page) ─────────────────────────────────────────────
+
+
+async def _compute_changes_page(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    since: int,
+    known_ids: FrozenSet[uuid.UUID],
+    current_seq: int,
+    start_seq: int,
+    limit: int,
+    after: Optional[FeedKey],
+) -> ChangesResponse:
+    """The next ``limit`` rows of the delta since ``since`` after ``after``, in
+    the feed's ``(seq, kind, id)`` order (see ``db/sync_seq.py``).
+
+    Every page is resolved against the cursor the paging started from. A row
+    written while the client pages gets a seq above every row already returned,
+    so it lands on a later page; nothing is skipped, at worst re-sent. The
+    removals only go out on the last page, which hands out ``next_cursor``.
+
+    With the sequence allocator a row can also commit, while the client pages,
+    with a seq the walk has already passed. The last page then hands out
+    ``start_seq``, the high-water mark when the first page was read, below which
+    everything was committed; the next pull re-sends what lies above it."""
+    checklist_crud = CheckListCRUD(session)
+
+    # One row past the page per kind tells whether any rows are left.
+    card_keys = await checklist_crud.list_changed_checklist_keys_for_user(
+        user_id=user_id, since=since, after=after, limit=limit + 1
     )
-    label_tombstones = await label_crud.list_tombstoned_ids(
-        user_id=user_id, since=since
+    item_rows = await CheckListItemCRUD(session).list_changed_items_page(
+        user_id=user_id,
+        since=since,
+        access=checklist_crud.access_cte(user_id),
+        after=after,
+        limit=limit + 1,
+    )
+    label_rows = await LabelCRUD(session).list_changed_page(
+        user_id=user_id, since=since, after=after, limit=limit + 1
+    )
+    # Each list is in feed order already and kinds never tie, so merging on
+    # (seq, kind) keeps the id order the database returned.
+    rows = list(
+        heapq.merge(
+            ((seq, FEED_KIND_CHECKLIST, cl_id) for seq, cl_id in card_keys),
+            ((seq, FEED_KIND_ITEM, item) for seq, item in item_rows),
+            ((seq, FEED_KIND_LABEL, label) for seq, label in label_rows),
+            key=lambda row: row[:2],
+        )
     )
-    labels = await label_crud.list_changed(user_id=user_id, since=since)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    # Access revocations: ids the client caches that it can no longer see and that
-    # are not already reported as tombstoned.
-    tombstone_set = set(checklist_tombstones)
-    removed_checklist_ids = [
-        kid
-        for kid in _parse_known_ids(known)
-        if kid not in accessible_ids and kid not in tombstone_set
-    ]
+    card_ids = [row for _, kind, row in rows if kind == FEED_KIND_CHECKLIST]
+    checklists = await _load_checklists(session, card_ids, user_id)
+    page_order = {cl_id: index for index, cl_id in enumerate(card_ids)}
+    checklists.sort(key=lambda checklist: page_order[checklist.id])
+    items = [row for _, kind, row in rows if kind == FEED_KIND_ITEM]
+    labels = [row for _, kind, row in rows if kind == FEED_KIND_LABEL]
 
+    if has_more:
+        seq, kind, last = rows[-1]
+        last_id = last if kind == FEED_KIND_CHECKLIST else last.id
+        return ChangesResponse(
+            **_changes_header(since),
+            has_more=True,
+            next_page=_encode_page_token(
+                since, FeedKey(seq, kind, last_id), start_seq
+            ),
+            checklists=checklists,
+            items=items,
+            labels=labels,
+            checklist_tombstones=[],
+            item_tombstones=[],
+            label_tombstones=[],
+            removed_checklist_ids=[],
+        )
+    scope = await resolve_changes_scope(
+        session, user_id, since, payload_flags=False
+    )
+    next_cursor = start_seq if uses_sequence_allocator() else current_seq
     return ChangesResponse(
-        next_cursor=current_seq,
-        full_resync=full_resync,
+        **_changes_header(next_cursor),
         checklists=checklists,
         items=items,
         labels=labels,
-        checklist_tombstones=checklist_tombstones,
-        item_tombstones=item_tombstones,
-        label_tombstones=label_tombstones,
-        removed_checklist_ids=removed_checklist_ids,
+        **_removals(scope, known_ids)._asdict(),
     )
+
+
+# ── Streamed variant (Accept: application/x-ndjson) ──────────────────────────
+
+_CHECKLISTS = TypeAdapter(List[CheckListApiWithSubObj])
+_ITEMS = TypeAdapter(List[CheckListItemRead])
+_LABELS = TypeAdapter(List[LabelReadAPI])
+_IDS = TypeAdapter(List[uuid.UUID])
+
+
+def _ndjson_line(obj: dict) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+def _ndjson_rows(key: str, adapter: TypeAdapter, rows: list) -> bytes:
+    body = adapter.dump_json(
+        adapter.validate_python(rows, from_attributes=True), by_alias=True
+    )
+    return b'{"' + key.encode() + b'":' + body + b"}\n"
+
+
+def _chunks(rows: list) -> Iterator[list]:
+    for i in range(0, len(rows), _NDJSON_CHUNK_SIZE):
+        yield rows[i : i + _NDJSON_CHUNK_SIZE]
+
+
+async def _stream_changes(
+    user_id: uuid.UUID,
+    since: int,
+    known_ids: FrozenSet[uuid.UUID],
+    current_seq: int,
+    full_resync: bool,
+) -> AsyncIterator[bytes]:
+    """The delta as NDJSON: a header line with ``next_cursor`` / ``full_resync``,
+    then one line per chunk of up to ``_NDJSON_CHUNK_SIZE`` rows, keyed by the
+    ``ChangesResponse`` field it belongs to, and a final ``{"done":true}``.
+
+    Cards and items are read from server-side cursors and sent chunk by chunk,
+    so memory stays flat whatever the account size and the first bytes go out
+    before the last row is read."""
+    async with get_async_session_context() as session:
+        scope = await _resolve_scope(
+            session, user_id, since, known_ids, full_resync
+        )
+        yield _ndjson_line(_changes_header(current_seq, scope.full_resync))
+
+        async for rows in CheckListCRUD(session).stream_full_by_ids_for_user(
+            checklist_ids=scope.card_ids,
+            user_id=user_id,
+            chunk_size=_NDJSON_CHUNK_SIZE,
+        ):
+            checklists = await _attach_user_view(session, rows, user_id)
+            yield _ndjson_rows("checklists", _CHECKLISTS, checklists)
+            # Drop the sent cards (and their labels) from the session.
+            session.expunge_all()
+
+        if scope.has_items:
+            async for items in CheckListItemCRUD(session).stream_changed_items(
+                since=scope.since,
+                access=CheckListCRUD(session).access_cte(user_id),
+                chunk_size=_NDJSON_CHUNK_SIZE,
+            ):
+                yield _ndjson_rows("items", _ITEMS, items)
+
+        # A user's own labels: a few dozen at most.
+        if scope.has_labels:
+            labels = await LabelCRUD(session).list_changed(
+                user_id=user_id, since=scope.since
+            )
+            for chunk in _chunks(labels):
+                yield _ndjson_rows("labels", _LABELS, chunk)
+
+        for key in (
+            "checklist_tombstones",
+            "item_tombstones",
+            "label_tombstones",
+            "removed_checklist_ids",
+        ):
+            for chunk in _chunks(getattr(scope, key)):
+                yield _ndjson_rows(key, _IDS, chunk)
+
+    yield _ndjson_line({"done": True})
+
+
+async def _empty_stream(current_seq: int) -> AsyncIterator[bytes]:
+    yield _ndjson_line(_changes_header(current_seq))
+    yield _ndjson_line({"done": True})
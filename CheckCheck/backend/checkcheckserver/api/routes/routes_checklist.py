@@ -11,6 +11,7 @@ from fastapi import (
     Body,
     Form,
     Path,
+    Request,
     Response,
 )
 
@@ -65,6 +66,11 @@ from checkcheckserver.api.access import (
     ChecklistAccessLevel,
     UserChecklistAccess,
 )
+from checkcheckserver.api.msgpack_response import (
+    MSGPACK_RESPONSE_DOC,
+    accepts_msgpack,
+    msgpack_response,
+)
 from checkcheckserver.api.paginator import (
     PaginatedResponse,
     create_query_params_class,
@@ -84,7 +90,7 @@ log = get_logger()
 fast_api_checklist_router: APIRouter = APIRouter()
 
 CheckListQueryParams: Type[QueryParamsInterface] = create_query_params_class(
-    CheckList, no_ordering=True
+    CheckList, no_ordering=True, keyset=True
 )
 CheckListPublicQueryParams: Type[QueryParamsInterface] = create_query_params_class(
     CheckListApi
@@ -94,9 +100,12 @@ CheckListPublicQueryParams: Type[QueryParamsInterface] = create_query_params_cla
 @fast_api_checklist_router.get(
     "/checklist",
     response_model=PaginatedResponse[CheckListApiWithSubObj],
-    description=f"List all CheckLists of the current user with their positions and configuration. This is a rather expensive endpoint and should be only used when really needed.",
+    description=f"List all CheckLists of the current user with their positions and configuration. This is a rather expensive endpoint and should be only used when really needed. Page with `offset`, or pass `next_page` back as `page`. Send `Accept: application/msgpack` for a MessagePack body.",
+    responses=MSGPACK_RESPONSE_DOC,
 )
 async def list_checklists(
+    request: Request,
+    response: Response,
     archived: Optional[bool] = Query(False),
     label_id: Optional[uuid.UUID] = None,
     search: Optional[str] = Query(None),
@@ -106,50 +115,34 @@ async def list_checklists(
         "shared *by* the caller ('by_me'). ANDs with label_id/search/archived.",
     ),
     checklist_crud: CheckListCRUD = Depends(CheckListCRUD.get_crud),
-    checklist_label_crud: ChecklistLabelCRUD = Depends(ChecklistLabelCRUD.get_crud),
-    checklist_collaborator_crud: CheckListCollaboratorCRUD = Depends(
-        CheckListCollaboratorCRUD.get_crud
-    ),
     pagination: QueryParamsInterface = Depends(CheckListQueryParams),
     current_user: User = Depends(get_current_user),
 ) -> PaginatedResponse[CheckListApiWithSubObj]:
-    result_checklist_items = await checklist_crud.list(
-        user_id=current_user.id,
-        archived=archived,
-        pagination=pagination,
-        include_sub_obj=True,
-        label_id=label_id,
-        search=search,
-        shared=shared,
-    )
-    total_count = await checklist_crud.count(
+    # One statement for the page, its total, and the caller's position, labels
+    # and collaborator permission on each card (see CheckListCRUD.list_for_grid).
+    total_count, rows, next_page = await checklist_crud.list_for_grid(
         user_id=current_user.id,
         archived=archived,
         label_id=label_id,
         search=search,
         shared=shared,
+        pagination=pagination,
     )
-    # Labels are per-user; the ORM relationship returns every collaborator's
-    # labels on a shared card, so scope each card's labels to the caller. Done
-    # after every query above so the in-memory reassignment never triggers an
-    # autoflush (it is never committed).
-    labels_by_checklist = await checklist_label_crud.list_labels_for_user_by_checklist(
-        checklist_ids=[cl.id for cl in result_checklist_items],
-        user_id=current_user.id,
-    )
-    for checklist in result_checklist_items:
-        checklist.labels = labels_by_checklist.get(checklist.id, [])
+    if total_count is None:
+        # An empty page carries no total.
+        total_count = await checklist_crud.count(
+            user_id=current_user.id,
+            archived=archived,
+            label_id=label_id,
+            search=search,
+            shared=shared,
+        )
     # Attach the caller's effective permission (P0.1) so the client can gate
     # owner-only / collaborator UI. A listed card is one the caller owns or is an
     # accepted collaborator on (pending invites have no position, so never list);
     # resolve owner -> "owner", everyone else from their collaborator level.
-    collaborator_permissions = (
-        await checklist_collaborator_crud.permissions_for_user_by_checklist(
-            checklist_ids=[cl.id for cl in result_checklist_items],
-            user_id=current_user.id,
-        )
-    )
-    for checklist in result_checklist_items:
+    result_checklist_items = []
+    for checklist, collaborator_permission in rows:
         if checklist.owner_id == current_user.id:
             attach_my_permission(checklist, ChecklistAccessLevel.owner)
         else:
@@ -158,17 +151,19 @@ async def list_checklists(
             # inner-join), so a missing entry would be an invariant violation — fall
             # back to "view" rather than 500 the whole grid.
             attach_my_permission(
-                checklist,
-                collaborator_permissions.get(
-                    checklist.id, ChecklistAccessLevel.view
-                ),
+                checklist, collaborator_permission or ChecklistAccessLevel.view
             )
-    return PaginatedResponse(
+        result_checklist_items.append(checklist)
+    page = PaginatedResponse(
         total_count=total_count,
-        offset=pagination.offset,
+        offset=pagination.page_offset(),
         count=len(result_checklist_items),
         items=result_checklist_items,
+        next_page=next_page,
     )
+    if accepts_msgpack(request, response):
+        return msgpack_response(page, PaginatedResponse[CheckListApiWithSubObj])
+    return page
 
 
 @fast_api_checklist_router.post(
@@ -252,6 +247,7 @@ async def create_checklist(
             index=new_order_position,
         )
     )
+    await sync_crud.create(SyncNotification(cl_id=checklist_db.id, upd_prop="checklist_created"))
     await checklist_crud.session.commit()
     # Refresh both just-inserted rows so their relationships load as (empty) rather
     # than lazily on access during serialization — a lazy load on the async session
@@ -262,7 +258,6 @@ async def create_checklist(
     checklist_db.position = index
     # The creator is always the owner.
     attach_my_permission(checklist_db, ChecklistAccessLevel.owner)
-    await sync_crud.create(SyncNotification(cl_id=checklist_db.id, upd_prop="checklist_created"))
     return checklist_db
 
 
@@ -353,6 +348,7 @@ async def update_checklist(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
     current_user: User = Depends(get_current_user),
 ) -> CheckListApiWithSubObj:
+    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist"))
     result = await checklist_crud.update(
         id_=checklist_id,
         update_obj=checklist,
@@ -370,7 +366,6 @@ async def update_checklist(
     )
     scope_position_to_caller(result, user_position)
     attach_my_permission(result, checklist_access.permission_level())
-    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist"))
     return result
 
 
@@ -400,11 +395,8 @@ async def delete_checklist(
         await checklist_position_crud.delete(
             user_id=leaver_id, checklist_id=checklist_id
         )
-        await checklist_collaborator_crud.delete(
-            user_id=leaver_id, checklist_id=checklist_id
-        )
         # Only the leaver should drop the card from their view. Pin the target
-        # explicitly: by now their collaborator row is gone, so dynamic
+        # explicitly: by delivery their collaborator row is gone, so dynamic
         # resolution would exclude them and notify everyone *else* instead.
         await sync_crud.create(
             SyncNotification(cl_id=checklist_id, upd_prop="checklist_deleted"),
@@ -414,6 +406,9 @@ async def delete_checklist(
         await sync_crud.create(
             SyncNotification(cl_id=checklist_id, upd_prop="share_removed")
         )
+        await checklist_collaborator_crud.delete(
+            user_id=leaver_id, checklist_id=checklist_id
+        )
         return
 
     if checklist_access.user_is_owner():
@@ -429,6 +424,10 @@ async def delete_checklist(
         # NOT hard-delete the positions here: the card ORM object loaded by the
         # access guard eager-joins its position, and deleting that row out from
         # under it would break the tombstone flush's save-update cascade.
+        await sync_crud.create(
+            SyncNotification(cl_id=checklist_id, upd_prop="checklist_deleted"),
+            target_user_ids=target_user_ids,
+        )
         await checklist_crud.soft_delete(
             id_=checklist_id,
             raise_exception_if_not_exists=HTTPException(
@@ -436,7 +435,3 @@ async def delete_checklist(
                 detail=f"No checklist with id '{checklist_id}'",
             ),
         )
-        await sync_crud.create(
-            SyncNotification(cl_id=checklist_id, upd_prop="checklist_deleted"),
-            target_user_ids=target_user_ids,
-        )
@@ -11,6 +11,7 @@ from fastapi import (
     Body,
     Form,
     Path,
+    Request,
     Response,
 )
 import decimal
@@ -75,6 +76,11 @@ from checkcheckserver.api.access import (
     UserChecklistAccess,
     verify_item_belongs_to_checklist,
 )
+from checkcheckserver.api.msgpack_response import (
+    MSGPACK_RESPONSE_DOC,
+    accepts_msgpack,
+    msgpack_response,
+)
 from checkcheckserver.api.paginator import (
     PaginatedResponse,
     create_query_params_class,
@@ -140,9 +146,12 @@ class BulkItemOpResult(BaseModel):
 @fast_api_checklist_item_router.get(
     "/item",
     response_model=Dict[uuid.UUID, CheckListsItemPreview],
-    description=f"List first items of all or certain checklists. This should only be used as a bootstrap endpoint to initaly create an overview panel of all checklists. Therefor the maximum items count per checklist is limited to 32.",
+    description=f"List first items of all or certain checklists. This should only be used as a bootstrap endpoint to initaly create an overview panel of all checklists. Therefor the maximum items count per checklist is limited to 32. Send `Accept: application/msgpack` for a MessagePack body.",
+    responses=MSGPACK_RESPONSE_DOC,
 )
 async def list_items(
+    request: Request,
+    response: Response,
     checklist_ids: Optional[List[uuid.UUID]] = Query(
         default_factory=list,
         description="Only return certain checklist items by id. If left empty all checklists will be returned.",
@@ -171,13 +180,23 @@ async def list_items(
         checked=checked,
         limit_per_checklist=limit_per_checklist,
     )
+    counts_per_checklist = await checklist_item_crud.count_by_checklist(
+        list(preview_per_checklist)
+    )
     result = {}
     for id, items in preview_per_checklist.items():
+        counts = counts_per_checklist[id]
         result[id] = CheckListsItemPreview(
             items=items,
-            item_count=await checklist_item_crud.count(id),
-            item_checked_count=await checklist_item_crud.count(id, checked=True),
-            item_unchecked_count=await checklist_item_crud.count(id, checked=False),
+            item_count=counts.total,
+            item_checked_count=counts.checked,
+            item_unchecked_count=counts.unchecked,
+        )
+    if accepts_msgpack(request, response):
+        # Map keys are text, as in the JSON (see api/msgpack_response.py).
+        return msgpack_response(
+            {str(id): preview for id, preview in result.items()},
+            Dict[str, CheckListsItemPreview],
         )
     return result
 
@@ -185,9 +204,12 @@ async def list_items(
 @fast_api_checklist_item_router.get(
     "/checklist/{checklist_id}/item",
     response_model=PaginatedResponse[CheckListItemRead],
-    description=f"List all items of a certain checklist.",
+    description=f"List all items of a certain checklist. Send `Accept: application/msgpack` for a MessagePack body.",
+    responses=MSGPACK_RESPONSE_DOC,
 )
 async def list_checklist_items(
+    request: Request,
+    response: Response,
     checklist_id: uuid.UUID,
     checked: Optional[bool] = Query(None),
     checklist_access: UserChecklistAccess = Security(
@@ -202,7 +224,7 @@ async def list_checklist_items(
         checked=checked,
         pagination=pagination,
     )
-    return PaginatedResponse(
+    page = PaginatedResponse(
         total_count=await checklist_item_crud.count(
             checklist_id=checklist_id,
             checked=checked,
@@ -211,6 +233,9 @@ async def list_checklist_items(
         count=len(result_items),
         items=result_items,
     )
+    if accepts_msgpack(request, response):
+        return msgpack_response(page, PaginatedResponse[CheckListItemRead])
+    return page
 
 
 @fast_api_checklist_item_router.get(
@@ -325,10 +350,10 @@ async def create_checklist_item(
     checklist_item_crud.stage_create(checklist_item)
     checklist_item_pos_crud.stage_create(checklist_item_position)
     checklist_item_state_crud.stage_create(checklist_item_state)
-    await checklist_item_crud.session.commit()
     await sync_crud.create(SyncNotification(
         cl_id=checklist_id, cli_id=new_checklist_item_id, upd_prop="item_created"
     ))
+    await checklist_item_crud.session.commit()
     return await checklist_item_crud.get(new_checklist_item_id)
 
 
@@ -369,14 +394,14 @@ async def update_checklist_item(
             status_code=status.HTTP_410_GONE,
             detail=f"Item '{checklist_item_id}' has been deleted.",
         )
+    await sync_crud.create(SyncNotification(
+        cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_text"
+    ))
     db_item: CheckListItem = await checklist_item_crud.update(
         checklist_item_update,
         id_=checklist_item_id,
         raise_exception_if_not_exists=checklist_item_not_exists_error,
     )
-    await sync_crud.create(SyncNotification(
-        cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_text"
-    ))
     return db_item
 
 
@@ -414,13 +439,13 @@ async def delete_checklist_item(
     if db_item.deleted_at is not None:
         # Already tombstoned — nothing to do, no duplicate sync poke.
         return True
+    await sync_crud.create(SyncNotification(
+        cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_deleted"
+    ))
     # Soft delete (WI-2): tombstone the item so the removal reaches offline
     # clients and cannot be resurrected by a stale edit. State/position children
     # are left in place, masked by this tombstone.
     await checklist_item_crud.soft_delete(id_=checklist_item_id)
-    await sync_crud.create(SyncNotification(
-        cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_deleted"
-    ))
     return True
 
 
@@ -441,23 +466,21 @@ async def delete_checked_items(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> BulkItemOpResult:
     checklist_id = checklist_access.checklist.id
-    affected = await checklist_item_crud.delete_checked_items(
+    affected = await checklist_item_crud.stage_delete_checked_items(
         checklist_id=checklist_id
     )
     if affected:
-        # One poke for the whole batch; the auto-appended `changes_available`
-        # frame carries the current server_seq for local-first clients. `cli_id`
-        # is None (card-level, not one item).
+        # One poke for the whole batch, committed with it; the auto-appended
+        # `changes_available` frame carries the current server_seq for
+        # local-first clients. `cli_id` is None (card-level, not one item).
         await sync_crud.create(SyncNotification(
             cl_id=checklist_id, cli_id=None, upd_prop="item_deleted"
         ))
+        await checklist_item_crud.session.commit()
+    counts = await checklist_item_crud.count_for_checklist(checklist_id)
     return BulkItemOpResult(
         affected=affected,
-        item_count=await checklist_item_crud.count(checklist_id),
-        item_checked_count=await checklist_item_crud.count(
-            checklist_id, checked=True
-        ),
-        item_unchecked_count=await checklist_item_crud.count(
-            checklist_id, checked=False
-        ),
+        item_count=counts.total,
+        item_checked_count=counts.checked,
+        item_unchecked_count=counts.unchecked,
     )
@@ -132,6 +132,9 @@ async def update_checklist_item_position(
     ),
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> CheckListItemPosition:
+    await sync_crud.create(SyncNotification(
+        cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
+    ))
     result = await checklist_item_pos_crud.update(
         checklist_item_position_update=CheckListItemPositionUpdate(
             checklist_item_id=checklist_item_id,
@@ -142,9 +145,6 @@ async def update_checklist_item_position(
             detail=f"Item with uuid '{checklist_item_id}' can not be found.",
         ),
     )
-    await sync_crud.create(SyncNotification(
-        cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
-    ))
     return result
 
 
@@ -190,10 +190,10 @@ async def move_item_under_other_item(
         target_pos.index = float(
             decimal.Decimal(str(other_item_pos.index)) + decimal.Decimal(str(0.4))
         )
-        await checklist_item_pos_crud.update(target_pos)
         await sync_crud.create(SyncNotification(
             cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
         ))
+        await checklist_item_pos_crud.update(target_pos)
         return target_pos
     target_pos.index = float(
         (
@@ -205,10 +205,10 @@ async def move_item_under_other_item(
         )
         + decimal.Decimal(str(other_item_pos.index))
     )
-    await checklist_item_pos_crud.update(target_pos)
     await sync_crud.create(SyncNotification(
         cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
     ))
+    await checklist_item_pos_crud.update(target_pos)
     return target_pos
 
 
@@ -254,10 +254,10 @@ async def move_item_above_other_item(
         target_pos.index = float(
             decimal.Decimal(str(other_item_pos.index)) - decimal.Decimal(str(0.4))
         )
-        await checklist_item_pos_crud.update(target_pos)
         await sync_crud.create(SyncNotification(
             cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
         ))
+        await checklist_item_pos_crud.update(target_pos)
         return target_pos
     target_pos.index = float(
         (
@@ -266,10 +266,10 @@ async def move_item_above_other_item(
         )
         / 2
     )
-    await checklist_item_pos_crud.update(target_pos)
     await sync_crud.create(SyncNotification(
         cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
     ))
+    await checklist_item_pos_crud.update(target_pos)
     return target_pos
 
 
@@ -303,10 +303,10 @@ async def move_item_to_bottom_of_checklist(
         await checklist_item_pos_crud.update(target_pos)
         return target_pos
     target_pos.index = float(decimal.Decimal(str(last_pos.index)) + decimal.Decimal("0.4"))
-    await checklist_item_pos_crud.update(target_pos)
     await sync_crud.create(SyncNotification(
         cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
     ))
+    await checklist_item_pos_crud.update(target_pos)
     return target_pos
 
 
@@ -342,8 +342,8 @@ async def move_item_to_top_of_checklist(
     target_pos.index = float(
         decimal.Decimal(str(first_pos.index)) - decimal.Decimal("0.4")
     )
-    await checklist_item_pos_crud.update(target_pos)
     await sync_crud.create(SyncNotification(
         cl_id=checklist_access.checklist.id, cli_id=checklist_item_id, upd_prop="item_position"
     ))
+    await checklist_item_pos_crud.update(target_pos)
     return target_pos
@@ -133,12 +133,12 @@ async def set_checklist_item_checked_state(
     ),
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> CheckListItemStateWithoutChecklistID:
-    result = await checklist_item_state_crud.update(update_obj=val, id_=checklist_item_id)
     await sync_crud.create(SyncNotification(
         cl_id=checklist_access.checklist.id,
         cli_id=checklist_item_id,
         upd_prop="item_state",
     ))
+    result = await checklist_item_state_crud.update(update_obj=val, id_=checklist_item_id)
     return result
 
 
@@ -162,23 +162,21 @@ async def uncheck_all_items(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> BulkItemOpResult:
     checklist_id = checklist_access.checklist.id
-    affected = await checklist_item_state_crud.uncheck_all_items(
+    affected = await checklist_item_state_crud.stage_uncheck_all_items(
         checklist_id=checklist_id
     )
     if affected:
-        # One poke for the whole batch; the auto-appended `changes_available`
-        # frame carries the current server_seq for local-first clients. `cli_id`
-        # is None (card-level, not one item).
+        # One poke for the whole batch, committed with it; the auto-appended
+        # `changes_available` frame carries the current server_seq for
+        # local-first clients. `cli_id` is None (card-level, not one item).
         await sync_crud.create(SyncNotification(
             cl_id=checklist_id, cli_id=None, upd_prop="item_state"
         ))
+        await checklist_item_state_crud.session.commit()
+    counts = await checklist_item_crud.count_for_checklist(checklist_id)
     return BulkItemOpResult(
         affected=affected,
-        item_count=await checklist_item_crud.count(checklist_id),
-        item_checked_count=await checklist_item_crud.count(
-            checklist_id, checked=True
-        ),
-        item_unchecked_count=await checklist_item_crud.count(
-            checklist_id, checked=False
-        ),
+        item_count=counts.total,
+        item_checked_count=counts.checked,
+        item_unchecked_count=counts.unchecked,
     )
@@ -250,15 +250,17 @@ async def add_label_to_checklist(
     if existing_label.owner_id != current_user.id:
         raise label_not_exist_exception
 
-    await checklist_label_crud.create(
-        CheckListLabelCreate(
-            checklist_id=checklist_id,
-            label_id=label_id,
-            user_id=current_user.id,
-        ),
-        exists_ok=True,
+    link = CheckListLabelCreate(
+        checklist_id=checklist_id,
+        label_id=label_id,
+        user_id=current_user.id,
     )
+    # Re-adding an attached label changes nothing and announces nothing.
+    if await checklist_label_crud.find(link):
+        return existing_label
+    # Enqueued first so it rides the link's commit.
     await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_label"))
+    await checklist_label_crud.create(link, exists_ok=True)
     return existing_label
 
 
@@ -289,7 +291,7 @@ async def remove_label_from_checklist(
     # re-emit the card — an offline device would keep the stale chip forever.
     # Re-stamp the caller's position row (per-user, like the label set) so the
     # feed's card-level query picks the card up for this user only.
+    await sync_crud.create(SyncNotification(cl_id=checklist_access.checklist.id, upd_prop="checklist_label"))
     await checklist_position_crud.touch(
         checklist_id=checklist_access.checklist.id, user_id=current_user.id
     )
-    await sync_crud.create(SyncNotification(cl_id=checklist_access.checklist.id, upd_prop="checklist_label"))
@@ -67,14 +67,14 @@ log = get_logger()
 fast_api_checklist_position_router: APIRouter = APIRouter()
 
 CheckListPosQueryParams: Type[QueryParamsInterface] = create_query_params_class(
-    CheckListPosition, default_order_by_attr="index"
+    CheckListPosition, default_order_by_attr="index", keyset=True
 )
 
 
 @fast_api_checklist_position_router.get(
     "/position",
     response_model=PaginatedResponse[CheckListPosition],
-    description=f"List all CheckListPosition objects of the current user.",
+    description=f"List all CheckListPosition objects of the current user. Page with `offset`, or pass `next_page` back as `page` (with the same `order_by` / `order_desc`).",
 )
 async def list_checklist_positions(
     archived: bool = Query(None),
@@ -91,11 +91,19 @@ async def list_checklist_positions(
         filter_user_id=current_user.id,
         archived=archived,
     )
+    next_page = None
+    if result_items:
+        next_page = pagination.next_page_token(
+            checklist_pos_crud.sort_key_values(pagination, result_items[-1]),
+            count=len(result_items),
+            total_count=total_item_count,
+        )
     return PaginatedResponse(
         total_count=total_item_count,
-        offset=pagination.offset,
+        offset=pagination.page_offset(),
         count=len(result_items),
         items=result_items,
+        next_page=next_page,
     )
 
 
@@ -132,12 +140,12 @@ async def update_checklist_position(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
     current_user: User = Depends(get_current_user),
 ) -> CheckListPosition:
+    await sync_crud.create(SyncNotification(cl_id=checklist_access.checklist.id, upd_prop="checklist_position"))
     result_item = await checklist_pos_crud.update(
         update_obj=checklist_obj,
         user_id=current_user.id,
         checklist_id=checklist_access.checklist.id,
     )
-    await sync_crud.create(SyncNotification(cl_id=checklist_access.checklist.id, upd_prop="checklist_position"))
     return result_item
 
 
@@ -190,10 +198,10 @@ async def move_checklist_under_other_checklist(
         target_pos.index = float(
             decimal.Decimal(str(other_pos.index)) - decimal.Decimal(str(0.4))
         )
+        await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
         await checklist_pos_crud.update(
             target_pos, checklist_id=checklist_id, user_id=current_user.id
         )
-        await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
         return target_pos
     target_pos.index = float(
         (
@@ -205,10 +213,10 @@ async def move_checklist_under_other_checklist(
         )
         + decimal.Decimal(str(checklist_under_other_checklist_pos.index))
     )
+    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
     await checklist_pos_crud.update(
         target_pos, checklist_id=checklist_id, user_id=current_user.id
     )
-    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
     return target_pos
 
 
@@ -261,10 +269,10 @@ async def move_checklist_above_other_checklist(
         target_pos.index = float(
             decimal.Decimal(str(other_pos.index)) + decimal.Decimal(str(0.4))
         )
+        await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
         await checklist_pos_crud.update(
             target_pos, checklist_id=checklist_id, user_id=current_user.id
         )
-        await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
         return target_pos
     target_pos.index = float(
         (
@@ -276,8 +284,8 @@ async def move_checklist_above_other_checklist(
         )
         + decimal.Decimal(str(other_pos.index))
     )
+    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
     await checklist_pos_crud.update(
         target_pos, checklist_id=checklist_id, user_id=current_user.id
     )
-    await sync_crud.create(SyncNotification(cl_id=checklist_id, upd_prop="checklist_position"))
     return target_pos
@@ -259,11 +259,6 @@ async def join_public_checklist(
         checklist_id=checklist_id, user_id=current_user.id
     )
     if not is_owner and existing is None:
-        await checklist_collaborator_crud.upsert(
-            checklist_id=checklist_id,
-            user_id=current_user.id,
-            permission=link.permission,
-        )
         await ensure_position(
             checklist_id, current_user.id, checklist_position_crud
         )
@@ -271,6 +266,11 @@ async def join_public_checklist(
         await sync_crud.create(
             SyncNotification(cl_id=checklist_id, upd_prop="share_added")
         )
+        await checklist_collaborator_crud.upsert(
+            checklist_id=checklist_id,
+            user_id=current_user.id,
+            permission=link.permission,
+        )
 
     # Return the card scoped to the joining user (their own position + labels).
     # set_committed_value (via scope_position_to_caller), not plain assignment: the
@@ -338,9 +338,6 @@ async def set_public_checklist_item_state(
     ),
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> CheckListItemStateWithoutChecklistID:
-    result = await checklist_item_state_crud.update(
-        update_obj=val, id_=checklist_item_id
-    )
     await sync_crud.create(
         SyncNotification(
             cl_id=checklist_access.checklist.id,
@@ -348,6 +345,9 @@ async def set_public_checklist_item_state(
             upd_prop="item_state",
         )
     )
+    result = await checklist_item_state_crud.update(
+        update_obj=val, id_=checklist_item_id
+    )
     return result
 
 
@@ -423,14 +423,17 @@ async def create_public_checklist_item(
         **checklist_item_create.model_dump(exclude=["position", "state", "id"]),
     )
 
-    await checklist_item_crud.create(checklist_item)
-    await checklist_item_pos_crud.create(checklist_item_position)
-    await checklist_item_state_crud.create(checklist_item_state)
+    # One transaction for the item, its position, its state and the sync event,
+    # like the authed create_checklist_item.
+    checklist_item_crud.stage_create(checklist_item)
+    checklist_item_pos_crud.stage_create(checklist_item_position)
+    checklist_item_state_crud.stage_create(checklist_item_state)
     await sync_crud.create(
         SyncNotification(
             cl_id=checklist_id, cli_id=new_checklist_item_id, upd_prop="item_created"
         )
     )
+    await checklist_item_crud.session.commit()
     return await checklist_item_crud.get(new_checklist_item_id)
 
 
@@ -450,6 +453,11 @@ async def update_public_checklist_item(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> CheckListItemRead:
     checklist_id = checklist_access.checklist.id
+    await sync_crud.create(
+        SyncNotification(
+            cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_text"
+        )
+    )
     db_item = await checklist_item_crud.update(
         checklist_item_update,
         id_=checklist_item_id,
@@ -458,11 +466,6 @@ async def update_public_checklist_item(
             detail=f"Item with id {checklist_item_id} does not exist.",
         ),
     )
-    await sync_crud.create(
-        SyncNotification(
-            cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_text"
-        )
-    )
     return db_item
 
 
@@ -481,13 +484,13 @@ async def delete_public_checklist_item(
     sync_crud: SyncNotifiationCRUD = Depends(SyncNotifiationCRUD.get_crud),
 ) -> bool:
     checklist_id = checklist_access.checklist.id
-    # Soft delete (WI-2) — the public edit surface tombstones like the authed one.
-    # verify_item_belongs_to_public_checklist has already 410'd an already-deleted
-    # item, so here the item is guaranteed live.
-    await checklist_item_crud.soft_delete(id_=checklist_item_id)
     await sync_crud.create(
         SyncNotification(
             cl_id=checklist_id, cli_id=checklist_item_id, upd_prop="item_deleted"
         )
     )
+    # Soft delete (WI-2) — the public edit surface tombstones like the authed one.
+    # verify_item_belongs_to_public_checklist has already 410'd an already-deleted
+    # item, so here the item is guaranteed live.
+    await checklist_item_crud.soft_delete(id_=checklist_item_id)
     return True
@@ -253,6 +253,7 @@ async def upsert_share(
         await sync_crud.create(
             SyncNotification(cl_id=checklist_id, upd_prop="share_added")
         )
+    await checklist_collaborator_crud.session.commit()
 
     collab = await checklist_collaborator_crud.get_one(
         checklist_id=checklist_id, user_id=user_id
@@ -307,6 +308,7 @@ async def delete_share(
         checklist_position_crud=checklist_position_crud,
         sync_crud=sync_crud,
     )
+    await checklist_collaborator_crud.session.commit()
 
 
 @fast_api_checklist_share_router.post(
@@ -355,6 +357,12 @@ async def transfer_ownership(
     await checklist_crud.set_owner(
         checklist_id=checklist_id, new_owner_id=new_owner_id
     )
+    # A single notification reaches both parties: it is resolved when the
+    # demotion below commits, when the target set (owner + collaborators)
+    # includes the new owner and the demoted previous owner.
+    await sync_crud.create(
+        SyncNotification(cl_id=checklist_id, upd_prop="share_added")
+    )
     # Demote the previous owner to an 'edit' collaborator (keeps their access and
     # their existing position).
     await checklist_collaborator_crud.upsert(
@@ -362,13 +370,6 @@ async def transfer_ownership(
         user_id=old_owner_id,
         permission=SharePermission.edit,
     )
-
-    # A single notification reaches both parties: after the commit above the
-    # target set (owner + collaborators) includes the new owner and the demoted
-    # previous owner.
-    await sync_crud.create(
-        SyncNotification(cl_id=checklist_id, upd_prop="share_added")
-    )
     return TransferOwnershipResult(
         checklist_id=checklist_id,
         new_owner_id=new_owner_id,
@@ -677,17 +678,17 @@ async def accept_invite(
     invite = await _get_own_pending_invite(
         checklist_id, current_user.id, checklist_collaborator_crud
     )
-    await checklist_collaborator_crud.set_status(
-        checklist_id=checklist_id,
-        user_id=current_user.id,
-        status=ShareStatus.accepted,
-    )
     await ensure_position(checklist_id, current_user.id, checklist_position_crud)
     # Now an accepted collaborator: owner + collaborators (incl. the new joiner)
     # see the share set change, exactly like an instant-add share.
     await sync_crud.create(
         SyncNotification(cl_id=checklist_id, upd_prop="share_added")
     )
+    await checklist_collaborator_crud.set_status(
+        checklist_id=checklist_id,
+        user_id=current_user.id,
+        status=ShareStatus.accepted,
+    )
 
     checklist = await checklist_crud.get(id_=checklist_id)
     # set_committed_value (via scope_position_to_caller), not plain assignment: the
@@ -23,8 +23,19 @@ from checkcheckserver.db.user import User
 
 from checkcheckserver.config import Config
 from checkcheckserver.db.user import UserCRUD
-from checkcheckserver.model.healthcheck import HealthCheck, HealthCheckReport
+from checkcheckserver.model.healthcheck import (
+    HealthCheck,
+    HealthCheckReport,
+    SyncStreamStats,
+    AudienceCacheStats,
+    DbPoolStats,
+    SingleFlightStats,
+)
 from checkcheckserver.db.healthcheck import HealthcheckRead
+from checkcheckserver.api.routes.routes_sync_notification import sync_stream_stats
+from checkcheckserver.db.sync_audience import audience_cache
+from checkcheckserver.db._engine import db_pool_stats
+from checkcheckserver.api.routes.routes_changes import changes_single_flight
 
 
 config = Config()
@@ -57,4 +68,11 @@ async def get_health_status(
     user: UserCRUD = Security(get_current_user),
     health_read: HealthcheckRead = Depends(HealthcheckRead.get_crud),
 ) -> HealthCheckReport:
-    return await health_read.get_report()
+    report = await health_read.get_report()
+    report.sync_streams = SyncStreamStats(**sync_stream_stats())
+    report.audience_cache = AudienceCacheStats(**audience_cache.stats())
+    report.changes_single_flight = SingleFlightStats(**changes_single_flight.stats())
+    pool_stats = db_pool_stats()
+    if pool_stats is not None:
+        report.db_pool = DbPoolStats(**pool_stats)
+    return report
@@ -10,7 +10,15 @@ import datetime
 import uuid
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Security, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    Security,
+    HTTPException,
+    status,
+    Query,
+    Response,
+)
 from pydantic import BaseModel, Field
 
 from checkcheckserver.config import Config
@@ -18,7 +26,11 @@ from checkcheckserver.log import get_logger
 
 from checkcheckserver.db.user import User
 from checkcheckserver.api.auth.security import get_current_user
-from checkcheckserver.db.notification import NotificationCRUD
+from checkcheckserver.api.paginator import encode_page_token, parse_page_keys
+from checkcheckserver.db.notification import (
+    NotificationCRUD,
+    NOTIFICATION_SORT_KEYS,
+)
 from checkcheckserver.model.notification import Notification, NotificationType
 
 
@@ -27,6 +39,8 @@ log = get_logger()
 
 fast_api_notification_router: APIRouter = APIRouter()
 
+NEXT_PAGE_HEADER = "X-Next-Page"
+
 
 class NotificationRead(BaseModel):
     id: uuid.UUID
@@ -55,19 +69,36 @@ def _to_read(noti: Notification) -> NotificationRead:
 @fast_api_notification_router.get(
     "/user/me/notifications",
     response_model=List[NotificationRead],
-    description="The current user's notification feed, newest first.",
+    description="The current user's notification feed, newest first. When more "
+    "notifications are left, the `X-Next-Page` response header carries a token: "
+    "pass it as `page` for the next page (with the same `unread_only`).",
 )
 async def list_my_notifications(
+    response: Response,
     unread_only: bool = Query(
         default=False, description="Return only notifications that are still unread."
     ),
     limit: int = Query(default=100, ge=1, le=200),
+    page: Optional[str] = Query(
+        default=None,
+        description="Continuation token: the previous page's `X-Next-Page` header.",
+    ),
     current_user: User = Security(get_current_user),
     notification_crud: NotificationCRUD = Depends(NotificationCRUD.get_crud),
 ) -> List[NotificationRead]:
-    notifications = await notification_crud.list_for_user(
-        user_id=current_user.id, unread_only=unread_only, limit=limit
+    offset, after = 0, None
+    if page is not None:
+        offset, after = parse_page_keys(page, NOTIFICATION_SORT_KEYS)
+    notifications, has_more = await notification_crud.list_for_user(
+        user_id=current_user.id, unread_only=unread_only, limit=limit, after=after
     )
+    # The body stays a plain list for existing clients; the token goes in a
+    # header.
+    if has_more:
+        last = notifications[-1]
+        response.headers[NEXT_PAGE_HEADER] = encode_page_token(
+            offset + limit, (last.created_at, last.id)
+        )
     return [_to_read(n) for n in notifications]
 
 
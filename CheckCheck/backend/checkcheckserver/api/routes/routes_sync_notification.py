@@ -2,8 +2,9 @@ import uuid
 import json
 import asyncio
 import datetime
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import List, Optional, Tuple
+from typing import Deque, Optional
 
 from fastapi import (
     Depends,
@@ -17,8 +18,8 @@ from fastapi import (
 )
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials
+from starlette.types import Receive, Scope, Send
 
-from checkcheckserver.db.user import User
 from checkcheckserver.db.user_session import UserSessionCRUD
 from checkcheckserver.db.user_auth import UserAuthCRUD
 from checkcheckserver.db.user import UserCRUD
@@ -29,10 +30,18 @@ from checkcheckserver.api.auth.security import (
 )
 from checkcheckserver.api.access import AnonymousPrincipal, link_is_resolvable
 from checkcheckserver.api.share_password import verify_share_grant
+from checkcheckserver.api.sync_clients import (
+    SyncClient,
+    SyncClientRegistry,
+    coalesce_key,
+)
 from checkcheckserver.db.checklist_public_share import CheckListPublicShareCRUD
 from checkcheckserver.log import get_logger
 from checkcheckserver.config import Config, DbBackend
 from checkcheckserver.db._session import get_async_session_context
+from checkcheckserver.db.sync_audience import audience_cache
+from checkcheckserver.db.sync_outbox import decode_pg_payload
+from checkcheckserver.db.sync_seq import get_current_server_seq
 from checkcheckserver.db.sync_notification import (
     SyncNotifiationCRUD,
     SyncNotificationPackage,
@@ -47,39 +56,42 @@ fast_api_sse_sync_router: APIRouter = APIRouter()
 # Each connected SSE client carries a *principal* — either a logged-in ``User``
 # (matched by ``user.id``) or an ``AnonymousPrincipal`` from a public link
 # (matched by ``.token``). Notifications are routed by whichever the target set
-# names; see ``_principal_is_target``.
-
-# SQLite only: connected SSE clients. Each entry is (queue, principal, request).
-_sqlite_clients: List[Tuple[asyncio.Queue, object, Request]] = []
+# names; the registries index clients by both keys so a fan-out only touches the
+# clients it targets (see ``SyncClientRegistry.targets``).
+
+# Seconds of silence after which a stream is sent a keepalive comment, so
+# proxies / load balancers do not time it out. One heartbeat task per registry
+# serves all of its idle clients (see ``SyncHeartbeat``).
+_KEEPALIVE_INTERVAL = 30
+
+# SQLite only: connected SSE clients.
+_sqlite_clients = SyncClientRegistry(
+    replay_size=config.SYNC_SSE_REPLAY_BUFFER,
+    keepalive_interval=_KEEPALIVE_INTERVAL,
+    coalesce_window=config.SYNC_COALESCE_WINDOW_MS / 1000,
+)
 
 # Postgres only: connected SSE clients, fed by a single shared LISTEN
-# connection (see _pg_listener_supervisor). Each entry is (queue, principal, request).
-_pg_clients: List[Tuple[asyncio.Queue, object, Request]] = []
+# connection (see _pg_listener_supervisor).
+_pg_clients = SyncClientRegistry(
+    replay_size=config.SYNC_SSE_REPLAY_BUFFER,
+    keepalive_interval=_KEEPALIVE_INTERVAL,
+    coalesce_window=config.SYNC_COALESCE_WINDOW_MS / 1000,
+)
 # The single shared asyncpg connection holding LISTEN state, and an event the
 # termination callback sets so the supervisor knows to reconnect.
 _pg_listen_conn = None
 _pg_connection_lost: asyncio.Event | None = None
+# Parsed NOTIFY payloads queued behind a spilled event that is still being
+# loaded (see _pg_on_notify), and the task draining them.
+_pg_backlog: Deque[dict] = deque()
+_pg_backlog_task: asyncio.Task | None = None
 
 
 def _utcnow() -> datetime.datetime:
     return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
 
 
-def _principal_is_target(
-    principal, target_user_ids: List[str], target_tokens: List[str]
-) -> bool:
-    """A notification reaches a connected client if its principal is named in the
-    target set — by ``user.id`` (logged-in) or by public-share ``token``
-    (anonymous). All ids are compared as strings."""
-    pid = getattr(principal, "id", None)
-    if pid is not None and str(pid) in target_user_ids:
-        return True
-    ptoken = getattr(principal, "token", None)
-    if ptoken is not None and ptoken in target_tokens:
-        return True
-    return False
-
-
 async def resolve_sync_principal(
     request: Request,
     token: Optional[str] = Query(
@@ -91,17 +103,17 @@ async def resolve_sync_principal(
         description="Grant proving the passphrase of a protected public link (see /unlock).",
     ),
     x_share_grant: Optional[str] = Header(default=None),
-    user_session_crud: UserSessionCRUD = Depends(UserSessionCRUD.get_crud),
-    user_auth_crud: UserAuthCRUD = Depends(UserAuthCRUD.get_crud),
-    user_crud: UserCRUD = Depends(UserCRUD.get_crud),
     api_token: Optional[HTTPAuthorizationCredentials] = Depends(api_token_security),
-    public_share_crud: CheckListPublicShareCRUD = Depends(
-        CheckListPublicShareCRUD.get_crud
-    ),
 ):
     """Authenticate an SSE subscriber as either a logged-in ``User`` or an
     anonymous principal carrying a valid public-share ``token``.
 
+    Runs in its own short-lived DB session, closed before the stream starts.
+    With the usual ``Depends(...get_crud)`` the request session's teardown is
+    tied to the response; for a stream that lives for hours that would pin a
+    pooled session (and with it a connection) per connected client. The
+    returned ``User`` is detached; only its id is used from then on.
+
     An *explicit* valid ``?token=`` wins over an ambient session: a logged-in user
     viewing a public link must receive that card's token-scoped stream, not their
     own identity stream (which has no access to a card shared only via the link,
@@ -109,8 +121,22 @@ async def resolve_sync_principal(
     i.e. every existing client — are unaffected. Token subscription is gated by
     the same public-links config switches as the rest of Phase 5.
     """
+    async with get_async_session_context() as session:
+        return await _resolve_sync_principal(
+            session, request, token, share_grant, x_share_grant, api_token
+        )
+
+
+async def _resolve_sync_principal(
+    session,
+    request: Request,
+    token: Optional[str],
+    share_grant: Optional[str],
+    x_share_grant: Optional[str],
+    api_token: Optional[HTTPAuthorizationCredentials],
+):
     if token and config.SHARING_ENABLED and config.SHARING_PUBLIC_LINKS_ENABLED:
-        link = await public_share_crud.get_by_token(token)
+        link = await CheckListPublicShareCRUD(session).get_by_token(token)
         # A passphrase-protected link must carry a valid grant to subscribe — the
         # stream is the same capability as the read surface, so it is gated the
         # same way (see /unlock).
@@ -132,12 +158,12 @@ async def resolve_sync_principal(
     if has_creds:
         user_auth = await get_current_user_auth(
             request=request,
-            user_session_crud=user_session_crud,
-            user_auth_crud=user_auth_crud,
+            user_session_crud=UserSessionCRUD(session),
+            user_auth_crud=UserAuthCRUD(session),
             api_token=api_token,
         )
         if user_auth is not None:
-            user = await user_crud.get(user_auth.user_id)
+            user = await UserCRUD(session).get(user_auth.user_id)
             if user is not None:
                 return user
 
@@ -159,34 +185,77 @@ async def resolve_sync_principal(
     },
 )
 async def sync_via_server_send_events(
-    request: Request,
     principal=Depends(resolve_sync_principal),
+    last_event_id: Optional[str] = Query(
+        default=None,
+        description=(
+            "Resume after this event id, for clients that reopen the stream "
+            "themselves. The Last-Event-ID header wins when both are sent."
+        ),
+    ),
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
 ):
+    # The browser's own EventSource reconnect sends the header (with the newest
+    # id it saw), on top of whatever query string the stream was opened with.
+    resume_from = last_event_id_header or last_event_id
     if config.db_backend == DbBackend.POSTGRES:
-        return StreamingResponse(
-            _postgres_stream(request, principal),
-            media_type="text/event-stream",
+        return SyncEventStreamResponse(_postgres_stream(principal, resume_from))
+    return SyncEventStreamResponse(_sqlite_stream(principal, resume_from))
+
+
+class SyncEventStreamResponse(StreamingResponse):
+    """``text/event-stream`` response that ends when the ASGI server reports
+    ``http.disconnect``.
+
+    The sync streams wait on their queue without a timeout, so they never poll
+    ``Request.is_disconnected()``. Instead the disconnect message is awaited
+    next to the stream and cancels it, which runs the generator's ``finally``
+    (unregistering the client) right away. Starlette only does this for ASGI
+    spec versions below 2.4; here it is done regardless, because an idle stream
+    would otherwise only notice a gone client at its next keepalive write."""
+
+    media_type = "text/event-stream"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stream = asyncio.ensure_future(self.stream_response(send))
+        disconnect = asyncio.ensure_future(self.listen_for_disconnect(receive))
+        try:
+            await asyncio.wait(
+                (stream, disconnect), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stream.cancel()
+            disconnect.cancel()
+            await asyncio.gather(stream, disconnect, return_exceptions=True)
+        # A failed write means the client is gone, like a disconnect.
+        if not stream.cancelled() and not isinstance(stream.exception(), OSError):
+            stream.result()
+
+
+def _log_overflow(client: SyncClient):
+    if client.queue.overflowed:
+        log.warning(
+            f"[sync] SSE client exceeded {client.queue.max_pending} pending events; "
+            "closed its stream with a resync signal"
         )
-    return StreamingResponse(
-        _sqlite_stream(request, principal),
-        media_type="text/event-stream",
-    )
+
+
+def sync_stream_stats() -> dict:
+    """Buffer usage of the connected SSE clients (both backends; one is empty)."""
+    pg, lite = _pg_clients.stats(), _sqlite_clients.stats()
+    return {
+        key: max(pg[key], lite[key]) if key.startswith("max_") else pg[key] + lite[key]
+        for key in pg
+    }
 
 
 # ── Postgres path ─────────────────────────────────────────────────────────────
 
-def _sse_from_payload(data: dict) -> str:
-    """Render a pg_notify payload into a single SSE message string."""
-    noti = SyncNotification(
-        timestamp=data["timestamp"],
-        cl_id=uuid.UUID(data["cl_id"]),
-        cli_id=uuid.UUID(data["cli_id"]) if data.get("cli_id") else None,
-        upd_prop=data["upd_prop"],
-        server_seq=data.get("server_seq"),
-    )
+def _sse_frame(noti: SyncNotification) -> str:
+    """Render a notification into a single SSE message string."""
     # target_user_ids / target_tokens are server-side routing details (other
-    # users' ids / secret tokens) — never ship them to the client. Excluding them
-    # also keeps the SSE payload identical to the SQLite drain path.
+    # users' ids / secret tokens) — never ship them to the client. Both backends
+    # render through here, so the SSE payload is identical on either.
     return (
         "data: "
         f"{noti.model_dump_json(exclude={'target_user_ids', 'target_tokens'})}"
@@ -194,23 +263,74 @@ def _sse_from_payload(data: dict) -> str:
     )
 
 
+def _pg_publish(noti: SyncNotification):
+    _pg_clients.coalescing.publish(
+        noti.cl_id,
+        _sse_frame(noti),
+        coalesce_key(noti.cl_id, noti.cli_id, noti.upd_prop),
+        noti.target_user_ids or [],
+        noti.target_tokens or [],
+        server_seq=noti.server_seq,
+    )
+
+
 def _pg_on_notify(conn, pid, channel, payload: str):
     """
     Called on the single shared LISTEN connection for every NOTIFY. Parses the
-    payload once and fans it out to all connected clients in the target set.
-    Synchronous + put_nowait: queues are unbounded so this never blocks.
+    payload once and fans it out to the connected clients in the target set,
+    looked up by user id / token rather than scanning every client.
+    Synchronous: the per-client queues are bounded and coalescing, so a put
+    never blocks (a client that falls too far behind is closed instead).
+
+    A spilled event (one whose recipients did not fit into a NOTIFY, see
+    ``db/sync_outbox.py``) has to be read from the database first. It and
+    everything notified after it go through ``_pg_backlog`` so the clients
+    still see the events in commit order.
     """
+    global _pg_backlog_task
     try:
         data = json.loads(payload)
-    except (ValueError, KeyError):
+        if "audience_changed" in data:
+            # Another process (or this one) committed a sharing/ownership
+            # change; drop the cached audiences it affects.
+            audience_cache.invalidate(
+                uuid.UUID(cl_id) for cl_id in data["audience_changed"]
+            )
+            return
+        if "ref" in data or _pg_backlog:
+            _pg_backlog.append(data)
+            if _pg_backlog_task is None or _pg_backlog_task.done():
+                _pg_backlog_task = asyncio.create_task(_pg_drain_backlog())
+            return
+        noti = decode_pg_payload(data)
+    except (ValueError, KeyError, TypeError):
         log.warning("[sync] dropping malformed NOTIFY payload")
         return
-    target_user_ids = data.get("target_user_ids", [])
-    target_tokens = data.get("target_tokens", [])
-    sse = _sse_from_payload(data)
-    for queue, principal, _ in list(_pg_clients):
-        if _principal_is_target(principal, target_user_ids, target_tokens):
-            queue.put_nowait(sse)
+    _pg_publish(noti)
+
+
+async def _pg_drain_backlog():
+    while _pg_backlog:
+        data = _pg_backlog[0]
+        try:
+            noti = decode_pg_payload(data)
+            if noti is None:
+                async with get_async_session_context() as session:
+                    noti = await SyncNotifiationCRUD(session).get(data["ref"])
+                if noti is None:
+                    log.warning(
+                        f"[sync] spilled notification {data['ref']} is gone; dropped"
+                    )
+        except (ValueError, KeyError, TypeError):
+            log.warning("[sync] dropping malformed NOTIFY payload")
+            noti = None
+        except Exception:
+            log.exception("[sync] could not load spilled notification")
+            noti = None
+        if noti is not None:
+            _pg_publish(noti)
+        # Only now: whatever arrives meanwhile must queue behind this one.
+        _pg_backlog.popleft()
 
 
 def _pg_on_terminate(conn):
@@ -218,6 +338,23 @@ def _pg_on_terminate(conn):
         _pg_connection_lost.set()
 
 
+async def _pg_announce_listen_gap():
+    """Tell every connected client to catch up on what was notified while the
+    LISTEN connection was down: a ``resync`` event, then a ``changes_available``
+    poke carrying the current visible ``server_seq``."""
+    try:
+        async with get_async_session_context() as session:
+            server_seq = await get_current_server_seq(session)
+    except Exception:
+        log.exception("[sync] could not read the server_seq for the resync poke")
+        server_seq = _pg_clients.replay.server_seq
+    poke = SyncNotification(
+        cl_id=uuid.UUID(int=0), upd_prop="changes_available", server_seq=server_seq
+    )
+    delivered = _pg_clients.announce_gap(_sse_frame(poke), server_seq)
+    log.info(f"[sync] LISTEN restored; sent {delivered} client(s) a resync poke")
+
+
 async def _pg_listener_supervisor():
     """
     Background task (Postgres only). Holds ONE shared asyncpg LISTEN connection
@@ -226,31 +363,37 @@ async def _pg_listener_supervisor():
     SSE clients (one raw connection per client would otherwise exhaust
     max_connections well before any CPU/memory limit).
 
-    If the shared connection drops, all client SSE streams are closed so the
-    browsers reconnect — which triggers the frontend resync and recovers any
-    events missed during the gap — and the supervisor reconnects.
+    If the shared connection drops, the supervisor reconnects while the client
+    SSE streams stay open. Once LISTEN is back every connected client is sent a
+    resync poke (see ``_pg_announce_listen_gap``), so it pulls the events it
+    missed during the gap without a reconnect storm.
     """
     import asyncpg
 
     global _pg_listen_conn
+    listen_lost = False
     while True:
         try:
             _pg_listen_conn = await asyncpg.connect(config.POSTGRES_DSN)
             _pg_connection_lost.clear()
             _pg_listen_conn.add_termination_listener(_pg_on_terminate)
             await _pg_listen_conn.add_listener("checkcheck_sync", _pg_on_notify)
+            # Invalidations sent while we were not listening are lost.
+            audience_cache.clear()
         except Exception:
             log.exception("[sync] could not establish Postgres LISTEN; retrying")
             await asyncio.sleep(2)
             continue
 
+        if listen_lost:
+            # Only now: a poke read before LISTEN was back could miss a commit.
+            await _pg_announce_listen_gap()
+            listen_lost = False
+
         # Hold the connection open until it is reported lost.
         await _pg_connection_lost.wait()
         log.warning("[sync] Postgres LISTEN connection lost; reconnecting")
-
-        # Close client streams so browsers reconnect and resync the missed gap.
-        for queue, _, _ in list(_pg_clients):
-            queue.put_nowait(None)
+        listen_lost = True
         try:
             await _pg_listen_conn.close()
         except Exception:
@@ -259,24 +402,27 @@ async def _pg_listener_supervisor():
         await asyncio.sleep(1)
 
 
-async def _postgres_stream(request: Request, principal):
+async def _postgres_stream(principal, last_event_id: Optional[str] = None):
     """
-    Each client gets a personal asyncio.Queue fed by the shared LISTEN
-    connection (see _pg_listener_supervisor).
+    Each client gets a personal bounded, coalescing queue (see
+    ``SyncClientQueue``) fed by the shared LISTEN connection (see
+    _pg_listener_supervisor) and by the registry's heartbeat while idle. A
+    reconnecting client is first replayed what it missed since
+    ``last_event_id``. Cancelled by ``SyncEventStreamResponse`` when the client
+    disconnects.
     """
-    queue: asyncio.Queue[str] = asyncio.Queue()
-    _pg_clients.append((queue, principal, request))
+    client = _pg_clients.add(
+        SyncClient(principal, max_pending=config.SYNC_SSE_CLIENT_MAX_PENDING)
+    )
+    if last_event_id:
+        _pg_clients.resume(client, last_event_id)
     try:
-        while not await request.is_disconnected():
-            try:
-                payload = await asyncio.wait_for(queue.get(), timeout=30)
-                if payload is None:  # connection-lost / shutdown signal
-                    break
-                yield payload
-            except asyncio.TimeoutError:
-                yield ": keepalive\n\n"  # prevent proxy / load-balancer timeout
+        # None once closed: connection lost / shutdown.
+        while (payload := await client.queue.get()) is not None:
+            yield payload
     finally:
-        _pg_clients[:] = [t for t in _pg_clients if t[0] is not queue]
+        _pg_clients.remove(client)
+        _log_overflow(client)
 
 
 # ── SQLite path ───────────────────────────────────────────────────────────────
@@ -287,30 +433,25 @@ async def _postgres_stream(request: Request, principal):
 # in-process client list and single global drain loop are fine for dev and are
 # intentionally not hardened.
 
-async def _sqlite_stream(request: Request, principal):
+async def _sqlite_stream(principal, last_event_id: Optional[str] = None):
     """
-    Each client gets a personal asyncio.Queue. The background drain loop
+    Each client gets a personal queue. The background drain loop
     (notify_clients) polls the sync_notifications table, resolves target users,
-    and pushes serialised events into the matching queues.
+    and pushes serialised events into the matching queues. Like the Postgres
+    path, the stream ends on disconnect (``SyncEventStreamResponse``) or when
+    the queue is closed at shutdown.
     """
-    queue: asyncio.Queue[str] = asyncio.Queue()
-    _sqlite_clients.append((queue, principal, request))
+    client = _sqlite_clients.add(
+        SyncClient(principal, max_pending=config.SYNC_SSE_CLIENT_MAX_PENDING)
+    )
+    if last_event_id:
+        _sqlite_clients.resume(client, last_event_id)
     try:
-        while not await request.is_disconnected():
-            try:
-                # Bounded wait so a disconnected client is noticed promptly via
-                # the loop's is_disconnected() check, instead of the coroutine
-                # blocking on queue.get() forever (which keeps the connection
-                # "active" and stalls graceful shutdown). Mirrors the Postgres
-                # path; no keepalive is emitted since SQLite is dev-only.
-                data = await asyncio.wait_for(queue.get(), timeout=5)
-            except asyncio.TimeoutError:
-                continue
-            if data is None:  # shutdown signal
-                break
+        while (data := await client.queue.get()) is not None:
             yield data
     finally:
-        _sqlite_clients[:] = [t for t in _sqlite_clients if t[0] is not queue]
+        _sqlite_clients.remove(client)
+        _log_overflow(client)
 
 
 async def _sqlite_drain():
@@ -330,20 +471,18 @@ async def _sqlite_drain():
             continue
 
         # Fan out to all connected clients that are in the target set.
-        # target_user_ids / target_tokens are server-side routing details (and
-        # list other users' ids / secret tokens) — never ship them to the
-        # client; this also keeps the SSE payload identical to the Postgres path.
-        payload = (
-            "data: "
-            f"{noti.notification.model_dump_json(exclude={'target_user_ids', 'target_tokens'})}"
-            "\n\n"
+        _sqlite_clients.coalescing.publish(
+            noti.notification.cl_id,
+            _sse_frame(noti.notification),
+            coalesce_key(
+                noti.notification.cl_id,
+                noti.notification.cli_id,
+                noti.notification.upd_prop,
+            ),
+            noti.target_user_ids,
+            noti.target_tokens,
+            server_seq=noti.notification.server_seq,
         )
-        target_user_id_strs = [str(uid) for uid in noti.target_user_ids]
-        for queue, principal, _ in list(_sqlite_clients):
-            if _principal_is_target(
-                principal, target_user_id_strs, noti.target_tokens
-            ):
-                await queue.put(payload)
         # No sleep — loop immediately while rows are pending.
 
 
@@ -356,22 +495,28 @@ async def lifespan(app: FastAPI):
     pg_task = None
     if config.db_backend == DbBackend.SQLITE:
         drain_task = asyncio.create_task(_sqlite_drain())
+        heartbeat_task = asyncio.create_task(_sqlite_clients.heartbeat.run())
     else:
         _pg_connection_lost = asyncio.Event()
         pg_task = asyncio.create_task(_pg_listener_supervisor())
+        heartbeat_task = asyncio.create_task(_pg_clients.heartbeat.run())
     try:
         yield
     finally:
+        heartbeat_task.cancel()
+        if _pg_backlog_task is not None:
+            _pg_backlog_task.cancel()
+        _pg_backlog.clear()
         if drain_task is not None:
             drain_task.cancel()
         if pg_task is not None:
             pg_task.cancel()
         # Signal all connected clients to close.
-        for queue, _, _ in _sqlite_clients:
-            await queue.put(None)
+        _sqlite_clients.coalescing.clear()
+        _sqlite_clients.close_all()
         _sqlite_clients.clear()
-        for queue, _, _ in _pg_clients:
-            queue.put_nowait(None)
+        _pg_clients.coalescing.clear()
+        _pg_clients.close_all()
         _pg_clients.clear()
         if _pg_listen_conn is not None:
             try:
@@ -7,6 +7,12 @@ These were extracted from ``routes_checklist_share.py`` so that
 circular import back into the routes module. The routes still own the HTTP-facing
 authorization and the request/response schemas; this module owns the DB-facing
 side effects of a single user gaining or losing access to one card.
+
+Nothing here commits: the rows are staged on the request's session and the
+sync events enqueued (see ``db/sync_outbox.py``), so the caller adds its
+broadcast and commits once — the share, its notifications and its events land
+in one transaction. A bulk caller (the group reconciler) commits once for the
+whole batch.
 """
 
 import decimal
@@ -37,7 +43,8 @@ async def ensure_position(
 ) -> None:
     """Make sure the user has a CheckListPosition for this checklist, so the card
     shows up in their grid (the checklist-list query joins on the per-user
-    position). Places it at the top of their grid, mirroring create_checklist."""
+    position). Places it at the top of their grid, mirroring create_checklist.
+    Stages the row; the caller commits."""
     existing = await checklist_position_crud.get(
         checklist_id=checklist_id, user_id=user_id
     )
@@ -49,7 +56,7 @@ async def ensure_position(
         if last is not None
         else 0
     )
-    await checklist_position_crud.create(
+    checklist_position_crud.stage_create(
         CheckListPositionCreate(
             checklist_id=checklist_id, user_id=user_id, index=new_index
         )
@@ -71,11 +78,11 @@ async def grant_share_to_user(
 ) -> bool:
     """Grant (or raise) one user's share, honouring ``SHARING_REQUIRE_INVITE_ACCEPT``.
 
-    Does only the **per-recipient** side effects: the collaborator upsert, the
+    Stages only the **per-recipient** side effects: the collaborator upsert, the
     grid position (instant-add only), the pinned invite nudge, and the in-app
     notification. The broadcast ``share_added`` SSE (which fans out to the whole
     share set) is intentionally left to the caller so a bulk group-share can emit
-    it exactly once.
+    it exactly once; the caller then commits.
 
     ``already_accepted`` is the caller's pre-read of whether the target is already
     a live collaborator — when so, the invite gate is bypassed (re-arming an invite
@@ -90,7 +97,7 @@ async def grant_share_to_user(
     broadcast ``share_added`` is warranted), ``False`` for an invite.
     """
     if config.SHARING_REQUIRE_INVITE_ACCEPT and not already_accepted:
-        await checklist_collaborator_crud.upsert(
+        await checklist_collaborator_crud.stage_upsert(
             checklist_id=checklist_id,
             user_id=target_user_id,
             permission=permission,
@@ -111,7 +118,7 @@ async def grant_share_to_user(
         )
         return False
 
-    await checklist_collaborator_crud.upsert(
+    await checklist_collaborator_crud.stage_upsert(
         checklist_id=checklist_id,
         user_id=target_user_id,
         permission=permission,
@@ -146,7 +153,7 @@ async def remove_user_access(
     """Hard-remove one user's access to a card: drop their collaborator + position
     rows, advance the global seq so offline clients actually pull the removal, and
     pin a ``checklist_deleted`` poke to the removed user while telling the rest of
-    the share set the set changed.
+    the share set the set changed. Stages all of it; the caller commits.
 
     Shared by ``delete_share`` (the owner/collaborator revoke route) and the group
     reconciler (a member who left a shared group / a revoked group share). The
@@ -162,11 +169,15 @@ async def remove_user_access(
     card-scoped ``share_removed`` itself — one poke instead of N. The per-user
     pinned ``checklist_deleted`` is always emitted; those must stay targeted.
     """
-    await checklist_collaborator_crud.delete(
+    await checklist_collaborator_crud.stage_delete(
+        checklist_id=checklist_id, user_id=user_id
+    )
+    await checklist_position_crud.stage_delete(
         checklist_id=checklist_id, user_id=user_id
     )
-    await checklist_position_crud.delete(checklist_id=checklist_id, user_id=user_id)
-    await checklist_position_crud.touch(checklist_id=checklist_id, user_id=owner_id)
+    await checklist_position_crud.stage_touch(
+        checklist_id=checklist_id, user_id=owner_id
+    )
     await sync_crud.create(
         SyncNotification(cl_id=checklist_id, upd_prop="checklist_deleted"),
         target_user_ids=[user_id],
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+# Request coalescing ("single flight"): concurrent callers asking for the same
+# thing share one computation instead of each running their own. Kept free of
+# config / DB / FastAPI imports, like ``sync_clients``.
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Runs at most one computation per key at a time; callers that arrive
+    while it is in flight await the same result (or the same exception).
+
+    The computation runs as its own task, so a caller that is cancelled (its
+    client went away) neither cancels it for the others nor leaves them
+    waiting. Nothing is cached: once the computation finishes, the next call
+    for the key starts a new one."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Task[T]"] = {}
+        # Computations started, and calls that joined one already in flight.
+        self.computed = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.computed += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[T]"):
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Mark a failure as retrieved even if every caller has gone away.
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "computed": self.computed,
+            "shared": self.shared,
+        }
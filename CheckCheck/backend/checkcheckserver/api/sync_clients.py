@@ -0,0 +1,602 @@
+import asyncio
+import itertools
+import math
+import time
+from collections import OrderedDict, deque
+from typing import (
+    Deque,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# In-process registry of connected SSE sync subscribers (see
+# routes_sync_notification). Kept free of config / DB / FastAPI imports so the
+# fan-out path can be exercised and benchmarked without booting the app.
+
+# Sent as the last frame of a stream the server closes because the client fell
+# too far behind. A named event, so clients that only handle plain ``message``
+# frames ignore it; either way the stream then ends, the browser reconnects and
+# catches up through ``/api/changes`` (see docs/SYNC_PROTOCOL.md).
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+
+# The same event also opens a resumed stream whose ``Last-Event-ID`` is no
+# longer in the replay buffer: frames were missed and cannot be replayed.
+
+# Every ``changes_available`` poke for a client shares this key: a client only
+# needs the highest ``server_seq``, so pending pokes collapse into one.
+_POKE_KEY = ("changes_available",)
+
+# A client has at most one keepalive pending; a newer one replaces it.
+_KEEPALIVE_KEY = ("keepalive",)
+
+
+def coalesce_key(cl_id, cli_id, upd_prop: str) -> Tuple:
+    """Key under which a pending notification replaces an older one for the same
+    client: one slot for all pokes, one per ``(cl_id, cli_id, upd_prop)`` for
+    entity events (the client re-reads the entity, so duplicates carry nothing)."""
+    if upd_prop == "changes_available":
+        return _POKE_KEY
+    return (str(cl_id), str(cli_id) if cli_id is not None else None, upd_prop)
+
+
+class SyncClientQueue:
+    """Bounded, coalescing frame buffer between the fan-out and one SSE stream.
+
+    Frames are stored under a coalescing key (see ``coalesce_key``); putting a
+    frame whose key is already pending replaces it and moves it to the back, so
+    a burst of edits to one card costs one slot. For pokes the one with the
+    highest ``server_seq`` wins, whatever order they arrive in.
+
+    When more than ``max_pending`` distinct frames are waiting the client is not
+    keeping up: everything pending is dropped, ``RESYNC_FRAME`` is queued as the
+    final frame and the queue closes. ``put`` never blocks, so the LISTEN
+    callback can feed it synchronously."""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._frames: "OrderedDict[Hashable, Tuple[str, Optional[int]]]" = (
+            OrderedDict()
+        )
+        self._ready = asyncio.Event()
+        # Approximate: SSE frames are ASCII JSON, so characters ~ bytes.
+        self.pending_bytes = 0
+        self.closed = False
+        self.overflowed = False
+        # ``time.monotonic()`` of the last frame handed to the stream (or of
+        # the connect); the heartbeat keeps a stream alive from here.
+        self.last_activity = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def put(
+        self,
+        frame: str,
+        key: Optional[Hashable] = None,
+        server_seq: Optional[int] = None,
+    ) -> bool:
+        """Queue ``frame``. Returns False if the queue is closed or this put
+        overflowed it. A ``None`` key never coalesces."""
+        if self.closed:
+            return False
+        if key is None:
+            key = object()
+        pending = self._frames.pop(key, None)
+        if pending is not None:
+            self.pending_bytes -= len(pending[0])
+            if (
+                server_seq is not None
+                and pending[1] is not None
+                and pending[1] > server_seq
+            ):
+                frame, server_seq = pending
+        if len(self._frames) >= self.max_pending:
+            self._overflow()
+            return False
+        self._frames[key] = (frame, server_seq)
+        self.pending_bytes += len(frame)
+        self._ready.set()
+        return True
+
+    def close(self):
+        """End the stream once the frames already pending are delivered."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """The oldest pending frame, or ``None`` once the queue is closed and
+        drained. Raises ``asyncio.TimeoutError`` if nothing arrives in time."""
+        while not self._frames:
+            if self.closed:
+                return None
+            self._ready.clear()
+            if timeout is None:
+                # The streams wait here: no timer per idle client.
+                await self._ready.wait()
+            else:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+        _, (frame, _) = self._frames.popitem(last=False)
+        self.pending_bytes -= len(frame)
+        self.last_activity = time.monotonic()
+        return frame
+
+    def _overflow(self):
+        self._frames.clear()
+        self._frames[_POKE_KEY] = (RESYNC_FRAME, None)
+        self.pending_bytes = len(RESYNC_FRAME)
+        self.overflowed = True
+        self.close()
+
+
+class _ReplayEntry(NamedTuple):
+    event_no: int
+    frame: str
+    key: Optional[Hashable]
+    server_seq: Optional[int]
+    target_user_ids: FrozenSet[str]
+    target_tokens: FrozenSet[str]
+
+
+class SyncReplayRing:
+    """The most recent frames published by this process, for resuming a
+    reconnecting client from its ``Last-Event-ID``.
+
+    Every published frame gets an SSE ``id:`` of the form
+    ``<server_seq>-<event_no>``: the highest ``server_seq`` seen so far plus a
+    per-process event number. Event numbers start at the process start time in
+    nanoseconds, so an id issued by another server process (or an earlier run of
+    this one) falls outside the range this ring accepts and is treated as aged
+    out instead of being replayed against the wrong history.
+
+    ``max_frames=0`` keeps nothing: every resume then falls back to a resync."""
+
+    def __init__(self, max_frames: int):
+        self.max_frames = max_frames
+        self._entries: Deque[_ReplayEntry] = deque()
+        self._last_no = time.time_ns()
+        # A client whose last id is older than this may have missed an evicted
+        # frame.
+        self._evicted_through = self._last_no
+        self.server_seq = 0
+        self.resumed = 0
+        self.resume_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def last_event_id(self) -> str:
+        return f"{self.server_seq}-{self._last_no}"
+
+    def record(
+        self,
+        frame: str,
+        key: Optional[Hashable],
+        target_user_ids: Iterable[str],
+        target_tokens: Iterable[str],
+        server_seq: Optional[int] = None,
+    ) -> str:
+        """Assign the next id to ``frame``, remember it for replay and return
+        the frame with its ``id:`` line."""
+        self._last_no += 1
+        if server_seq is not None and server_seq > self.server_seq:
+            self.server_seq = server_seq
+        frame = f"id: {self.last_event_id()}\n{frame}"
+        if self.max_frames <= 0:
+            self._evicted_through = self._last_no
+            return frame
+        self._entries.append(
+            _ReplayEntry(
+                self._last_no,
+                frame,
+                key,
+                server_seq,
+                frozenset(str(uid) for uid in target_user_ids),
+                frozenset(target_tokens),
+            )
+        )
+        if len(self._entries) > self.max_frames:
+            self._evicted_through = self._entries.popleft().event_no
+        return frame
+
+    def replay(self, client: "SyncClient", last_event_id: str) -> bool:
+        """Queue the frames addressed to ``client`` that were published after
+        ``last_event_id``. Returns False (queues nothing) when that id is
+        unknown or has aged out, i.e. the client must resync."""
+        event_no = _parse_event_no(last_event_id)
+        if event_no is None or not (
+            self._evicted_through <= event_no <= self._last_no
+        ):
+            self.resume_misses += 1
+            return False
+        self.resumed += 1
+        if not self._entries:
+            return True
+        # Event numbers are contiguous, so the first frame to replay is found
+        # by offset rather than by scanning the ring.
+        start = max(0, event_no - self._entries[0].event_no + 1)
+        for entry in itertools.islice(self._entries, start, None):
+            if (
+                client.user_id is not None and client.user_id in entry.target_user_ids
+            ) or (client.token is not None and client.token in entry.target_tokens):
+                client.queue.put(entry.frame, entry.key, entry.server_seq)
+        return True
+
+    def reset(self):
+        """Forget everything published so far: ids issued before now can no
+        longer be resumed (e.g. notifications were lost while the LISTEN
+        connection was down)."""
+        self._entries.clear()
+        # Skip a number so that even the newest id handed out is now too old.
+        self._last_no += 1
+        self._evicted_through = self._last_no
+
+
+def _parse_event_no(last_event_id: str) -> Optional[int]:
+    _, sep, event_no = last_event_id.strip().rpartition("-")
+    if not sep or not event_no.isdigit():
+        return None
+    return int(event_no)
+
+
+class SyncClient:
+    """One connected SSE subscriber: its principal plus the queue its stream
+    drains.
+
+    The routing keys are derived once at connect time — ``user_id`` for a
+    logged-in ``User`` (as a string, the form the target sets use) and ``token``
+    for an ``AnonymousPrincipal`` from a public link. A principal may carry
+    neither (it then never matches) but never changes keys while connected."""
+
+    __slots__ = ("principal", "queue", "user_id", "token")
+
+    def __init__(self, principal, max_pending: int = 256):
+        self.principal = principal
+        self.queue = SyncClientQueue(max_pending)
+        pid = getattr(principal, "id", None)
+        self.user_id: Optional[str] = str(pid) if pid is not None else None
+        self.token: Optional[str] = getattr(principal, "token", None)
+
+
+class SyncHeartbeat:
+    """Keepalive frames for idle streams, driven by one timer for all clients.
+
+    Proxies and load balancers drop a response that stays silent too long, so a
+    stream that has sent nothing for ``interval`` seconds gets a keepalive
+    comment (see ``SyncClientRegistry.keepalive_frame``). Rather than a timeout
+    per waiting stream, clients sit on a timer wheel of ``slots`` buckets, one
+    tick (``interval / slots``) apart, in the bucket of the tick at which they
+    are next due. Each tick only visits the clients due then: an idle one is
+    sent a keepalive, one that was active meanwhile moves to the bucket its last
+    frame makes it due in. A keepalive is therefore at most one tick late.
+
+    Removed clients are not unlinked from the wheel; they are dropped when
+    their bucket comes up."""
+
+    def __init__(
+        self, registry: "SyncClientRegistry", interval: float, slots: int = 30
+    ):
+        self.registry = registry
+        self.interval = interval
+        self.tick = interval / slots
+        self._wheel: List[Set[SyncClient]] = [set() for _ in range(slots)]
+        # Absolute number of the last tick processed, counted from ``_origin``.
+        self._tick_no = 0
+        self._origin = time.monotonic()
+        self.sent = 0
+
+    def schedule(self, client: "SyncClient", due: Optional[float] = None):
+        """Put ``client`` in the bucket of the first tick at or after ``due``
+        (default: one interval after its last activity)."""
+        if due is None:
+            due = client.queue.last_activity + self.interval
+        tick_no = math.ceil((due - self._origin) / self.tick)
+        slots = len(self._wheel)
+        tick_no = min(max(tick_no, self._tick_no + 1), self._tick_no + slots)
+        self._wheel[tick_no % slots].add(client)
+
+    def advance(self, now: float) -> int:
+        """Process every tick up to ``now``; returns how many keepalives were
+        queued."""
+        sent = 0
+        slots = len(self._wheel)
+        while self._origin + (self._tick_no + 1) * self.tick <= now:
+            self._tick_no += 1
+            bucket = self._wheel[self._tick_no % slots]
+            self._wheel[self._tick_no % slots] = set()
+            for client in bucket:
+                if client not in self.registry or client.queue.closed:
+                    continue
+                if client.queue.last_activity + self.interval > now:
+                    self.schedule(client)
+                    continue
+                # Idle for a full interval. A client with frames still pending
+                # is about to write anyway.
+                if not len(client.queue):
+                    client.queue.put(
+                        self.registry.keepalive_frame(), _KEEPALIVE_KEY
+                    )
+                    sent += 1
+                self.schedule(client, now + self.interval)
+        self.sent += sent
+        return sent
+
+    async def run(self):
+        """Background task: tick until cancelled."""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.advance(time.monotonic())
+
+
+class _HeldFrame(NamedTuple):
+    frame: str
+    key: Optional[Hashable]
+    target_user_ids: List[str]
+    target_tokens: List[str]
+    server_seq: Optional[int]
+
+
+class SyncCoalescingWindow:
+    """Merges bursts of frames for one checklist before they are fanned out.
+
+    The first frame for a checklist is published at once and opens a window of
+    ``window`` seconds. Frames for that checklist arriving within it are held
+    back and merged per recipient set: per-entity frames by their coalescing key
+    ``(cl_id, cli_id, upd_prop)`` (the newest wins), pokes into one carrying the
+    highest ``server_seq``. When the window ends the held frames are published
+    and the next window opens; a window that ends with nothing held closes. An
+    isolated edit thus goes out without delay, while a burst costs its viewers
+    one frame (and one ``/api/changes`` pull) per key and window.
+
+    ``window <= 0`` publishes every frame immediately."""
+
+    def __init__(self, registry: "SyncClientRegistry", window: float):
+        self.registry = registry
+        self.window = window
+        # cl_id -> frames held in the checklist's open window
+        self._held: Dict[str, "OrderedDict[Hashable, _HeldFrame]"] = {}
+        self.merged = 0
+
+    def publish(
+        self,
+        cl_id,
+        frame: str,
+        key: Optional[Hashable],
+        target_user_ids: Iterable[str] = (),
+        target_tokens: Iterable[str] = (),
+        server_seq: Optional[int] = None,
+    ):
+        """``SyncClientRegistry.publish`` for a frame about checklist
+        ``cl_id``, subject to the window. Call from the event loop."""
+        if self.window <= 0:
+            self.registry.publish(
+                frame, key, target_user_ids, target_tokens, server_seq
+            )
+            return
+        cl_id = str(cl_id)
+        held = self._held.get(cl_id)
+        if held is None:
+            self._open(cl_id)
+            self.registry.publish(
+                frame, key, target_user_ids, target_tokens, server_seq
+            )
+            return
+        target_user_ids = [str(uid) for uid in target_user_ids]
+        target_tokens = list(target_tokens)
+        merge_key = (
+            (key, frozenset(target_user_ids), frozenset(target_tokens))
+            if key is not None
+            else object()
+        )
+        previous = held.pop(merge_key, None)
+        if previous is not None:
+            self.merged += 1
+            if previous.server_seq is not None and (
+                server_seq is None or previous.server_seq > server_seq
+            ):
+                frame, server_seq = previous.frame, previous.server_seq
+        held[merge_key] = _HeldFrame(
+            frame, key, target_user_ids, target_tokens, server_seq
+        )
+
+    def _open(self, cl_id: str):
+        self._held[cl_id] = OrderedDict()
+        asyncio.get_running_loop().call_later(self.window, self._close, cl_id)
+
+    def _close(self, cl_id: str):
+        held = self._held.pop(cl_id, None)
+        if not held:
+            return
+        self._open(cl_id)
+        for h in held.values():
+            self.registry.publish(
+                h.frame, h.key, h.target_user_ids, h.target_tokens, h.server_seq
+            )
+
+    def clear(self):
+        """Drop everything held (shutdown); pending timers find nothing."""
+        self._held.clear()
+
+
+class SyncClientRegistry:
+    """Connected SSE clients, indexed by user id and by public-share token.
+
+    A notification names its audience as ``target_user_ids`` / ``target_tokens``;
+    ``targets()`` resolves those with one dict lookup per name, so the cost of a
+    fan-out is proportional to the audience, not to the number of connected
+    clients. A user with several tabs open has one entry per tab under the same
+    key; a client matched by both its id and its token is delivered once.
+
+    Published frames are tagged with an SSE ``id:`` and kept in a replay ring
+    of ``replay_size`` frames (see ``SyncReplayRing``), so a reconnecting client
+    can ``resume`` where it left off. Idle streams are kept alive every
+    ``keepalive_interval`` seconds by ``heartbeat`` (see ``SyncHeartbeat``),
+    whose ``run()`` the owner starts as a background task. Checklist events are
+    published through ``coalescing`` (see ``SyncCoalescingWindow``), which
+    merges bursts within ``coalesce_window`` seconds."""
+
+    def __init__(
+        self,
+        replay_size: int = 0,
+        keepalive_interval: float = 30.0,
+        coalesce_window: float = 0.0,
+    ):
+        self.replay = SyncReplayRing(replay_size)
+        self.heartbeat = SyncHeartbeat(self, keepalive_interval)
+        self.coalescing = SyncCoalescingWindow(self, coalesce_window)
+        self._clients: Set[SyncClient] = set()
+        self._by_user_id: Dict[str, Set[SyncClient]] = {}
+        self._by_token: Dict[str, Set[SyncClient]] = {}
+        # Streams closed because their client fell behind, since process start.
+        self.overflow_disconnects = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __iter__(self) -> Iterator[SyncClient]:
+        # Snapshot: callers may remove clients while iterating.
+        return iter(list(self._clients))
+
+    def __contains__(self, client: SyncClient) -> bool:
+        return client in self._clients
+
+    def add(self, client: SyncClient) -> SyncClient:
+        self._clients.add(client)
+        self.heartbeat.schedule(client)
+        if client.user_id is not None:
+            self._by_user_id.setdefault(client.user_id, set()).add(client)
+        if client.token is not None:
+            self._by_token.setdefault(client.token, set()).add(client)
+        return client
+
+    def resume(self, client: SyncClient, last_event_id: str) -> bool:
+        """Replay what ``client`` missed since ``last_event_id``, or queue a
+        resync signal if that is no longer possible. Call right after ``add``,
+        without awaiting in between, so no frame falls into the gap."""
+        if self.replay.replay(client, last_event_id):
+            return True
+        client.queue.put(RESYNC_FRAME)
+        return False
+
+    def keepalive_frame(self) -> str:
+        """Comment frame for an idle stream. Carries the current last event id:
+        a client with nothing pending has seen everything addressed to it up to
+        there, so a reconnect resumes from it instead of from an older frame
+        that may have aged out."""
+        return f": keepalive\nid: {self.replay.last_event_id()}\n\n"
+
+    def remove(self, client: SyncClient):
+        """Drop a client. Idempotent — a stream's ``finally`` may race shutdown."""
+        self._clients.discard(client)
+        self._discard_from_index(self._by_user_id, client.user_id, client)
+        self._discard_from_index(self._by_token, client.token, client)
+
+    def clear(self):
+        self._clients.clear()
+        self._by_user_id.clear()
+        self._by_token.clear()
+
+    def targets(
+        self,
+        target_user_ids: Iterable[str] = (),
+        target_tokens: Iterable[str] = (),
+    ) -> List[SyncClient]:
+        """All connected clients whose principal is named in the target set. User
+        ids are compared as strings."""
+        matched: Set[SyncClient] = set()
+        for uid in target_user_ids:
+            clients = self._by_user_id.get(str(uid))
+            if clients:
+                matched.update(clients)
+        for token in target_tokens:
+            clients = self._by_token.get(token)
+            if clients:
+                matched.update(clients)
+        return list(matched)
+
+    def publish(
+        self,
+        frame: str,
+        key: Optional[Hashable],
+        target_user_ids: Iterable[str] = (),
+        target_tokens: Iterable[str] = (),
+        server_seq: Optional[int] = None,
+    ) -> int:
+        """Queue ``frame`` for every targeted client and return how many took it.
+        Never blocks; a client that overflows is closed with a resync signal (its
+        stream logs it)."""
+        target_user_ids, target_tokens = list(target_user_ids), list(target_tokens)
+        frame = self.replay.record(
+            frame, key, target_user_ids, target_tokens, server_seq
+        )
+        delivered = 0
+        for client in self.targets(target_user_ids, target_tokens):
+            was_closed = client.queue.closed
+            if client.queue.put(frame, key, server_seq):
+                delivered += 1
+            elif not was_closed and client.queue.overflowed:
+                self.overflow_disconnects += 1
+        return delivered
+
+    def announce_gap(self, poke_frame: str, server_seq: int) -> int:
+        """Recover the connected streams from a gap in which frames addressed to
+        them were lost (e.g. the LISTEN connection dropped). Returns how many
+        clients took the poke.
+
+        The replay history is forgotten, so an id issued before now no longer
+        resumes. Every stream stays open and is sent ``RESYNC_FRAME`` and then
+        ``poke_frame``, the ``changes_available`` poke for ``server_seq``. The
+        poke is published like any other, so it re-seeds the ring and gives
+        each client a fresh id to resume from."""
+        self.replay.reset()
+        for client in self:
+            client.queue.put(RESYNC_FRAME)
+        return self.publish(
+            poke_frame,
+            _POKE_KEY,
+            list(self._by_user_id),
+            list(self._by_token),
+            server_seq,
+        )
+
+    def close_all(self):
+        """Close every connected stream once its pending frames are sent."""
+        for client in self:
+            client.queue.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Buffer usage across all connections (exposed in the health report)."""
+        pending_bytes = [c.queue.pending_bytes for c in self._clients]
+        return {
+            "connected_clients": len(self._clients),
+            "pending_frames": sum(len(c.queue) for c in self._clients),
+            "pending_bytes": sum(pending_bytes),
+            "max_client_pending_bytes": max(pending_bytes, default=0),
+            "overflow_disconnects": self.overflow_disconnects,
+            "replay_frames": len(self.replay),
+            "resumed_streams": self.replay.resumed,
+            "resume_misses": self.replay.resume_misses,
+            "coalesced_frames": self.coalescing.merged,
+        }
+
+    @staticmethod
+    def _discard_from_index(
+        index: Dict[str, Set[SyncClient]], key: Optional[str], client: SyncClient
+    ):
+        if key is None:
+            return
+        clients = index.get(key)
+        if clients is None:
+            return
+        clients.discard(client)
+        if not clients:
+            # Drop empty buckets so a churn of one-off public-link visitors does
+            # not grow the index without bound.
+            del index[key]
@@ -10,6 +10,8 @@ from starlette.datastructures import MutableHeaders
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from fastapi.middleware.cors import CORSMiddleware
 from checkcheckserver.api.routers_map import mount_fast_api_routers
+from checkcheckserver.api.compression import APICompressionMiddleware
+from checkcheckserver.api.routes.routes_notification import NEXT_PAGE_HEADER
 from pathlib import Path
 import json
 from fastapi.openapi.utils import get_openapi
@@ -129,6 +131,18 @@ class FastApiAppContainer:
     def _apply_api_middleware(self):
         # Prevent any browser/proxy from reusing a dynamic API reply from cache.
         self.app.add_middleware(APINoStoreCacheMiddleware)
+        # Negotiated br/zstd/gzip for API JSON; never the /api/sync SSE stream.
+        if config.SERVER_COMPRESSION_ENCODINGS:
+            self.app.add_middleware(
+                APICompressionMiddleware,
+                encodings=config.SERVER_COMPRESSION_ENCODINGS,
+                minimum_size=config.SERVER_COMPRESSION_MIN_SIZE,
+                levels={
+                    "br": config.SERVER_COMPRESSION_BR_LEVEL,
+                    "zstd": config.SERVER_COMPRESSION_ZSTD_LEVEL,
+                    "gzip": config.SERVER_COMPRESSION_GZIP_LEVEL,
+                },
+            )
 
         allow_origins = []
         for oidc_config in config.AUTH_OIDC_PROVIDERS:
@@ -154,6 +168,9 @@ class FastApiAppContainer:
             allow_methods=["*"],
             allow_headers=["*"],
             allow_credentials=True,
+            # Response headers a cross-origin client may read; the notification
+            # feed's continuation token travels in one.
+            expose_headers=[NEXT_PAGE_HEADER],
         )
         self.app.add_middleware(
             SessionMiddleware,
@@ -1,5 +1,7 @@
+from typing import Dict, Optional
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import event, Engine
+from sqlalchemy.pool import QueuePool
 from sqlite3 import Connection as SQLite3Connection
 from checkcheckserver.config import Config
 from checkcheckserver.log import get_logger
@@ -11,3 +13,16 @@ log = get_logger()
 db_engine = create_async_engine(
     str(config.SQL_DATABASE_URL), echo=config.DEBUG_SQL, future=True
 )
+
+
+def db_pool_stats() -> Optional[Dict[str, int]]:
+    """Connection-pool usage of this process, or ``None`` for a pool that keeps
+    no counters (e.g. the ``StaticPool`` of an in-memory SQLite database)."""
+    pool = db_engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+    }
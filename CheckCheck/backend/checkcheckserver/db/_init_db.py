@@ -16,7 +16,11 @@ from checkcheckserver.db.user_auth import (
     AllowedAuthSchemeType,
 )
 from checkcheckserver.db._db_data_provisioner import provision_data
-from checkcheckserver.model._base_model import SYNC_SEQ_ROW_ID, SyncSequence
+from checkcheckserver.model._base_model import (
+    SYNC_SEQ_ROW_ID,
+    SyncSequence,
+    align_server_seq_allocators,
+)
 from checkcheckserver.log import get_logger
 from checkcheckserver.config import Config
 
@@ -56,6 +60,9 @@ def init_schema_and_migrations():
                 ),
                 {"row_id": SYNC_SEQ_ROW_ID},
             )
+            # Continue above the other allocator's values if SYNC_SEQ_ALLOCATOR
+            # was switched (Postgres; create_all made the sequence).
+            await conn.run_sync(align_server_seq_allocators)
         async with db_engine.connect() as conn:
             rev = await _get_current_alembic_revision(conn)
         # Dispose inside the event loop — asyncpg requires async close and
@@ -0,0 +1,25 @@
+from typing import Any, Optional, Sequence
+
+from sqlmodel import asc, desc, literal, tuple_
+from sqlmodel.sql import expression as sqlEpression
+
+
+def append_seek_to_query(
+    sqlmodel_query: sqlEpression.Select,
+    sort_keys: Sequence,
+    after: Optional[Sequence[Any]] = None,
+    descending: bool = True,
+) -> sqlEpression.Select:
+    """Order ``sqlmodel_query`` by ``sort_keys`` (all in one direction, the last
+    one unique) and, given the keys of the previous page's last row, keep only
+    the rows after it. A row-value comparison, so an index on the sort keys
+    seeks straight to the page instead of reading and discarding every row
+    before it the way ``OFFSET`` does."""
+    if after is not None:
+        row = tuple_(*sort_keys)
+        last = tuple_(
+            *(literal(value, key.type) for value, key in zip(after, sort_keys))
+        )
+        sqlmodel_query = sqlmodel_query.where(row < last if descending else row > last)
+    direction = desc if descending else asc
+    return sqlmodel_query.order_by(*(direction(key) for key in sort_keys))
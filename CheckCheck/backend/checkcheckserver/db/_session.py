@@ -8,6 +8,16 @@ from sqlalchemy.orm import sessionmaker
 import contextlib
 from checkcheckserver.config import Config
 from checkcheckserver.db._engine import db_engine
+from checkcheckserver.db.sync_outbox import take_pending_sync_notifications
+
+# Registers the commit hook that bumps the delta feed's per-user watermarks.
+from checkcheckserver.db import sync_watermark  # noqa: F401
+
+# Registers the flush and commit hooks that keep the per-checklist item counters.
+from checkcheckserver.db import checklist_item_counter  # noqa: F401
+
+# Registers the flush and commit hooks that keep the card search index.
+from checkcheckserver.db import search  # noqa: F401
 
 config = Config()
 
@@ -15,7 +25,21 @@ config = Config()
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async_session = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
     async with async_session() as session:
-        yield session
+        try:
+            yield session
+        except Exception:
+            # Drops the events of the write that did not land, too.
+            await session.rollback()
+            raise
+        # Routes enqueue their events ahead of their write's commit (see
+        # db/sync_outbox.py). One still pending here missed it.
+        late = take_pending_sync_notifications(session)
+        if late:
+            raise RuntimeError(
+                f"Sync events {[p.noti.upd_prop for p in late]} were enqueued "
+                "after the request's last commit and are not delivered; "
+                "enqueue them ahead of the commit of the write they announce"
+            )
 
 
 get_async_session_context = contextlib.asynccontextmanager(get_async_session)
@@ -1,4 +1,13 @@
-from typing import AsyncGenerator, List, Optional, Literal, Sequence, Annotated, Tuple
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    List,
+    Optional,
+    Literal,
+    Sequence,
+    Annotated,
+    Tuple,
+)
 from pydantic import validate_email, validator, StringConstraints
 from pydantic_core import PydanticCustomError
 from fastapi import Depends
@@ -22,7 +31,8 @@ from sqlmodel import (
 import uuid
 from uuid import UUID
 from sqlmodel.sql import expression as sqlEpression
-from sqlalchemy.orm import selectinload, with_loader_criteria
+from sqlalchemy import CTE
+from sqlalchemy.orm import contains_eager, noload
 from checkcheckserver.config import Config
 from checkcheckserver.log import get_logger
 from checkcheckserver.model.checklist import (
@@ -37,12 +47,20 @@ from checkcheckserver.model.checklist_collaborator import (
     ShareStatus,
 )
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.checklist_label import ChecklistLabelCRUD
+from checkcheckserver.db.search import get_search_engine
+from checkcheckserver.db.sync_seq import (
+    FEED_KIND_CHECKLIST,
+    FeedKey,
+    after_feed_key,
+    card_seq,
+)
 from checkcheckserver.api.paginator import QueryParamsInterface
+from checkcheckserver.db._keyset import append_seek_to_query
 from checkcheckserver.model.checklist_position import CheckListPosition
 from checkcheckserver.model.checklist import CheckListApi, CheckListApiWithSubObj
 from checkcheckserver.model.label import Label
 from checkcheckserver.model.checklist_label import CheckListLabel
-from checkcheckserver.model.checklist_item import CheckListItem
 
 log = get_logger()
 config = Config()
@@ -128,44 +146,42 @@ class CheckListCRUD(
             and_(CheckList.owner_id == user_id, has_collaborator)
         )
 
-    async def count(
+    def _add_grid_filters(
         self,
+        query: sqlEpression.Select,
         user_id: uuid.UUID,
         archived: Optional[bool] = None,
         label_id: Optional[uuid.UUID] = None,
         search: Optional[str] = None,
         shared: Optional[SharedFilter] = None,
-    ) -> int:
-        query = select(func.count()).select_from(CheckList)
-
-        if archived is not None:
-            query = query.where(CheckListPosition.archived == archived)
+    ):
+        """The grid's filters on top of the caller's access: shared by ``count``
+        and ``list_for_grid`` so the total always matches the listing."""
         query = self._add_user_has_access_query(query, user_id)
         query = self._add_shared_filter(query, user_id, shared)
+        if archived is not None:
+            query = query.where(CheckListPosition.archived == archived)
         if label_id is not None:
             query = query.join(CheckListLabel).where(
                 CheckListLabel.label_id == label_id
             )
         if search is not None:
-            needle = f"%{search}%"
-            item_match = (
-                select(CheckListItem.id)
-                .where(
-                    and_(
-                        CheckListItem.checklist_id == CheckList.id,
-                        CheckListItem.text.ilike(needle),
-                    )
-                )
-                .exists()
-            )
-            query = query.where(
-                or_(
-                    col(CheckList.name).ilike(needle),
-                    col(CheckList.text).ilike(needle),
-                    item_match,
-                )
-            )
+            # Scoped by the access filter above, in the same statement.
+            query = query.where(get_search_engine().checklist_condition(search))
+        return query
 
+    async def count(
+        self,
+        user_id: uuid.UUID,
+        archived: Optional[bool] = None,
+        label_id: Optional[uuid.UUID] = None,
+        search: Optional[str] = None,
+        shared: Optional[SharedFilter] = None,
+    ) -> int:
+        query = select(func.count()).select_from(CheckList)
+        query = self._add_grid_filters(
+            query, user_id, archived, label_id, search, shared
+        )
         results = await self.session.exec(statement=query)
         return results.first()
 
@@ -214,13 +230,29 @@ class CheckListCRUD(
         await self.session.refresh(checklist)
         return checklist
 
-    async def list_changed_checklist_ids_for_user(
+    def access_cte(self, user_id: uuid.UUID) -> CTE:
+        """The caller's accessible cards as a CTE of ``(id, granted_seq,
+        position_seq)``, the last two from the caller's ``checklist_position``.
+
+        The delta feed resolves everything a pull returns against this one
+        relation (see ``db/sync_feed.py``) instead of re-running the access
+        predicate per query or binding the accessible ids as parameters."""
+        query = select(
+            CheckList.id,
+            CheckListPosition.granted_seq,
+            col(CheckListPosition.server_seq).label("position_seq"),
+        )
+        query = self._add_user_has_access_query(query, user_id)
+        return query.cte("access")
+
+    def changed_checklist_ids_query(
         self,
         user_id: uuid.UUID,
         since: int,
-    ) -> List[uuid.UUID]:
-        """Ids of the caller's *accessible* cards whose card-level state changed
-        after ``since`` (WI-4 delta feed).
+        access: CTE,
+    ) -> sqlEpression.Select:
+        """Ids of the caller's *accessible* cards (``access``, see ``access_cte``)
+        whose card-level state changed after ``since`` (WI-4 delta feed).
 
         "Card-level" means any of: the ``checklist`` row itself (name/color/text),
         the caller's own ``checklist_position`` (pin/archive/index), one of the
@@ -228,13 +260,13 @@ class CheckListCRUD(
         ``checklist_collaborator`` row (a permission-level change) — all of which
         the client's checklist store renders per card (``my_permission`` included).
         Item changes are handled separately (an item edit does not re-emit its
-        card). Reuses ``_add_user_has_access_query`` so tombstoned cards and cards
-        the caller can't see are already excluded.
+        card). Tombstoned cards and cards the caller can't see are not in
+        ``access``.
 
         Note this is card-level only: a *fresh* grant (whole-tree delivery) is
-        detected separately via the position ``granted_seq`` gain query; a
-        permission bump on an already-accepted collaborator only needs the card
-        re-emitted so ``my_permission`` updates, not the tree re-shipped."""
+        detected separately via the position ``granted_seq``; a permission bump on
+        an already-accepted collaborator only needs the card re-emitted so
+        ``my_permission`` updates, not the tree re-shipped."""
         label_changed = (
             select(CheckListLabel.checklist_id)
             .where(
@@ -258,24 +290,47 @@ class CheckListCRUD(
             )
             .exists()
         )
-        query = select(CheckList.id)
-        query = self._add_user_has_access_query(query, user_id)
-        query = query.where(
-            or_(
-                col(CheckList.server_seq) > since,
-                col(CheckListPosition.server_seq) > since,
-                label_changed,
-                collaborator_changed,
+        return (
+            select(CheckList.id)
+            .join(access, access.c.id == CheckList.id)
+            .where(
+                or_(
+                    col(CheckList.server_seq) > since,
+                    access.c.position_seq > since,
+                    label_changed,
+                    collaborator_changed,
+                )
             )
         )
+
+    async def list_changed_checklist_keys_for_user(
+        self,
+        user_id: uuid.UUID,
+        since: int,
+        after: Optional[FeedKey],
+        limit: int,
+    ) -> List[Tuple[int, uuid.UUID]]:
+        """One page of ``changed_checklist_ids_query`` for the paged delta feed:
+        up to ``limit`` ``(seq, id)`` pairs after ``after``, in feed order (see
+        ``db/sync_seq.py``). ``seq > since`` is the same card-level change test,
+        and covers cards gained since the cursor."""
+        seq = card_seq(user_id)
+        query = select(seq, CheckList.id)
+        query = self._add_user_has_access_query(query, user_id)
+        query = (
+            query.where(seq > since)
+            .where(after_feed_key(seq, CheckList.id, FEED_KIND_CHECKLIST, after))
+            .order_by(seq, CheckList.id)
+            .limit(limit)
+        )
         results = await self.session.exec(statement=query)
-        return list(results.all())
+        return [tuple(row) for row in results.all()]
 
-    async def list_tombstoned_checklist_ids_for_user(
+    def tombstoned_checklist_ids_query(
         self,
         user_id: uuid.UUID,
         since: int,
-    ) -> List[uuid.UUID]:
+    ) -> sqlEpression.Select:
         """Ids of cards tombstoned after ``since`` that the caller could see
         (owner or accepted collaborator). The parent tombstone leaves collaborator
         rows in place (WI-2 cascade rule), so membership is still resolvable here;
@@ -292,43 +347,74 @@ class CheckListCRUD(
             )
             .exists()
         )
-        query = select(CheckList.id).where(
+        return select(CheckList.id).where(
             and_(
                 col(CheckList.deleted_at).is_not(None),
                 col(CheckList.server_seq) > since,
                 or_(CheckList.owner_id == user_id, is_collaborator),
             )
         )
-        results = await self.session.exec(statement=query)
-        return list(results.all())
+
+    @staticmethod
+    def _full_by_ids_for_user_query(checklist_ids: List[uuid.UUID], user_id: uuid.UUID):
+        accepted_collaborator = and_(
+            CheckListCollaborator.checklist_id == CheckList.id,
+            CheckListCollaborator.user_id == user_id,
+            CheckListCollaborator.status == ShareStatus.accepted.value,
+        )
+        return (
+            select(CheckList, CheckListCollaborator.permission)
+            .join(
+                CheckListPosition,
+                and_(
+                    CheckListPosition.checklist_id == CheckList.id,
+                    CheckListPosition.user_id == user_id,
+                ),
+            )
+            .outerjoin(CheckListCollaborator, accepted_collaborator)
+            .where(col(CheckList.id).in_(checklist_ids))
+            .where(col(CheckList.deleted_at).is_(None))
+            .options(
+                contains_eager(CheckList.position),
+                # Unscoped (every user's links); the caller sets the caller's own.
+                noload(CheckList.labels),
+            )
+        )
 
     async def list_full_by_ids_for_user(
         self,
         checklist_ids: List[uuid.UUID],
         user_id: uuid.UUID,
-    ) -> List[CheckList]:
-        """Load live cards by id with the caller's own position/color/labels eager
-        loaded, for the delta feed's changed-card payload. Mirrors the per-user
-        eager-load in ``list()`` (position scoped to the caller so a shared card
-        never reports another user's pin/archive/index); the route replaces the
-        unscoped labels with the caller's set and attaches ``my_permission``."""
+    ) -> List[Tuple[CheckList, Optional[str]]]:
+        """Load live cards by id for the delta feed's changed-card payload, each
+        with the caller's accepted collaborator permission (``None`` on a card
+        they own), in one statement. The caller's own position is joined in (so a
+        shared card never reports another user's pin/archive/index) and color and
+        owner ride their joined loads. Labels are not loaded: the route sets the
+        caller's own set and attaches ``my_permission``."""
         if not checklist_ids:
             return []
-        query = (
-            select(CheckList)
-            .where(col(CheckList.id).in_(checklist_ids))
-            .where(col(CheckList.deleted_at).is_(None))
-            .options(
-                selectinload(CheckList.position),
-                with_loader_criteria(
-                    CheckListPosition, CheckListPosition.user_id == user_id
-                ),
-                selectinload(CheckList.color),
-                selectinload(CheckList.labels),
-            )
-        )
+        query = self._full_by_ids_for_user_query(checklist_ids, user_id)
         results = await self.session.exec(statement=query)
-        return list(results.all())
+        return [tuple(row) for row in results.all()]
+
+    async def stream_full_by_ids_for_user(
+        self,
+        checklist_ids: List[uuid.UUID],
+        user_id: uuid.UUID,
+        chunk_size: int,
+    ) -> AsyncIterator[List[Tuple[CheckList, Optional[str]]]]:
+        """``list_full_by_ids_for_user`` in chunks of ``chunk_size``, read from a
+        server-side cursor so only one chunk is held in memory at a time (the
+        streamed delta feed)."""
+        if not checklist_ids:
+            return
+        query = self._full_by_ids_for_user_query(
+            checklist_ids, user_id
+        ).execution_options(yield_per=chunk_size)
+        results = await self.session.stream(query)
+        async for chunk in results.partitions():
+            yield [tuple(row) for row in chunk]
 
     async def list_access_ids(
         self,
@@ -347,81 +433,115 @@ class CheckListCRUD(
         results = await self.session.exec(statement=query)
         return results.all()
 
-    async def list(
+    async def list_for_grid(
         self,
         user_id: uuid.UUID,
-        include_sub_obj: bool = False,
         archived: Optional[bool] = None,
         label_id: Optional[uuid.UUID] = None,
         search: Optional[str] = None,
         shared: Optional[SharedFilter] = None,
         pagination: QueryParamsInterface = None,
-    ) -> List[CheckList | CheckListApiWithSubObj]:
-        query = select(CheckList)
-        query = self._add_user_has_access_query(
-            query, user_id, join_CheckListPosition=True
-        )
-        query = self._add_shared_filter(query, user_id, shared)
+    ) -> Tuple[
+        Optional[int], List[Tuple[CheckList, Optional[str]]], Optional[str]
+    ]:
+        """One page of the caller's grid in a single statement: the total count
+        of matching cards, each card with the caller's accepted collaborator
+        permission (``None`` on a card they own), and the ``next_page`` token.
 
-        if archived is not None:
-            query = query.where(CheckListPosition.archived == archived)
-        if label_id is not None:
-            query = query.join(CheckListLabel).where(
-                CheckListLabel.label_id == label_id
-            )
-        if search is not None:
-            needle = f"%{search}%"
-            item_match = (
-                select(CheckListItem.id)
-                .where(
-                    and_(
-                        CheckListItem.checklist_id == CheckList.id,
-                        CheckListItem.text.ilike(needle),
-                    )
-                )
-                .exists()
-            )
-            query = query.where(
-                or_(
-                    col(CheckList.name).ilike(needle),
-                    col(CheckList.text).ilike(needle),
-                    item_match,
-                )
-            )
+        The page is cut in a subquery that also carries ``COUNT(*) OVER ()``
+        (evaluated before its ``LIMIT``); the outer query joins the page's cards
+        to the caller's own position and label links and the card's color, so
+        labels arrive already scoped to the caller and nothing is loaded only to
+        be replaced. Pinned cards come first across pages, then by descending
+        position index, the id breaking ties so pages never overlap. A ``page``
+        token seeks past the previous page's last card on those keys instead of
+        skipping ``offset`` rows.
+
+        The total is ``None`` when the page is empty (an offset past the end):
+        there is no row to carry it, ``count`` has it."""
         # Pinned checklists must come first across pagination so they all reach
         # the top group in the client. coalesce guards legacy NULL `pinned` rows
         # (Postgres would otherwise sort NULLs first under desc()).
-        query = query.order_by(
-            desc(func.coalesce(CheckListPosition.pinned, False)),
-            desc(CheckListPosition.index),
+        pinned = func.coalesce(CheckListPosition.pinned, False)
+        sort_keys = (pinned, col(CheckListPosition.index), col(CheckList.id))
+        page = select(
+            col(CheckList.id).label("id"),
+            pinned.label("pinned"),
+            col(CheckListPosition.index).label("index"),
+            func.count().over().label("total_count"),
+        )
+        page = self._add_grid_filters(
+            page, user_id, archived, label_id, search, shared
         )
         if pagination:
-            query = pagination.append_to_query(query)
-        if include_sub_obj:
-            # CheckListPosition is per-user: a shared card has N position rows
-            # (one per collaborator + owner), but CheckList.position is a scalar
-            # (uselist=False) relationship. An unscoped eager-load pulls every
-            # user's row into the single slot, so SQLAlchemy warns and picks one
-            # arbitrarily — a shared card could then report another user's
-            # pinned/archived/index. Scope the load to the caller (mirroring the
-            # already user-scoped access-query join) so each viewer sees their
-            # own position.
-            query = query.options(
-                selectinload(CheckList.position),
-                with_loader_criteria(
-                    CheckListPosition, CheckListPosition.user_id == user_id
+            page = pagination.append_keyset_to_query(page, sort_keys)
+        else:
+            page = append_seek_to_query(page, sort_keys)
+        page = page.subquery("page")
+
+        accepted_collaborator = and_(
+            CheckListCollaborator.checklist_id == CheckList.id,
+            CheckListCollaborator.user_id == user_id,
+            CheckListCollaborator.status == ShareStatus.accepted.value,
+        )
+        query = (
+            select(CheckList, CheckListCollaborator.permission, page.c.total_count)
+            .join(page, page.c.id == CheckList.id)
+            # CheckListPosition and CheckListLabel are per-user, while
+            # CheckList.position is a scalar and CheckList.labels spans every
+            # user's links: join the caller's rows and load the relationships
+            # from them.
+            .join(
+                CheckListPosition,
+                and_(
+                    CheckListPosition.checklist_id == CheckList.id,
+                    CheckListPosition.user_id == user_id,
+                ),
+            )
+            .outerjoin(CheckListCollaborator, accepted_collaborator)
+            .outerjoin(
+                CheckListLabel,
+                and_(
+                    CheckListLabel.checklist_id == CheckList.id,
+                    CheckListLabel.user_id == user_id,
+                ),
+            )
+            .outerjoin(
+                Label,
+                and_(
+                    Label.id == CheckListLabel.label_id,
+                    col(Label.deleted_at).is_(None),
                 ),
             )
-            query = query.options(selectinload(CheckList.color))
-            # Eager-load labels so the per-user reassignment in the route does
-            # not trigger an async lazy-load. They are loaded UNSCOPED here (the
-            # CheckList.labels relationship spans the link table without its
-            # per-user dimension, so it cannot be user-scoped at load time —
-            # with_loader_criteria does not reach a m2m secondary). The caller
-            # (list_checklists route) replaces them with the per-user set via
-            # ChecklistLabelCRUD.list_labels_for_user_by_checklist.
-            query = query.options(selectinload(CheckList.labels))
-        # log.debug(f"list.checklist.query: {query}")
+            .options(
+                contains_eager(CheckList.position),
+                contains_eager(CheckList.labels),
+            )
+            .order_by(
+                desc(page.c.pinned),
+                desc(page.c.index),
+                desc(page.c.id),
+                *ChecklistLabelCRUD._label_order(),
+            )
+        )
         results = await self.session.exec(statement=query)
-        objs = results.all()
-        return objs
+        rows = results.unique().all()
+        if not rows:
+            return None, [], None
+        total_count = rows[0][2]
+        next_page = None
+        if pagination:
+            if pagination.page is not None:
+                # Past a seek the window only counts the cards from there on.
+                total_count += pagination.page_offset()
+            last = rows[-1][0]
+            next_page = pagination.next_page_token(
+                (bool(last.position.pinned), last.position.index, last.id),
+                count=len(rows),
+                total_count=total_count,
+            )
+        return (
+            total_count,
+            [(checklist, permission) for checklist, permission, _ in rows],
+            next_page,
+        )
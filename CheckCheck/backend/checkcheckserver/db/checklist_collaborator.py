@@ -20,6 +20,7 @@ from checkcheckserver.model.checklist_collaborator import (
 )
 from checkcheckserver.model.checklist import CheckList
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.sync_audience import mark_audience_changed
 from checkcheckserver.api.paginator import QueryParamsInterface
 
 
@@ -126,6 +127,33 @@ class CheckListCollaboratorCRUD(
             )
         )
 
+    async def stage_upsert(
+        self,
+        checklist_id: uuid.UUID,
+        user_id: uuid.UUID,
+        permission,
+        status: ShareStatus = ShareStatus.accepted,
+        via_group: Optional[str] = None,
+    ) -> CheckListCollaborator:
+        """``upsert`` WITHOUT committing, so a share's rows (collaborator, grid
+        position, notification) and its sync events land in one transaction."""
+        existing = await self.get_one(checklist_id=checklist_id, user_id=user_id)
+        if existing is None:
+            return self.stage_create(
+                CheckListCollaboratorCreate(
+                    checklist_id=checklist_id,
+                    user_id=user_id,
+                    permission=permission,
+                    status=status,
+                    via_group=via_group,
+                )
+            )
+        existing.permission = permission
+        existing.status = status
+        existing.via_group = via_group
+        self.session.add(existing)
+        return existing
+
     async def list_group_derived_for_user(
         self,
         user_id: uuid.UUID,
@@ -188,6 +216,16 @@ class CheckListCollaboratorCRUD(
         checklist_id: UUID,
         user_id: Optional[UUID] = None,
     ):
+        await self.stage_delete(checklist_id, user_id)
+        await self.session.commit()
+        return
+
+    async def stage_delete(
+        self,
+        checklist_id: UUID,
+        user_id: Optional[UUID] = None,
+    ):
+        """``delete`` WITHOUT committing."""
         del_statement = delete(CheckListCollaborator).where(
             CheckListCollaborator.checklist_id == checklist_id
         )
@@ -196,6 +234,5 @@ class CheckListCollaboratorCRUD(
                 CheckListCollaborator.user_id == user_id
             )
 
+        mark_audience_changed(self.session, checklist_id)
         await self.session.exec(del_statement)
-        await self.session.commit()
-        return
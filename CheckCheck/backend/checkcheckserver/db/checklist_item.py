@@ -1,5 +1,6 @@
 from typing import (
     AsyncGenerator,
+    AsyncIterator,
     List,
     Optional,
     Literal,
@@ -8,6 +9,7 @@ from typing import (
     Tuple,
     Dict,
     Any,
+    NamedTuple,
     Type,
 )
 from pydantic import StringConstraints, PositiveInt
@@ -31,7 +33,7 @@ from sqlmodel import (
     or_,
 )
 from collections import defaultdict
-from sqlalchemy import func
+from sqlalchemy import CTE, func
 from sqlalchemy.orm import (
     contains_eager,
     joinedload,
@@ -44,6 +46,7 @@ import uuid
 
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql import over
+from sqlmodel.sql import expression as sqlEpression
 from collections import defaultdict
 
 
@@ -56,11 +59,19 @@ from checkcheckserver.model.checklist_item import (
 )
 from checkcheckserver.model.checklist_item_state import CheckListItemState
 from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_counter import CheckListItemCounter
 
 from checkcheckserver.model.checklist import CheckList
 from checkcheckserver.model.checklist_position import CheckListPosition
 
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.sync_seq import (
+    FEED_KIND_ITEM,
+    FeedKey,
+    after_feed_key,
+    card_seq,
+    greatest_seq,
+)
 from checkcheckserver.model._base_model import naive_utc_now
 from checkcheckserver.api.paginator import QueryParamsInterface
 
@@ -69,6 +80,15 @@ log = get_logger()
 config = Config()
 
 
+class ItemCounts(NamedTuple):
+    """Live item counts of one checklist. An item without a state row counts
+    as unchecked."""
+
+    total: int = 0
+    checked: int = 0
+    unchecked: int = 0
+
+
 class CheckListItemCRUD(
     create_crud_base(
         table_model=CheckListItem,
@@ -95,6 +115,28 @@ class CheckListItemCRUD(
         results = await self.session.exec(statement=query)
         return results.first()
 
+    async def count_by_checklist(
+        self, checklist_ids: Sequence[uuid.UUID]
+    ) -> Dict[uuid.UUID, ItemCounts]:
+        """Live item counts of many checklists, read from their counter rows
+        (``db/checklist_item_counter.py``) in one statement. Every requested
+        checklist gets an entry; one without live items counts ``(0, 0, 0)``."""
+        counts = {checklist_id: ItemCounts() for checklist_id in checklist_ids}
+        if not counts:
+            return counts
+        query = select(
+            CheckListItemCounter.checklist_id,
+            CheckListItemCounter.item_count,
+            CheckListItemCounter.checked_count,
+        ).where(col(CheckListItemCounter.checklist_id).in_(list(counts)))
+        results = await self.session.exec(statement=query)
+        for checklist_id, total, checked in results.all():
+            counts[checklist_id] = ItemCounts(total, checked, total - checked)
+        return counts
+
+    async def count_for_checklist(self, checklist_id: uuid.UUID) -> ItemCounts:
+        return (await self.count_by_checklist([checklist_id]))[checklist_id]
+
     async def list(
         self,
         checklist_id: uuid.UUID,
@@ -147,7 +189,17 @@ class CheckListItemCRUD(
 
     async def delete_checked_items(self, checklist_id: uuid.UUID) -> int:
         """Bulk "delete ticked": soft-delete (tombstone) every checked, live item
-        of this checklist in a single transaction.
+        of this checklist in a single transaction. Returns the number of items
+        tombstoned.
+        """
+        affected = await self.stage_delete_checked_items(checklist_id)
+        if affected:
+            await self.session.commit()
+        return affected
+
+    async def stage_delete_checked_items(self, checklist_id: uuid.UUID) -> int:
+        """``delete_checked_items`` WITHOUT committing, so the caller can enqueue
+        the sync event (which depends on the count) into the same commit.
 
         MUST mutate ORM objects in a loop (not a Core ``DELETE`` / bulk
         ``UPDATE``): ``server_seq`` is stamped by the ``before_update`` mapper
@@ -181,48 +233,115 @@ class CheckListItemCRUD(
         for item in items:
             item.deleted_at = now
             self.session.add(item)
-        if items:
-            await self.session.commit()
         return len(items)
 
+    @staticmethod
+    def _changed_items_filter(query: sqlEpression.Select, since: int, access: CTE):
+        return (
+            query.join(access, access.c.id == CheckListItem.checklist_id)
+            .join(
+                CheckListItemState,
+                CheckListItem.id == CheckListItemState.checklist_item_id,
+            )
+            .join(
+                CheckListItemPosition,
+                CheckListItem.id == CheckListItemPosition.checklist_item_id,
+            )
+            .where(col(CheckListItem.deleted_at).is_(None))
+            .where(
+                or_(
+                    access.c.granted_seq > since,
+                    col(CheckListItem.server_seq) > since,
+                    col(CheckListItemState.server_seq) > since,
+                    col(CheckListItemPosition.server_seq) > since,
+                )
+            )
+        )
+
+    @classmethod
+    def changed_item_ids_query(cls, since: int, access: CTE) -> sqlEpression.Select:
+        """Ids of the live items to ship in a delta pull (WI-4), over the caller's
+        accessible cards (``access``, see ``CheckListCRUD.access_cte``).
+
+        Two scopes, OR-ed:
+        * cards the caller already had: only the items whose own row, ``state``
+          (checked) or ``position`` changed after ``since``;
+        * cards the caller gained access to since the cursor (their position's
+          ``granted_seq`` is above it): their whole tree predates the grant (lower
+          ``server_seq``), so *all* live items regardless of ``since``."""
+        return cls._changed_items_filter(select(CheckListItem.id), since, access)
+
+    @classmethod
+    def changed_items_query(cls, since: int, access: CTE) -> sqlEpression.Select:
+        """The items of ``changed_item_ids_query``, with state + position eager
+        loaded."""
+        return cls._changed_items_filter(
+            select(CheckListItem), since, access
+        ).options(
+            contains_eager(CheckListItem.state),
+            contains_eager(CheckListItem.position),
+        )
+
     async def list_changed_items(
         self,
         since: int,
-        changed_checklist_ids: List[uuid.UUID],
-        full_checklist_ids: List[uuid.UUID],
+        access: CTE,
     ) -> List[CheckListItem]:
-        """Live items to ship in a delta pull (WI-4), with state + position eager
-        loaded.
+        """Run ``changed_items_query``."""
+        results = await self.session.exec(
+            statement=self.changed_items_query(since, access)
+        )
+        return list(results.unique().all())
 
-        Two scopes, OR-ed:
-        * ``changed_checklist_ids`` — cards the caller already has; return only the
-          items whose own row, ``state`` (checked) or ``position`` changed after
-          ``since``.
-        * ``full_checklist_ids`` — cards the caller just gained access to; their
-          whole tree predates the access grant (lower ``server_seq``), so return
-          *all* live items regardless of ``since``.
-        The two sets are disjoint at the call site; overlap would merely OR to the
-        same rows."""
-        conditions = []
-        if full_checklist_ids:
-            conditions.append(
-                col(CheckListItem.checklist_id).in_(full_checklist_ids)
-            )
-        if changed_checklist_ids:
-            conditions.append(
-                and_(
-                    col(CheckListItem.checklist_id).in_(changed_checklist_ids),
-                    or_(
-                        col(CheckListItem.server_seq) > since,
-                        col(CheckListItemState.server_seq) > since,
-                        col(CheckListItemPosition.server_seq) > since,
-                    ),
-                )
+    async def stream_changed_items(
+        self,
+        since: int,
+        access: CTE,
+        chunk_size: int,
+    ) -> AsyncIterator[List[CheckListItem]]:
+        """``list_changed_items`` in chunks of ``chunk_size``, read from a
+        server-side cursor so only one chunk is held in memory at a time (the
+        streamed delta feed). State and position are one-to-one joins, so every
+        row is a distinct item."""
+        results = await self.session.stream_scalars(
+            self.changed_items_query(since, access).execution_options(
+                yield_per=chunk_size
             )
-        if not conditions:
-            return []
+        )
+        async for chunk in results.partitions():
+            yield list(chunk)
+
+    async def list_changed_items_page(
+        self,
+        user_id: uuid.UUID,
+        since: int,
+        access: CTE,
+        after: Optional[FeedKey],
+        limit: int,
+    ) -> List[Tuple[int, CheckListItem]]:
+        """One page of ``list_changed_items`` for the paged delta feed: up to
+        ``limit`` ``(seq, item)`` pairs after ``after``, in feed order (see
+        ``db/sync_seq.py``), over the caller's accessible cards (``access``).
+
+        An item's ``seq`` is the highest of its own row, state and position. Items
+        of a card the caller gained since the cursor (their position's
+        ``granted_seq`` is above it, the feed's gain test) all ship, and never sort
+        below the card's ``seq``: the client only applies items of cards it holds,
+        so they must not come before the card, which sorts just ahead of them."""
+        item_seq = greatest_seq(
+            CheckListItem.server_seq,
+            CheckListItemState.server_seq,
+            CheckListItemPosition.server_seq,
+        )
+        seq = case(
+            (
+                access.c.granted_seq > since,
+                greatest_seq(card_seq(user_id), item_seq),
+            ),
+            else_=item_seq,
+        )
         query = (
-            select(CheckListItem)
+            select(CheckListItem, seq)
             .join(
                 CheckListItemState,
                 CheckListItem.id == CheckListItemState.checklist_item_id,
@@ -231,34 +350,31 @@ class CheckListItemCRUD(
                 CheckListItemPosition,
                 CheckListItem.id == CheckListItemPosition.checklist_item_id,
             )
+            .join(CheckList, CheckList.id == CheckListItem.checklist_id)
+            .join(access, access.c.id == CheckList.id)
             .where(col(CheckListItem.deleted_at).is_(None))
-            .where(or_(*conditions))
+            .where(seq > since)
+            .where(after_feed_key(seq, CheckListItem.id, FEED_KIND_ITEM, after))
+            .order_by(seq, CheckListItem.id)
+            .limit(limit)
             .options(
                 contains_eager(CheckListItem.state),
                 contains_eager(CheckListItem.position),
             )
         )
         results = await self.session.exec(statement=query)
-        return list(results.unique().all())
-
-    async def list_tombstoned_item_ids(
-        self,
-        checklist_ids: List[uuid.UUID],
-        since: int,
-    ) -> List[uuid.UUID]:
-        """Ids of items tombstoned after ``since`` within the given (currently
-        accessible) cards. Items of a *tombstoned card* are intentionally excluded
-        — the client drops the whole card via ``checklist_tombstones`` — so callers
-        pass only live-accessible checklist ids."""
-        if not checklist_ids:
-            return []
-        query = select(CheckListItem.id).where(
-            col(CheckListItem.checklist_id).in_(checklist_ids),
+        return [(item_seq, item) for item, item_seq in results.all()]
+
+    @staticmethod
+    def tombstoned_item_ids_query(since: int, access: CTE) -> sqlEpression.Select:
+        """Ids of items tombstoned after ``since`` within the caller's accessible
+        cards (``access``). Items of a *tombstoned card* are intentionally
+        excluded — the client drops the whole card via ``checklist_tombstones``."""
+        return select(CheckListItem.id).where(
+            col(CheckListItem.checklist_id).in_(select(access.c.id)),
             col(CheckListItem.deleted_at).is_not(None),
             col(CheckListItem.server_seq) > since,
         )
-        results = await self.session.exec(statement=query)
-        return list(results.all())
 
     async def list_multiple_checklist_items_old(
         self,
@@ -0,0 +1,349 @@
+"""Per-checklist item counters (``CheckListItemCounter``) and their repair job.
+
+The grid's item previews (``GET /api/item``) and the bulk item operations report
+each card's live, checked and unchecked item counts. Counting them means joining
+``checklist_item`` to ``checklist_item_state`` under the ``deleted_at IS NULL``
+filter for every card on every grid load. Instead each card keeps a counter row,
+adjusted by the commit that changes what it counts:
+
+* an item created or tombstoned (or un-tombstoned): ``item_count``, and
+  ``checked_count`` if it is checked;
+* an item's state created, deleted or (un)checked: ``checked_count``, if the
+  item is live.
+
+This covers every ORM write path (``CheckListItemCRUD`` creates and tombstones,
+``CheckListItemStateCRUD`` updates, ``delete_checked_items`` and
+``uncheck_all_items``) without each of them having to remember it. Before a
+flush, the items whose liveness or state it changes are locked and their
+liveness and state are read from the database; after it they are read again in
+one statement. The differences are summed per card and applied on commit with
+one upsert that adds them to the stored counts, so concurrent commits on the
+same card both land.
+
+Both reads come from the rows, not from the in-memory attribute history: two
+requests checking the same item from stale reads would both see an unchecked
+"before" there and both count it. The lock makes the second flush wait for the
+first commit and then read the item as checked. SQLite has no row locks, but by
+then the flush's ``server_seq`` reservation (a ``before_flush`` hook registered
+ahead of this one) has taken its database write lock.
+
+``repair_item_counters`` recomputes every counter from the item rows and fixes
+and reports any that drifted anyway (a write that bypassed the ORM). Each
+server process runs it every ``DB_ITEM_COUNTER_REPAIR_INTERVAL_MINUTES``; runs
+are idempotent.
+
+Writes that bypass the ORM (the tombstone GC's bulk deletes) only remove rows
+the counters no longer count: tombstoned items, or a whole card together with
+its counter row.
+"""
+
+import asyncio
+import dataclasses
+import uuid
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, event, func, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.log import get_logger
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_counter import CheckListItemCounter
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+
+log = get_logger()
+config = Config()
+
+ITEM_COUNTER_DELTAS_KEY = "checkcheck_item_counter_deltas"
+# The items the running flush changes, and what they counted before it.
+_ITEM_COUNTER_BEFORE_KEY = "checkcheck_item_counter_before"
+
+
+def _touched_item_ids(session: Session) -> Set[uuid.UUID]:
+    """The items whose liveness or state the coming flush changes."""
+    item_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, CheckListItem):
+            item_ids.add(obj.id)
+        elif isinstance(obj, CheckListItemState):
+            item_ids.add(obj.checklist_item_id)
+    for obj in session.dirty:
+        if isinstance(obj, CheckListItem):
+            if inspect(obj).attrs.deleted_at.history.has_changes():
+                item_ids.add(obj.id)
+        elif isinstance(obj, CheckListItemState):
+            if inspect(obj).attrs.checked.history.has_changes():
+                item_ids.add(obj.checklist_item_id)
+    return item_ids
+
+
+def _counted_state(
+    session: Session, item_ids: Set[uuid.UUID]
+) -> Dict[uuid.UUID, Tuple[uuid.UUID, bool, bool]]:
+    """Item id -> (card id, live, checked) as stored, for the items that exist."""
+    rows = session.connection().execute(
+        select(
+            CheckListItem.id,
+            CheckListItem.checklist_id,
+            col(CheckListItem.deleted_at).is_(None),
+            func.coalesce(CheckListItemState.checked, False),
+        )
+        .outerjoin(
+            CheckListItemState,
+            CheckListItemState.checklist_item_id == CheckListItem.id,
+        )
+        .where(col(CheckListItem.id).in_(item_ids))
+    )
+    return {
+        item_id: (cl_id, bool(live), bool(checked))
+        for item_id, cl_id, live, checked in rows
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _read_item_counts_before_flush(session: Session, flush_context, instances):
+    # Never carry the state of a flush that failed into the next one.
+    session.info.pop(_ITEM_COUNTER_BEFORE_KEY, None)
+    item_ids = _touched_item_ids(session)
+    if not item_ids:
+        return
+    # Lock the items (in id order, so concurrent flushes do not deadlock) before
+    # reading them: a concurrent flush of the same item then commits first, and
+    # the read sees its result. A statement of its own, so the read takes a
+    # snapshot after the locks are granted. SQLite ignores FOR UPDATE.
+    session.connection().execute(
+        select(CheckListItem.id)
+        .where(col(CheckListItem.id).in_(item_ids))
+        .order_by(CheckListItem.id)
+        .with_for_update()
+    )
+    session.info[_ITEM_COUNTER_BEFORE_KEY] = (
+        item_ids,
+        _counted_state(session, item_ids),
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_item_counter_deltas(session: Session, flush_context):
+    pending = session.info.pop(_ITEM_COUNTER_BEFORE_KEY, None)
+    if pending is None:
+        return
+    item_ids, before = pending
+    after = _counted_state(session, item_ids)
+
+    deltas: Dict[uuid.UUID, list] = session.info.setdefault(
+        ITEM_COUNTER_DELTAS_KEY, {}
+    )
+    # An item missing on one side did not exist then: neither live nor checked.
+    for item_id in item_ids:
+        old, new = before.get(item_id), after.get(item_id)
+        if old is None and new is None:
+            continue
+        cl_id, live, checked = new or (old[0], False, False)
+        _, was_live, was_checked = old or (cl_id, False, False)
+        total_delta = int(live) - int(was_live)
+        checked_delta = int(live and checked) - int(was_live and was_checked)
+        if total_delta or checked_delta:
+            delta = deltas.setdefault(cl_id, [0, 0])
+            delta[0] += total_delta
+            delta[1] += checked_delta
+
+
+def _insert():
+    if config.db_backend == DbBackend.POSTGRES:
+        return postgresql.insert
+    return sqlite.insert
+
+
+def _apply_item_counter_deltas(session: Session):
+    deltas = session.info.pop(ITEM_COUNTER_DELTAS_KEY, None)
+    if not deltas:
+        return
+    rows = [
+        {"checklist_id": cl_id, "item_count": total, "checked_count": checked}
+        # Sorted, so concurrent commits lock the rows in the same order.
+        for cl_id, (total, checked) in sorted(deltas.items())
+        if total or checked
+    ]
+    if not rows:
+        return
+    statement = _insert()(CheckListItemCounter).values(rows)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["checklist_id"],
+            set_={
+                "item_count": CheckListItemCounter.item_count
+                + statement.excluded.item_count,
+                "checked_count": CheckListItemCounter.checked_count
+                + statement.excluded.checked_count,
+            },
+        )
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_item_counter_deltas_on_commit(session: Session):
+    # Flush first: the deltas are only collected on flush.
+    session.flush()
+    _apply_item_counter_deltas(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_item_counter_deltas_on_rollback(session: Session, previous_transaction):
+    session.info.pop(ITEM_COUNTER_DELTAS_KEY, None)
+    session.info.pop(_ITEM_COUNTER_BEFORE_KEY, None)
+
+
+def _live_count(checked_only: bool = False):
+    """Scalar subquery counting the live items of the counter row's card."""
+    query = (
+        select(func.count())
+        .select_from(CheckListItem)
+        .where(CheckListItem.checklist_id == CheckListItemCounter.checklist_id)
+        .where(col(CheckListItem.deleted_at).is_(None))
+    )
+    if checked_only:
+        query = query.join(
+            CheckListItemState,
+            CheckListItemState.checklist_item_id == CheckListItem.id,
+        ).where(CheckListItemState.checked == True)  # noqa: E712
+    return query.scalar_subquery()
+
+
+@dataclasses.dataclass
+class ItemCounterRepairReport:
+    # Checklists whose counters were compared.
+    checklists: int = 0
+    # Checklists whose counters were off, with the (item_count, checked_count)
+    # they were off by (stored minus recomputed). Repaired by the run.
+    drift: Dict[uuid.UUID, Tuple[int, int]] = dataclasses.field(
+        default_factory=dict
+    )
+    # Counter rows left behind by a deleted checklist, removed by the run.
+    orphans: int = 0
+
+
+async def repair_item_counters(session: AsyncSession) -> ItemCounterRepairReport:
+    """Recompute every checklist's counters from its item rows; fix and report
+    the ones that drifted."""
+    checked = CheckListItemState.checked
+    actual = (
+        select(
+            CheckListItem.checklist_id,
+            func.count().label("item_count"),
+            func.sum(case((checked == True, 1), else_=0)).label(  # noqa: E712
+                "checked_count"
+            ),
+        )
+        .outerjoin(
+            CheckListItemState,
+            CheckListItemState.checklist_item_id == CheckListItem.id,
+        )
+        .where(col(CheckListItem.deleted_at).is_(None))
+        .group_by(CheckListItem.checklist_id)
+        .subquery()
+    )
+    # Stored and recomputed counts from one statement, so from one snapshot.
+    result = await session.execute(
+        select(
+            CheckList.id,
+            func.coalesce(CheckListItemCounter.item_count, 0),
+            func.coalesce(CheckListItemCounter.checked_count, 0),
+            func.coalesce(actual.c.item_count, 0),
+            func.coalesce(actual.c.checked_count, 0),
+        )
+        .select_from(CheckList)
+        .outerjoin(
+            CheckListItemCounter,
+            CheckListItemCounter.checklist_id == CheckList.id,
+        )
+        .outerjoin(actual, actual.c.checklist_id == CheckList.id)
+    )
+    report = ItemCounterRepairReport()
+    for cl_id, stored_total, stored_checked, total, checked_total in result:
+        report.checklists += 1
+        if (stored_total, stored_checked) != (total, checked_total):
+            report.drift[cl_id] = (
+                stored_total - total,
+                stored_checked - checked_total,
+            )
+
+    if report.drift:
+        drifted = sorted(report.drift)
+        # Take the rows' locks first (creating missing rows), then recount in a
+        # statement of its own: its snapshot then includes every commit that
+        # held a lock, so a concurrent delta is neither lost nor counted twice.
+        statement = _insert()(CheckListItemCounter).values(
+            [{"checklist_id": cl_id} for cl_id in drifted]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["checklist_id"],
+                set_={"item_count": CheckListItemCounter.item_count},
+            )
+        )
+        await session.execute(
+            update(CheckListItemCounter)
+            .where(col(CheckListItemCounter.checklist_id).in_(drifted))
+            .values(item_count=_live_count(), checked_count=_live_count(True))
+        )
+    # SQLite does not enforce the ``ON DELETE CASCADE``.
+    orphans = await session.execute(
+        delete(CheckListItemCounter).where(
+            col(CheckListItemCounter.checklist_id).not_in(select(CheckList.id))
+        )
+    )
+    report.orphans = orphans.rowcount
+    await session.commit()
+    return report
+
+
+async def run_item_counter_repair() -> ItemCounterRepairReport:
+    """One repair pass in a session of its own; logs any drift it fixed."""
+    # Not at module level: ``db/_session.py`` imports this module to register
+    # its hooks.
+    from checkcheckserver.db._session import get_async_session_context
+
+    async with get_async_session_context() as session:
+        report = await repair_item_counters(session)
+    if report.drift:
+        log.warning(
+            f"Item counters of {len(report.drift)} of {report.checklists} "
+            f"checklists had drifted and were repaired: {report.drift}"
+        )
+    if report.orphans:
+        log.info(f"Removed {report.orphans} item counters of deleted checklists")
+    return report
+
+
+_repair_task: Optional["asyncio.Task[None]"] = None
+
+
+async def _item_counter_repair_loop():
+    interval = config.DB_ITEM_COUNTER_REPAIR_INTERVAL_MINUTES * 60
+    while True:
+        try:
+            await run_item_counter_repair()
+        except Exception:
+            log.exception("Item counter repair run failed")
+        await asyncio.sleep(interval)
+
+
+def start_item_counter_repair():
+    """Start the periodic job unless disabled (an interval of 0). Registered as
+    an app startup callback."""
+    global _repair_task
+    if config.DB_ITEM_COUNTER_REPAIR_INTERVAL_MINUTES <= 0:
+        return
+    _repair_task = asyncio.create_task(_item_counter_repair_loop())
+
+
+def stop_item_counter_repair():
+    global _repair_task
+    if _repair_task is not None:
+        _repair_task.cancel()
+        _repair_task = None
@@ -112,7 +112,18 @@ class CheckListItemStateCRUD(
 
     async def uncheck_all_items(self, checklist_id: uuid.UUID) -> int:
         """Bulk "untick all": flip every checked, live item of this checklist to
-        unchecked in a single transaction.
+        unchecked in a single transaction. Returns the number of rows flipped.
+        """
+        affected = await self.stage_uncheck_all_items(checklist_id)
+        if affected:
+            # One commit for the whole batch: a single transaction, and the
+            # server_seq allocator lock is held once.
+            await self.session.commit()
+        return affected
+
+    async def stage_uncheck_all_items(self, checklist_id: uuid.UUID) -> int:
+        """``uncheck_all_items`` WITHOUT committing, so the caller can enqueue
+        the sync event (which depends on the count) into the same commit.
 
         MUST mutate ORM objects in a loop (not a Core ``UPDATE ... SET``): the
         global ``server_seq`` cursor is stamped by the ``before_update`` mapper
@@ -140,10 +151,6 @@ class CheckListItemStateCRUD(
         for state in states:
             state.checked = False
             self.session.add(state)
-        if states:
-            # One commit for the whole batch: a single transaction, and the
-            # server_seq allocator lock is held once.
-            await self.session.commit()
         return len(states)
 
     async def get(
@@ -32,6 +32,7 @@ from checkcheckserver.model.checklist_position import (
     CheckListPositionUpdate,
 )
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.sync_watermark import mark_access_lost
 from checkcheckserver.model._base_model import naive_utc_now
 from checkcheckserver.api.paginator import QueryParamsInterface
 from checkcheckserver.model.checklist_collaborator import CheckListCollaborator
@@ -86,10 +87,41 @@ class CheckListPositionCRUD(
         if archived is not None:
             query = query.where(CheckListPosition.archived == archived)
         if pagination:
-            query = pagination.append_to_query(query)
+            query = pagination.append_keyset_to_query(
+                query,
+                self._sort_keys(pagination),
+                descending=bool(pagination.order_desc),
+            )
         results = await self.session.exec(statement=query)
         return results.unique().all()
 
+    @staticmethod
+    def _sort_keys(pagination: QueryParamsInterface) -> Tuple:
+        """The listing's keyset: the ``order_by`` attribute, then the primary key
+        so rows sharing a value keep one order and a ``page`` token can seek
+        past them. A row-value comparison never matches NULL, so unset flags and
+        sequence numbers sort as their zero value."""
+        column = CheckListPosition.__table__.c[pagination.order_by or "index"]
+        if column.nullable:
+            column = func.coalesce(column, column.type.python_type())
+        return (
+            column,
+            col(CheckListPosition.checklist_id),
+            col(CheckListPosition.user_id),
+        )
+
+    @staticmethod
+    def sort_key_values(
+        pagination: QueryParamsInterface, position: CheckListPosition
+    ) -> Tuple:
+        """``position``'s values of the listing's keyset (see ``_sort_keys``), to
+        build the ``next_page`` token from a page's last row."""
+        order_by = pagination.order_by or "index"
+        value = getattr(position, order_by)
+        if value is None:
+            value = CheckListPosition.__table__.c[order_by].type.python_type()
+        return (value, position.checklist_id, position.user_id)
+
     async def count(
         self,
         filter_checklist_id: Optional[uuid.UUID] = None,
@@ -143,38 +175,23 @@ class CheckListPositionCRUD(
         LWW-wise this is a no-op for other devices. Returns False when the caller
         has no position row (should not happen for owner/accepted collaborator).
         """
-        existing = await self.get(checklist_id=checklist_id, user_id=user_id)
-        if existing is None:
+        if not await self.stage_touch(checklist_id=checklist_id, user_id=user_id):
             return False
-        existing.updated_at = naive_utc_now()
-        self.session.add(existing)
         await self.session.commit()
         return True
 
-    async def list_gained_access_checklist_ids(
+    async def stage_touch(
         self,
+        checklist_id: uuid.UUID,
         user_id: uuid.UUID,
-        since: int,
-    ) -> List[uuid.UUID]:
-        """Checklist ids where THIS user's position row was *created* after
-        ``since`` — i.e. access was granted since the client's cursor (WI-4 /
-        Phase 1+2 review finding 1).
-
-        A position row exists for exactly the users who can see the card, and every
-        grant path inserts it at grant time (create, instant share, invite accept,
-        public-link join, ownership transfer), so keying gain off ``granted_seq``
-        covers all of them uniformly — including ownership transfer to a
-        non-collaborator, which leaves no fresh accepted-collaborator seq. The
-        whole card tree predates the grant, so the delta feed ships it in full for
-        these cards. ``granted_seq`` is stamped once on insert and never bumped, so
-        a later reorder/pin/touch of the same position is not mistaken for a grant.
-        """
-        query = select(CheckListPosition.checklist_id).where(
-            CheckListPosition.user_id == user_id,
-            col(CheckListPosition.granted_seq) > since,
-        )
-        results = await self.session.exec(statement=query)
-        return list(results.all())
+    ) -> bool:
+        """``touch`` WITHOUT committing."""
+        existing = await self.get(checklist_id=checklist_id, user_id=user_id)
+        if existing is None:
+            return False
+        existing.updated_at = naive_utc_now()
+        self.session.add(existing)
+        return True
 
     async def get_next(
         self, checklist_id: uuid.UUID, user_id: uuid.UUID
@@ -274,15 +291,31 @@ class CheckListPositionCRUD(
         checklist_id: uuid.UUID,
         user_id: Optional[uuid.UUID] = None,
     ):
+        await self.stage_delete(checklist_id=checklist_id, user_id=user_id)
+        await self.session.commit()
+        return
+
+    async def stage_delete(
+        self,
+        checklist_id: uuid.UUID,
+        user_id: Optional[uuid.UUID] = None,
+    ):
+        """``delete`` WITHOUT committing."""
         del_statement = delete(CheckListPosition).where(
             CheckListPosition.checklist_id == checklist_id
         )
+        lost_query = select(CheckListPosition.user_id).where(
+            CheckListPosition.checklist_id == checklist_id
+        )
         if user_id is not None:
             del_statement = del_statement.where(CheckListPosition.user_id == user_id)
-
+            lost_query = lost_query.where(CheckListPosition.user_id == user_id)
+        # A position row exists for exactly the users who can see the card, so
+        # deleting one is an access loss for the delta feed (its watermark and
+        # the access log).
+        lost_user_ids = (await self.session.exec(lost_query)).all()
+        mark_access_lost(self.session, checklist_id, lost_user_ids)
         await self.session.exec(del_statement)
-        await self.session.commit()
-        return
 
     async def get_first(self, user_id: uuid.UUID) -> CheckListPosition | None:
         current_lowest_index_query = (
@@ -14,6 +14,7 @@ from sqlmodel import select, delete, update, and_, or_, col
 from checkcheckserver.config import Config
 from checkcheckserver.log import get_logger
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.sync_audience import mark_audience_changed
 from checkcheckserver.model.checklist_public_share import (
     CheckListPublicShare,
     CheckListPublicShareCreate,
@@ -109,9 +110,18 @@ class CheckListPublicShareCRUD(
         return result.rowcount > 0
 
     async def delete_for_checklist(self, checklist_id: uuid.UUID) -> None:
+        mark_audience_changed(self.session, checklist_id)
         await self.session.exec(
             delete(CheckListPublicShare).where(
                 CheckListPublicShare.checklist_id == checklist_id
             )
         )
         await self.session.commit()
+
+    async def delete(self, id_: uuid.UUID, raise_exception_if_not_exists=None):
+        # The base delete is a Core DELETE, which the audience cache does not
+        # see on flush — so record the change explicitly.
+        link = await self.get(id_, raise_exception_if_not_exists)
+        if link is not None:
+            mark_audience_changed(self.session, link.checklist_id)
+            await super().delete(id_, raise_exception_if_not_exists)
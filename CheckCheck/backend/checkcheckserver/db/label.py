@@ -16,6 +16,7 @@ from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import Field, select, delete, Column, JSON, SQLModel, func, col, desc
 from sqlalchemy.orm import selectinload
+from sqlmodel.sql import expression as sqlEpression
 
 import uuid
 from uuid import UUID
@@ -30,6 +31,7 @@ from checkcheckserver.model.checklist_color_scheme import (
 from checkcheckserver.model.label import Label, LabelUpdate, LabelCreate
 
 from checkcheckserver.db._base_crud import create_crud_base
+from checkcheckserver.db.sync_seq import FEED_KIND_LABEL, FeedKey, after_feed_key
 from checkcheckserver.api.paginator import QueryParamsInterface
 
 
@@ -62,37 +64,64 @@ class LabelCRUD(
         objs = results.all()
         return objs
 
+    @staticmethod
+    def changed_ids_query(user_id: uuid.UUID, since: int) -> sqlEpression.Select:
+        """Ids of live labels owned by the caller that changed after ``since``
+        (WI-4)."""
+        return select(Label.id).where(
+            Label.owner_id == user_id,
+            col(Label.deleted_at).is_(None),
+            col(Label.server_seq) > since,
+        )
+
     async def list_changed(
         self,
         user_id: uuid.UUID,
         since: int,
     ) -> List[Label]:
-        """Live labels owned by the caller that changed after ``since`` (WI-4)."""
+        """The labels of ``changed_ids_query``."""
         query = (
             select(Label)
-            .where(
-                Label.owner_id == user_id,
-                col(Label.deleted_at).is_(None),
-                col(Label.server_seq) > since,
-            )
+            .where(col(Label.id).in_(self.changed_ids_query(user_id, since)))
             .options(selectinload(Label.color))
         )
         results = await self.session.exec(statement=query)
         return list(results.all())
 
-    async def list_tombstoned_ids(
+    async def list_changed_page(
         self,
         user_id: uuid.UUID,
         since: int,
-    ) -> List[uuid.UUID]:
+        after: Optional[FeedKey],
+        limit: int,
+    ) -> List[Tuple[int, Label]]:
+        """One page of ``list_changed`` for the paged delta feed: up to ``limit``
+        ``(seq, label)`` pairs after ``after``, in feed order (see
+        ``db/sync_seq.py``)."""
+        seq = col(Label.server_seq)
+        query = (
+            select(Label)
+            .where(
+                Label.owner_id == user_id,
+                col(Label.deleted_at).is_(None),
+                seq > since,
+                after_feed_key(seq, Label.id, FEED_KIND_LABEL, after),
+            )
+            .order_by(seq, Label.id)
+            .limit(limit)
+            .options(selectinload(Label.color))
+        )
+        results = await self.session.exec(statement=query)
+        return [(label.server_seq, label) for label in results.all()]
+
+    @staticmethod
+    def tombstoned_ids_query(user_id: uuid.UUID, since: int) -> sqlEpression.Select:
         """Ids of the caller's labels tombstoned after ``since`` (WI-4)."""
-        query = select(Label.id).where(
+        return select(Label.id).where(
             Label.owner_id == user_id,
             col(Label.deleted_at).is_not(None),
             col(Label.server_seq) > since,
         )
-        results = await self.session.exec(statement=query)
-        return list(results.all())
 
     async def get_max_sort_order(
         self,
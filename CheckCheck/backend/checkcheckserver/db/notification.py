@@ -9,12 +9,13 @@ the existing SSE so a connected client refreshes its feed/badge live.
 
 import datetime
 import uuid
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence, Tuple
 
 from sqlmodel import select, update, and_, col, func
 
 from checkcheckserver.config import Config
 from checkcheckserver.log import get_logger
+from checkcheckserver.db._keyset import append_seek_to_query
 from checkcheckserver.db._base_crud import create_crud_base
 from checkcheckserver.db.sync_notification import SyncNotifiationCRUD
 from checkcheckserver.model.sync_notifications import SyncNotification
@@ -28,6 +29,9 @@ from checkcheckserver.model.notification import (
 log = get_logger()
 config = Config()
 
+# The feed's order, newest first; the id breaks ties between equal timestamps.
+NOTIFICATION_SORT_KEYS = (col(Notification.created_at), col(Notification.id))
+
 
 def _utcnow() -> datetime.datetime:
     # Naive UTC to match the timestamps stored on the model (see TimestampedModel).
@@ -48,15 +52,20 @@ class NotificationCRUD(
         user_id: uuid.UUID,
         unread_only: bool = False,
         limit: int = 100,
-    ) -> List[Notification]:
-        """The user's feed, newest first, bounded. ``unread_only`` keeps only the
-        rows that have not been marked read."""
+        after: Optional[Sequence[Any]] = None,
+    ) -> Tuple[List[Notification], bool]:
+        """The user's feed, newest first, bounded, and whether there is more of
+        it. ``unread_only`` keeps only the rows that have not been marked read;
+        ``after`` (the ``NOTIFICATION_SORT_KEYS`` of the previous page's last
+        row) continues after that row."""
         query = select(Notification).where(Notification.user_id == user_id)
         if unread_only:
             query = query.where(col(Notification.read_at).is_(None))
-        query = query.order_by(col(Notification.created_at).desc()).limit(limit)
-        results = await self.session.exec(query)
-        return list(results.all())
+        # One row past the page tells whether any rows are left.
+        query = append_seek_to_query(query, NOTIFICATION_SORT_KEYS, after=after)
+        results = await self.session.exec(query.limit(limit + 1))
+        notifications = list(results.all())
+        return notifications[:limit], len(notifications) > limit
 
     async def unread_count(self, user_id: uuid.UUID) -> int:
         query = (
@@ -118,8 +127,11 @@ async def emit_notification(
     notification refers to a card and the SSE envelope (``SyncNotification.cl_id``)
     is non-nullable; the push is pinned to ``user_id`` so only the recipient's
     connected clients refresh.
+
+    Stages the row and enqueues the push; the caller commits, usually together
+    with the share that triggered it.
     """
-    noti = await notification_crud.create(
+    noti = notification_crud.stage_create(
         NotificationCreate(
             user_id=user_id,
             type=type,
@@ -0,0 +1,323 @@
+"""The grid's card search (``GET /api/checklist?search=``) and its indexes.
+
+A card matches when its name, its note or the text of one of its live items
+contains the needle, case-insensitively (``ILIKE '%needle%'``; ``%`` and ``_`` in
+the needle are wildcards). That used to be answered by scanning: a correlated
+EXISTS over each accessible card's items, once for the page and once for its
+count. No btree serves a leading wildcard, so every keystroke in the search box
+read all of the caller's items.
+
+A ``SearchEngine`` turns the needle into a condition on ``CheckList`` rows.
+``CheckListCRUD`` ANDs it with the caller's access and the other grid filters in
+the same statement, so cards the caller cannot see are never matched, listed or
+counted. The engine follows the database backend:
+
+* Postgres (``TrigramSearchEngine``): the same ILIKE, served by GIN trigram
+  indexes on ``checklist.name``, ``checklist.text`` and the live rows of
+  ``checklist_item.text`` (``model/_base_model.py::trigram_index``). The item
+  match is one ``IN`` over the index instead of a probe per card. Postgres keeps
+  the indexes current itself.
+* SQLite (``Fts5SearchEngine``): ``checklist_search``, an FTS5 table with the
+  trigram tokenizer holding one document per card (name and note) and one per
+  live item. FTS5 answers ``LIKE`` from its index for needles of three or more
+  characters; shorter ones scan the table. The documents are kept by this
+  module's flush and commit hooks, which see every ORM write, and built from the
+  rows when ``create_all`` finds the table missing (a database from before it).
+* ``ScanSearchEngine``: the unindexed query, for SQLite builds without FTS5.
+
+Matches keep the grid's order (pinned, then position), not a relevance rank:
+the grid's keyset pagination seeks on that order.
+
+Writes that bypass the ORM only remove rows: the tombstone GC's bulk deletes
+drop the documents of the cards they remove (``forget_search_documents``); a
+tombstoned item's document is already gone. ``rebuild_search_index`` recreates
+every document from the rows.
+"""
+
+import abc
+import functools
+import sqlite3
+import uuid
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    Uuid,
+    delete,
+    event,
+    inspect,
+    insert,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import SQLModel, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.log import get_logger
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_item import CheckListItem
+
+log = get_logger()
+config = Config()
+
+SEARCH_DOCUMENTS_KEY = "checkcheck_search_documents"
+
+# Statements bind at most this many document keys each.
+_KEY_BATCH = 500
+# Rows read and written per statement by ``rebuild_search_index``.
+_REBUILD_BATCH = 5000
+
+# Not on ``SQLModel.metadata``: ``create_all`` cannot create a virtual table, see
+# ``_create_search_table``.
+checklist_search = Table(
+    "checklist_search",
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("body", Text),
+    Column("checklist_id", Uuid),
+)
+
+
+def _document_key(row_id: uuid.UUID) -> int:
+    """The FTS5 rowid of a card's or an item's document. FTS5 keys its rows by
+    integer; 63 bits of the row's random uuid make a collision negligible."""
+    return row_id.int >> 65
+
+
+def _card_body(checklist: CheckList) -> str:
+    return f"{checklist.name or ''}\n{checklist.text or ''}"
+
+
+class SearchEngine(abc.ABC):
+    name: str = ""
+
+    @abc.abstractmethod
+    def checklist_condition(self, search: str) -> ColumnElement[bool]:
+        """True for the ``CheckList`` rows whose name, note or a live item
+        contains ``search``."""
+
+
+class ScanSearchEngine(SearchEngine):
+    name = "scan"
+
+    def checklist_condition(self, search: str) -> ColumnElement[bool]:
+        needle = f"%{search}%"
+        item_match = (
+            select(CheckListItem.id)
+            .where(
+                CheckListItem.checklist_id == CheckList.id,
+                col(CheckListItem.deleted_at).is_(None),
+                col(CheckListItem.text).ilike(needle),
+            )
+            .exists()
+        )
+        return or_(
+            col(CheckList.name).ilike(needle),
+            col(CheckList.text).ilike(needle),
+            item_match,
+        )
+
+
+class TrigramSearchEngine(SearchEngine):
+    name = "trigram"
+
+    def checklist_condition(self, search: str) -> ColumnElement[bool]:
+        needle = f"%{search}%"
+        # Uncorrelated, so the planner reads the matching items off the trigram
+        # index once instead of probing each card's items.
+        matching_items = select(CheckListItem.checklist_id).where(
+            col(CheckListItem.deleted_at).is_(None),
+            col(CheckListItem.text).ilike(needle),
+        )
+        return or_(
+            col(CheckList.name).ilike(needle),
+            col(CheckList.text).ilike(needle),
+            col(CheckList.id).in_(matching_items),
+        )
+
+
+class Fts5SearchEngine(SearchEngine):
+    name = "fts5"
+
+    def checklist_condition(self, search: str) -> ColumnElement[bool]:
+        # LIKE, not ILIKE: FTS5 only serves a bare column, and SQLite's LIKE
+        # already ignores (ASCII) case, as ILIKE's lower() does.
+        matching_documents = select(checklist_search.c.checklist_id).where(
+            checklist_search.c.body.like(f"%{search}%")
+        )
+        return col(CheckList.id).in_(matching_documents)
+
+
+SCAN_SEARCH = ScanSearchEngine()
+TRIGRAM_SEARCH = TrigramSearchEngine()
+FTS5_SEARCH = Fts5SearchEngine()
+
+
+@functools.lru_cache(maxsize=None)
+def fts5_available() -> bool:
+    """Whether the SQLite library has FTS5 with the trigram tokenizer (3.34+)."""
+    try:
+        connection = sqlite3.connect(":memory:")
+        try:
+            connection.execute(
+                "CREATE VIRTUAL TABLE probe USING fts5(body, tokenize='trigram')"
+            )
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        log.warning("SQLite has no FTS5 trigram tokenizer; card search will scan")
+        return False
+    return True
+
+
+def get_search_engine() -> SearchEngine:
+    if config.db_backend == DbBackend.POSTGRES:
+        return TRIGRAM_SEARCH
+    if fts5_available():
+        return FTS5_SEARCH
+    return SCAN_SEARCH
+
+
+# ── FTS5 document upkeep (SQLite) ───────────────────────────────────────────
+
+
+def _changed(obj, *attributes: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attributes)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_search_documents(session: Session, flush_context):
+    if get_search_engine() is not FTS5_SEARCH:
+        return
+    # Document key -> (card id, body), or None to drop the document. A later
+    # flush of the same row in the transaction overrides an earlier one.
+    changed: Dict[int, Optional[Tuple[uuid.UUID, str]]] = {}
+    for obj in session.new:
+        if isinstance(obj, CheckList):
+            changed[_document_key(obj.id)] = (obj.id, _card_body(obj))
+        elif isinstance(obj, CheckListItem) and obj.deleted_at is None:
+            changed[_document_key(obj.id)] = (obj.checklist_id, obj.text or "")
+    for obj in session.dirty:
+        if isinstance(obj, CheckList) and _changed(obj, "name", "text"):
+            changed[_document_key(obj.id)] = (obj.id, _card_body(obj))
+        elif isinstance(obj, CheckListItem) and _changed(
+            obj, "text", "deleted_at", "checklist_id"
+        ):
+            changed[_document_key(obj.id)] = (
+                (obj.checklist_id, obj.text or "")
+                if obj.deleted_at is None
+                else None
+            )
+    for obj in session.deleted:
+        if isinstance(obj, (CheckList, CheckListItem)):
+            changed[_document_key(obj.id)] = None
+    if changed:
+        session.info.setdefault(SEARCH_DOCUMENTS_KEY, {}).update(changed)
+
+
+def _write_documents(
+    connection, documents: Dict[int, Optional[Tuple[uuid.UUID, str]]]
+) -> None:
+    keys = sorted(documents)
+    for start in range(0, len(keys), _KEY_BATCH):
+        connection.execute(
+            delete(checklist_search).where(
+                checklist_search.c.rowid.in_(keys[start : start + _KEY_BATCH])
+            )
+        )
+    rows = [
+        {"rowid": key, "checklist_id": document[0], "body": document[1]}
+        for key, document in documents.items()
+        if document is not None
+    ]
+    if rows:
+        connection.execute(insert(checklist_search), rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_search_documents_on_commit(session: Session):
+    if get_search_engine() is not FTS5_SEARCH:
+        return
+    # Flush first: the documents are only collected on flush.
+    session.flush()
+    documents = session.info.pop(SEARCH_DOCUMENTS_KEY, None)
+    if documents:
+        _write_documents(session.connection(), documents)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_search_documents_on_rollback(session: Session, previous_transaction):
+    session.info.pop(SEARCH_DOCUMENTS_KEY, None)
+
+
+def rebuild_search_index(connection) -> int:  # noqa: ANN001
+    """Replace every document with one built from the rows: each card and each
+    live item. Returns the number of documents. Runs on a sync connection."""
+    connection.execute(delete(checklist_search))
+    cards = select(CheckList.id, CheckList.name, CheckList.text)
+    items = select(
+        CheckListItem.id, CheckListItem.checklist_id, CheckListItem.text
+    ).where(col(CheckListItem.deleted_at).is_(None))
+    total = 0
+    for batch in connection.execute(cards).partitions(_REBUILD_BATCH):
+        rows = [
+            {
+                "rowid": _document_key(cl_id),
+                "checklist_id": cl_id,
+                "body": f"{name or ''}\n{note or ''}",
+            }
+            for cl_id, name, note in batch
+        ]
+        connection.execute(insert(checklist_search), rows)
+        total += len(rows)
+    for batch in connection.execute(items).partitions(_REBUILD_BATCH):
+        rows = [
+            {"rowid": _document_key(item_id), "checklist_id": cl_id, "body": body}
+            for item_id, cl_id, body in batch
+        ]
+        connection.execute(insert(checklist_search), rows)
+        total += len(rows)
+    return total
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _create_search_table(target, connection, **kw):
+    """Create ``checklist_search`` on SQLite if missing, and fill it from the
+    rows. ``create_all`` runs on every boot, so an existing database gets it on
+    its first boot with this module."""
+    if connection.dialect.name != "sqlite" or not fts5_available():
+        return
+    if inspect(connection).has_table(checklist_search.name):
+        return
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE {checklist_search.name} USING fts5("
+            "body, checklist_id UNINDEXED, tokenize='trigram')"
+        )
+    )
+    # Once per database; about two minutes for a million items.
+    log.info("Building the card search index")
+    documents = rebuild_search_index(connection)
+    log.info(f"Built the card search index: {documents} documents")
+
+
+async def forget_search_documents(session: AsyncSession, checklist_ids) -> int:
+    """Drop the documents of the cards ``checklist_ids`` (a select of ids) and
+    of their items, for deletes that bypass the ORM. Returns how many."""
+    if get_search_engine() is not FTS5_SEARCH:
+        return 0
+    result = await session.execute(
+        delete(checklist_search).where(
+            checklist_search.c.checklist_id.in_(checklist_ids)
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,47 @@
+"""Per-user log of lost card access for the delta feed.
+
+A revoked share is a hard delete, so it leaves nothing for the feed's change
+scans to find. Clients used to report every card they cache as ``known`` so the
+feed could diff it against current access — tens of kilobytes of query string on
+a large account, parsed and diffed on every pull. Instead every access loss
+appends a ``sync_access_log`` row stamped with a ``server_seq`` of its own, and
+the feed reads the caller's losses after their cursor from that log
+(``db/sync_feed.py``).
+
+A position row exists for exactly the users who can see a card, so
+``CheckListPositionCRUD.delete`` is the one place that records losses (via
+``mark_access_lost``): revoking a share, a group share or a group membership,
+and leaving a card all go through it. The rows are written by the watermark's
+``before_commit`` hook (``db/sync_watermark.py``), which allocates the seq.
+"""
+
+import uuid
+from typing import Iterable, Tuple
+
+from sqlalchemy import Select, insert
+from sqlalchemy.orm import Session
+from sqlmodel import col, select
+
+from checkcheckserver.model.sync_access_log import SyncAccessLog
+
+
+def record_access_losses(
+    session: Session, seq: int, losses: Iterable[Tuple[uuid.UUID, uuid.UUID]]
+):
+    """Append one row per ``(user_id, checklist_id)`` loss, stamped ``seq``."""
+    session.execute(
+        insert(SyncAccessLog),
+        [
+            {"user_id": user_id, "checklist_id": checklist_id, "server_seq": seq}
+            for user_id, checklist_id in losses
+        ],
+    )
+
+
+def lost_checklist_ids_query(user_id: uuid.UUID, since: int) -> Select:
+    """Cards ``user_id`` lost access to after ``since``, possibly repeated. A card
+    may since have been regained; the caller filters by current access."""
+    return select(SyncAccessLog.checklist_id).where(
+        SyncAccessLog.user_id == user_id,
+        col(SyncAccessLog.server_seq) > since,
+    )
@@ -0,0 +1,157 @@
+"""In-process cache of checklist audiences for sync notification routing.
+
+Every delivered sync event needs its checklist's audience: the owner, the
+accepted collaborators and the tokens of its active public links. Audiences
+change rarely compared to the edits fanned out to them, so each server process
+keeps them in a small LRU keyed by ``checklist_id``.
+
+Invalidation follows the writes that change an audience — the same
+collaborator, public-share and ownership writes that advance ``server_seq``:
+
+* ORM writes are picked up from the flush (``after_flush``); Core bulk
+  statements on those tables call ``mark_audience_changed`` themselves;
+* the affected checklists are dropped from the local cache when the
+  transaction commits, and (Postgres) broadcast to the other server processes
+  over the sync channel in the same transaction — see ``db/sync_outbox.py``;
+* a session never reads or fills the cache for a checklist whose audience it
+  has changed but not yet committed.
+
+Public tokens are cached with their ``expires_at`` and filtered at read time,
+so a link that expires while cached stops receiving events on time.
+"""
+
+import datetime
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from checkcheckserver.config import Config
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import CheckListCollaborator
+from checkcheckserver.model.checklist_public_share import CheckListPublicShare
+
+config = Config()
+
+AUDIENCE_CHANGES_KEY = "checkcheck_audience_changes"
+
+
+class CachedAudience(NamedTuple):
+    user_ids: Tuple[uuid.UUID, ...]
+    # (token, expires_at); expires_at is naive UTC like the column, None = never
+    tokens: Tuple[Tuple[str, Optional[datetime.datetime]], ...]
+
+    def active_tokens(self, now: datetime.datetime) -> List[str]:
+        return [
+            token
+            for token, expires_at in self.tokens
+            if expires_at is None or expires_at > now
+        ]
+
+
+class ChecklistAudienceCache:
+    """LRU of ``CachedAudience`` by checklist id. ``max_entries=0`` disables it.
+
+    ``generation`` is bumped by every invalidation. A loader reads it before
+    querying and hands it back to ``put``; a result loaded across an
+    invalidation is then discarded instead of caching a pre-change audience.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[uuid.UUID, CachedAudience]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, cl_id: uuid.UUID) -> Optional[CachedAudience]:
+        entry = self._entries.get(cl_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(cl_id)
+        self.hits += 1
+        return entry
+
+    def put(self, cl_id: uuid.UUID, audience: CachedAudience, generation: int):
+        if self.max_entries <= 0 or generation != self.generation:
+            return
+        self._entries[cl_id] = audience
+        self._entries.move_to_end(cl_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, cl_ids: Iterable[uuid.UUID]):
+        self.generation += 1
+        for cl_id in cl_ids:
+            if self._entries.pop(cl_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+audience_cache = ChecklistAudienceCache(config.SYNC_AUDIENCE_CACHE_SIZE)
+
+
+def mark_audience_changed(session, cl_id: uuid.UUID):
+    """Record that this transaction changes ``cl_id``'s audience. Only needed
+    for Core ``UPDATE``/``DELETE`` statements; ORM writes are detected on
+    flush."""
+    session.info.setdefault(AUDIENCE_CHANGES_KEY, set()).add(cl_id)
+
+
+def pending_audience_changes(session) -> Set[uuid.UUID]:
+    return session.info.get(AUDIENCE_CHANGES_KEY, set())
+
+
+def _audience_change_cl_id(obj, is_new_or_deleted: bool) -> Optional[uuid.UUID]:
+    if isinstance(obj, (CheckListCollaborator, CheckListPublicShare)):
+        return obj.checklist_id
+    if isinstance(obj, CheckList):
+        # Checklists are updated all the time (name, color, ...); only an
+        # ownership transfer changes who receives its events.
+        if is_new_or_deleted or inspect(obj).attrs.owner_id.history.has_changes():
+            return obj.id
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_audience_changes(session: Session, flush_context):
+    for objs, is_new_or_deleted in (
+        (session.new, True),
+        (session.deleted, True),
+        (session.dirty, False),
+    ):
+        for obj in objs:
+            cl_id = _audience_change_cl_id(obj, is_new_or_deleted)
+            if cl_id is not None:
+                mark_audience_changed(session, cl_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_audience_changes(session: Session):
+    changed = session.info.pop(AUDIENCE_CHANGES_KEY, None)
+    if changed:
+        audience_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_audience_changes_on_rollback(session: Session, previous_transaction):
+    session.info.pop(AUDIENCE_CHANGES_KEY, None)
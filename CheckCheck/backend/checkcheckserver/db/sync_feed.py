@@ -0,0 +1,145 @@
+"""What a delta-feed pull returns, resolved as ids in one statement.
+
+Before loading a row, ``GET /api/changes`` settles which cards the caller can
+see, which of those they gained or whose card-level state changed since the
+cursor, which cards, items and labels were tombstoned, and which cards the
+caller lost. These used to be one query each, in sequence, with the access
+predicate re-run by several of them and the accessible ids bound as parameters
+into the rest: a round trip per query. ``resolve_changes_scope`` reads them in a
+single ``UNION ALL`` over one ``access`` CTE (``CheckListCRUD.access_cte``).
+Each branch tags its rows with what they are. It also says whether any items or
+labels changed at all, so a pull skips the payload queries that would return
+nothing; the item queries join the same CTE instead of an id list.
+
+A card counts as gained when the caller's ``checklist_position`` row was created
+after the cursor (its ``granted_seq``). A position row exists for exactly the
+users who can see the card, and every grant path inserts it at grant time
+(create, instant share, invite accept, public-link join, ownership transfer), so
+this covers all of them, including ownership transfer to a non-collaborator,
+which leaves no fresh accepted-collaborator seq. ``granted_seq`` is stamped once
+on insert and never bumped, so a later reorder/pin/touch of the same position is
+not mistaken for a grant.
+"""
+
+import uuid
+from typing import List, NamedTuple, Set
+
+from sqlalchemy import Integer, cast, literal_column, null, union_all
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from checkcheckserver.db.checklist import CheckListCRUD
+from checkcheckserver.db.checklist_item import CheckListItemCRUD
+from checkcheckserver.db.label import LabelCRUD
+from checkcheckserver.db.sync_access_log import lost_checklist_ids_query
+from checkcheckserver.model.checklist import CheckList
+
+(
+    _ACCESSIBLE,
+    _CHANGED_CARD,
+    _CHECKLIST_TOMBSTONE,
+    _ITEM_TOMBSTONE,
+    _LABEL_TOMBSTONE,
+    _LOST,
+    _ITEMS_CHANGED,
+    _LABELS_CHANGED,
+) = range(8)
+
+
+class ChangesScope(NamedTuple):
+    # Cards the caller can currently see (owner + accepted collaborator).
+    accessible_ids: Set[uuid.UUID]
+    # Accessible cards gained since the cursor: the feed ships their whole tree.
+    gain_ids: Set[uuid.UUID]
+    # Accessible cards whose card-level state changed since the cursor.
+    changed_card_ids: Set[uuid.UUID]
+    checklist_tombstones: List[uuid.UUID]
+    item_tombstones: List[uuid.UUID]
+    label_tombstones: List[uuid.UUID]
+    # Cards lost since the cursor, per the access log; may since be regained.
+    lost_ids: List[uuid.UUID]
+    # Whether ``CheckListItemCRUD.changed_item_ids_query`` /
+    # ``LabelCRUD.changed_ids_query`` find anything; only resolved with
+    # ``payload_flags``.
+    has_items: bool
+    has_labels: bool
+
+
+def _tagged(query, kind: int, seq=None):
+    # Every branch yields ``(id, kind, seq)``; only the access rows carry a seq.
+    return query.add_columns(
+        literal_column(str(kind)),
+        seq if seq is not None else cast(null(), Integer),
+    )
+
+
+def _flag(query, kind: int):
+    # A single id-less row if ``query`` finds anything.
+    return select(
+        cast(null(), col(CheckList.id).type),
+        literal_column(str(kind)),
+        cast(null(), Integer),
+    ).where(query.exists())
+
+
+async def resolve_changes_scope(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    since: int,
+    payload_flags: bool = True,
+) -> ChangesScope:
+    """Resolve a pull from ``since`` for ``user_id`` in one round trip. A
+    bootstrap (``since=0``) caches nothing, so reads no access losses."""
+    checklist_crud = CheckListCRUD(session)
+    access = checklist_crud.access_cte(user_id)
+    branches = [
+        _tagged(select(access.c.id), _ACCESSIBLE, access.c.granted_seq),
+        _tagged(
+            checklist_crud.changed_checklist_ids_query(user_id, since, access),
+            _CHANGED_CARD,
+        ),
+        _tagged(
+            checklist_crud.tombstoned_checklist_ids_query(user_id, since),
+            _CHECKLIST_TOMBSTONE,
+        ),
+        _tagged(
+            CheckListItemCRUD.tombstoned_item_ids_query(since, access),
+            _ITEM_TOMBSTONE,
+        ),
+        _tagged(LabelCRUD.tombstoned_ids_query(user_id, since), _LABEL_TOMBSTONE),
+    ]
+    if since > 0:
+        branches.append(_tagged(lost_checklist_ids_query(user_id, since), _LOST))
+    if payload_flags:
+        branches.append(
+            _flag(
+                CheckListItemCRUD.changed_item_ids_query(since, access),
+                _ITEMS_CHANGED,
+            )
+        )
+        branches.append(
+            _flag(LabelCRUD.changed_ids_query(user_id, since), _LABELS_CHANGED)
+        )
+
+    ids = {kind: [] for kind in range(_ITEMS_CHANGED)}
+    gain_ids = set()
+    flags = set()
+    result = await session.execute(union_all(*branches))
+    for row_id, kind, seq in result.all():
+        if kind >= _ITEMS_CHANGED:
+            flags.add(kind)
+            continue
+        ids[kind].append(row_id)
+        if kind == _ACCESSIBLE and seq is not None and seq > since:
+            gain_ids.add(row_id)
+    return ChangesScope(
+        accessible_ids=set(ids[_ACCESSIBLE]),
+        gain_ids=gain_ids,
+        changed_card_ids=set(ids[_CHANGED_CARD]),
+        checklist_tombstones=ids[_CHECKLIST_TOMBSTONE],
+        item_tombstones=ids[_ITEM_TOMBSTONE],
+        label_tombstones=ids[_LABEL_TOMBSTONE],
+        lost_ids=list(dict.fromkeys(ids[_LOST])),
+        has_items=_ITEMS_CHANGED in flags,
+        has_labels=_LABELS_CHANGED in flags,
+    )
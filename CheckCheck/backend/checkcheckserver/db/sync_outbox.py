@@ -0,0 +1,365 @@
+"""Request-scoped outbox for sync notifications.
+
+``SyncNotifiationCRUD.create`` does no database work itself: it appends the
+event to an outbox stored on the ``Session`` (``session.info``). The outbox is
+delivered by a ``before_commit`` hook, so it always travels inside the
+transaction of the data write:
+
+* routes enqueue their events before the commit of their (last) write, so the
+  write and its notifications land (or roll back) together in one round trip,
+  and the poke's ``server_seq`` covers every row the request stamped;
+* rolling back discards every pending event, so nothing is announced for a
+  write that did not land;
+* an event still pending when the request's session closes was enqueued after
+  the request's last commit. Delivering it would take a transaction of its
+  own, so it is dropped and the session raises instead (see
+  ``db/_session.py``): the route has to enqueue ahead of its commit.
+
+Delivery resolves each checklist's audience once for the whole batch (from the
+audience cache, or three queries for the misses, whatever the number of
+events), emits one ``changes_available`` poke per distinct recipient set
+instead of one per event, and sends every payload in a single ``pg_notify``
+statement (Postgres) or a single flush of ``sync_notification`` rows (SQLite).
+
+On Postgres the same commit also broadcasts the checklists whose audience it
+changed, so every server process drops them from its audience cache.
+
+Postgres rejects ``NOTIFY`` payloads of 8000 bytes or more. Events go out in a
+compact envelope (short keys, empty fields left out), which fits a few hundred
+recipients inline. An event whose recipient list does not fit (a card shared
+with a large group) is stored in ``sync_notification`` instead, committed with
+the same transaction, and only its row id is sent. Listeners load it back (see
+``decode_pg_payload``). These rows are kept for ``_PG_SPILL_RETENTION_SECONDS``.
+
+Lives below the CRUD layer (it is imported by ``db/_session.py``), so it only
+depends on the models, the config and ``db/sync_audience.py``.
+"""
+
+import datetime
+import json
+import time
+import uuid
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, event, text, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlmodel import and_, col, delete, or_, select
+
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.model._base_model import _allocated_server_seq
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.checklist_public_share import CheckListPublicShare
+from checkcheckserver.model.sync_notifications import SyncNotification
+from checkcheckserver.db.sync_audience import (
+    CachedAudience,
+    audience_cache,
+    pending_audience_changes,
+)
+
+config = Config()
+
+SYNC_OUTBOX_KEY = "checkcheck_sync_outbox"
+
+PG_SYNC_CHANNEL = "checkcheck_sync"
+
+# upd_props that get no ``changes_available`` poke: personal bell events are not
+# board data returned by the delta feed, and a poke must not poke itself.
+_NO_POKE_UPD_PROPS = ("changes_available", "notification")
+
+_AUDIENCE_IDS_PER_PAYLOAD = 100
+
+# Postgres refuses NOTIFY payloads of this many bytes or more.
+_PG_NOTIFY_PAYLOAD_LIMIT = 8000
+# How long a spilled event row stays readable for the listeners.
+_PG_SPILL_RETENTION_SECONDS = 300
+
+
+class PendingSyncNotification(NamedTuple):
+    noti: SyncNotification
+    # Explicit recipients (see ``SyncNotifiationCRUD.create``); None = resolve
+    # from the checklist's live audience at delivery time.
+    target_user_ids: Optional[List[uuid.UUID]]
+    target_tokens: Optional[List[str]]
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_sync_notification(
+    session,
+    noti: SyncNotification,
+    target_user_ids: Optional[List[uuid.UUID]] = None,
+    target_tokens: Optional[List[str]] = None,
+):
+    """Stage ``noti`` for delivery with the session's next commit."""
+    session.info.setdefault(SYNC_OUTBOX_KEY, []).append(
+        PendingSyncNotification(
+            noti,
+            list(target_user_ids) if target_user_ids is not None else None,
+            list(target_tokens) if target_tokens is not None else None,
+        )
+    )
+
+
+def take_pending_sync_notifications(session) -> List[PendingSyncNotification]:
+    """Remove and return the events no commit has delivered yet."""
+    return session.info.pop(SYNC_OUTBOX_KEY, None) or []
+
+
+# ── Audience resolution ───────────────────────────────────────────────────────
+
+
+def owner_ids_query(cl_ids: Sequence[uuid.UUID]):
+    return select(CheckList.id, CheckList.owner_id).where(col(CheckList.id).in_(cl_ids))
+
+
+def accepted_collaborator_ids_query(cl_ids: Sequence[uuid.UUID]):
+    # A pending/declined invitee is not a live viewer yet, so it is not fanned
+    # out ordinary edits (the invite notification itself is pinned to the
+    # invitee at the call site — see upsert_share).
+    return select(
+        CheckListCollaborator.checklist_id, CheckListCollaborator.user_id
+    ).where(
+        and_(
+            col(CheckListCollaborator.checklist_id).in_(cl_ids),
+            CheckListCollaborator.status == ShareStatus.accepted.value,
+        )
+    )
+
+
+def enabled_public_tokens_query(cl_ids: Sequence[uuid.UUID]):
+    """Tokens and expiry of the enabled, not yet expired public links.
+    Connected anonymous SSE clients are addressed by token; the expiry is kept
+    so a cached audience can drop a link the moment it expires."""
+    now = _utcnow()
+    return select(
+        CheckListPublicShare.checklist_id,
+        CheckListPublicShare.token,
+        CheckListPublicShare.expires_at,
+    ).where(
+        and_(
+            col(CheckListPublicShare.checklist_id).in_(cl_ids),
+            CheckListPublicShare.enabled == True,  # noqa: E712
+            or_(
+                col(CheckListPublicShare.expires_at).is_(None),
+                CheckListPublicShare.expires_at > now,
+            ),
+        )
+    )
+
+
+def _load_audiences(
+    session: Session, cl_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, CachedAudience]:
+    user_ids: Dict[uuid.UUID, List[uuid.UUID]] = {cl_id: [] for cl_id in cl_ids}
+    tokens: Dict[uuid.UUID, list] = {cl_id: [] for cl_id in cl_ids}
+    for cl_id, user_id in session.execute(accepted_collaborator_ids_query(cl_ids)):
+        user_ids[cl_id].append(user_id)
+    for cl_id, owner_id in session.execute(owner_ids_query(cl_ids)):
+        if owner_id is not None:
+            user_ids[cl_id].append(owner_id)
+    for cl_id, token, expires_at in session.execute(
+        enabled_public_tokens_query(cl_ids)
+    ):
+        tokens[cl_id].append((token, expires_at))
+    return {
+        cl_id: CachedAudience(tuple(user_ids[cl_id]), tuple(tokens[cl_id]))
+        for cl_id in cl_ids
+    }
+
+
+def resolve_audiences(
+    session: Session, cl_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, Tuple[List[uuid.UUID], List[str]]]:
+    """``{cl_id: (user_ids, tokens)}`` for every checklist, served from the
+    process-wide audience cache where possible (see ``db/sync_audience.py``);
+    the misses are loaded in one pass of three queries.
+
+    Takes a sync ``Session``; from an ``AsyncSession`` call it through
+    ``run_sync``."""
+    now = _utcnow()
+    # Audiences this transaction changed are read live and not cached: nobody
+    # else may see them before the commit.
+    uncommitted = pending_audience_changes(session)
+    audiences: Dict[uuid.UUID, Tuple[List[uuid.UUID], List[str]]] = {}
+    misses = []
+    for cl_id in cl_ids:
+        cached = None if cl_id in uncommitted else audience_cache.get(cl_id)
+        if cached is None:
+            misses.append(cl_id)
+        else:
+            audiences[cl_id] = (list(cached.user_ids), cached.active_tokens(now))
+    if misses:
+        generation = audience_cache.generation
+        for cl_id, audience in _load_audiences(session, misses).items():
+            audiences[cl_id] = (list(audience.user_ids), audience.active_tokens(now))
+            if cl_id not in uncommitted:
+                audience_cache.put(cl_id, audience, generation)
+    return audiences
+
+
+# ── Delivery ──────────────────────────────────────────────────────────────────
+
+
+def _collect_events(
+    session: Session, pending: List[PendingSyncNotification]
+) -> List[SyncNotification]:
+    dynamic_cl_ids = list(
+        {
+            p.noti.cl_id
+            for p in pending
+            if p.target_user_ids is None or p.target_tokens is None
+        }
+    )
+    audiences = resolve_audiences(session, dynamic_cl_ids)
+
+    events: List[SyncNotification] = []
+    seen = set()
+    # recipient set -> checklist id of the last event addressed to it
+    poke_cl_ids: Dict[Tuple[frozenset, frozenset], uuid.UUID] = {}
+    for p in pending:
+        user_ids, tokens = audiences.get(p.noti.cl_id, ([], []))
+        if p.target_user_ids is not None:
+            user_ids = p.target_user_ids
+        if p.target_tokens is not None:
+            tokens = p.target_tokens
+        user_id_strs = [str(uid) for uid in user_ids]
+        if not user_id_strs and not tokens:
+            continue  # nobody to tell
+        recipients = (frozenset(user_id_strs), frozenset(tokens))
+        dedup_key = (p.noti.cl_id, p.noti.cli_id, p.noti.upd_prop, recipients)
+        if dedup_key not in seen:
+            seen.add(dedup_key)
+            p.noti.target_user_ids = user_id_strs
+            p.noti.target_tokens = list(tokens)
+            events.append(p.noti)
+        if p.noti.upd_prop not in _NO_POKE_UPD_PROPS:
+            poke_cl_ids.pop(recipients, None)
+            poke_cl_ids[recipients] = p.noti.cl_id
+
+    if poke_cl_ids:
+        server_seq = _allocated_server_seq(session.connection())
+        for (user_id_strs, tokens), cl_id in poke_cl_ids.items():
+            events.append(
+                SyncNotification(
+                    cl_id=cl_id,
+                    upd_prop="changes_available",
+                    server_seq=server_seq,
+                    target_user_ids=sorted(user_id_strs),
+                    target_tokens=sorted(tokens),
+                )
+            )
+    return events
+
+
+def _pg_payload(noti: SyncNotification) -> str:
+    envelope = {"ts": noti.timestamp, "cl": str(noti.cl_id), "p": noti.upd_prop}
+    if noti.cli_id:
+        envelope["cli"] = str(noti.cli_id)
+    if noti.server_seq is not None:
+        envelope["seq"] = noti.server_seq
+    if noti.target_user_ids:
+        envelope["u"] = noti.target_user_ids
+    if noti.target_tokens:
+        envelope["k"] = noti.target_tokens
+    return json.dumps(envelope, separators=(",", ":"))
+
+
+def decode_pg_payload(data: dict) -> Optional[SyncNotification]:
+    """The event carried by a parsed ``_pg_payload`` envelope, with its
+    targets. ``None`` for a spilled event: load ``sync_notification`` row
+    ``data["ref"]`` instead."""
+    if "ref" in data:
+        return None
+    return SyncNotification(
+        timestamp=data["ts"],
+        cl_id=uuid.UUID(data["cl"]),
+        cli_id=uuid.UUID(data["cli"]) if data.get("cli") else None,
+        upd_prop=data["p"],
+        server_seq=data.get("seq"),
+        target_user_ids=data.get("u", []),
+        target_tokens=data.get("k", []),
+    )
+
+
+def _pg_event_payloads(session: Session, events: List[SyncNotification]) -> List[str]:
+    payloads = []
+    spilled = []
+    for noti in events:
+        payload = _pg_payload(noti)
+        if len(payload.encode()) < _PG_NOTIFY_PAYLOAD_LIMIT:
+            payloads.append(payload)
+        else:
+            session.add(noti)
+            spilled.append(noti)
+            payloads.append(None)
+    if spilled:
+        # Spills are rare, so this is where the expired ones are cleaned up.
+        session.execute(
+            delete(SyncNotification).where(
+                SyncNotification.timestamp < time.time() - _PG_SPILL_RETENTION_SECONDS
+            )
+        )
+        session.flush()  # assigns the row ids
+        refs = iter(spilled)
+        payloads = [
+            p if p is not None else json.dumps({"ref": next(refs).id})
+            for p in payloads
+        ]
+    return payloads
+
+
+def _pg_audience_change_payloads(session: Session) -> List[str]:
+    # Tells every server process (this one included) to drop the cached
+    # audiences this transaction changed. Chunked to stay well below the
+    # 8000-byte NOTIFY payload limit.
+    cl_ids = sorted(str(cl_id) for cl_id in pending_audience_changes(session))
+    return [
+        json.dumps({"audience_changed": cl_ids[i : i + _AUDIENCE_IDS_PER_PAYLOAD]})
+        for i in range(0, len(cl_ids), _AUDIENCE_IDS_PER_PAYLOAD)
+    ]
+
+
+@event.listens_for(Session, "before_commit")
+def _deliver_sync_outbox_on_commit(session: Session):
+    pending = session.info.pop(SYNC_OUTBOX_KEY, None)
+    is_postgres = config.db_backend == DbBackend.POSTGRES
+    if not pending and not is_postgres:
+        return
+    # Flush first: the poke must carry a server_seq at least as high as the rows
+    # this transaction stamps, or a client could skip the pull that fetches them;
+    # and audience changes are only collected on flush.
+    session.flush()
+    events = _collect_events(session, pending) if pending else []
+
+    if is_postgres:
+        payloads = _pg_audience_change_payloads(session)
+        payloads.extend(_pg_event_payloads(session, events))
+        if payloads:
+            # One round trip for the whole batch. NOTIFY is transactional:
+            # Postgres delivers the payloads, in array order, only when this
+            # transaction commits.
+            session.execute(
+                text(
+                    "SELECT pg_notify(:channel, payload) "
+                    "FROM unnest(:payloads) AS payload"
+                ).bindparams(bindparam("payloads", type_=ARRAY(Text))),
+                {"channel": PG_SYNC_CHANNEL, "payloads": payloads},
+            )
+    elif events:
+        # SQLite: rows for the drain loop, flushed by the commit in progress.
+        # Targets are always stored resolved, so the drain never has to re-read
+        # rows the same request may have deleted since. SQLite runs a single
+        # server process, so the local cache invalidation on commit suffices.
+        session.add_all(events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_sync_outbox_on_rollback(session: Session, previous_transaction):
+    session.info.pop(SYNC_OUTBOX_KEY, None)
@@ -2,18 +2,90 @@
 
 The write side (allocation + the ``sync_seq`` table itself) lives in
 ``model/_base_model.py`` so it can sit next to the mapper stamping events. This
-module only exposes the current high-water mark, which the delta feed uses as the
-``next_cursor`` it hands back to clients.
+module exposes the visible high-water mark, which the delta feed uses as the
+``next_cursor`` it hands back to clients, and the ordering the feed pages in.
 """
 
-from sqlalchemy import text
+import time
+from typing import NamedTuple, Optional
+import uuid
+
+from sqlalchemy import func, true
+from sqlmodel import and_, col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from checkcheckserver.model._base_model import SYNC_SEQ_ROW_ID
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.model._base_model import (
+    SYNC_SEQ_ROW_ID,
+    SyncSequence,
+    uses_sequence_allocator,
+)
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.checklist_label import CheckListLabel
+from checkcheckserver.model.checklist_position import CheckListPosition
+
+config = Config()
+
+
+def visible_server_seq():
+    """SQL expression (over the ``sync_seq`` row) for the highest ``server_seq``
+    at or below which every row is committed: the counter's value, or with the
+    sequence allocator ``sync_server_seq_visible()`` (see
+    ``model/_base_model.py``)."""
+    if uses_sequence_allocator():
+        return func.sync_server_seq_visible()
+    return SyncSequence.value
+
+
+# With the sequence allocator the visible seq is read from ``pg_locks``, which
+# takes every lock-manager partition lock. Pulls in one process share a reading
+# this young. It can only trail the true value, which is never unsafe: a cursor
+# from it holds back, it never skips. A commit in this process that raised a
+# watermark drops the reading (``forget_visible_server_seq``), so a write shows in
+# the next pull; one committed by another process may take this long.
+VISIBLE_SEQ_CACHE_SECONDS = 0.1
+
+_visible_seq: Optional[int] = None
+_visible_seq_read_at = 0.0
+# Bumped by every forget, so a reading taken before one is not stored after it.
+_visible_seq_generation = 0
+
+
+async def get_visible_server_seq(session: AsyncSession, at_least: int = 0) -> int:
+    """``sync_server_seq_visible()``, read at most once per
+    ``VISIBLE_SEQ_CACHE_SECONDS``. A reading below ``at_least`` (a cursor another
+    process handed out) is refreshed, so it never makes a cursor look ahead of
+    the server. Sequence allocator only."""
+    global _visible_seq, _visible_seq_read_at
+    now = time.monotonic()
+    if (
+        _visible_seq is not None
+        and _visible_seq >= at_least
+        and now - _visible_seq_read_at < VISIBLE_SEQ_CACHE_SECONDS
+    ):
+        return _visible_seq
+    # Pulls arriving together may each read it once; that is all.
+    generation = _visible_seq_generation
+    value = (
+        await session.execute(select(func.sync_server_seq_visible()))
+    ).scalar_one()
+    if generation == _visible_seq_generation:
+        _visible_seq, _visible_seq_read_at = value, now
+    return value
+
+
+def forget_visible_server_seq():
+    global _visible_seq, _visible_seq_generation
+    _visible_seq = None
+    _visible_seq_generation += 1
 
 
 async def get_current_server_seq(session: AsyncSession) -> int:
-    """Highest ``server_seq`` handed out and committed so far.
+    """Highest ``server_seq`` at or below which every row is committed.
 
     Read *before* the delta feed runs its entity queries so the returned
     ``next_cursor`` can never sit above a row the same pull failed to include:
@@ -21,7 +93,77 @@ async def get_current_server_seq(session: AsyncSession) -> int:
     the next pull (harmless, LWW is idempotent), never skipped.
     """
     result = await session.execute(
-        text("SELECT value FROM sync_seq WHERE id = :row_id"),
-        {"row_id": SYNC_SEQ_ROW_ID},
+        select(visible_server_seq()).where(SyncSequence.id == SYNC_SEQ_ROW_ID)
     )
     return result.scalar_one()
+
+
+# ── Paging order of the delta feed ───────────────────────────────────────────
+#
+# A paged pull (``GET /api/changes?limit=``) walks the rows it returns in one
+# order across entity kinds: ``(seq, kind, id)``. ``seq`` is the highest
+# ``server_seq`` among the rows that make up the entity as the feed ships it, so
+# an edit moves the entity behind every page handed out before it and paging
+# never skips it. With the sequence allocator a seq can also commit after the
+# walk passed it, which the last page covers by handing out the cursor the walk
+# started from (``routes_changes._compute_changes_page``).
+
+FEED_KIND_CHECKLIST = 0
+FEED_KIND_ITEM = 1
+FEED_KIND_LABEL = 2
+
+
+class FeedKey(NamedTuple):
+    """A row's place in the delta feed's paging order."""
+
+    seq: int
+    kind: int
+    id: uuid.UUID
+
+
+def greatest_seq(*seqs):
+    """The highest of several ``server_seq`` expressions, a missing one (NULL)
+    counting as 0."""
+    greatest = func.greatest if config.db_backend == DbBackend.POSTGRES else func.max
+    return greatest(*(func.coalesce(seq, 0) for seq in seqs))
+
+
+def card_seq(user_id: uuid.UUID):
+    """``seq`` of a card as ``user_id`` sees it, correlated to ``CheckList``: the
+    card row, the caller's position, label links and accepted collaborator row
+    (the card-level state of ``CheckListCRUD.changed_checklist_ids_query``). The
+    caller's position is stamped when access is granted, so a card gained after
+    a cursor always sorts above it."""
+    position_seq = select(CheckListPosition.server_seq).where(
+        CheckListPosition.checklist_id == CheckList.id,
+        CheckListPosition.user_id == user_id,
+    )
+    label_seq = select(func.max(CheckListLabel.server_seq)).where(
+        CheckListLabel.checklist_id == CheckList.id,
+        CheckListLabel.user_id == user_id,
+    )
+    collaborator_seq = select(CheckListCollaborator.server_seq).where(
+        CheckListCollaborator.checklist_id == CheckList.id,
+        CheckListCollaborator.user_id == user_id,
+        CheckListCollaborator.status == ShareStatus.accepted.value,
+    )
+    # Correlated to the card only: the enclosing query may join the caller's
+    # position (or the other tables) itself.
+    return greatest_seq(
+        CheckList.server_seq,
+        *(
+            subquery.correlate(CheckList).scalar_subquery()
+            for subquery in (position_seq, label_seq, collaborator_seq)
+        ),
+    )
+
+
+def after_feed_key(seq, id_column, kind: int, after: Optional[FeedKey]):
+    """Rows of ``kind`` that sort after ``after`` (keyset condition)."""
+    if after is None:
+        return true()
+    if kind < after.kind:
+        return seq > after.seq
+    if kind > after.kind:
+        return seq >= after.seq
+    return or_(seq > after.seq, and_(seq == after.seq, col(id_column) > after.id))
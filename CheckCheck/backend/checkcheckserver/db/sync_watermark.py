@@ -0,0 +1,274 @@
+"""Per-user "last relevant ``server_seq``" watermark for the delta feed.
+
+Most ``GET /api/changes`` pulls return nothing: a ``changes_available`` poke for
+a shared board reaches everyone on it, and devices also pull on reconnect and
+on focus. The feed's change scans would still run in full. Instead every commit
+that stamps a syncable row bumps the ``sync_user_watermark`` row of each user
+whose feed that row can show up in. A pull whose cursor is at or above the
+caller's watermark is answered with an empty delta after one primary-key lookup
+(see ``routes_changes.get_changes``).
+
+Whose feed a row shows up in:
+
+* ``checklist`` / ``checklist_item`` (and an item's state / position): the
+  card's owner and accepted collaborators, read live in the committing
+  transaction;
+* a user's own ``checklist_position``, ``checklist_label`` or
+  ``checklist_collaborator`` row, and a ``label``: that user;
+* a lost access (the user's position row deleted, see
+  ``CheckListPositionCRUD.delete``): that user, at a freshly allocated seq. A hard
+  delete stamps nothing, so without the new seq the loss could sit at or below
+  the user's cursor and never reach their ``removed_checklist_ids``. The same
+  seq stamps the loss's ``sync_access_log`` row (``db/sync_access_log.py``).
+
+The watermark is bumped in the same transaction as the rows it covers, and the
+feed reads it after the global high-water mark, so a write the pull does not see
+has a seq above the ``next_cursor`` the pull hands back. A bump after commit, in
+a transaction of its own, would leave a window in which a pull sees the rows but
+not the bump and skips them for good. The upsert locks the audience's rows in
+user id order instead, so concurrent bumps cannot deadlock on each other.
+Audiences are read live rather than from the audience cache, whose entries other
+server processes invalidate asynchronously.
+"""
+
+import uuid
+from typing import Iterable, NamedTuple, Optional, Set
+
+from sqlalchemy import event, func, literal, true, union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlmodel import and_, col, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.db.sync_access_log import record_access_losses
+from checkcheckserver.db.sync_seq import (
+    forget_visible_server_seq,
+    get_visible_server_seq,
+    visible_server_seq,
+)
+from checkcheckserver.model._base_model import (
+    SYNC_SEQ_ROW_ID,
+    SyncSequence,
+    TimestampedModel,
+    _allocate_server_seq,
+    _allocated_server_seq,
+    uses_sequence_allocator,
+)
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.checklist_label import CheckListLabel
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.label import Label
+from checkcheckserver.model.sync_watermark import SyncUserWatermark
+from checkcheckserver.model.user import User
+
+config = Config()
+
+WATERMARK_CHECKLISTS_KEY = "checkcheck_watermark_checklists"
+WATERMARK_ITEMS_KEY = "checkcheck_watermark_items"
+WATERMARK_USERS_KEY = "checkcheck_watermark_users"
+ACCESS_LOST_KEY = "checkcheck_access_lost"
+WATERMARKS_BUMPED_KEY = "checkcheck_watermarks_bumped"
+
+_KEYS = (
+    WATERMARK_CHECKLISTS_KEY,
+    WATERMARK_ITEMS_KEY,
+    WATERMARK_USERS_KEY,
+    ACCESS_LOST_KEY,
+    WATERMARKS_BUMPED_KEY,
+)
+
+
+def mark_access_lost(
+    session, checklist_id: uuid.UUID, user_ids: Iterable[uuid.UUID]
+):
+    """Record that this transaction takes ``checklist_id`` away from
+    ``user_ids``."""
+    session.info.setdefault(ACCESS_LOST_KEY, set()).update(
+        (user_id, checklist_id) for user_id in user_ids
+    )
+
+
+def _collect(session: Session, obj):
+    if not isinstance(obj, TimestampedModel):
+        return
+    info = session.info
+    if isinstance(obj, CheckList):
+        info.setdefault(WATERMARK_CHECKLISTS_KEY, set()).add(obj.id)
+    elif isinstance(obj, CheckListItem):
+        info.setdefault(WATERMARK_CHECKLISTS_KEY, set()).add(obj.checklist_id)
+    elif isinstance(obj, (CheckListItemState, CheckListItemPosition)):
+        info.setdefault(WATERMARK_ITEMS_KEY, set()).add(obj.checklist_item_id)
+    elif isinstance(obj, (CheckListPosition, CheckListLabel, CheckListCollaborator)):
+        info.setdefault(WATERMARK_USERS_KEY, set()).add(obj.user_id)
+    elif isinstance(obj, Label):
+        info.setdefault(WATERMARK_USERS_KEY, set()).add(obj.owner_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_watermark_targets(session: Session, flush_context):
+    for objs in (session.new, session.dirty, session.deleted):
+        for obj in objs:
+            _collect(session, obj)
+
+
+def _audience_select(
+    seq: int,
+    cl_ids: Set[uuid.UUID],
+    item_ids: Set[uuid.UUID],
+    user_ids: Set[uuid.UUID],
+):
+    # UNION (not UNION ALL) keeps each user once, which the Postgres upsert
+    # requires. Its order is undefined, so the rows are upserted by user id: two
+    # transactions bumping overlapping audiences then lock their watermark rows in
+    # the same order and cannot deadlock on them. The outer WHERE is for SQLite,
+    # which needs one before ON CONFLICT in an INSERT ... SELECT.
+    selects = []
+    if cl_ids or item_ids:
+
+        def touched(cl_id_column):
+            conditions = []
+            if cl_ids:
+                conditions.append(cl_id_column.in_(cl_ids))
+            if item_ids:
+                conditions.append(
+                    cl_id_column.in_(
+                        select(CheckListItem.checklist_id).where(
+                            col(CheckListItem.id).in_(item_ids)
+                        )
+                    )
+                )
+            return or_(*conditions)
+
+        selects.append(
+            select(col(CheckList.owner_id), literal(seq)).where(
+                touched(col(CheckList.id))
+            )
+        )
+        selects.append(
+            select(col(CheckListCollaborator.user_id), literal(seq)).where(
+                and_(
+                    touched(col(CheckListCollaborator.checklist_id)),
+                    CheckListCollaborator.status == ShareStatus.accepted.value,
+                )
+            )
+        )
+    if user_ids:
+        selects.append(
+            select(col(User.id), literal(seq)).where(col(User.id).in_(user_ids))
+        )
+    audience = (union(*selects) if len(selects) > 1 else selects[0]).subquery()
+    user_id, server_seq = audience.c
+    return select(user_id, server_seq).where(true()).order_by(user_id)
+
+
+def _bump_watermarks(session: Session):
+    info = session.info
+    cl_ids = info.pop(WATERMARK_CHECKLISTS_KEY, set())
+    item_ids = info.pop(WATERMARK_ITEMS_KEY, set())
+    user_ids = info.pop(WATERMARK_USERS_KEY, set())
+    lost = info.pop(ACCESS_LOST_KEY, set())
+    if not (cl_ids or item_ids or user_ids or lost):
+        return
+    info[WATERMARKS_BUMPED_KEY] = True
+    if lost:
+        # The flush may have stamped nothing at all: a lost access needs a seq
+        # of its own, above every cursor handed out before it.
+        seq = _allocate_server_seq(session.connection())
+        record_access_losses(session, seq, lost)
+    else:
+        seq = _allocated_server_seq(session.connection())
+
+    is_postgres = config.db_backend == DbBackend.POSTGRES
+    insert = postgresql.insert if is_postgres else sqlite.insert
+    greatest = func.greatest if is_postgres else func.max
+    statement = insert(SyncUserWatermark).from_select(
+        ["user_id", "server_seq"],
+        _audience_select(
+            seq, cl_ids, item_ids, user_ids | {user_id for user_id, _ in lost}
+        ),
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            # Never lower a watermark: a transaction that stamped nothing reads
+            # the committed high-water mark, which may trail one just bumped by a
+            # transaction still holding the counter lock.
+            set_={
+                "server_seq": greatest(
+                    SyncUserWatermark.server_seq, statement.excluded.server_seq
+                )
+            },
+        )
+    )
+
+
+# Inserted first, ahead of the sync outbox's ``before_commit``: a seq allocated
+# for a lost access must be in place before the outbox reads the high-water mark
+# its ``changes_available`` pokes carry.
+@event.listens_for(Session, "before_commit", insert=True)
+def _bump_watermarks_on_commit(session: Session):
+    # Flush first: the targets are only collected on flush.
+    session.flush()
+    _bump_watermarks(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_visible_seq_on_commit(session: Session):
+    # The caller's next pull must see what this transaction just committed.
+    if session.info.pop(WATERMARKS_BUMPED_KEY, False):
+        forget_visible_server_seq()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_watermark_targets_on_rollback(session: Session, previous_transaction):
+    for key in _KEYS:
+        session.info.pop(key, None)
+
+
+class SyncCursorState(NamedTuple):
+    """Where a pull stands. The visible high-water mark is read first (with the
+    sequence allocator, from the per-process cache in ``db/sync_seq.py``), the
+    rest in one statement after it: the mark can only trail the watermark, which
+    at worst re-delivers rows on the next pull, never skips them."""
+
+    # The global visible high-water mark (see ``db/sync_seq.py``).
+    server_seq: int
+    # Oldest cursor the feed can answer exactly (``SyncSequence.min_cursor``).
+    min_cursor: int
+    # The caller's watermark; ``None`` if nothing relevant to them was committed
+    # since the table was introduced.
+    watermark: Optional[int]
+
+
+async def get_sync_cursor_state(
+    session: AsyncSession, user_id: uuid.UUID, since: int = 0
+) -> SyncCursorState:
+    """``since`` is the caller's cursor: a cached high-water mark below it is
+    read again rather than taken for a server reset."""
+    watermark = (
+        select(SyncUserWatermark.server_seq)
+        .where(SyncUserWatermark.user_id == user_id)
+        .scalar_subquery()
+    )
+    if not uses_sequence_allocator():
+        result = await session.execute(
+            select(visible_server_seq(), SyncSequence.min_cursor, watermark).where(
+                SyncSequence.id == SYNC_SEQ_ROW_ID
+            )
+        )
+        return SyncCursorState(*result.one())
+    server_seq = await get_visible_server_seq(session, at_least=since)
+    result = await session.execute(
+        select(SyncSequence.min_cursor, watermark).where(
+            SyncSequence.id == SYNC_SEQ_ROW_ID
+        )
+    )
+    return SyncCursorState(server_seq, *result.one())
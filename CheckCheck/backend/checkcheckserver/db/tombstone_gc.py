@@ -0,0 +1,250 @@
+"""Garbage collection of old tombstones (``SoftDeleteMixin``).
+
+A deleted checklist, item or label stays behind as a tombstone so a device that
+was offline learns about the delete from the delta feed. Kept forever, they make
+``checklist``, ``checklist_item`` and ``label`` grow without bound, and every
+feed scan and masked read pays for them. Tombstones older than
+``SYNC_TOMBSTONE_RETENTION_DAYS`` are therefore hard-deleted, together with the
+rows they mask: item state/position, and a card's items, positions, label links,
+shares, item counters, search documents and access-log rows.
+
+A cursor below the ``server_seq`` of a removed tombstone could miss that delete,
+so each run first raises ``sync_seq.min_cursor`` to the highest one it is about
+to remove. ``GET /api/changes`` answers cursors below it with ``full_resync``
+(see ``routes_changes._needs_full_resync``). The floor is committed before the
+deletes, so only a pull already past its floor check when the run starts can
+find a tombstone missing. Access-log rows at or below the floor are never read
+again and go too.
+
+Each server process runs the job every ``SYNC_TOMBSTONE_GC_INTERVAL_MINUTES``.
+Runs are idempotent, so processes racing each other only repeat work.
+"""
+
+import asyncio
+import dataclasses
+import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, literal_column, text, union_all, update
+from sqlmodel import col, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from checkcheckserver.config import Config, DbBackend
+from checkcheckserver.db._session import get_async_session_context
+from checkcheckserver.db.search import forget_search_documents
+from checkcheckserver.db.sync_seq import greatest_seq
+from checkcheckserver.log import get_logger
+from checkcheckserver.model._base_model import (
+    SYNC_SEQ_ROW_ID,
+    SyncSequence,
+    naive_utc_now,
+)
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import CheckListCollaborator
+from checkcheckserver.model.checklist_group_share import CheckListGroupShare
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_counter import CheckListItemCounter
+from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.checklist_label import CheckListLabel
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.checklist_public_share import CheckListPublicShare
+from checkcheckserver.model.label import Label
+from checkcheckserver.model.sync_access_log import SyncAccessLog
+
+log = get_logger()
+config = Config()
+
+
+@dataclasses.dataclass
+class TombstoneGcReport:
+    # Deleted rows per table; tables with none are left out.
+    rows: Dict[str, int] = dataclasses.field(default_factory=dict)
+    # Storage freed for reuse: the size of the deleted rows on Postgres (vacuum
+    # hands it back), the shrink of the database's used pages on SQLite.
+    reclaimed_bytes: int = 0
+    # ``sync_seq.min_cursor`` after the run.
+    min_cursor: int = 0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+async def _used_bytes(session: AsyncSession) -> int:
+    result = await session.execute(
+        text(
+            "SELECT (page_count - freelist_count) * page_size FROM "
+            "pragma_page_count(), pragma_freelist_count(), pragma_page_size()"
+        )
+    )
+    return result.scalar_one()
+
+
+async def _row_bytes(session: AsyncSession, table, condition) -> int:
+    row_size = func.pg_column_size(literal_column(f"{table.__tablename__}.*"))
+    result = await session.execute(
+        select(func.coalesce(func.sum(row_size), 0))
+        .select_from(table)
+        .where(condition)
+    )
+    return result.scalar_one()
+
+
+async def collect_tombstones(
+    session: AsyncSession, deleted_before: datetime.datetime
+) -> TombstoneGcReport:
+    """Hard-delete tombstones deleted before ``deleted_before`` and the rows
+    they mask, raising the cursor floor first."""
+    is_postgres = config.db_backend == DbBackend.POSTGRES
+    expired_checklists = select(CheckList.id).where(
+        col(CheckList.deleted_at) < deleted_before
+    )
+    # A card's items go with it, tombstoned or not.
+    expired_items = select(CheckListItem.id).where(
+        or_(
+            col(CheckListItem.deleted_at) < deleted_before,
+            col(CheckListItem.checklist_id).in_(expired_checklists),
+        )
+    )
+    expired_labels = select(Label.id).where(col(Label.deleted_at) < deleted_before)
+
+    removed_seqs = union_all(
+        select(CheckList.server_seq).where(
+            col(CheckList.id).in_(expired_checklists)
+        ),
+        select(CheckListItem.server_seq).where(
+            col(CheckListItem.id).in_(expired_items)
+        ),
+        select(Label.server_seq).where(col(Label.id).in_(expired_labels)),
+    ).subquery()
+    floor = (
+        await session.execute(select(func.max(removed_seqs.c.server_seq)))
+    ).scalar_one()
+    if floor is not None:
+        await session.execute(
+            update(SyncSequence)
+            .where(SyncSequence.id == SYNC_SEQ_ROW_ID)
+            .values(min_cursor=greatest_seq(SyncSequence.min_cursor, floor))
+        )
+        await session.commit()
+    min_cursor = (
+        await session.execute(
+            select(SyncSequence.min_cursor).where(SyncSequence.id == SYNC_SEQ_ROW_ID)
+        )
+    ).scalar_one()
+    report = TombstoneGcReport(min_cursor=min_cursor)
+
+    # Children first: SQLite does not enforce the ``ON DELETE CASCADE``s.
+    targets = [
+        (
+            CheckListItemState,
+            col(CheckListItemState.checklist_item_id).in_(expired_items),
+        ),
+        (
+            CheckListItemPosition,
+            col(CheckListItemPosition.checklist_item_id).in_(expired_items),
+        ),
+        (CheckListItem, col(CheckListItem.id).in_(expired_items)),
+        (
+            CheckListLabel,
+            or_(
+                col(CheckListLabel.checklist_id).in_(expired_checklists),
+                col(CheckListLabel.label_id).in_(expired_labels),
+            ),
+        ),
+        (
+            CheckListPosition,
+            col(CheckListPosition.checklist_id).in_(expired_checklists),
+        ),
+        (
+            CheckListItemCounter,
+            col(CheckListItemCounter.checklist_id).in_(expired_checklists),
+        ),
+        (
+            CheckListCollaborator,
+            col(CheckListCollaborator.checklist_id).in_(expired_checklists),
+        ),
+        (
+            CheckListGroupShare,
+            col(CheckListGroupShare.checklist_id).in_(expired_checklists),
+        ),
+        (
+            CheckListPublicShare,
+            col(CheckListPublicShare.checklist_id).in_(expired_checklists),
+        ),
+        (
+            SyncAccessLog,
+            or_(
+                col(SyncAccessLog.checklist_id).in_(expired_checklists),
+                col(SyncAccessLog.server_seq) <= min_cursor,
+            ),
+        ),
+        (CheckList, col(CheckList.id).in_(expired_checklists)),
+        (Label, col(Label.id).in_(expired_labels)),
+    ]
+    used_before = None if is_postgres else await _used_bytes(session)
+    # Before the cards go: the documents are found by card id.
+    forgotten = await forget_search_documents(session, expired_checklists)
+    if forgotten:
+        report.rows["checklist_search"] = forgotten
+    for table, condition in targets:
+        if is_postgres:
+            report.reclaimed_bytes += await _row_bytes(session, table, condition)
+        result = await session.execute(delete(table).where(condition))
+        if result.rowcount:
+            report.rows[table.__tablename__] = result.rowcount
+    await session.commit()
+    if not is_postgres:
+        report.reclaimed_bytes = max(used_before - await _used_bytes(session), 0)
+    return report
+
+
+async def run_tombstone_gc(
+    retention_days: Optional[int] = None,
+) -> TombstoneGcReport:
+    """One collection pass in a session of its own; logs what it reclaimed."""
+    if retention_days is None:
+        retention_days = config.SYNC_TOMBSTONE_RETENTION_DAYS
+    deleted_before = naive_utc_now() - datetime.timedelta(days=retention_days)
+    async with get_async_session_context() as session:
+        report = await collect_tombstones(session, deleted_before)
+    if report.rows:
+        log.info(
+            f"Tombstone GC removed {report.total_rows} rows ({report.rows}), "
+            f"reclaimed {report.reclaimed_bytes} bytes; oldest answerable cursor "
+            f"is now {report.min_cursor}"
+        )
+    return report
+
+
+_gc_task: Optional["asyncio.Task[None]"] = None
+
+
+async def _tombstone_gc_loop():
+    interval = config.SYNC_TOMBSTONE_GC_INTERVAL_MINUTES * 60
+    while True:
+        try:
+            await run_tombstone_gc()
+        except Exception:
+            log.exception("Tombstone GC run failed")
+        await asyncio.sleep(interval)
+
+
+def start_tombstone_gc():
+    """Start the periodic job unless disabled (a retention or an interval of
+    0). Registered as an app startup callback."""
+    global _gc_task
+    if (
+        config.SYNC_TOMBSTONE_RETENTION_DAYS <= 0
+        or config.SYNC_TOMBSTONE_GC_INTERVAL_MINUTES <= 0
+    ):
+        return
+    _gc_task = asyncio.create_task(_tombstone_gc_loop())
+
+
+def stop_tombstone_gc():
+    global _gc_task
+    if _gc_task is not None:
+        _gc_task.cancel()
+        _gc_task = None
@@ -2,5 +2,6 @@
 
 Nothing in this package is imported by the running server. It holds tools that
 are convenient during local development, most notably the random dev-data seeder
-(``seed_dev_data``) wired into the ``run_dev_backend_server_*.sh`` scripts.
+(``seed_dev_data``) wired into the ``run_dev_backend_server_*.sh`` scripts, and
+the ``bench_*`` micro-benchmarks for the sync hot paths.
 """
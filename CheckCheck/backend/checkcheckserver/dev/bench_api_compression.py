@@ -0,0 +1,146 @@
+"""Micro-benchmark: bytes on the wire and CPU cost of API response compression.
+
+``APICompressionMiddleware`` (``api/compression.py``) compresses every ``/api/*``
+JSON body from ``SERVER_COMPRESSION_MIN_SIZE`` on with the best coding the
+client accepts. This script builds delta-feed-like JSON bodies of increasing
+size (random ids and timestamps, like the real feed) and compresses each with
+every available coding at its configured level, through the same compressor
+objects the middleware uses. For each size and coding it reports the bytes
+sent, the share of the original that is, and the CPU time per response, so
+the threshold and the levels can be picked for the expected response sizes.
+
+Levels come from the ``SERVER_COMPRESSION_*_LEVEL`` settings; ``--level``
+overrides one per run::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_api_compression
+    python -m checkcheckserver.dev.bench_api_compression --level br=6 --level gzip=9
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_SIZES = [512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_api_compression",
+        description="Measure bytes on the wire and CPU cost per response size.",
+    )
+    p.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=DEFAULT_SIZES,
+        help="Comma-separated uncompressed body sizes in bytes.",
+    )
+    p.add_argument(
+        "--level",
+        action="append",
+        default=[],
+        metavar="CODING=LEVEL",
+        help="Override a coding's configured level, e.g. br=6. Repeatable.",
+    )
+    p.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.2,
+        help="Compress each body repeatedly for at least this much CPU time.",
+    )
+    return p.parse_args(argv)
+
+
+def _item(rng: random.Random, now: datetime.datetime) -> Dict:
+    updated = now - datetime.timedelta(seconds=rng.randrange(10_000_000))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "checklist_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "text": " ".join(
+            rng.choice(("milk", "eggs", "call Anna", "pay rent", "fix the bike"))
+            for _ in range(rng.randint(1, 4))
+        ),
+        "state": {"checked": rng.random() < 0.3},
+        "position": {"index": rng.random() * 1000, "indentation": rng.randint(0, 2)},
+        "server_seq": rng.randrange(1, 10_000_000),
+        "updated_at": updated.isoformat(),
+    }
+
+
+def _body(size: int) -> bytes:
+    """A JSON object of (at least) ``size`` bytes, shaped like a delta page."""
+    rng = random.Random(size)
+    now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    items: List[Dict] = []
+    length = 0
+    while length < size:
+        item = _item(rng, now)
+        items.append(item)
+        length += len(json.dumps(item)) + 2
+    return json.dumps({"next_cursor": 1, "items": items}).encode()
+
+
+def _measure(encoding: str, level: int, body: bytes, min_seconds: float):
+    from checkcheckserver.api.compression import make_compressor
+
+    runs = 0
+    start = time.process_time()
+    while True:
+        compressor = make_compressor(encoding, level)
+        sent = len(compressor.compress(body) + compressor.finish())
+        runs += 1
+        elapsed = time.process_time() - start
+        if elapsed >= min_seconds:
+            return sent, elapsed / runs
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    from checkcheckserver.api.compression import available_encodings
+    from checkcheckserver.config import Config
+
+    config = Config()
+    levels = {
+        "br": config.SERVER_COMPRESSION_BR_LEVEL,
+        "zstd": config.SERVER_COMPRESSION_ZSTD_LEVEL,
+        "gzip": config.SERVER_COMPRESSION_GZIP_LEVEL,
+    }
+    for override in args.level:
+        encoding, _, level = override.partition("=")
+        levels[encoding] = int(level)
+    encodings = available_encodings()
+
+    print(
+        "levels: "
+        + ", ".join(f"{encoding}={levels[encoding]}" for encoding in encodings)
+        + f"; threshold SERVER_COMPRESSION_MIN_SIZE="
+        f"{config.SERVER_COMPRESSION_MIN_SIZE} bytes\n"
+    )
+    print(
+        f"{'body bytes':>10} | {'coding':<6} | {'sent bytes':>10} | {'sent %':>6} | "
+        f"{'CPU ms':>8} | {'MB/s':>7}"
+    )
+    print(f"{'-' * 10}-+-{'-' * 6}-+-{'-' * 10}-+-{'-' * 6}-+-{'-' * 8}-+-{'-' * 7}")
+    for size in args.sizes:
+        body = _body(size)
+        for encoding in encodings:
+            sent, seconds = _measure(
+                encoding, levels[encoding], body, args.min_seconds
+            )
+            print(
+                f"{len(body):>10} | {encoding:<6} | {sent:>10} | "
+                f"{sent / len(body) * 100:>5.1f}% | {seconds * 1e3:>8.3f} | "
+                f"{len(body) / seconds / 1e6:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Micro-benchmark: statements and wall time per ``GET /api/changes`` pull.
+
+Every statement a pull runs is a round trip to the database, one after the
+other on the pull's session. The feed used to resolve its scope with a query
+per id set (accessible, gained and changed cards, three kinds of tombstones,
+access losses), re-running the access predicate or binding the accessible ids
+into each, and then ran every payload query whether or not it had anything to
+return. Now the scope is one ``UNION ALL`` over a shared access CTE
+(``db/sync_feed.py``), and only the payload queries it found rows for run.
+
+This script seeds one user with ``--cards`` cards of ``--items`` items each,
+then computes typical pulls the way the route does (``_compute_changes``,
+after the cursor read) and reports the statements each ran and its mean wall
+time. Round trips cost little on in-memory SQLite (the default); point
+``--db-url`` at a scratch Postgres database to see what they cost over a
+socket. The database is created from the models and must be empty::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_changes_roundtrips
+    python -m checkcheckserver.dev.bench_changes_roundtrips --cards 500 --items 50 \\
+        --db-url postgresql+asyncpg://user:pw@localhost/checkcheck_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_changes_roundtrips",
+        description="Count statements and time per delta-feed pull.",
+    )
+    p.add_argument("--cards", type=int, default=200, help="Cards of the user.")
+    p.add_argument("--items", type=int, default=20, help="Items per card.")
+    p.add_argument(
+        "--rounds", type=int, default=20, help="Pulls timed per scenario."
+    )
+    p.add_argument(
+        "--db-url",
+        default="sqlite+aiosqlite://",
+        help="Database to seed and pull from (default: in-memory SQLite).",
+    )
+    return p.parse_args(argv)
+
+
+async def _seed(session, cards: int, items: int) -> Tuple[uuid.UUID, list, list]:
+    from checkcheckserver.model.checklist import CheckList
+    from checkcheckserver.model.checklist_item import CheckListItem
+    from checkcheckserver.model.checklist_item_position import (
+        CheckListItemPosition,
+    )
+    from checkcheckserver.model.checklist_item_state import CheckListItemState
+    from checkcheckserver.model.checklist_label import CheckListLabel
+    from checkcheckserver.model.checklist_position import CheckListPosition
+    from checkcheckserver.model.label import Label
+    from checkcheckserver.model.user import User
+
+    user = User(user_name="bench-changes")
+    label = Label(owner_id=user.id, display_name="bench")
+    session.add_all([user, label])
+    await session.flush()
+    checklists, states = [], []
+    for n in range(cards):
+        checklist = CheckList(name=f"card {n}", owner_id=user.id)
+        checklists.append(checklist)
+        session.add(checklist)
+        session.add(
+            CheckListPosition(checklist_id=checklist.id, user_id=user.id, index=n)
+        )
+        session.add(
+            CheckListLabel(
+                checklist_id=checklist.id, label_id=label.id, user_id=user.id
+            )
+        )
+        for i in range(items):
+            item = CheckListItem(checklist_id=checklist.id, text=f"item {i}")
+            state = CheckListItemState(checklist_item_id=item.id, checked=False)
+            states.append(state)
+            session.add_all(
+                [
+                    item,
+                    state,
+                    CheckListItemPosition(
+                        checklist_item_id=item.id, index=i, indentation=0
+                    ),
+                ]
+            )
+        await session.flush()
+    await session.commit()
+    return user.id, checklists, states
+
+
+async def _server_seq(session) -> int:
+    from checkcheckserver.db.sync_seq import get_current_server_seq
+
+    return await get_current_server_seq(session)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from sqlalchemy import event, text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    import checkcheckserver.model._tables  # noqa: F401  (register every table)
+    from checkcheckserver.api.routes.routes_changes import _compute_changes
+
+    engine = create_async_engine(args.db_url)
+    statements: List[int] = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(text("INSERT INTO sync_seq (id, value) VALUES (1, 0)"))
+
+    def session():
+        return AsyncSession(engine, expire_on_commit=False)
+
+    async with session() as s:
+        user_id, checklists, states = await _seed(s, args.cards, args.items)
+
+    async def edit(change: Callable[[AsyncSession], None]) -> int:
+        # Commit one change and return the cursor from just before it.
+        async with session() as s:
+            since = await _server_seq(s)
+            change(s)
+            await s.commit()
+            return since
+
+    async def bootstrap() -> int:
+        return 0
+
+    def tick(s):
+        states[0].checked = not states[0].checked
+        s.add(states[0])
+
+    def rename(s):
+        checklists[0].name = f"{checklists[0].name}!"
+        s.add(checklists[0])
+
+    scenarios: List[Tuple[str, Callable[[], Awaitable[int]]]] = [
+        ("bootstrap (since=0)", bootstrap),
+        ("one item ticked", lambda: edit(tick)),
+        ("one card renamed", lambda: edit(rename)),
+    ]
+    print(
+        f"{args.cards} cards x {args.items} items, {args.rounds} pulls per row, "
+        f"{engine.dialect.name}\n"
+    )
+    print(f"{'pull':<22} | {'statements':>10} | {'rows':>7} | {'ms/pull':>8}")
+    print(f"{'-' * 22}-+-{'-' * 10}-+-{'-' * 7}-+-{'-' * 8}")
+    for name, prepare in scenarios:
+        since = await prepare()
+        async with session() as s:
+            current_seq = await _server_seq(s)
+        elapsed, count, rows = 0.0, 0, 0
+        for _ in range(args.rounds):
+            async with session() as s:
+                statements[0] = 0
+                start = time.perf_counter()
+                changes = await _compute_changes(
+                    s, user_id, since, frozenset(), current_seq, False
+                )
+                elapsed += time.perf_counter() - start
+                count = statements[0]
+            rows = len(changes.checklists) + len(changes.items) + len(changes.labels)
+        print(
+            f"{name:<22} | {count:>10} | {rows:>7} | "
+            f"{elapsed / args.rounds * 1e3:>8.2f}"
+        )
+    await engine.dispose()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    # The feed's queries pick their SQL dialect from the configured database.
+    os.environ["SQL_DATABASE_URL"] = args.db_url
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
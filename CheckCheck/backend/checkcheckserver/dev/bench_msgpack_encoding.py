@@ -0,0 +1,168 @@
+"""Micro-benchmark: JSON vs MessagePack bodies of the sync-heavy read endpoints.
+
+With ``Accept: application/msgpack``, ``GET /api/changes``, ``/api/checklist``
+and the item listings answer with MessagePack instead of JSON
+(``api/msgpack_response.py``): the same response model, with ids as 16-byte
+binaries instead of 36-character strings and timestamps as integers instead
+of ISO strings.
+
+This script seeds one user with ``--cards`` cards of ``--items`` items each
+(like ``bench_changes_roundtrips``) and renders three bodies both ways: a
+``since=0`` delta bootstrap, a page of the grid listing and a card's item
+listing. JSON goes through FastAPI's own response serialisation (the feed
+through ``ChangesResponse.model_dump_json``), MessagePack through the helpers
+the routes use. It reports the bytes of each body, its gzip size (what goes on
+the wire when the client accepts it, see ``bench_api_compression``) and the
+mean encode time::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_msgpack_encoding
+    python -m checkcheckserver.dev.bench_msgpack_encoding --cards 500 --items 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_msgpack_encoding",
+        description="Compare JSON and MessagePack body size and encode time.",
+    )
+    p.add_argument("--cards", type=int, default=200, help="Cards of the user.")
+    p.add_argument("--items", type=int, default=20, help="Items per card.")
+    p.add_argument(
+        "--rounds", type=int, default=20, help="Encodes timed per body and format."
+    )
+    return p.parse_args(argv)
+
+
+def _fastapi_json(response_model: Any) -> Callable[[Any], bytes]:
+    # What a route with ``response_model=`` does to its return value.
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    field = create_model_field(
+        name="bench_response", type_=response_model, mode="serialization"
+    )
+
+    def encode(content: Any) -> bytes:
+        rendered = asyncio.run(
+            serialize_response(field=field, response_content=content)
+        )
+        return JSONResponse(rendered).body
+
+    return encode
+
+
+def _time(encode: Callable[[Any], bytes], content: Any, rounds: int):
+    body = encode(content)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(content)
+    return body, (time.perf_counter() - start) / rounds
+
+
+async def _bodies(args: argparse.Namespace) -> List[Tuple[str, Any, Any, Callable]]:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    import checkcheckserver.model._tables  # noqa: F401  (register every table)
+    from checkcheckserver.api.msgpack_response import dump_model_msgpack
+    from checkcheckserver.api.paginator import PaginatedResponse
+    from checkcheckserver.api.routes.routes_changes import _compute_changes
+    from checkcheckserver.db.sync_seq import get_current_server_seq
+    from checkcheckserver.dev.bench_changes_roundtrips import _seed
+    from checkcheckserver.model.checklist import CheckListApiWithSubObj
+    from checkcheckserver.model.checklist_item import CheckListItemRead
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(text("INSERT INTO sync_seq (id, value) VALUES (1, 0)"))
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user_id, _, _ = await _seed(session, args.cards, args.items)
+        current_seq = await get_current_server_seq(session)
+        changes = await _compute_changes(
+            session, user_id, 0, frozenset(), current_seq, False
+        )
+    await engine.dispose()
+
+    # Plain models from here on: the encoders run outside the session.
+    grid = PaginatedResponse[CheckListApiWithSubObj](
+        total_count=len(changes.checklists),
+        offset=0,
+        count=min(len(changes.checklists), 50),
+        items=changes.checklists[:50],
+    )
+    card_items = [
+        item for item in changes.items if item.checklist_id == grid.items[0].id
+    ]
+    item_page = PaginatedResponse[CheckListItemRead](
+        total_count=len(card_items),
+        offset=0,
+        count=len(card_items),
+        items=card_items,
+    )
+    return [
+        (
+            "changes since=0",
+            changes,
+            lambda content: content.model_dump_json(by_alias=True).encode(),
+            dump_model_msgpack,
+        ),
+        (
+            "checklist page (50)",
+            grid,
+            _fastapi_json(PaginatedResponse[CheckListApiWithSubObj]),
+            _msgpack(PaginatedResponse[CheckListApiWithSubObj]),
+        ),
+        (
+            "card item page",
+            item_page,
+            _fastapi_json(PaginatedResponse[CheckListItemRead]),
+            _msgpack(PaginatedResponse[CheckListItemRead]),
+        ),
+    ]
+
+
+def _msgpack(response_model: Any) -> Callable[[Any], bytes]:
+    from checkcheckserver.api.msgpack_response import msgpack_response
+
+    return lambda content: msgpack_response(content, response_model).body
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    os.environ["SQL_DATABASE_URL"] = "sqlite+aiosqlite://"
+    bodies = asyncio.run(_bodies(args))
+
+    print(
+        f"{args.cards} cards x {args.items} items, {args.rounds} encodes per row\n"
+    )
+    print(
+        f"{'body':<19} | {'format':<7} | {'bytes':>9} | {'gzip bytes':>10} | "
+        f"{'encode ms':>9}"
+    )
+    print(f"{'-' * 19}-+-{'-' * 7}-+-{'-' * 9}-+-{'-' * 10}-+-{'-' * 9}")
+    for name, content, encode_json, encode_msgpack in bodies:
+        for fmt, encode in (("json", encode_json), ("msgpack", encode_msgpack)):
+            body, seconds = _time(encode, content, args.rounds)
+            print(
+                f"{name:<19} | {fmt:<7} | {len(body):>9} | "
+                f"{len(gzip.compress(body, 6)):>10} | {seconds * 1e3:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Micro-benchmark: the grid's card search, scanning vs. indexed.
+
+``GET /api/checklist?search=`` matches a card by its name, its note or the text
+of one of its live items (``db/search.py``). Unindexed, that is a correlated
+EXISTS over every accessible card's items; the indexed engines read the matches
+off Postgres trigram indexes or, on SQLite, the FTS5 table ``checklist_search``.
+
+This script times one grid page (``CheckListCRUD.list_for_grid``: the page and
+its total in one statement) for each ``--needle``, with the scan and with the
+database's indexed engine, over ``--rounds`` rounds, and checks that both
+engines find the same number of cards. It reads an existing database, by
+default the configured ``SQL_DATABASE_URL``; opening it builds the SQLite search
+index if it is missing, which is timed separately. A dataset of about a million
+items comes from the dev seeder::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.seed_dev_data --profile large \\
+        --owned-lists 20000 --padding-items 100
+    python -m checkcheckserver.dev.bench_search --skip-scan
+    python -m checkcheckserver.dev.bench_search --user user1
+    python -m checkcheckserver.dev.bench_search --needle olive --needle zzz \\
+        --db-url postgresql+asyncpg://user:pw@localhost/checkcheck_bench
+
+The scan probes each accessible card's items, and ``checklist_item.checklist_id``
+has no index of its own: on that dataset one scan of the admin's 20,000 cards
+takes about an hour on SQLite. ``--skip-scan`` times the index alone; a user
+with a handful of cards (``user1``) still compares both.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List, Optional, Sequence
+
+DEFAULT_NEEDLES = ["milk", "dentist", "ee", "no such thing"]
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_search",
+        description="Compare the grid's card search with and without its index.",
+    )
+    p.add_argument(
+        "--db-url",
+        default=None,
+        help="Seeded database to search (default: the configured one).",
+    )
+    p.add_argument(
+        "--user",
+        default=None,
+        help="user_name whose grid is searched (default: the admin user).",
+    )
+    p.add_argument(
+        "--needle",
+        action="append",
+        default=None,
+        help=f"Search term; repeatable (default: {DEFAULT_NEEDLES}).",
+    )
+    p.add_argument("--limit", type=int, default=50, help="Grid page size.")
+    p.add_argument("--rounds", type=int, default=5, help="Timed runs per needle.")
+    p.add_argument(
+        "--skip-scan",
+        action="store_true",
+        help="Time the indexed engine only (the scan is slow on large grids).",
+    )
+    return p.parse_args(argv)
+
+
+async def _time_search(session, user_id, needle: str, args) -> tuple:
+    from checkcheckserver.api.routes.routes_checklist import CheckListQueryParams
+    from checkcheckserver.db.checklist import CheckListCRUD
+
+    crud = CheckListCRUD(session)
+    timings: List[float] = []
+    total = 0
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        total, _, _ = await crud.list_for_grid(
+            user_id,
+            search=needle,
+            pagination=CheckListQueryParams(offset=0, limit=args.limit),
+        )
+        timings.append(time.perf_counter() - start)
+        session.expunge_all()
+    return total or 0, statistics.median(timings)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from sqlalchemy import func
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel, col, select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    import checkcheckserver.model._tables  # noqa: F401  (register every table)
+    from checkcheckserver.config import Config
+    from checkcheckserver.db import checklist as checklist_module
+    from checkcheckserver.db import search
+    from checkcheckserver.model.checklist_item import CheckListItem
+    from checkcheckserver.model.user import User
+
+    config = Config()
+    engine = create_async_engine(args.db_url)
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    print(f"create_all (builds a missing index): {time.perf_counter() - start:.2f} s")
+
+    indexed = search.get_search_engine()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user_name = args.user or config.ADMIN_USER_NAME
+        user_id = (
+            await session.exec(select(User.id).where(User.user_name == user_name))
+        ).first()
+        if user_id is None:
+            raise SystemExit(f"No user '{user_name}'; seed the database first.")
+        items = (
+            await session.exec(
+                select(func.count()).where(col(CheckListItem.deleted_at).is_(None))
+            )
+        ).one()
+        print(
+            f"{items} live items, {engine.dialect.name}, page of {args.limit}, "
+            f"median of {args.rounds} rounds\n"
+        )
+        print(
+            f"{'needle':<16} | {'cards':>7} | {'scan ms':>9} | "
+            f"{indexed.name + ' ms':>10} | {'speedup':>7} | same"
+        )
+        print(f"{'-' * 16}-+-{'-' * 7}-+-{'-' * 9}-+-{'-' * 10}-+-{'-' * 7}-+-----")
+        engines = [indexed] if args.skip_scan else [search.SCAN_SEARCH, indexed]
+        for needle in args.needle or DEFAULT_NEEDLES:
+            results = {}
+            for search_engine in engines:
+                # The grid filter asks get_search_engine() on each call.
+                checklist_module.get_search_engine = lambda e=search_engine: e
+                results[search_engine.name] = await _time_search(
+                    session, user_id, needle, args
+                )
+            total, indexed_s = results[indexed.name]
+            if args.skip_scan:
+                scan, speedup, same = "-", "-", "-"
+            else:
+                scan_total, scan_s = results[search.SCAN_SEARCH.name]
+                scan = f"{scan_s * 1e3:.2f}"
+                speedup = f"{scan_s / indexed_s:.1f}x"
+                same = "yes" if total == scan_total else "NO"
+            print(
+                f"{needle[:16]:<16} | {total:>7} | {scan:>9} | "
+                f"{indexed_s * 1e3:>10.2f} | {speedup:>7} | {same}"
+            )
+    await engine.dispose()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if args.db_url is not None:
+        # The search engine follows the configured database.
+        os.environ["SQL_DATABASE_URL"] = args.db_url
+    else:
+        from checkcheckserver.config import Config
+
+        args.db_url = str(Config().SQL_DATABASE_URL)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Micro-benchmark: write throughput of the ``server_seq`` allocators.
+
+Every transaction that stamps a syncable row takes its ``server_seq`` values
+from the allocator chosen by ``SYNC_SEQ_ALLOCATOR`` (``model/_base_model.py``).
+The ``counter`` allocator holds the single ``sync_seq`` row lock from the first
+stamped row until commit, so concurrent writers queue behind each other for the
+rest of their transaction. The ``sequence`` allocator (Postgres only) takes
+values from a native sequence and never waits.
+
+This script runs ``--writers`` concurrent writers. Each commits ``--txns``
+transactions that create one item (item, state, position) on a card of its own,
+and spends ``--hold-ms`` of simulated request work after its flush and before
+its commit. It reports commits per second and the commit latency for each
+allocator, and checks that the visible cursor reached every committed seq. The
+gap between the two grows with the writers and the hold time. On SQLite (the
+default, a temporary file) only the counter runs. Point ``--db-url`` at an empty
+scratch Postgres database to compare both::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_seq_allocator
+    python -m checkcheckserver.dev.bench_seq_allocator --writers 32 --hold-ms 5 \\
+        --db-url postgresql+asyncpg://user:pw@localhost/checkcheck_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import List, Optional, Sequence
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_seq_allocator",
+        description="Compare write throughput of the server_seq allocators.",
+    )
+    p.add_argument("--writers", type=int, default=16, help="Concurrent writers.")
+    p.add_argument(
+        "--txns", type=int, default=50, help="Transactions per writer and run."
+    )
+    p.add_argument(
+        "--hold-ms",
+        type=float,
+        default=2.0,
+        help="Simulated work between a transaction's flush and its commit.",
+    )
+    p.add_argument(
+        "--db-url",
+        default=None,
+        help="Empty database to write to (default: a temporary SQLite file).",
+    )
+    return p.parse_args(argv)
+
+
+async def _writer(
+    session_factory, owner_id: uuid.UUID, args, latencies: List[float]
+) -> None:
+    from checkcheckserver.model.checklist import CheckList
+    from checkcheckserver.model.checklist_item import CheckListItem
+    from checkcheckserver.model.checklist_item_position import (
+        CheckListItemPosition,
+    )
+    from checkcheckserver.model.checklist_item_state import CheckListItemState
+    from checkcheckserver.model.user import User
+
+    async with session_factory() as session:
+        # Postgres enforces the owner's foreign key.
+        session.add(User(id=owner_id, user_name=f"bench-{owner_id.hex}"))
+        await session.flush()
+        checklist = CheckList(name="bench", owner_id=owner_id)
+        session.add(checklist)
+        await session.commit()
+        for n in range(args.txns):
+            start = time.perf_counter()
+            item = CheckListItem(checklist_id=checklist.id, text=f"item {n}")
+            session.add_all(
+                [
+                    item,
+                    CheckListItemState(checklist_item_id=item.id, checked=False),
+                    CheckListItemPosition(
+                        checklist_item_id=item.id, index=float(n), indentation=0
+                    ),
+                ]
+            )
+            await session.flush()
+            await asyncio.sleep(args.hold_ms / 1e3)
+            await session.commit()
+            latencies.append(time.perf_counter() - start)
+
+
+async def _run_allocator(engine, args, allocator: str) -> None:
+    from sqlalchemy import func, select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from checkcheckserver.db.sync_seq import get_current_server_seq
+    from checkcheckserver.model import _base_model
+    from checkcheckserver.model.checklist_item import CheckListItem
+
+    _base_model.config.SYNC_SEQ_ALLOCATOR = allocator
+    async with engine.begin() as conn:
+        await conn.run_sync(_base_model.align_server_seq_allocators)
+
+    def session_factory():
+        return AsyncSession(engine, expire_on_commit=False)
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _writer(session_factory, uuid.uuid4(), args, latencies)
+            for _ in range(args.writers)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    async with session_factory() as session:
+        cursor = await get_current_server_seq(session)
+        top = (
+            await session.execute(select(func.max(CheckListItem.server_seq)))
+        ).scalar_one()
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{allocator:<9} | {len(latencies) / elapsed:>9.1f} | "
+        f"{statistics.mean(latencies) * 1e3:>8.2f} | {p95 * 1e3:>8.2f} | "
+        f"{'yes' if cursor >= top else 'NO'}"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+
+    import checkcheckserver.model._tables  # noqa: F401  (register every table)
+
+    is_postgres = args.db_url.startswith("postgresql")
+    pool = {"pool_size": args.writers + 1, "max_overflow": 0} if is_postgres else {}
+    engine = create_async_engine(args.db_url, **pool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(text("INSERT INTO sync_seq (id, value) VALUES (1, 0)"))
+
+    print(
+        f"{args.writers} writers x {args.txns} transactions, "
+        f"{args.hold_ms} ms held before each commit, {engine.dialect.name}\n"
+    )
+    print(
+        f"{'allocator':<9} | {'commits/s':>9} | {'mean ms':>8} | {'p95 ms':>8} | "
+        "cursor caught up"
+    )
+    print(f"{'-' * 9}-+-{'-' * 9}-+-{'-' * 8}-+-{'-' * 8}-+-{'-' * 16}")
+    allocators = ["counter", "sequence"] if is_postgres else ["counter"]
+    for allocator in allocators:
+        await _run_allocator(engine, args, allocator)
+    await engine.dispose()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if args.db_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench_seq_allocator.sqlite")
+        args.db_url = f"sqlite+aiosqlite:///{path}"
+    # The allocator picks its SQL from the configured database.
+    os.environ["SQL_DATABASE_URL"] = args.db_url
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
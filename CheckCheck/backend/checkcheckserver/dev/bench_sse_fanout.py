@@ -0,0 +1,118 @@
+"""Micro-benchmark: SSE fan-out cost vs. number of connected clients.
+
+Every sync notification is routed to its audience (``target_user_ids`` /
+``target_tokens``). The old fan-out scanned *every* connected client per
+notification, so each write cost O(connected clients) on the event loop no matter
+how small its audience. ``SyncClientRegistry`` looks the audience up by user id /
+token instead; this script measures both against a fixed-size audience while the
+number of connected clients grows, so the indexed cost should stay flat.
+
+Runs in-process with no database or server::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_sse_fanout
+    python -m checkcheckserver.dev.bench_sse_fanout --clients 1000 10000 100000 --audience 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from typing import List, Optional, Sequence
+
+from checkcheckserver.api.sync_clients import SyncClient, SyncClientRegistry
+
+
+class _User:
+    def __init__(self):
+        self.id = uuid.uuid4()
+
+
+class _Anonymous:
+    id = None
+
+    def __init__(self):
+        self.token = uuid.uuid4().hex
+
+
+def _linear_targets(
+    clients: List[SyncClient], target_user_ids: List[str], target_tokens: List[str]
+) -> List[SyncClient]:
+    # The pre-index fan-out, kept here as the baseline: one membership test per
+    # connected client.
+    matched = []
+    for client in clients:
+        if client.user_id is not None and client.user_id in target_user_ids:
+            matched.append(client)
+        elif client.token is not None and client.token in target_tokens:
+            matched.append(client)
+    return matched
+
+
+def _time_per_call(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def run(client_counts: Sequence[int], audience: int, rounds: int) -> None:
+    print(f"audience={audience} recipients, {rounds} notifications per row\n")
+    print(f"{'clients':>10} | {'linear scan (us)':>17} | {'indexed (us)':>13}")
+    print(f"{'-' * 10}-+-{'-' * 17}-+-{'-' * 13}")
+    for n in client_counts:
+        registry = SyncClientRegistry()
+        clients: List[SyncClient] = []
+        for i in range(n):
+            # ~10% of subscribers are anonymous public-link visitors.
+            principal = _Anonymous() if i % 10 == 0 else _User()
+            clients.append(registry.add(SyncClient(principal)))
+
+        audience_clients = clients[:: max(1, n // audience)][:audience]
+        target_user_ids = [c.user_id for c in audience_clients if c.user_id]
+        target_tokens = [c.token for c in audience_clients if c.token]
+
+        # Sanity: both strategies must agree on who receives the notification.
+        assert set(_linear_targets(clients, target_user_ids, target_tokens)) == set(
+            registry.targets(target_user_ids, target_tokens)
+        )
+
+        linear = _time_per_call(
+            lambda: _linear_targets(clients, target_user_ids, target_tokens), rounds
+        )
+        indexed = _time_per_call(
+            lambda: registry.targets(target_user_ids, target_tokens), rounds
+        )
+        print(f"{n:>10} | {linear * 1e6:>17.2f} | {indexed * 1e6:>13.2f}")
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_sse_fanout",
+        description="Measure SSE fan-out cost as the number of connected clients grows.",
+    )
+    p.add_argument(
+        "--clients",
+        type=int,
+        nargs="+",
+        default=[100, 1_000, 10_000, 100_000],
+        help="Connected-client counts to measure.",
+    )
+    p.add_argument(
+        "--audience", type=int, default=3, help="Recipients per notification."
+    )
+    p.add_argument(
+        "--rounds", type=int, default=200, help="Notifications timed per row."
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    run(args.clients, args.audience, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
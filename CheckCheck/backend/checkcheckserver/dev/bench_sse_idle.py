@@ -0,0 +1,160 @@
+"""Micro-benchmark: event-loop CPU spent on idle SSE clients.
+
+Most connected sync clients are idle: a browser tab left open. The old stream
+loop waited on its queue with ``asyncio.wait_for(..., timeout=30)`` and polled
+``Request.is_disconnected()`` on every pass, so each idle client armed and
+cancelled its own timer and polled the ASGI receive channel once per keepalive
+interval. Now a stream waits on its queue without a timeout, one
+``SyncHeartbeat`` timer wheel queues the keepalives for all idle clients, and
+disconnects arrive as the ASGI ``http.disconnect`` message instead.
+
+This script connects the same number of idle clients both ways and reports the
+process CPU time the event loop burns per wall-clock second. The keepalive
+interval is shortened (default 1 s instead of 30 s) so a few seconds of
+measurement cover many intervals; both variants scale with ``1 / interval``.
+
+Runs in-process with no database or server::
+
+    cd CheckCheck/backend
+    python -m checkcheckserver.dev.bench_sse_idle
+    python -m checkcheckserver.dev.bench_sse_idle --clients 1000 10000 --interval 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+
+from checkcheckserver.api.sync_clients import SyncClient, SyncClientRegistry
+
+
+class _User:
+    def __init__(self):
+        self.id = uuid.uuid4()
+
+
+async def _never_disconnects() -> dict:
+    await asyncio.Event().wait()
+    return {"type": "http.disconnect"}
+
+
+async def _polling_stream(
+    registry: SyncClientRegistry, interval: float, delivered: List[int]
+):
+    # The pre-heartbeat stream loop, kept here as the baseline.
+    request = Request({"type": "http"}, _never_disconnects)
+    client = registry.add(SyncClient(_User()))
+    try:
+        while not await request.is_disconnected():
+            try:
+                frame = await client.queue.get(timeout=interval)
+                if frame is None:
+                    break
+            except asyncio.TimeoutError:
+                registry.keepalive_frame()
+            delivered[0] += 1
+    finally:
+        registry.remove(client)
+
+
+async def _heartbeat_stream(registry: SyncClientRegistry, delivered: List[int]):
+    client = registry.add(SyncClient(_User()))
+    try:
+        while await client.queue.get() is not None:
+            delivered[0] += 1
+    finally:
+        registry.remove(client)
+
+
+async def _measure(
+    start_clients: Callable[[SyncClientRegistry, List[int]], List[asyncio.Task]],
+    registry: SyncClientRegistry,
+    seconds: float,
+) -> Tuple[float, int]:
+    delivered = [0]
+    tasks = start_clients(registry, delivered)
+    # Let every stream reach its first wait before measuring.
+    await asyncio.sleep(0.2)
+    delivered[0] = 0
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    keepalives = delivered[0]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return cpu / wall, keepalives
+
+
+async def _run_polling(n: int, interval: float, seconds: float) -> Tuple[float, int]:
+    def start(registry, delivered):
+        return [
+            asyncio.create_task(_polling_stream(registry, interval, delivered))
+            for _ in range(n)
+        ]
+
+    return await _measure(start, SyncClientRegistry(), seconds)
+
+
+async def _run_heartbeat(n: int, interval: float, seconds: float) -> Tuple[float, int]:
+    registry = SyncClientRegistry(keepalive_interval=interval)
+
+    def start(registry, delivered):
+        tasks = [
+            asyncio.create_task(_heartbeat_stream(registry, delivered))
+            for _ in range(n)
+        ]
+        return tasks + [asyncio.create_task(registry.heartbeat.run())]
+
+    return await _measure(start, registry, seconds)
+
+
+def run(client_counts: Sequence[int], interval: float, seconds: float) -> None:
+    print(f"keepalive every {interval} s, measured over {seconds} s per row\n")
+    columns = f"{'CPU ms/s':>10} {'keepalives':>13}"
+    print(f"{'clients':>8} | {'per-client timers':>24} | {'heartbeat wheel':>24}")
+    print(f"{'':>8} | {columns} | {columns}")
+    print(f"{'-' * 8}-+-{'-' * 24}-+-{'-' * 24}")
+    for n in client_counts:
+        polling, polling_sent = asyncio.run(_run_polling(n, interval, seconds))
+        wheel, wheel_sent = asyncio.run(_run_heartbeat(n, interval, seconds))
+        print(
+            f"{n:>8} | {polling * 1e3:>10.1f} {polling_sent:>13} "
+            f"| {wheel * 1e3:>10.1f} {wheel_sent:>13}"
+        )
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m checkcheckserver.dev.bench_sse_idle",
+        description="Measure event-loop CPU spent keeping idle SSE clients alive.",
+    )
+    p.add_argument(
+        "--clients",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000],
+        help="Idle-client counts to measure.",
+    )
+    p.add_argument(
+        "--interval", type=float, default=1.0, help="Keepalive interval in seconds."
+    )
+    p.add_argument(
+        "--seconds", type=float, default=5.0, help="Measurement window per row."
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    run(args.clients, args.interval, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -110,6 +110,7 @@ class Profile:
     group_shares: int         # other-owned lists shared to a group admin is in
     public_links: int         # admin-owned lists that get a public share link
     max_items: int            # upper bound for the "long" lists
+    padding_items: int = 18   # upper bound for the random padding lists
 
     @staticmethod
     def named(name: str) -> "Profile":
@@ -262,7 +263,8 @@ def _owned_specs(rng: random.Random, profile: Profile, n_labels: int) -> List[Li
 
     # 2. Random padding up to the requested count -------------------------------
     while len([s for s in specs]) < max(len(specs), profile.owned_lists):
-        add(items=_make_items(rng, rng.randint(0, 18), "mixed", rng.uniform(0.0, 0.7)),
+        add(items=_make_items(rng, rng.randint(0, profile.padding_items), "mixed",
+                               rng.uniform(0.0, 0.7)),
             checked_items_collapsed=rng.random() < 0.3,
             checked_items_seperated=rng.random() < 0.8,
             suggest_existing_items=rng.random() < 0.7,
@@ -641,13 +643,17 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
     p.add_argument("--group-shares", type=int, default=None)
     p.add_argument("--public-links", type=int, default=None)
     p.add_argument("--max-items", type=int, default=None)
+    p.add_argument("--padding-items", type=int, default=None,
+                   help="Upper bound for the items of each padding list (default: 18). "
+                        "'--profile large --owned-lists 20000 --padding-items 100' "
+                        "seeds about a million items, e.g. for bench_search.")
     return p.parse_args(argv)
 
 
 def _resolve_profile(args: argparse.Namespace) -> Profile:
     profile = Profile.named(args.profile)
     for attr in ("owned_lists", "shared_by_me", "shared_with_me",
-                 "group_shares", "public_links", "max_items"):
+                 "group_shares", "public_links", "max_items", "padding_items"):
         override = getattr(args, attr)
         if override is not None:
             setattr(profile, attr, override)
@@ -65,8 +65,17 @@ def start():
     import uvicorn
     from uvicorn.config import LOGGING_CONFIG
     from checkcheckserver.app import FastApiAppContainer
+    from checkcheckserver.db.tombstone_gc import start_tombstone_gc, stop_tombstone_gc
+    from checkcheckserver.db.checklist_item_counter import (
+        start_item_counter_repair,
+        stop_item_counter_repair,
+    )
 
     app_container = FastApiAppContainer()
+    app_container.add_startup_callback(start_tombstone_gc)
+    app_container.add_shutdown_callback(stop_tombstone_gc)
+    app_container.add_startup_callback(start_item_counter_repair)
+    app_container.add_shutdown_callback(stop_item_counter_repair)
 
     uvicorn_log_config: Dict = LOGGING_CONFIG
     uvicorn_log_config["loggers"][APP_LOGGER_DEFAULT_NAME] = {
@@ -1,15 +1,16 @@
-from typing import Optional
+from typing import List, Optional
 import datetime
+import itertools
 from pydantic import Field, field_validator, ValidationInfo
-from sqlalchemy import text, event as _sa_event
-from sqlalchemy.orm import Mapper as _SAMapper
+from sqlalchemy import DDL, Index, Sequence as _SASequence, text, event as _sa_event
+from sqlalchemy.orm import Mapper as _SAMapper, Session as _SASession, object_session
 import uuid
 
 
 from sqlmodel import SQLModel, Field as SQLField
 
 
-from checkcheckserver.config import Config
+from checkcheckserver.config import Config, DbBackend
 from checkcheckserver.log import get_logger
 
 
@@ -89,12 +90,15 @@ class TimestampedModel(SQLModel):
     #
     # Chosen over an `(updated_at, id)` timestamp cursor because timestamps have
     # same-instant collisions and are not monotonic across clock adjustments. The
-    # allocator (``_allocate_server_seq``) increments a single-row counter table
+    # allocator (``_reserve_server_seqs``) increments a single-row counter table
     # (``sync_seq``) and holds that row's lock until the surrounding transaction
     # commits, so the order in which rows *commit* matches the order of their
     # ``server_seq`` values — a reader that has consumed up to N can never miss a
-    # row that commits later with a smaller seq. Nullable only for schema
-    # tolerance of pre-2.0 rows; every row inserted through the ORM gets a value.
+    # row that commits later with a smaller seq (the Postgres sequence allocator
+    # trades that for throughput, see below). Each flush reserves one block for
+    # all the rows it stamps (``_reserve_server_seqs_for_flush``). Nullable only
+    # for schema tolerance of pre-2.0 rows; every row inserted through the ORM
+    # gets a value.
     # Uses sqlmodel's Field (not pydantic's, which the module aliases as `Field`)
     # so `index=True` actually creates the DB index the `server_seq > since`
     # delta queries scan — a plain int, so no callable leaks into json_schema_extra
@@ -135,18 +139,48 @@ class SoftDeleteMixin(SQLModel):
     removal stays a hard delete in 2.0 — access-loss and label-set changes are
     re-derived by the delta feed in WI-4 (documented in VERSION_2.0_WORK_ITEMS.md).
 
-    Garbage collection of old tombstones is explicitly deferred (2.1+).
+    Tombstones older than ``SYNC_TOMBSTONE_RETENTION_DAYS`` are hard-deleted,
+    with the rows they mask, by ``db/tombstone_gc.py``, which raises
+    ``SyncSequence.min_cursor`` past them.
     """
 
     deleted_at: Optional[datetime.datetime] = Field(default=None, nullable=True)
 
 
+# ── Trigram indexes (Postgres, grid search) ──────────────────────────────────
+#
+# The grid's ``search`` matches ``ILIKE '%needle%'`` on card names, notes and item
+# texts (``db/search.py``). A GIN index with ``pg_trgm``'s operator class serves
+# that; a btree cannot. The extension is created on every boot, before the
+# tables (and so their indexes) are. On SQLite the indexes are skipped: the
+# search runs on an FTS5 table there.
+
+_sa_event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def trigram_index(name: str, column: str, **kwargs) -> Index:
+    """A GIN trigram index on ``column`` for a model's ``__table_args__``,
+    created on Postgres only."""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+        **kwargs,
+    ).ddl_if(dialect="postgresql")
+
+
 class SyncSequence(SQLModel, table=True):
     """Single-row global allocator behind ``TimestampedModel.server_seq`` (WI-4).
 
     Exactly one row (``id == SYNC_SEQ_ROW_ID``) holding the highest ``server_seq``
-    handed out so far. Seeded to ``0`` right after ``create_all`` (see
-    ``db/_init_db.py``); the next allocation returns ``1``. Deliberately NOT a
+    handed out so far by the counter allocator. Seeded to ``0`` right after
+    ``create_all`` (see ``db/_init_db.py``); the next allocation returns ``1``.
+    Also holds ``min_cursor`` whichever allocator is configured. Deliberately NOT a
     ``TimestampedModel`` — it must not recurse into the stamping events below.
     A single global counter (rather than a per-table sequence) gives the delta
     feed one totally-ordered cursor across every entity.
@@ -158,21 +192,161 @@ class SyncSequence(SQLModel, table=True):
     # inserted with an explicit id via raw SQL in _init_db, never through the ORM.
     id: Optional[int] = SQLField(default=None, primary_key=True)
     value: int = SQLField(default=0, nullable=False)
+    # Oldest cursor the delta feed can still answer exactly: a pull from below it
+    # (other than ``since=0``) gets ``full_resync``. Raised by migration ``0014``
+    # to the high-water mark at the time, since losses before that are not in
+    # ``sync_access_log``, and by every tombstone GC run to the highest seq of a
+    # tombstone it removes (``db/tombstone_gc.py``).
+    min_cursor: int = SQLField(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
 
 
 # The one seeded row id for the global counter.
 SYNC_SEQ_ROW_ID = 1
 
 
-def _allocate_server_seq(connection) -> int:  # noqa: ANN001
-    """Return the next global ``server_seq`` on ``connection``'s transaction.
+# ── Sequence allocator (Postgres, ``SYNC_SEQ_ALLOCATOR=sequence``) ─────────
+#
+# The counter row serialises the commit tail of every write. The alternative
+# takes values from a native sequence instead, which never blocks, and gives up
+# commit-order monotonicity: a transaction can commit seq 7 after another
+# committed seq 8. The feed's cursor then must not be the highest seq handed
+# out, but the *visible* one: the highest below which every seq belongs to a
+# finished transaction (``sync_server_seq_visible``).
+#
+# That needs the in-flight transactions and the lowest seq each may hold, which
+# their uncommitted rows cannot tell another session. Postgres's lock table can:
+# before its first ``nextval``, a transaction takes a shared, transaction-scoped
+# advisory lock keyed by the highest seq handed out so far (its values are all
+# above it) and holds it until it ends. The visible seq is the lower of the
+# highest seq handed out, read first, and the lowest such key, read second. A
+# transaction not yet holding its lock at the second read calls ``nextval``
+# after the first, so its values are above that. Shared locks never wait on
+# each other, and a stale key only holds the cursor back.
+#
+# Any other advisory lock in the database would hold it back too, so the
+# allocator keeps to a key space of its own: the two-key form (``objsubid = 2``
+# in ``pg_locks``) with the first key in the band ``SERVER_SEQ_LOCK_SPACE`` +
+# 0..65535, carrying the seq's high bits (seqs up to 2^48), the second key its
+# low 32 bits. Reading ``pg_locks`` takes every lock-manager partition lock, so
+# the feed reads the visible seq at most once per
+# ``db/sync_seq.py::VISIBLE_SEQ_CACHE_SECONDS`` per process.
+#
+# The sequence and both functions are created by ``create_all`` on every boot
+# (so on existing databases too), whichever allocator is configured; see
+# ``align_server_seq_allocators`` for switching. Every server process must use
+# the same allocator.
+
+SERVER_SEQ_SEQUENCE = _SASequence("sync_server_seq", metadata=SQLModel.metadata)
+
+# First advisory-lock key of the allocator's band ("CC" in the high 16 bits).
+SERVER_SEQ_LOCK_SPACE = 0x43430000
+
+_HIGHEST_SEQUENCE_VALUE_SQL = (
+    "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END "
+    "FROM sync_server_seq"
+)
+
+_sa_event.listen(
+    SQLModel.metadata,
+    "after_create",
+    DDL(
+        f"""
+CREATE OR REPLACE FUNCTION sync_server_seq_reserve(n integer)
+RETURNS SETOF bigint LANGUAGE plpgsql AS $fn$
+DECLARE
+    highest bigint;
+BEGIN
+    {_HIGHEST_SEQUENCE_VALUE_SQL} INTO highest;
+    PERFORM pg_advisory_xact_lock_shared(
+        ({SERVER_SEQ_LOCK_SPACE} + (highest >> 32))::integer,
+        (highest & 4294967295)::bit(32)::integer
+    );
+    RETURN QUERY SELECT nextval('sync_server_seq') FROM generate_series(1, n);
+END
+$fn$
+"""
+    ).execute_if(dialect="postgresql"),
+)
+_sa_event.listen(
+    SQLModel.metadata,
+    "after_create",
+    DDL(
+        f"""
+CREATE OR REPLACE FUNCTION sync_server_seq_visible()
+RETURNS bigint LANGUAGE plpgsql VOLATILE AS $fn$
+DECLARE
+    highest bigint;
+    lowest_in_flight bigint;
+BEGIN
+    {_HIGHEST_SEQUENCE_VALUE_SQL} INTO highest;
+    SELECT min(((classid::bigint - {SERVER_SEQ_LOCK_SPACE}) << 32) | objid::bigint)
+    INTO lowest_in_flight
+    FROM pg_locks
+    WHERE locktype = 'advisory' AND objsubid = 2
+      AND classid::bigint BETWEEN {SERVER_SEQ_LOCK_SPACE}
+                              AND {SERVER_SEQ_LOCK_SPACE} + 65535
+      AND database = (SELECT oid FROM pg_database
+                      WHERE datname = current_database());
+    RETURN LEAST(highest, lowest_in_flight);
+END
+$fn$
+"""
+    ).execute_if(dialect="postgresql"),
+)
 
-    Runs inside a mapper flush event, so ``connection`` is the sync-facade
-    connection the flush is using. The ``UPDATE`` takes a row lock on the single
-    ``sync_seq`` row that is held until this transaction commits/rolls back, which
-    is what makes committed ``server_seq`` values monotonic in *commit* order (see
-    ``TimestampedModel.server_seq``). Two statements instead of ``UPDATE ...
-    RETURNING`` so we don't depend on a minimum SQLite version.
+
+def uses_sequence_allocator() -> bool:
+    """Whether ``server_seq`` comes from the Postgres sequence rather than the
+    ``sync_seq`` counter row (``SYNC_SEQ_ALLOCATOR``; SQLite always counts)."""
+    return (
+        config.SYNC_SEQ_ALLOCATOR == "sequence"
+        and config.db_backend == DbBackend.POSTGRES
+    )
+
+
+def align_server_seq_allocators(connection) -> None:  # noqa: ANN001
+    """Carry the high-water mark over from the other allocator, so a switch
+    never hands out a seq a cursor has already passed. Run on boot, after
+    ``create_all``."""
+    if config.db_backend != DbBackend.POSTGRES:
+        if config.SYNC_SEQ_ALLOCATOR == "sequence":
+            log.warning(
+                "SYNC_SEQ_ALLOCATOR=sequence needs PostgreSQL; using the counter"
+            )
+        return
+    if uses_sequence_allocator():
+        connection.execute(
+            text(
+                "SELECT setval('sync_server_seq', value) FROM sync_seq "
+                f"WHERE id = :row_id AND value > ({_HIGHEST_SEQUENCE_VALUE_SQL})"
+            ),
+            {"row_id": SYNC_SEQ_ROW_ID},
+        )
+    else:
+        connection.execute(
+            text(
+                f"UPDATE sync_seq SET value = ({_HIGHEST_SEQUENCE_VALUE_SQL}) "
+                f"WHERE id = :row_id AND value < ({_HIGHEST_SEQUENCE_VALUE_SQL})"
+            ),
+            {"row_id": SYNC_SEQ_ROW_ID},
+        )
+
+
+def _reserve_server_seqs(connection, count: int) -> List[int]:  # noqa: ANN001
+    """Reserve the next ``count`` global ``server_seq`` values on ``connection``'s
+    transaction, in ascending order, with one statement. With the sequence
+    allocator that is ``sync_server_seq_reserve`` (see above); otherwise one
+    ``UPDATE ... RETURNING`` (SQLite 3.35+) on the counter row.
+
+    The counter ``UPDATE`` takes a row lock on the single ``sync_seq`` row that is
+    held until this transaction commits/rolls back, which is what makes committed
+    ``server_seq`` values monotonic in *commit* order (see
+    ``TimestampedModel.server_seq``). A block is contiguous for the same reason:
+    no other transaction can allocate until this one ends (the sequence's blocks
+    may interleave). Values of a block left unused are skipped; the feed only
+    needs seqs to be increasing, not dense.
 
     Deadlock note (Postgres): serialising every write through this one counter row
     means a multi-row transaction holds the counter lock alongside its other row
@@ -183,20 +357,83 @@ def _allocate_server_seq(connection) -> int:  # noqa: ANN001
     self-heals. Under real concurrency this shows up as occasional retry noise, not
     lost or skipped rows — the commit-order guarantee still holds (verified by
     ``tests/tests_server_seq_concurrency.py``). If the noise ever matters, allocate
-    the seq in its own short autonomous transaction instead of the flush's.
+    the seq in its own short autonomous transaction instead of the flush's, or
+    switch to the sequence allocator.
     """
-    connection.execute(
-        text("UPDATE sync_seq SET value = value + 1 WHERE id = :row_id"),
-        {"row_id": SYNC_SEQ_ROW_ID},
-    )
-    result = connection.execute(
+    if uses_sequence_allocator():
+        result = connection.execute(
+            text("SELECT * FROM sync_server_seq_reserve(:count)"), {"count": count}
+        )
+        return sorted(result.scalars())
+    top = connection.execute(
+        text(
+            "UPDATE sync_seq SET value = value + :count WHERE id = :row_id "
+            "RETURNING value"
+        ),
+        {"count": count, "row_id": SYNC_SEQ_ROW_ID},
+    ).scalar_one()
+    return list(range(top - count + 1, top + 1))
+
+
+def _allocate_server_seq(connection) -> int:  # noqa: ANN001
+    """Return the next global ``server_seq`` on ``connection``'s transaction."""
+    return _reserve_server_seqs(connection, 1)[0]
+
+
+def _allocated_server_seq(connection) -> int:  # noqa: ANN001
+    """The highest ``server_seq`` handed out to ``connection``'s transaction or
+    committed; with the sequence allocator, handed out to any transaction. An
+    upper bound for the rows this transaction stamped, unlike the feed's cursor
+    (``db/sync_seq.py``)."""
+    if uses_sequence_allocator():
+        return connection.execute(text(_HIGHEST_SEQUENCE_VALUE_SQL)).scalar_one()
+    return connection.execute(
         text("SELECT value FROM sync_seq WHERE id = :row_id"),
         {"row_id": SYNC_SEQ_ROW_ID},
+    ).scalar_one()
+
+
+# The flush's reserved block: an iterator over the values not yet handed out.
+_SEQ_BLOCK_KEY = "server_seq_block"
+
+
+@_sa_event.listens_for(_SASession, "before_flush")
+def _reserve_server_seqs_for_flush(session, flush_context, instances):  # noqa: ANN001
+    """Reserve one block for every row the flush is about to stamp.
+
+    The mapper events below fire once per new and per dirty row (``before_update``
+    runs for dirty rows even without a net change), so that count is exact unless
+    a row joins the flush later (a cascade): those fall back to allocating one
+    value each. Stamping one row at a time cost an ``UPDATE`` plus a ``SELECT``
+    per row, e.g. 1,000 statements to uncheck a 500-item list.
+    """
+    # Never carry a block across flushes: one from a flush that failed was
+    # rolled back with it.
+    session.info.pop(_SEQ_BLOCK_KEY, None)
+    count = sum(
+        isinstance(obj, TimestampedModel)
+        for obj in itertools.chain(session.new, session.dirty)
     )
-    return result.scalar_one()
+    if count:
+        session.info[_SEQ_BLOCK_KEY] = iter(
+            _reserve_server_seqs(session.connection(), count)
+        )
+
+
+@_sa_event.listens_for(_SASession, "after_flush_postexec")
+def _release_server_seq_block(session, flush_context):  # noqa: ANN001
+    session.info.pop(_SEQ_BLOCK_KEY, None)
+
+
+def _next_server_seq(connection, target) -> int:  # noqa: ANN001
+    # The flush's next reserved value, in flush (= mapper event) order.
+    session = object_session(target)
+    block = session.info.get(_SEQ_BLOCK_KEY) if session is not None else None
+    seq = next(block, None) if block is not None else None
+    return seq if seq is not None else _allocate_server_seq(connection)
 
 
-# Server-stamp `updated_at` + allocate a fresh `server_seq` on every INSERT and
+# Server-stamp `updated_at` + hand out a fresh `server_seq` on every INSERT and
 # UPDATE flush. Registered on the generic Mapper (TimestampedModel itself is
 # abstract / non-mapped) and gated by an isinstance check so it applies to exactly
 # the timestamped (== syncable) tables — no custom CRUD method or bulk ORM write
@@ -206,7 +443,7 @@ def _allocate_server_seq(connection) -> int:  # noqa: ANN001
 @_sa_event.listens_for(_SAMapper, "before_insert")
 def _stamp_server_seq_on_insert(mapper, connection, target):  # noqa: ANN001
     if isinstance(target, TimestampedModel):
-        target.server_seq = _allocate_server_seq(connection)
+        target.server_seq = _next_server_seq(connection, target)
         # A grant row (checklist_position) records its creation seq once, so the
         # delta feed can recognise a freshly-granted card and ship its full tree
         # (see GrantSeqMixin). Never touched by before_update, so a later reorder
@@ -221,4 +458,4 @@ def _stamp_updated_at(mapper, connection, target):  # noqa: ANN001
         target.updated_at = naive_utc_now()
         # A tombstone (soft delete sets deleted_at) also flows through here, so a
         # deleted row gets a fresh seq and surfaces in the delta feed.
-        target.server_seq = _allocate_server_seq(connection)
+        target.server_seq = _next_server_seq(connection, target)
@@ -5,6 +5,8 @@ from checkcheckserver.model.user_session import UserSession
 # from checkcheckserver.model.user_auth_external_oidc_token import UserAuthExternalOIDCToken,
 
 from checkcheckserver.model.sync_notifications import SyncNotification
+from checkcheckserver.model.sync_watermark import SyncUserWatermark
+from checkcheckserver.model.sync_access_log import SyncAccessLog
 from checkcheckserver.model.checklist import CheckList
 from checkcheckserver.model.checklist_collaborator import CheckListCollaborator
 from checkcheckserver.model.checklist_group_share import CheckListGroupShare
@@ -14,3 +16,4 @@ from checkcheckserver.model.checklist_color_scheme import ChecklistColorScheme
 from checkcheckserver.model.checklist_item import CheckListItem
 from checkcheckserver.model.checklist_item_position import CheckListItemPosition
 from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.checklist_item_counter import CheckListItemCounter
@@ -5,7 +5,7 @@ serialisation matches every other endpoint (and the client's stores) exactly.
 Changed rows are grouped flat per entity; removals arrive as id lists.
 """
 
-from typing import List
+from typing import List, Optional
 import uuid
 
 from checkcheckserver.model._base_model import BaseTable
@@ -24,6 +24,11 @@ class ChangesResponse(BaseTable):
     # otherwise unusable: the client must drop its cache and treat this response as
     # a full bootstrap (it was computed as if ``since=0``).
     full_resync: bool
+    # Paged pulls (``limit``) only. True when rows are left: pass ``next_page``
+    # back as ``page`` for the next page. ``next_cursor`` stays at the cursor the
+    # paging started from until the last page, which carries the removals.
+    has_more: bool = False
+    next_page: Optional[str] = None
 
     # Changed rows, flat per entity, in the same shapes the REST endpoints return.
     checklists: List[CheckListApiWithSubObj]
@@ -18,6 +18,7 @@ from checkcheckserver.model._base_model import (
     BaseTable,
     TimestampedModel,
     SoftDeleteMixin,
+    trigram_index,
 )
 from checkcheckserver.model.checklist_color_scheme import ChecklistColorScheme
 from checkcheckserver.model.checklist_position import (
@@ -71,6 +72,10 @@ class CheckListBase(BaseTable):
 
 class CheckList(CheckListBase, TimestampedModel, SoftDeleteMixin, table=True):
     __tablename__ = "checklist"
+    __table_args__ = (
+        trigram_index("ix_checklist_name_trgm", "name"),
+        trigram_index("ix_checklist_text_trgm", "text"),
+    )
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         primary_key=True,
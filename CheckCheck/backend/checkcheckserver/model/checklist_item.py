@@ -11,6 +11,7 @@ from pydantic import (
 import datetime
 from fastapi import Depends
 from typing import Optional
+from sqlalchemy import text as sa_text
 from sqlmodel import Field, UniqueConstraint, Relationship, ForeignKeyConstraint
 
 import uuid
@@ -20,6 +21,7 @@ from checkcheckserver.model._base_model import (
     BaseTable,
     TimestampedModel,
     SoftDeleteMixin,
+    trigram_index,
 )
 from checkcheckserver.model.checklist_color_scheme import ChecklistColorScheme
 from checkcheckserver.model.checklist_item_state import (
@@ -63,6 +65,14 @@ class CheckListItemUpdate(CheckListItemBase, table=False):
 
 class CheckListItem(CheckListItemCreate, TimestampedModel, SoftDeleteMixin, table=True):
     __tablename__ = "checklist_item"
+    __table_args__ = (
+        # Only live items are searched.
+        trigram_index(
+            "ix_checklist_item_text_trgm",
+            "text",
+            postgresql_where=sa_text("deleted_at IS NULL"),
+        ),
+    )
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         primary_key=True,
@@ -0,0 +1,24 @@
+import uuid
+
+from sqlmodel import Field, SQLModel
+
+
+class CheckListItemCounter(SQLModel, table=True):
+    """Live item counts of one checklist (see ``db/checklist_item_counter.py``).
+
+    Denormalised from ``checklist_item`` / ``checklist_item_state`` so the grid's
+    item previews and the bulk item operations read their counts with a
+    primary-key lookup instead of counting the card's items. Adjusted by the
+    commit that creates, tombstones or (un)checks an item. A checklist without
+    a row has no live items. Not a ``TimestampedModel``: a count changing is not
+    a change the delta feed carries.
+    """
+
+    __tablename__ = "checklist_item_counter"
+    checklist_id: uuid.UUID = Field(
+        foreign_key="checklist.id", primary_key=True, ondelete="CASCADE"
+    )
+    # Live (not tombstoned) items.
+    item_count: int = Field(default=0, nullable=False)
+    # Live items whose state is checked.
+    checked_count: int = Field(default=0, nullable=False)
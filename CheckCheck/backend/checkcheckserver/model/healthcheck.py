@@ -1,5 +1,5 @@
 from typing import AsyncGenerator, List, Optional, Literal, Sequence, Annotated
-from pydantic import validate_email, validator, StringConstraints
+from pydantic import validate_email, validator, StringConstraints, BaseModel
 from fastapi import Depends
 from typing import Optional
 from sqlmodel import Field
@@ -19,7 +19,62 @@ class HealthCheck(TimestampedModel):
     healthy: bool
 
 
+class SyncStreamStats(BaseModel):
+    """Live-update (SSE) buffer usage of this server process. ``pending_bytes``
+    is what connected clients have not yet received; a client that exceeds
+    ``SYNC_SSE_CLIENT_MAX_PENDING`` is closed and counted in
+    ``overflow_disconnects``. ``resumed_streams`` reconnects were served from
+    the replay buffer (``SYNC_SSE_REPLAY_BUFFER``); ``resume_misses`` had aged
+    out and were told to resync. ``coalesced_frames`` were merged into another
+    frame within ``SYNC_COALESCE_WINDOW_MS``."""
+
+    connected_clients: int
+    pending_frames: int
+    pending_bytes: int
+    max_client_pending_bytes: int
+    overflow_disconnects: int
+    replay_frames: int
+    resumed_streams: int
+    resume_misses: int
+    coalesced_frames: int
+
+
+class AudienceCacheStats(BaseModel):
+    """Checklist audience cache of this server process (see
+    ``SYNC_AUDIENCE_CACHE_SIZE``). ``invalidations`` counts entries dropped
+    because sharing or ownership changed."""
+
+    entries: int
+    hits: int
+    misses: int
+    invalidations: int
+
+
+class SingleFlightStats(BaseModel):
+    """Request coalescing of ``GET /api/changes`` in this server process:
+    ``computed`` pulls ran the delta-feed queries, ``shared`` identical
+    concurrent pulls reused one of those instead."""
+
+    in_flight: int
+    computed: int
+    shared: int
+
+
+class DbPoolStats(BaseModel):
+    """Database connection pool of this server process. ``checked_out`` are
+    connections in use by a request right now (including the one serving this
+    report); open live-update streams hold none."""
+
+    size: int
+    checked_in: int
+    checked_out: int
+
+
 class HealthCheckReport(TimestampedModel):
     name: str
     version: str
     db_working: bool
+    sync_streams: Optional[SyncStreamStats] = None
+    audience_cache: Optional[AudienceCacheStats] = None
+    db_pool: Optional[DbPoolStats] = None
+    changes_single_flight: Optional[SingleFlightStats] = None
@@ -0,0 +1,24 @@
+from typing import Optional
+import uuid
+
+from sqlmodel import Field, Index, SQLModel
+
+
+class SyncAccessLog(SQLModel, table=True):
+    """One card a user lost access to: their position row was deleted (a revoked
+    share, a group revoke, leaving the card). See ``db/sync_access_log.py``.
+
+    Append-only. ``server_seq`` is allocated for the loss by the committing
+    transaction, so the delta feed returns the losses after a cursor as that
+    user's ``removed_checklist_ids`` with one index range scan. Not a
+    ``TimestampedModel``: the row carries the seq, it is never re-stamped.
+    """
+
+    __tablename__ = "sync_access_log"
+    __table_args__ = (
+        Index("ix_sync_access_log_user_id_server_seq", "user_id", "server_seq"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
+    checklist_id: uuid.UUID = Field(foreign_key="checklist.id", ondelete="CASCADE")
+    server_seq: int = Field(nullable=False)
@@ -0,0 +1,21 @@
+import uuid
+
+from sqlmodel import Field, SQLModel
+
+
+class SyncUserWatermark(SQLModel, table=True):
+    """Highest ``server_seq`` of a committed write that the delta feed may
+    return to this user (see ``db/sync_watermark.py``).
+
+    One row per user, bumped by the commit that stamps the write. A pull whose
+    cursor is at or above it has nothing to return, which ``GET /api/changes``
+    answers from this row alone. A user without a row has had no such write since
+    the table was introduced (existing users are seeded by migration ``0013``).
+    Not a ``TimestampedModel``: bumping it must not stamp a ``server_seq`` itself.
+    """
+
+    __tablename__ = "sync_user_watermark"
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    server_seq: int = Field(default=0, nullable=False)
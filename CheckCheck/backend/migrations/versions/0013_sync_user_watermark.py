@@ -0,0 +1,64 @@
+"""sync_user_watermark: per-user delta-feed watermark
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+
+Adds ``sync_user_watermark`` — one row per user holding the highest
+``server_seq`` of a committed write that can show up in that user's delta feed
+(see ``db/sync_watermark.py``). ``GET /api/changes`` answers a cursor at or
+above it with an empty delta without running the change scans.
+
+A user without a row is treated as "nothing changed", so on an existing database
+every user is seeded at the current high-water mark: each device's first pull
+after the upgrade still runs the full scans, later empty pulls take the fast
+path.
+
+**Idempotency.** ``create_all`` runs before Alembic on every boot (see
+``db/_init_db.py``) and has already created the (empty) table on an existing
+database, so the table is only created when absent; the seed only inserts the
+users that have no row yet. On a fresh database head is stamped and this
+revision does not run.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("sync_user_watermark"):
+        op.create_table(
+            "sync_user_watermark",
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("server_seq", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+    op.execute(
+        sa.text(
+            'INSERT INTO sync_user_watermark (user_id, server_seq) '
+            'SELECT "user".id, (SELECT value FROM sync_seq WHERE id = 1) '
+            'FROM "user" WHERE "user".id NOT IN '
+            "(SELECT user_id FROM sync_user_watermark)"
+        )
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if insp.has_table("sync_user_watermark"):
+        op.drop_table("sync_user_watermark")
@@ -0,0 +1,79 @@
+"""sync_access_log: per-user log of lost card access
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+
+Adds ``sync_access_log`` — one append-only row per card a user lost access to,
+stamped with a ``server_seq`` (see ``db/sync_access_log.py``). The delta feed
+reads a caller's ``removed_checklist_ids`` from it instead of diffing the
+``known`` ids the client used to send.
+
+Losses before this revision are not in the log, so ``sync_seq.min_cursor`` (the
+oldest cursor the feed can answer exactly) is raised to the current high-water
+mark: each device's first pull after the upgrade gets ``full_resync``, then
+pulls incrementally again.
+
+**Idempotency.** ``create_all`` runs before Alembic on every boot (see
+``db/_init_db.py``) and has already created the (empty) table on an existing
+database, so the table is only created when absent and the column only added
+when missing. On a fresh database head is stamped and this revision does not
+run.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("sync_access_log"):
+        op.create_table(
+            "sync_access_log",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("checklist_id", sa.Uuid(), nullable=False),
+            sa.Column("server_seq", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(
+                ["checklist_id"], ["checklist.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_sync_access_log_user_id_server_seq",
+            "sync_access_log",
+            ["user_id", "server_seq"],
+        )
+
+    columns = {column["name"] for column in insp.get_columns("sync_seq")}
+    if "min_cursor" not in columns:
+        op.add_column(
+            "sync_seq",
+            sa.Column("min_cursor", sa.Integer(), nullable=False, server_default="0"),
+        )
+    op.execute(sa.text("UPDATE sync_seq SET min_cursor = value WHERE id = 1"))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    columns = {column["name"] for column in insp.get_columns("sync_seq")}
+    if "min_cursor" in columns:
+        op.drop_column("sync_seq", "min_cursor")
+    if insp.has_table("sync_access_log"):
+        op.drop_index(
+            "ix_sync_access_log_user_id_server_seq", table_name="sync_access_log"
+        )
+        op.drop_table("sync_access_log")
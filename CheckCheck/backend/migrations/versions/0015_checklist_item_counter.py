@@ -0,0 +1,71 @@
+"""checklist_item_counter: per-checklist item counters
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+
+Adds ``checklist_item_counter`` — one row per checklist holding its live and
+checked item counts, adjusted by every commit that creates, tombstones or
+(un)checks an item (see ``db/checklist_item_counter.py``). ``GET /api/item`` and
+the bulk item operations read their counts from it instead of counting items.
+
+A checklist without a row counts as having no items, so on an existing database
+every checklist with live items is seeded with its counts.
+
+**Idempotency.** ``create_all`` runs before Alembic on every boot (see
+``db/_init_db.py``) and has already created the (empty) table on an existing
+database, so the table is only created when absent; the seed only inserts the
+checklists that have no row yet. On a fresh database head is stamped and this
+revision does not run.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("checklist_item_counter"):
+        op.create_table(
+            "checklist_item_counter",
+            sa.Column("checklist_id", sa.Uuid(), nullable=False),
+            sa.Column("item_count", sa.Integer(), nullable=False),
+            sa.Column("checked_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["checklist_id"], ["checklist.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("checklist_id"),
+        )
+
+    op.execute(
+        sa.text(
+            "INSERT INTO checklist_item_counter "
+            "(checklist_id, item_count, checked_count) "
+            "SELECT checklist_item.checklist_id, COUNT(*), "
+            "SUM(CASE WHEN checklist_item_state.checked THEN 1 ELSE 0 END) "
+            "FROM checklist_item LEFT OUTER JOIN checklist_item_state "
+            "ON checklist_item_state.checklist_item_id = checklist_item.id "
+            "WHERE checklist_item.deleted_at IS NULL "
+            "AND checklist_item.checklist_id NOT IN "
+            "(SELECT checklist_id FROM checklist_item_counter) "
+            "GROUP BY checklist_item.checklist_id"
+        )
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if insp.has_table("checklist_item_counter"):
+        op.drop_table("checklist_item_counter")
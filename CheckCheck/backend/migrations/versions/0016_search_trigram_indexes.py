@@ -0,0 +1,60 @@
+"""search: trigram indexes for the grid's card search
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+
+On Postgres, adds ``pg_trgm`` GIN indexes on ``checklist.name``,
+``checklist.text`` and the live rows of ``checklist_item.text``, so the grid's
+``search`` ILIKE reads matches off an index instead of scanning every accessible
+card's items (see ``db/search.py``). Creating the ``pg_trgm`` extension needs a
+role allowed to (the database owner on Postgres 13+).
+
+On SQLite this revision does nothing: the search index there is the FTS5 table
+``checklist_search``, which ``create_all`` creates and fills on boot when it is
+missing (``db/search.py::_create_search_table``).
+
+**Idempotency.** ``create_all`` runs before Alembic on every boot (see
+``db/_init_db.py``) but does not add indexes to tables that already exist, so
+the extension and the indexes are created ``IF NOT EXISTS``. On a fresh database
+head is stamped and this revision does not run.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0016"
+down_revision: Union[str, None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, column, partial-index condition)
+INDEXES = (
+    ("ix_checklist_name_trgm", "checklist", "name", None),
+    ("ix_checklist_text_trgm", "checklist", "text", None),
+    ("ix_checklist_item_text_trgm", "checklist_item", "text", "deleted_at IS NULL"),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for name, table, column, where in INDEXES:
+        op.execute(
+            sa.text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"USING gin ({column} gin_trgm_ops)"
+                + (f" WHERE {where}" if where else "")
+            )
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, _, _, _ in INDEXES:
+        op.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
@@ -24,6 +24,8 @@ import os
 import sys
 import json
 import time
+import uuid
+import asyncio
 import threading
 import subprocess
 import logging
@@ -273,6 +275,131 @@ def database(request):
         _teardown_postgres()
 
 
+# ── In-process database harness ───────────────────────────────────────────────
+# Tests of the data layer (flush/commit hooks, query shapes) drive the ORM in
+# this process instead of going through the server. Each scenario they run gets a
+# private, empty database of the backend the suite runs on: an in-memory SQLite
+# one, or one of its own in the Postgres container, copied from a template schema
+# built once per session. The Postgres pass thus exercises the Postgres-only
+# paths as well.
+
+_PG_HARNESS_TEMPLATE = "checkcheck_harness_template"
+
+
+class DbHarness:
+    """``run(scenario)`` awaits ``scenario(session, statements)`` on a fresh
+    ``AsyncSession`` of a private, empty database; ``statements`` collects every
+    SQL statement executed from then on (on any connection of the harness
+    engine, reachable as ``session.bind``)."""
+
+    def __init__(self, backend, pg_template=None):
+        self.backend = backend
+        self.pg_template = pg_template
+
+    def run(self, scenario):
+        from sqlalchemy import event
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlmodel.ext.asyncio.session import AsyncSession
+
+        from checkcheckserver.db.sync_seq import forget_visible_server_seq
+
+        async def main():
+            if self.pg_template is None:
+                database, url = None, "sqlite+aiosqlite://"
+            else:
+                database = f"checkcheck_harness_{uuid.uuid4().hex[:12]}"
+                await _pg_admin(
+                    f"CREATE DATABASE {database} TEMPLATE {self.pg_template}"
+                )
+                url = _pg_harness_url(database)
+            engine = create_async_engine(url)
+            statements = []
+
+            @event.listens_for(engine.sync_engine, "before_cursor_execute")
+            def _capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            try:
+                if database is None:
+                    async with engine.begin() as conn:
+                        await conn.run_sync(_create_harness_schema)
+                    statements.clear()
+                # A visible seq read from another test's database is not ours.
+                forget_visible_server_seq()
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    return await scenario(session, statements)
+            finally:
+                await engine.dispose()
+                if database is not None:
+                    await _pg_admin(f"DROP DATABASE IF EXISTS {database} WITH (FORCE)")
+
+        return asyncio.run(main())
+
+
+def _create_harness_schema(connection):
+    from sqlalchemy import text
+    from sqlmodel import SQLModel
+
+    import checkcheckserver.model._tables  # noqa: F401  (register every table)
+
+    SQLModel.metadata.create_all(connection)
+    connection.execute(text("INSERT INTO sync_seq (id, value) VALUES (1, 0)"))
+
+
+def _pg_harness_url(database: str) -> str:
+    return f"{_PG_URL.rsplit('/', 1)[0]}/{database}"
+
+
+async def _pg_admin(*statements: str):
+    import asyncpg
+
+    conn = await asyncpg.connect(_PG_URL.replace("+asyncpg", ""))
+    try:
+        for statement in statements:
+            await conn.execute(statement)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="session")
+def _pg_harness_template(request, database):
+    if request.config.getoption("--db") != "postgres":
+        yield None
+        return
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from checkcheckserver.config import Config, DbBackend
+
+    async def build():
+        await _pg_admin(
+            f"DROP DATABASE IF EXISTS {_PG_HARNESS_TEMPLATE}",
+            f"CREATE DATABASE {_PG_HARNESS_TEMPLATE}",
+        )
+        engine = create_async_engine(_pg_harness_url(_PG_HARNESS_TEMPLATE))
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(_create_harness_schema)
+        finally:
+            await engine.dispose()
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "db_backend", property(lambda self: DbBackend.POSTGRES))
+        asyncio.run(build())
+    yield _PG_HARNESS_TEMPLATE
+    asyncio.run(_pg_admin(f"DROP DATABASE IF EXISTS {_PG_HARNESS_TEMPLATE}"))
+
+
+@pytest.fixture
+def db_harness(monkeypatch, _pg_harness_template) -> DbHarness:
+    """Private databases of the suite's backend (see ``DbHarness``), with
+    ``Config.db_backend`` pinned to it."""
+    from checkcheckserver.config import Config, DbBackend
+
+    backend = DbBackend.SQLITE if _pg_harness_template is None else DbBackend.POSTGRES
+    monkeypatch.setattr(Config, "db_backend", property(lambda self: backend))
+    return DbHarness(backend, _pg_harness_template)
+
+
 def _start_server() -> subprocess.Popen:
     """Boot the backend exactly as run_dev_backend_server_with_oidc.sh does:
     ``python ./checkcheckserver/main.py`` from the backend dir, so __main__ and
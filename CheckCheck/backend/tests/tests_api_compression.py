@@ -0,0 +1,177 @@
+"""In-process tests for the negotiated API response compression
+(``api/compression.py::APICompressionMiddleware``).
+
+Drives the middleware over a bare ASGI app, so it needs neither the live server
+nor a database. Asserted here:
+
+* the coding is picked by the client's q-values, ties by server preference;
+* a JSON body from the size threshold on is compressed, one below it is not;
+* every response whose coding was negotiated says so in ``Vary``, compressed
+  or not;
+* a streamed body is flushed message by message;
+* the ``/api/sync`` SSE stream is never held back or compressed.
+"""
+
+import asyncio
+import gzip
+import json
+import zlib
+from typing import Dict, List
+
+import pytest
+
+from checkcheckserver.api.compression import (
+    APICompressionMiddleware,
+    available_encodings,
+    negotiate_encoding,
+)
+
+LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+
+
+def _app(chunks: List[bytes], content_type: str = "application/json"):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(sum(map(len, chunks))).encode()),
+                ],
+            }
+        )
+        for n, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": n < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+def _call(app, path: str, accept_encoding: str, on_message=None) -> List[Dict]:
+    middleware = APICompressionMiddleware(
+        app, encodings=["br", "zstd", "gzip"], minimum_size=1024, levels=LEVELS
+    )
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+        if on_message is not None:
+            on_message(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def _headers(messages: List[Dict]) -> Dict[str, str]:
+    return {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+
+
+def _body(messages: List[Dict]) -> bytes:
+    return b"".join(m["body"] for m in messages[1:])
+
+
+def _json_body(size: int) -> bytes:
+    items = [{"id": n, "text": f"item {n}", "checked": False} for n in range(size)]
+    return json.dumps(items).encode()[:size]
+
+
+def test_negotiation_follows_q_values_then_server_preference():
+    offered = ["br", "zstd", "gzip"]
+    assert negotiate_encoding("gzip, deflate, br, zstd", offered) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", offered) == "gzip"
+    assert negotiate_encoding("br;q=0, *", offered) == "zstd"
+    assert negotiate_encoding("identity", offered) is None
+    assert negotiate_encoding("", offered) is None
+
+
+def test_large_json_is_gzipped_and_small_json_is_not():
+    body = _json_body(4096)
+    messages = _call(_app([body]), "/api/checklist", "gzip")
+    headers = _headers(messages)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in headers
+    assert gzip.decompress(_body(messages)) == body
+
+    small = _json_body(512)
+    messages = _call(_app([small]), "/api/checklist", "gzip")
+    assert "content-encoding" not in _headers(messages)
+    assert _body(messages) == small
+
+
+def test_negotiated_responses_vary_on_accept_encoding():
+    small = _json_body(512)
+    for accept_encoding in ("gzip", "", "identity"):
+        # Below the threshold, or no coding accepted: sent as is, but a request
+        # with another Accept-Encoding may get a compressed body.
+        headers = _headers(_call(_app([small]), "/api/checklist", accept_encoding))
+        assert "content-encoding" not in headers
+        assert headers["vary"] == "Accept-Encoding"
+    headers = _headers(_call(_app([small], "image/png"), "/api/file", "gzip"))
+    assert "vary" not in headers
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_every_available_coding_round_trips(encoding):
+    body = _json_body(8192)
+    messages = _call(_app([body]), "/api/changes", encoding)
+    assert _headers(messages)["content-encoding"] == encoding
+    compressed = _body(messages)
+    assert len(compressed) < len(body)
+    if encoding == "br":
+        import brotli
+
+        assert brotli.decompress(compressed) == body
+    elif encoding == "zstd":
+        import zstandard
+
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+        assert decoder.decompress(compressed) == body
+    else:
+        assert gzip.decompress(compressed) == body
+
+
+def test_streamed_body_is_flushed_message_by_message():
+    lines = [json.dumps({"n": n}).encode() + b"\n" for n in range(3)]
+    messages = _call(_app(lines, "application/x-ndjson"), "/api/changes", "gzip")
+    assert _headers(messages)["content-encoding"] == "gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Each line decodes from its own message, without waiting for the next.
+    for line, message in zip(lines, messages[1:]):
+        assert decoder.decompress(message["body"]) == line
+
+
+def test_sync_stream_is_never_held_back_or_compressed():
+    events = [b"event: hello\ndata: {}\n\n", b": keepalive\n\n" * 200]
+    delivered = []
+    stream = _app(events, "text/event-stream")
+
+    async def app(scope, receive, send):
+        async def send_and_check(message):
+            await send(message)
+            # Every message reaches the client before the next one is produced.
+            assert delivered[-1] is message
+
+        await stream(scope, receive, send_and_check)
+
+    messages = _call(app, "/api/sync", "gzip, br", delivered.append)
+    assert "content-encoding" not in _headers(messages)
+    assert [m["body"] for m in messages[1:]] == events
+    # An event stream elsewhere under /api is not compressed either.
+    messages = _call(stream, "/api/other-stream", "gzip")
+    assert "content-encoding" not in _headers(messages)
@@ -12,13 +12,20 @@ queries, access-gain (share delivers the whole tree) and access-loss
 devices converging through the endpoint is the core property under test.
 """
 
+import json
 from typing import Dict, List, Optional
 
+import requests
+
+from checkcheckserver.api.routes.routes_changes import _needs_full_resync
+from checkcheckserver.db.sync_watermark import SyncCursorState
 from utils import (
     req,
     authorize_for_access_token,
     create_test_user,
     find_first_dict_in_list,
+    get_access_token,
+    get_server_base_url,
 )
 
 
@@ -301,6 +308,47 @@ def test_losing_access_is_reported_in_removed_ids():
     req(f"api/checklist/{cl_id}", "delete")
 
 
+def test_revocation_is_reported_without_known_from_the_access_log():
+    other = _make_user_token("wi4-lose-log")
+    other_id = _user_id(other)
+
+    cl_id = req("api/checklist", "post", b={"name": "revoke logged"})["id"]
+    kept_id = req("api/checklist", "post", b={"name": "still shared"})["id"]
+    for shared in (cl_id, kept_id):
+        req(f"api/checklist/{shared}/shares/{other_id}", "put", b={"permission": "edit"})
+    after_share = _cursor(token=other)
+
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "delete")
+
+    delta = _changes(since=after_share, token=other)
+    assert delta["removed_checklist_ids"] == [cl_id]
+    # Already past the loss: not reported again.
+    assert _changes(since=delta["next_cursor"], token=other)[
+        "removed_checklist_ids"
+    ] == []
+
+    for owned in (cl_id, kept_id):
+        req(f"api/checklist/{owned}", "delete")
+
+
+def test_a_card_regained_after_a_revocation_is_not_reported_removed():
+    other = _make_user_token("wi4-regain")
+    other_id = _user_id(other)
+
+    cl_id = req("api/checklist", "post", b={"name": "revoke and reshare"})["id"]
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "put", b={"permission": "edit"})
+    after_share = _cursor(token=other)
+
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "delete")
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "put", b={"permission": "view"})
+
+    delta = _changes(since=after_share, token=other)
+    assert cl_id not in delta["removed_checklist_ids"]
+    assert cl_id in _cl_ids(delta), "the regained card is shipped again"
+
+    req(f"api/checklist/{cl_id}", "delete")
+
+
 def test_revocation_advances_the_global_seq_so_the_poke_is_not_skipped():
     """A revoked local-first client only pulls `/api/changes` when the
     `changes_available` poke carries a server_seq AHEAD of its cursor (the §9b
@@ -448,6 +496,15 @@ def test_negative_cursor_triggers_full_resync():
     req(f"api/checklist/{cl_id}", "delete")
 
 
+def test_cursor_below_the_oldest_answerable_one_triggers_full_resync():
+    """Losses from before the access log existed are not in it, so a cursor below
+    ``sync_seq.min_cursor`` cannot be answered exactly. A bootstrap can."""
+    state = SyncCursorState(server_seq=100, min_cursor=40, watermark=None)
+    assert [
+        _needs_full_resync(since, state) for since in (-1, 0, 1, 39, 40, 100, 101)
+    ] == [True, False, True, True, False, False, True]
+
+
 def test_cursor_at_high_water_is_empty_and_not_a_resync():
     """The exact boundary `since == current_seq`: the change scans are strictly
     `> since`, so pulling at the high-water mark returns none of the rows written
@@ -549,3 +606,275 @@ def test_self_leave_advances_seq_and_lands_in_removed_ids():
     )
 
     req(f"api/checklist/{cl_id}", "delete")
+
+
+# ── empty-pull fast path (per-user watermark) ─────────────────────────────────
+
+
+def _is_empty(delta: Dict) -> bool:
+    return not any(
+        delta[key]
+        for key in (
+            "checklists",
+            "items",
+            "labels",
+            "checklist_tombstones",
+            "item_tombstones",
+            "label_tombstones",
+            "removed_checklist_ids",
+        )
+    )
+
+
+def test_writes_invisible_to_the_caller_give_an_empty_delta_at_the_new_cursor():
+    """Another user's private write advances the global seq but not the caller's
+    watermark: the pull is empty and still hands back the new high-water mark."""
+    other = _make_user_token("wi4-watermark-other")
+    synced = _cursor()
+
+    cl_id = req("api/checklist", "post", b={"name": "not yours"}, access_token=other)[
+        "id"
+    ]
+    req(f"api/checklist/{cl_id}/item", "post", b={"text": "x"}, access_token=other)
+
+    delta = _changes(since=synced)
+    assert _is_empty(delta) and delta["full_resync"] is False
+    assert delta["next_cursor"] > synced
+
+    req(f"api/checklist/{cl_id}", "delete", access_token=other)
+
+
+def test_collaborator_edit_raises_the_owners_watermark():
+    """An item edit on a shared card is stamped by the collaborator's request but
+    must still reach the owner's feed."""
+    other = _make_user_token("wi4-watermark-collab")
+    other_id = _user_id(other)
+    cl_id = req("api/checklist", "post", b={"name": "shared watermark"})["id"]
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "put", b={"permission": "edit"})
+    synced = _cursor()
+
+    item_id = req(
+        f"api/checklist/{cl_id}/item", "post", b={"text": "theirs"}, access_token=other
+    )["id"]
+
+    assert item_id in _item_ids(_changes(since=synced))
+
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_leaving_via_delete_is_reported_although_it_stamps_no_row():
+    """A collaborator 'deleting' a shared card only hard-deletes their own
+    collaborator + position rows. The access loss still raises their watermark
+    at a fresh seq, so the next pull is not answered empty."""
+    other = _make_user_token("wi4-watermark-leave")
+    other_id = _user_id(other)
+    cl_id = req("api/checklist", "post", b={"name": "leave via delete"})["id"]
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "put", b={"permission": "edit"})
+    synced = _cursor(token=other)
+
+    req(f"api/checklist/{cl_id}", "delete", access_token=other, expected_http_code=204)
+
+    delta = _changes(since=synced, known=[cl_id], token=other)
+    assert delta["next_cursor"] > synced
+    assert cl_id in delta["removed_checklist_ids"]
+
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+# ── streamed variant (Accept: application/x-ndjson) ───────────────────────────
+
+
+def _streamed_changes(since: int = 0, known: Optional[List[str]] = None) -> List[Dict]:
+    q: Dict = {"since": since}
+    if known is not None:
+        q["known"] = ",".join(known)
+    resp = requests.get(
+        f"{get_server_base_url()}/api/changes",
+        params=q,
+        headers={
+            "Authorization": f"Bearer {get_access_token()}",
+            "Accept": "application/x-ndjson",
+        },
+        stream=True,
+        timeout=(5, 30),
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.iter_lines() if line]
+
+
+def _merge_stream(lines: List[Dict]) -> Dict:
+    header, *chunks, trailer = lines
+    assert trailer == {"done": True}, "a complete stream ends with the done line"
+    merged = dict(header)
+    for chunk in chunks:
+        ((key, rows),) = chunk.items()
+        merged.setdefault(key, []).extend(rows)
+    return merged
+
+
+def _sorted_by_id(rows: List) -> List:
+    return sorted(rows, key=lambda row: row["id"] if isinstance(row, dict) else row)
+
+
+def test_streamed_bootstrap_carries_the_same_delta_as_the_json_response():
+    cl_ids = [
+        req("api/checklist", "post", b={"name": f"stream {n}"})["id"] for n in range(3)
+    ]
+    for cl_id in cl_ids:
+        for n in range(3):
+            req(f"api/checklist/{cl_id}/item", "post", b={"text": f"row {n}"})
+    req(f"api/checklist/{cl_ids[2]}", "delete")
+    gone = "00000000-0000-4000-8000-000000000000"
+
+    buffered = _changes(since=0, known=[gone])
+    streamed = _merge_stream(_streamed_changes(since=0, known=[gone]))
+
+    # Authenticating a request may itself stamp a (non-feed) row in between.
+    assert streamed["next_cursor"] >= buffered["next_cursor"]
+    assert streamed["full_resync"] == buffered["full_resync"]
+    for key in (
+        "checklists",
+        "items",
+        "labels",
+        "checklist_tombstones",
+        "item_tombstones",
+        "label_tombstones",
+        "removed_checklist_ids",
+    ):
+        assert _sorted_by_id(streamed.get(key, [])) == _sorted_by_id(buffered[key]), key
+    assert gone in streamed["removed_checklist_ids"]
+
+    for cl_id in cl_ids[:2]:
+        req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_streamed_pull_at_the_high_water_mark_is_header_and_done_only():
+    at = _cursor()
+    header, *rest = _streamed_changes(since=at)
+    assert header["next_cursor"] >= at and header["full_resync"] is False
+    assert rest == [{"done": True}]
+
+
+# ── paged variant (limit / page) ──────────────────────────────────────────────
+
+
+def _paged_changes(
+    since: int,
+    limit: int,
+    known: Optional[List[str]] = None,
+    token: Optional[str] = None,
+) -> List[Dict]:
+    pages = []
+    q: Dict = {"since": since, "limit": limit}
+    if known is not None:
+        q["known"] = known
+    while True:
+        page = req("api/changes", q=q, access_token=token)
+        pages.append(page)
+        if not page["has_more"]:
+            return pages
+        assert page["next_cursor"] == since, "the cursor moves on the last page only"
+        assert len(page["checklists"] + page["items"] + page["labels"]) == limit
+        q = {"page": page["next_page"], "limit": limit}
+        if known is not None:
+            q["known"] = known
+        assert len(pages) < 500, "paging must terminate"
+
+
+def _merge_pages(pages: List[Dict]) -> Dict:
+    merged: Dict = {}
+    for page in pages:
+        for key in ("checklists", "items", "labels"):
+            merged.setdefault(key, {}).update({row["id"]: row for row in page[key]})
+    return merged
+
+
+def test_paged_pull_adds_up_to_the_unpaged_delta():
+    start = _cursor()
+    cl_ids = [
+        req("api/checklist", "post", b={"name": f"paged {n}"})["id"] for n in range(3)
+    ]
+    for cl_id in cl_ids:
+        for n in range(3):
+            req(f"api/checklist/{cl_id}/item", "post", b={"text": f"row {n}"})
+    label_id = req("api/label", "post", b={"display_name": "paged-label"})["id"]
+    req(f"api/checklist/{cl_ids[2]}", "delete")
+    gone = "00000000-0000-4000-8000-000000000000"
+
+    whole = _changes(since=start, known=[gone])
+    pages = _paged_changes(since=start, limit=2, known=[gone])
+    assert len(pages) > 1
+    merged = _merge_pages(pages)
+    for key in ("checklists", "items", "labels"):
+        assert sorted(merged[key]) == sorted(row["id"] for row in whole[key]), key
+    assert label_id in merged["labels"]
+
+    last = pages[-1]
+    assert last["next_cursor"] >= whole["next_cursor"] and last["next_page"] is None
+    assert cl_ids[2] in last["checklist_tombstones"]
+    assert gone in last["removed_checklist_ids"]
+    for page in pages[:-1]:
+        assert page["checklist_tombstones"] == page["removed_checklist_ids"] == []
+
+    req(f"api/label/{label_id}", "delete")
+    for cl_id in cl_ids[:2]:
+        req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_items_of_a_gained_card_never_arrive_before_the_card():
+    other = _make_user_token("wi4-paged-gain")
+    other_id = _user_id(other)
+    cl_id = req("api/checklist", "post", b={"name": "paged gain"})["id"]
+    item_ids = [
+        req(f"api/checklist/{cl_id}/item", "post", b={"text": f"row {n}"})["id"]
+        for n in range(5)
+    ]
+    base = _cursor(token=other)
+    req(f"api/checklist/{cl_id}/shares/{other_id}", "put", b={"permission": "edit"})
+
+    seen_cards = set()
+    delivered = []
+    for page in _paged_changes(since=base, limit=2, token=other):
+        seen_cards.update(_cl_ids(page))
+        for item in page["items"]:
+            assert item["checklist_id"] in seen_cards, "item arrived before its card"
+            delivered.append(item["id"])
+    assert cl_id in seen_cards and sorted(delivered) == sorted(item_ids)
+
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_a_row_written_while_paging_lands_on_a_later_page():
+    start = _cursor()
+    cl_id = req("api/checklist", "post", b={"name": "paged writes"})["id"]
+    item_ids = [
+        req(f"api/checklist/{cl_id}/item", "post", b={"text": f"row {n}"})["id"]
+        for n in range(4)
+    ]
+    first = req("api/changes", q={"since": start, "limit": 2})
+    assert first["has_more"]
+    delivered = _item_ids(first) or _item_ids(
+        req("api/changes", q={"page": first["next_page"], "limit": 2})
+    )
+    # Edit a row the client already holds: paging on must bring it back.
+    req(f"api/checklist/{cl_id}/item/{delivered[0]}", "patch", b={"text": "edited"})
+
+    rest = []
+    q = {"page": first["next_page"], "limit": 2}
+    while True:
+        page = req("api/changes", q=q)
+        rest.extend(page["items"])
+        if not page["has_more"]:
+            break
+        q = {"page": page["next_page"], "limit": 2}
+    edited = find_first_dict_in_list(rest, {"id": delivered[0]})
+    assert edited is not None and edited["text"] == "edited"
+    assert set(item_ids) <= set(_item_ids(first)) | {i["id"] for i in rest}
+
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_malformed_page_token_is_rejected():
+    req("api/changes", q={"page": "not-a-token", "limit": 2}, expected_http_code=400)
+    req("api/changes", q={"since": 0, "limit": 0}, expected_http_code=422)
@@ -0,0 +1,157 @@
+"""In-process tests for the grid listing's single statement
+(``db/checklist.py::CheckListCRUD.list_for_grid`` behind ``GET /api/checklist``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* a page costs one statement, whatever the page size, and carries the total of
+  all matching cards;
+* each card comes with the caller's own position, labels and permission: a
+  collaborator's labels and pin on a shared card never show up;
+* listing leaves the cards clean, so nothing is written back;
+* an offset past the end still reports the total.
+"""
+
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.responses import Response
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.api.routes.routes_checklist import (
+    CheckListQueryParams,
+    list_checklists,
+)
+from checkcheckserver.db.checklist import CheckListCRUD
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    SharePermission,
+)
+from checkcheckserver.model.checklist_label import CheckListLabel
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.label import Label
+from checkcheckserver.model.user import User
+from utils import route_request
+
+
+async def _seed(session: AsyncSession, cards: int):
+    """``cards`` cards of ``owner``, the first shared with ``guest`` (``check``).
+    Both label and position the shared card their own way."""
+    owner = User(user_name="grid-owner")
+    guest = User(user_name="grid-guest")
+    session.add_all([owner, guest])
+    await session.flush()
+    owner_label = Label(owner_id=owner.id, display_name="owner label")
+    guest_label = Label(owner_id=guest.id, display_name="guest label")
+    checklists = [CheckList(name=f"card {n}", owner_id=owner.id) for n in range(cards)]
+    session.add_all([owner_label, guest_label, *checklists])
+    await session.flush()
+    for n, checklist in enumerate(checklists):
+        session.add(
+            CheckListPosition(checklist_id=checklist.id, user_id=owner.id, index=n)
+        )
+        session.add(
+            CheckListLabel(
+                checklist_id=checklist.id, label_id=owner_label.id, user_id=owner.id
+            )
+        )
+    shared = checklists[0]
+    session.add_all(
+        [
+            CheckListCollaborator(
+                checklist_id=shared.id,
+                user_id=guest.id,
+                permission=SharePermission.check,
+            ),
+            CheckListPosition(
+                checklist_id=shared.id, user_id=guest.id, index=0, pinned=True
+            ),
+            CheckListLabel(
+                checklist_id=shared.id, label_id=guest_label.id, user_id=guest.id
+            ),
+        ]
+    )
+    await session.commit()
+    return owner, guest, checklists
+
+
+async def _list(session, user, offset=0, limit=100):
+    return await list_checklists(
+        request=route_request(),
+        response=Response(),
+        archived=False,
+        label_id=None,
+        search=None,
+        shared=None,
+        checklist_crud=CheckListCRUD(session),
+        pagination=CheckListQueryParams(offset=offset, limit=limit),
+        current_user=user,
+    )
+
+
+def test_grid_page_is_one_statement(db_harness):
+    def statements_for(cards: int, limit: int):
+        async def scenario(session: AsyncSession, statements):
+            owner, _, _ = await _seed(session, cards)
+            statements.clear()
+            page = await _list(session, owner, limit=limit)
+            assert page.total_count == cards
+            assert page.count == min(cards, limit)
+            assert all(len(card.labels) == 1 for card in page.items)
+            return len(statements)
+
+        return db_harness.run(scenario)
+
+    assert statements_for(3, 100) == 1
+    assert statements_for(30, 100) == 1
+    assert statements_for(30, 10) == 1
+
+
+def test_grid_cards_carry_the_callers_view(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        owner, guest, checklists = await _seed(session, 3)
+        owner_page = await _list(session, owner)
+        owner_view = {
+            card.id: (
+                [label.display_name for label in card.labels],
+                card.position.pinned,
+                card.my_permission,
+            )
+            for card in owner_page.items
+        }
+        dirty = list(session.dirty)
+        session.expunge_all()
+        guest_page = await _list(session, guest)
+        guest_view = [
+            (
+                card.id,
+                [label.display_name for label in card.labels],
+                card.position.pinned,
+                card.my_permission,
+            )
+            for card in guest_page.items
+        ]
+        return checklists, owner_page, owner_view, dirty, guest_page, guest_view
+
+    checklists, owner_page, owner_view, dirty, guest_page, guest_view = db_harness.run(
+        scenario
+    )
+    # Descending position index, the owner pinned nothing.
+    assert [card.id for card in owner_page.items] == [
+        checklist.id for checklist in reversed(checklists)
+    ]
+    assert owner_view[checklists[0].id] == (["owner label"], False, "owner")
+    assert dirty == []
+    assert guest_page.total_count == 1
+    assert guest_view == [(checklists[0].id, ["guest label"], True, "check")]
+
+
+def test_offset_past_the_end_reports_the_total(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        owner, _, _ = await _seed(session, 3)
+        return await _list(session, owner, offset=10)
+
+    page = db_harness.run(scenario)
+    assert page.total_count == 3
+    assert page.count == 0 and page.items == []
@@ -1,5 +1,89 @@
-from utils import req, dict_must_contain
+import time
+
+import pytest
+import requests
+
+from utils import req, dict_must_contain, get_access_token, get_server_base_url
 
 def test_health():
     res = req("api/health")
     dict_must_contain(res, required_keys_and_val={"healthy": True})
+
+
+def test_health_report_exposes_sync_stream_stats():
+    res = req("api/health/report")
+    stats = res["sync_streams"]
+    for key in (
+        "connected_clients",
+        "pending_frames",
+        "pending_bytes",
+        "max_client_pending_bytes",
+        "overflow_disconnects",
+        "replay_frames",
+        "resumed_streams",
+        "resume_misses",
+        "coalesced_frames",
+    ):
+        assert isinstance(stats[key], int) and stats[key] >= 0
+
+
+def test_health_report_exposes_audience_cache_stats():
+    res = req("api/health/report")
+    stats = res["audience_cache"]
+    for key in ("entries", "hits", "misses", "invalidations"):
+        assert isinstance(stats[key], int) and stats[key] >= 0
+
+
+def test_health_report_exposes_changes_single_flight_stats():
+    req("api/changes", q={"since": 0})
+    stats = req("api/health/report")["changes_single_flight"]
+    assert stats["computed"] >= 1
+    for key in ("in_flight", "computed", "shared"):
+        assert isinstance(stats[key], int) and stats[key] >= 0
+
+
+def test_open_sync_streams_hold_no_pool_connections():
+    """The principal of an SSE stream is resolved in a session that is closed
+    before streaming starts, so connected clients do not pin pooled
+    connections."""
+    before = req("api/health/report")
+    if before.get("db_pool") is None:
+        pytest.skip("pool exposes no counters")
+    n = 5
+    streams = [
+        requests.get(
+            f"{get_server_base_url()}/api/sync",
+            headers={"Authorization": f"Bearer {get_access_token()}"},
+            stream=True,
+            timeout=(5, 5),
+        )
+        for _ in range(n)
+    ]
+    try:
+        expected = before["sync_streams"]["connected_clients"] + n
+        deadline = time.time() + 10
+        while True:
+            during = req("api/health/report")
+            if during["sync_streams"]["connected_clients"] >= expected:
+                break
+            assert time.time() < deadline, "streams did not register"
+            time.sleep(0.2)
+        # Other work (a stream's setup, a background drain) may hold a
+        # connection for a moment; with all streams registered the count must
+        # come back to exactly the baseline.
+        baseline = before["db_pool"]["checked_out"]
+        deadline = time.time() + 10
+        while not (
+            during["db_pool"]["checked_out"] == baseline
+            and during["sync_streams"]["connected_clients"] >= expected
+        ):
+            assert time.time() < deadline, (
+                f"{during['db_pool']['checked_out']} connections checked out with "
+                f"{during['sync_streams']['connected_clients']} streams open "
+                f"({n} opened), {baseline} before"
+            )
+            time.sleep(0.2)
+            during = req("api/health/report")
+    finally:
+        for stream in streams:
+            stream.close()
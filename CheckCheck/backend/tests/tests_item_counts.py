@@ -0,0 +1,254 @@
+"""In-process tests for the per-checklist item counters
+(``db/checklist_item_counter.py``) and the counts read from them
+(``db/checklist_item.py::CheckListItemCRUD.count_by_checklist``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* the counters follow every write path: item create, tombstone and restore,
+  state create and (un)check, ``delete_checked_items`` and
+  ``uncheck_all_items``, and a rolled back transaction changes nothing;
+* an item checked from a stale read, after another session has checked it,
+  is counted once;
+* the repair job recomputes drifted counters, reports by how much they were
+  off, removes counters of deleted checklists, and finds nothing on a rerun;
+* ``GET /api/item`` (``list_items``) issues the same number of statements for
+  two checklists as for twenty: the counts no longer cost three queries per
+  checklist.
+"""
+
+import uuid
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.responses import Response
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.api.routes.routes_checklist_item import list_items
+from checkcheckserver.config import DbBackend
+from checkcheckserver.db.checklist_item import CheckListItemCRUD, ItemCounts
+from checkcheckserver.db.checklist_item_counter import repair_item_counters
+from checkcheckserver.db.checklist_item_state import CheckListItemStateCRUD
+from checkcheckserver.model._base_model import naive_utc_now
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_counter import CheckListItemCounter
+from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.user import User
+from utils import route_request
+
+
+def _item(checklist_id, n, checked, with_state=True):
+    item = CheckListItem(checklist_id=checklist_id, text=f"item {n}")
+    created = [
+        item,
+        CheckListItemPosition(checklist_item_id=item.id, index=float(n), indentation=0),
+    ]
+    if with_state:
+        created.append(
+            CheckListItemState(checklist_item_id=item.id, checked=checked)
+        )
+    return item, created
+
+
+async def _seed(session: AsyncSession, cards: int):
+    """``cards`` checklists; card ``n`` has ``n + 1`` checked and ``n`` unchecked
+    live items."""
+    owner = User(user_name="counter-owner")
+    session.add(owner)
+    await session.flush()
+    checklists = [CheckList(name=f"card {n}", owner_id=owner.id) for n in range(cards)]
+    session.add_all(checklists)
+    await session.flush()
+    for n, checklist in enumerate(checklists):
+        for i in range(2 * n + 1):
+            session.add_all(_item(checklist.id, i, checked=i <= n)[1])
+    await session.commit()
+    return [checklist.id for checklist in checklists]
+
+
+async def _recounted(crud: CheckListItemCRUD, checklist_id) -> ItemCounts:
+    total = await crud.count(checklist_id)
+    checked = await crud.count(checklist_id, checked=True)
+    return ItemCounts(total, checked, total - checked)
+
+
+def test_counters_follow_every_write_path(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist_ids = await _seed(session, 3)
+        crud = CheckListItemCRUD(session)
+        state_crud = CheckListItemStateCRUD(session)
+        seen = []
+
+        async def snapshot():
+            counts = await crud.count_by_checklist(checklist_ids)
+            for checklist_id in checklist_ids:
+                assert counts[checklist_id] == await _recounted(crud, checklist_id)
+            seen.append(counts[checklist_ids[1]])
+
+        await snapshot()
+        # An item without a state row, then its state.
+        item, created = _item(checklist_ids[1], 10, False, with_state=False)
+        session.add_all(created)
+        await session.commit()
+        await snapshot()
+        session.add(CheckListItemState(checklist_item_id=item.id, checked=True))
+        await session.commit()
+        await snapshot()
+        await state_crud.set_checklist_item_state(item.id, checked=False)
+        await snapshot()
+        # Tombstoning a checked item, and restoring it.
+        await state_crud.set_checklist_item_state(item.id, checked=True)
+        await crud.soft_delete(item.id)
+        await snapshot()
+        item.deleted_at = None
+        session.add(item)
+        await session.commit()
+        await snapshot()
+        # The bulk operations.
+        await crud.delete_checked_items(checklist_ids[1])
+        await snapshot()
+        await state_crud.uncheck_all_items(checklist_ids[2])
+        await snapshot()
+        # A rolled back change leaves the counters alone.
+        item.deleted_at = naive_utc_now()
+        session.add(item)
+        await session.flush()
+        await session.rollback()
+        await snapshot()
+        return seen, await crud.count_by_checklist(checklist_ids)
+
+    seen, final = db_harness.run(scenario)
+    assert seen == [
+        ItemCounts(3, 2, 1),
+        ItemCounts(4, 2, 2),
+        ItemCounts(4, 3, 1),
+        ItemCounts(4, 2, 2),
+        ItemCounts(3, 2, 1),
+        ItemCounts(4, 3, 1),
+        ItemCounts(1, 0, 1),
+        ItemCounts(1, 0, 1),
+        ItemCounts(1, 0, 1),
+    ]
+    assert list(final.values())[2] == ItemCounts(5, 0, 5)
+
+
+def test_stale_check_is_counted_once(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist_id = (await _seed(session, 2))[1]
+        item = (
+            await session.exec(
+                select(CheckListItemState)
+                .join(
+                    CheckListItem,
+                    CheckListItem.id == CheckListItemState.checklist_item_id,
+                )
+                .where(
+                    CheckListItem.checklist_id == checklist_id,
+                    CheckListItemState.checked == False,  # noqa: E712
+                )
+            )
+        ).first()
+        async with AsyncSession(session.bind, expire_on_commit=False) as other:
+            stale = await other.get(CheckListItemState, item.checklist_item_id)
+            await other.commit()
+            # Checked and committed here, while ``other`` still holds the
+            # unchecked row.
+            item.checked = True
+            session.add(item)
+            await session.commit()
+            stale.checked = True
+            other.add(stale)
+            await other.commit()
+        crud = CheckListItemCRUD(session)
+        counts = await crud.count_by_checklist([checklist_id])
+        return counts[checklist_id], await _recounted(crud, checklist_id)
+
+    counted, recounted = db_harness.run(scenario)
+    assert counted == recounted == ItemCounts(3, 3, 0)
+
+
+def test_repair_fixes_and_reports_drift(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist_ids = await _seed(session, 3)
+        owner_id = (await session.get(CheckList, checklist_ids[0])).owner_id
+        empty = CheckList(name="empty", owner_id=owner_id)
+        session.add(empty)
+        await session.commit()
+        # Drift the counters behind the hooks' back: one off, one missing, one
+        # for a checklist that has no items at all.
+        await session.execute(
+            update(CheckListItemCounter)
+            .where(CheckListItemCounter.checklist_id == checklist_ids[1])
+            .values(item_count=7, checked_count=0)
+        )
+        await session.execute(
+            CheckListItemCounter.__table__.delete().where(
+                CheckListItemCounter.checklist_id == checklist_ids[2]
+            )
+        )
+        session.add(
+            CheckListItemCounter(checklist_id=empty.id, item_count=2, checked_count=1)
+        )
+        if db_harness.backend == DbBackend.SQLITE:
+            # SQLite does not enforce the foreign key, so a deleted checklist
+            # can leave its counter behind.
+            session.add(
+                CheckListItemCounter(checklist_id=uuid.uuid4(), item_count=1)
+            )
+        await session.commit()
+
+        report = await repair_item_counters(session)
+        counts = await CheckListItemCRUD(session).count_by_checklist(
+            checklist_ids + [empty.id]
+        )
+        rerun = await repair_item_counters(session)
+        return checklist_ids, empty.id, report, counts, rerun
+
+    checklist_ids, empty_id, report, counts, rerun = db_harness.run(scenario)
+    assert report.checklists == 4
+    assert report.drift == {
+        checklist_ids[1]: (4, -2),
+        checklist_ids[2]: (-5, -3),
+        empty_id: (2, 1),
+    }
+    assert report.orphans == (1 if db_harness.backend == DbBackend.SQLITE else 0)
+    assert [counts[i] for i in checklist_ids] == [
+        ItemCounts(1, 1, 0),
+        ItemCounts(3, 2, 1),
+        ItemCounts(5, 3, 2),
+    ]
+    assert counts[empty_id] == ItemCounts(0, 0, 0)
+    assert rerun.drift == {} and rerun.orphans == 0
+
+
+def test_list_items_statement_count_is_constant(db_harness):
+    def statements_for(cards: int):
+        async def scenario(session: AsyncSession, statements):
+            checklist_ids = await _seed(session, cards)
+            crud = CheckListItemCRUD(session)
+            statements.clear()
+            result = await list_items(
+                request=route_request(),
+                response=Response(),
+                checklist_ids=[],
+                checked=None,
+                limit_per_checklist=9,
+                checklist_item_crud=crud,
+                checklist_ids_with_user_access=checklist_ids,
+                current_user=None,
+            )
+            assert [result[i].item_count for i in checklist_ids] == [
+                2 * n + 1 for n in range(cards)
+            ]
+            assert [result[i].item_checked_count for i in checklist_ids] == [
+                n + 1 for n in range(cards)
+            ]
+            return len(statements)
+
+        return db_harness.run(scenario)
+
+    assert statements_for(2) == statements_for(20)
@@ -0,0 +1,233 @@
+"""In-process tests for keyset pagination (``api/paginator.py``): the ``page`` /
+``next_page`` tokens of ``GET /api/checklist``, ``GET /api/position`` and the
+notification feed.
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* following ``next_page`` walks the same rows as offset paging, reports the
+  same offsets and totals, and ends with no token;
+* a card moving ahead of the cursor between two requests is neither repeated
+  nor does it push a card off the next page, unlike with ``offset``;
+* a seek page of the grid is still one statement;
+* positions page by their ``order_by`` with the primary key breaking ties;
+* the notification feed hands its token out until the feed is exhausted;
+* a malformed token is a 400.
+"""
+
+import datetime
+
+from fastapi import HTTPException, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.api.routes.routes_checklist import (
+    CheckListQueryParams,
+    list_checklists,
+)
+from checkcheckserver.api.routes.routes_checklist_position import (
+    CheckListPosQueryParams,
+    list_checklist_positions,
+)
+from checkcheckserver.api.routes.routes_notification import (
+    NEXT_PAGE_HEADER,
+    list_my_notifications,
+)
+from checkcheckserver.db.checklist import CheckListCRUD
+from checkcheckserver.db.checklist_position import CheckListPositionCRUD
+from checkcheckserver.db.notification import NotificationCRUD
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.notification import Notification, NotificationType
+from checkcheckserver.model.user import User
+from utils import route_request
+
+
+async def _seed(session: AsyncSession, cards: int):
+    """``cards`` cards of one user; every third one pinned, and two sharing each
+    position index so the id has to break the tie."""
+    user = User(user_name="keyset-user")
+    session.add(user)
+    await session.flush()
+    positions = []
+    for n in range(cards):
+        checklist = CheckList(name=f"card {n}", owner_id=user.id)
+        position = CheckListPosition(
+            checklist_id=checklist.id,
+            user_id=user.id,
+            index=float(n // 2),
+            pinned=n % 3 == 0,
+        )
+        positions.append(position)
+        session.add_all([checklist, position])
+    await session.commit()
+    return user, positions
+
+
+async def _grid(session, user, offset=0, limit=3, page=None):
+    return await list_checklists(
+        request=route_request(),
+        response=Response(),
+        archived=False,
+        label_id=None,
+        search=None,
+        shared=None,
+        checklist_crud=CheckListCRUD(session),
+        pagination=CheckListQueryParams(offset=offset, limit=limit, page=page),
+        current_user=user,
+    )
+
+
+async def _positions(session, user, offset=0, limit=3, page=None, order_by="index"):
+    return await list_checklist_positions(
+        archived=None,
+        checklist_pos_crud=CheckListPositionCRUD(session),
+        pagination=CheckListPosQueryParams(
+            offset=offset, limit=limit, order_by=order_by, order_desc=False, page=page
+        ),
+        current_user=user,
+    )
+
+
+async def _walk(list_page):
+    """Every page from the first by following ``next_page``."""
+    pages = [await list_page(None)]
+    while pages[-1].next_page is not None:
+        pages.append(await list_page(pages[-1].next_page))
+    return pages
+
+
+def test_grid_pages_follow_the_token(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        user, _ = await _seed(session, 8)
+        everything = await _grid(session, user, limit=100)
+        pages = await _walk(lambda page: _grid(session, user, page=page))
+        statements.clear()
+        await _grid(session, user, page=pages[1].next_page)
+        return everything, pages, len(statements)
+
+    everything, pages, seek_statements = db_harness.run(scenario)
+    assert everything.next_page is None
+    assert [card.id for page in pages for card in page.items] == [
+        card.id for card in everything.items
+    ]
+    assert [(page.offset, page.count, page.total_count) for page in pages] == [
+        (0, 3, 8),
+        (3, 3, 8),
+        (6, 2, 8),
+    ]
+    assert seek_statements == 1
+
+
+def test_grid_token_survives_a_reorder(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        user, positions = await _seed(session, 8)
+        first = await _grid(session, user)
+        # The last card of the grid moves to the very top between two requests.
+        moved = positions[7]
+        moved.pinned, moved.index = True, 100.0
+        session.add(moved)
+        await session.commit()
+        session.expunge_all()
+        by_token = await _grid(session, user, page=first.next_page)
+        by_offset = await _grid(session, user, offset=3)
+        return first, by_token, by_offset, moved.checklist_id
+
+    first, by_token, by_offset, moved_id = db_harness.run(scenario)
+    seen = {card.id for card in first.items}
+    # The offset page repeats the first page's last card; the seek page starts
+    # right after it.
+    assert first.items[-1].id in {card.id for card in by_offset.items}
+    assert seen.isdisjoint(card.id for card in by_token.items)
+    assert moved_id not in {card.id for card in by_token.items}
+    assert by_token.offset == 3 and by_token.count == 3
+
+
+def test_positions_page_by_order_by(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        user, _ = await _seed(session, 7)
+        walks = {}
+        for order_by in ("index", "pinned"):
+            everything = await _positions(
+                session, user, limit=100, order_by=order_by
+            )
+            pages = await _walk(
+                lambda page: _positions(session, user, page=page, order_by=order_by)
+            )
+            walks[order_by] = (everything, pages)
+        return walks
+
+    for order_by, (everything, pages) in db_harness.run(scenario).items():
+        keys = [
+            (bool(getattr(position, order_by)), position.checklist_id)
+            if order_by == "pinned"
+            else (position.index, position.checklist_id)
+            for position in everything.items
+        ]
+        assert keys == sorted(keys), order_by
+        assert [p.checklist_id for page in pages for p in page.items] == [
+            p.checklist_id for p in everything.items
+        ], order_by
+        assert [page.offset for page in pages] == [0, 3, 6]
+        assert pages[-1].next_page is None
+
+
+def test_notification_feed_pages(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        user = User(user_name="keyset-noti")
+        session.add(user)
+        await session.flush()
+        created = datetime.datetime(2026, 10, 18, 12, 0)
+        for n in range(5):
+            session.add(
+                Notification(
+                    user_id=user.id,
+                    type=NotificationType.card_shared,
+                    # Pairs share a timestamp so the id breaks the tie.
+                    created_at=created + datetime.timedelta(minutes=n // 2),
+                )
+            )
+        await session.commit()
+        crud = NotificationCRUD(session)
+        pages, page = [], None
+        while True:
+            response = Response()
+            pages.append(
+                await list_my_notifications(
+                    response=response,
+                    unread_only=False,
+                    limit=2,
+                    page=page,
+                    current_user=user,
+                    notification_crud=crud,
+                )
+            )
+            page = response.headers.get(NEXT_PAGE_HEADER)
+            if page is None:
+                break
+        everything, has_more = await crud.list_for_user(user.id, limit=100)
+        return pages, everything, has_more
+
+    pages, everything, has_more = db_harness.run(scenario)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [n.id for page in pages for n in page] == [n.id for n in everything]
+    assert not has_more
+
+
+def test_malformed_token_is_rejected(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        user, _ = await _seed(session, 2)
+        position_token = (
+            await _positions(session, user, limit=1)
+        ).next_page
+        errors = []
+        for page in ("not-a-token", "W10", position_token):
+            try:
+                await _grid(session, user, page=page)
+            except HTTPException as error:
+                errors.append(error.status_code)
+        return errors
+
+    # The last one is a well-formed token, but of another listing's keys.
+    assert db_harness.run(scenario) == [400, 400, 400]
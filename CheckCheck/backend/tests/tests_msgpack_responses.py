@@ -0,0 +1,122 @@
+"""``Accept: application/msgpack`` on the sync-heavy read endpoints
+(``api/msgpack_response.py``).
+
+Each endpoint is fetched twice, as JSON and as MessagePack, and the two bodies
+must carry the same data: the same keys, ids as their 16 bytes, timestamps as
+integer microseconds since the Unix epoch (UTC). Map keys stay strings, so a
+default ``msgpack.unpackb`` reads every body. Both answers carry ``Vary:
+Accept``. JSON stays the default.
+"""
+
+import datetime
+import uuid
+from typing import Any, Dict, Optional
+
+import msgpack
+import requests
+
+from utils import req, get_access_token, get_server_base_url
+
+MSGPACK = "application/msgpack"
+
+# Values that may move between the JSON and the MessagePack request: every
+# authenticated request commits (its token's ``last_used_at``), which moves the
+# cursor. Only their types are compared; ``created_at`` and ``updated_at`` pin
+# the timestamp encoding.
+VOLATILE_KEYS = {"server_seq", "next_cursor"}
+
+
+def _get(endpoint: str, accept: Optional[str] = None, **params) -> requests.Response:
+    headers = {"Authorization": f"Bearer {get_access_token()}"}
+    if accept is not None:
+        headers["Accept"] = accept
+    r = requests.get(
+        f"{get_server_base_url()}/{endpoint}", params=params, headers=headers
+    )
+    r.raise_for_status()
+    return r
+
+
+def _same(binary: Any, text: Any, path: str = "$"):
+    """Assert the MessagePack value ``binary`` encodes the JSON value ``text``."""
+    if isinstance(binary, dict):
+        assert isinstance(text, dict), path
+        assert binary.keys() == text.keys(), path
+        for key, value in binary.items():
+            if key in VOLATILE_KEYS:
+                assert isinstance(value, int), f"{path}.{key}"
+            else:
+                _same(value, text[key], f"{path}.{key}")
+    elif isinstance(binary, list):
+        assert isinstance(text, list) and len(binary) == len(text), path
+        for n, (b, t) in enumerate(zip(binary, text)):
+            _same(b, t, f"{path}[{n}]")
+    elif isinstance(binary, bytes):
+        assert len(binary) == 16 and uuid.UUID(bytes=binary) == uuid.UUID(text), path
+    elif isinstance(binary, int) and isinstance(text, str):
+        timestamp = datetime.datetime.fromisoformat(text)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+        epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        assert binary == (timestamp - epoch) // datetime.timedelta(microseconds=1), path
+    else:
+        assert binary == text, path
+
+
+def _varies_on_accept(response: requests.Response) -> bool:
+    vary = response.headers.get("vary", "")
+    return "accept" in [v.strip().lower() for v in vary.split(",")]
+
+
+def _both(endpoint: str, **params) -> Dict:
+    as_json = _get(endpoint, **params)
+    assert as_json.headers["content-type"].startswith("application/json")
+    as_msgpack = _get(endpoint, MSGPACK, **params)
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    # Either body depends on Accept, so a shared cache must key on it.
+    assert _varies_on_accept(as_json) and _varies_on_accept(as_msgpack)
+    unpacked = msgpack.unpackb(as_msgpack.content)
+    _same(unpacked, as_json.json())
+    return unpacked
+
+
+def _card_with_items() -> str:
+    cl_id = req("api/checklist", "post", b={"name": "msgpack card"})["id"]
+    for n in range(3):
+        req(f"api/checklist/{cl_id}/item", "post", b={"text": f"item {n}"})
+    return cl_id
+
+
+def test_checklists_and_items_as_msgpack():
+    cl_id = _card_with_items()
+    listed = _both("api/checklist")
+    assert uuid.UUID(cl_id).bytes in [card["id"] for card in listed["items"]]
+    items = _both(f"api/checklist/{cl_id}/item")
+    assert items["total_count"] == 3
+    previews = _both("api/item", checklist_ids=cl_id)
+    assert list(previews) == [cl_id]
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_changes_as_msgpack():
+    cl_id = _card_with_items()
+    changes = _both("api/changes", since=0)
+    assert uuid.UUID(cl_id).bytes in [card["id"] for card in changes["checklists"]]
+    assert len(changes["items"]) >= 3
+    # An empty pull answers without scanning; it must honour the format too.
+    cursor = _get("api/changes", since=0).json()["next_cursor"]
+    empty_response = _get("api/changes", MSGPACK, since=cursor)
+    assert _varies_on_accept(empty_response)
+    empty = msgpack.unpackb(empty_response.content)
+    assert empty["checklists"] == [] and empty["next_cursor"] >= cursor
+    req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_json_stays_the_default():
+    assert _get("api/checklist").headers["content-type"].startswith(
+        "application/json"
+    )
+    weighted = _get("api/checklist", f"application/json, {MSGPACK};q=0.5")
+    assert weighted.headers["content-type"].startswith("application/json")
+    preferred = _get("api/checklist", f"application/json;q=0.5, {MSGPACK}")
+    assert preferred.headers["content-type"] == MSGPACK
@@ -0,0 +1,271 @@
+"""In-process tests for the grid's card search (``db/search.py`` behind
+``GET /api/checklist?search=``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* the FTS5 documents (SQLite only) follow every write: a card created or renamed, an item
+  created, edited, moved to another card or tombstoned, a card bulk deleted,
+  and a rolled back transaction changes nothing;
+* the backend's engine (FTS5 on SQLite, trigram on Postgres) and the scan match
+  the same cards for long, short and wildcard needles, tombstoned items match
+  neither;
+* the search only ever matches cards the caller can access, and the total
+  counts only those;
+* ``rebuild_search_index`` recreates the documents from the rows.
+"""
+
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.responses import Response
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.api.routes.routes_checklist import (
+    CheckListQueryParams,
+    list_checklists,
+)
+from checkcheckserver.config import DbBackend
+from checkcheckserver.db import checklist as checklist_module
+from checkcheckserver.db import search
+from checkcheckserver.db.checklist import CheckListCRUD
+from checkcheckserver.model._base_model import naive_utc_now
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    SharePermission,
+)
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.user import User
+from utils import route_request
+
+
+def _require_fts5(db_harness):
+    if db_harness.backend != DbBackend.SQLITE or not search.fts5_available():
+        pytest.skip("the FTS5 documents exist on SQLite with the trigram tokenizer")
+
+
+async def _seed(session: AsyncSession):
+    """Three cards of ``owner``, the first shared with ``guest``, and one card
+    of ``stranger`` that matches everything the owner's do."""
+    owner = User(user_name="search-owner")
+    guest = User(user_name="search-guest")
+    stranger = User(user_name="search-stranger")
+    session.add_all([owner, guest, stranger])
+    await session.flush()
+    cards = {
+        "groceries": ["Milk", "Olive oil", "Eggs"],
+        "errands": ["Call the dentist", "Return library book"],
+        "100% done": ["Water the ferns"],
+    }
+    checklists = {}
+    for n, (name, items) in enumerate(cards.items()):
+        checklist = CheckList(name=name, owner_id=owner.id)
+        checklists[name] = checklist
+        session.add(checklist)
+        session.add(
+            CheckListPosition(checklist_id=checklist.id, user_id=owner.id, index=n)
+        )
+        session.add_all(
+            CheckListItem(checklist_id=checklist.id, text=item) for item in items
+        )
+    foreign = CheckList(name="groceries", text="100% milk", owner_id=stranger.id)
+    session.add_all(
+        [
+            foreign,
+            CheckListPosition(checklist_id=foreign.id, user_id=stranger.id, index=0),
+            CheckListItem(checklist_id=foreign.id, text="Call the dentist"),
+            CheckListCollaborator(
+                checklist_id=checklists["groceries"].id,
+                user_id=guest.id,
+                permission=SharePermission.check,
+            ),
+            CheckListPosition(
+                checklist_id=checklists["groceries"].id, user_id=guest.id, index=0
+            ),
+        ]
+    )
+    await session.commit()
+    return owner, guest, checklists
+
+
+async def _documents(session: AsyncSession) -> set:
+    """Every document as (card id, body)."""
+    result = await session.execute(
+        select(search.checklist_search.c.checklist_id, search.checklist_search.c.body)
+    )
+    return set(result.all())
+
+
+async def _expected_documents(session: AsyncSession) -> set:
+    """The documents the rows call for: each card's and each live item's."""
+    cards = await session.execute(select(CheckList.id, CheckList.name, CheckList.text))
+    items = await session.execute(
+        select(CheckListItem.checklist_id, CheckListItem.text).where(
+            CheckListItem.deleted_at.is_(None)
+        )
+    )
+    return {
+        (card_id, f"{name or ''}\n{note or ''}") for card_id, name, note in cards
+    } | set(items.all())
+
+
+async def _search(session, user, needle):
+    page = await list_checklists(
+        request=route_request(),
+        response=Response(),
+        archived=False,
+        label_id=None,
+        search=needle,
+        shared=None,
+        checklist_crud=CheckListCRUD(session),
+        pagination=CheckListQueryParams(offset=0, limit=100),
+        current_user=user,
+    )
+    session.expunge_all()
+    return page.total_count, {card.name for card in page.items}
+
+
+def test_documents_follow_every_write(db_harness):
+    _require_fts5(db_harness)
+
+    async def scenario(session: AsyncSession, statements):
+        owner, _, checklists = await _seed(session)
+        in_sync = [await _documents(session) == await _expected_documents(session)]
+        groceries, errands = checklists["groceries"], checklists["errands"]
+        done_id = checklists["100% done"].id
+        # A card renamed and given a note; an item created and one edited.
+        groceries.name, groceries.text = "weekly shop", "before friday"
+        item = CheckListItem(checklist_id=groceries.id, text="Coffee beans")
+        session.add_all([groceries, item])
+        await session.commit()
+        in_sync.append(
+            await _documents(session) == await _expected_documents(session)
+        )
+        item.text = "Decaf beans"
+        session.add(item)
+        await session.flush()
+        # An item moved to another card, then tombstoned.
+        item.checklist_id = errands.id
+        session.add(item)
+        await session.commit()
+        moved = (errands.id, "Decaf beans") in await _documents(session)
+        item.deleted_at = naive_utc_now()
+        session.add(item)
+        await session.commit()
+        in_sync.append(
+            await _documents(session) == await _expected_documents(session)
+        )
+        # A rolled back rename.
+        errands.name = "rolled back"
+        session.add(errands)
+        await session.flush()
+        await session.rollback()
+        in_sync.append(
+            await _documents(session) == await _expected_documents(session)
+        )
+        # Bulk deletes (the tombstone GC) forget the card's documents first.
+        done = select(CheckList.id).where(CheckList.id == done_id)
+        forgotten = await search.forget_search_documents(session, done)
+        await session.execute(
+            delete(CheckListItem).where(CheckListItem.checklist_id.in_(done))
+        )
+        await session.execute(delete(CheckList).where(CheckList.id.in_(done)))
+        await session.commit()
+        in_sync.append(
+            await _documents(session) == await _expected_documents(session)
+        )
+        bodies = {body for _, body in await _documents(session)}
+        return in_sync, moved, forgotten, bodies
+
+    in_sync, moved, forgotten, bodies = db_harness.run(scenario)
+    assert in_sync == [True] * 5
+    assert moved
+    # The card's and its one item's.
+    assert forgotten == 2
+    assert "weekly shop\nbefore friday" in bodies
+    assert "Decaf beans" not in bodies and "rolled back\n" not in bodies
+
+
+@pytest.mark.parametrize(
+    "needle, expected",
+    [
+        ("milk", {"groceries"}),
+        ("OLIVE", {"groceries"}),
+        ("the", {"errands", "100% done"}),
+        ("e", {"groceries", "errands", "100% done"}),
+        ("ll", {"errands"}),
+        ("100%", {"100% done"}),
+        ("call%book", set()),
+        ("d_ntist", {"errands"}),
+        ("nothing like it", set()),
+    ],
+)
+def test_engines_match_alike(db_harness, monkeypatch, needle, expected):
+    native = search.get_search_engine()
+    if native is search.SCAN_SEARCH:
+        pytest.skip("SQLite without the FTS5 trigram tokenizer only scans")
+
+    async def scenario(session: AsyncSession, statements):
+        owner, _, checklists = await _seed(session)
+        # A tombstoned item matches no engine.
+        session.add(
+            CheckListItem(
+                checklist_id=checklists["errands"].id,
+                text="Milk for the neighbours",
+                deleted_at=naive_utc_now(),
+            )
+        )
+        await session.commit()
+        found = {}
+        for engine in (native, search.SCAN_SEARCH):
+            monkeypatch.setattr(checklist_module, "get_search_engine", lambda: engine)
+            found[engine.name] = await _search(session, owner, needle)
+        return found
+
+    found = db_harness.run(scenario)
+    assert found[native.name] == found["scan"]
+    assert found[native.name][1] == expected
+    assert found[native.name][0] == len(expected)
+
+
+def test_search_is_scoped_to_the_callers_cards(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        owner, guest, _ = await _seed(session)
+        statements.clear()
+        owner_hits = await _search(session, owner, "dentist")
+        statement_count = len(statements)
+        guest_hits = [
+            await _search(session, guest, needle)
+            for needle in ("milk", "dentist", "100%")
+        ]
+        return owner_hits, statement_count, guest_hits
+
+    owner_hits, statement_count, guest_hits = db_harness.run(scenario)
+    # The stranger's card matches too, but is neither listed nor counted.
+    assert owner_hits == (1, {"errands"})
+    assert statement_count == 1
+    assert guest_hits == [(1, {"groceries"}), (0, set()), (0, set())]
+
+
+def test_rebuild_recreates_the_documents(db_harness):
+    _require_fts5(db_harness)
+
+    async def scenario(session: AsyncSession, statements):
+        await _seed(session)
+        expected = await _expected_documents(session)
+        await session.execute(
+            text("UPDATE checklist_search SET body = 'stale' WHERE rowid % 2 = 0")
+        )
+        connection = await session.connection()
+        rebuilt = await connection.run_sync(search.rebuild_search_index)
+        documents = await _documents(session)
+        await session.commit()
+        return expected, rebuilt, documents
+
+    expected, rebuilt, documents = db_harness.run(scenario)
+    assert documents == expected
+    assert rebuilt == len(expected)
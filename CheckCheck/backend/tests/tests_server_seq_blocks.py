@@ -0,0 +1,119 @@
+"""In-process tests for flush-level ``server_seq`` block allocation
+(``model/_base_model.py::_reserve_server_seqs_for_flush``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* a flush reserves the seqs of all the rows it stamps with one statement (the
+  ``sync_seq`` update, or ``sync_server_seq_reserve`` with the sequence
+  allocator), and hands them out contiguously;
+* a flush that stamps nothing (a delete) reserves nothing;
+* a block reserved by a failed flush is never handed out again.
+
+The commit-order guarantee under real parallelism is
+``tests_server_seq_concurrency.py``'s job.
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.model._base_model import uses_sequence_allocator
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.user import User
+
+
+def _reservations(statements) -> int:
+    """How many of ``statements`` reserved ``server_seq`` values, with either
+    allocator."""
+    return sum(
+        "UPDATE sync_seq" in s or "sync_server_seq_reserve" in s for s in statements
+    )
+
+
+def _item(checklist_id, n=0):
+    item = CheckListItem(checklist_id=checklist_id, text=f"item {n}")
+    state = CheckListItemState(checklist_item_id=item.id, checked=False)
+    position = CheckListItemPosition(
+        checklist_item_id=item.id, index=float(n), indentation=0
+    )
+    return [item, state, position]
+
+
+async def _card(session: AsyncSession) -> CheckList:
+    owner = User(user_name="seq-owner")
+    checklist = CheckList(name="card", owner_id=owner.id)
+    session.add_all([owner, checklist])
+    await session.commit()
+    return checklist
+
+
+def test_one_statement_per_flush_and_contiguous_seqs(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist = await _card(session)
+        created = []
+        for n in range(3):
+            created += _item(checklist.id, n)
+        session.add_all(created)
+        statements.clear()
+        await session.flush()
+        insert_reservations = _reservations(statements)
+        created_seqs = [obj.server_seq for obj in created]
+
+        states = [obj for obj in created if isinstance(obj, CheckListItemState)]
+        for state in states:
+            state.checked = True
+        statements.clear()
+        await session.commit()
+        return (
+            checklist.server_seq,
+            insert_reservations,
+            _reservations(statements),
+            created_seqs,
+            [state.server_seq for state in states],
+        )
+
+    card_seq, inserts, updates, created_seqs, updated_seqs = db_harness.run(scenario)
+    assert inserts == 1
+    assert updates == 1
+    assert sorted(created_seqs) == list(range(card_seq + 1, card_seq + 10))
+    assert sorted(updated_seqs) == list(range(card_seq + 10, card_seq + 13))
+
+
+def test_flush_without_stamped_rows_reserves_nothing(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist = await _card(session)
+        created = _item(checklist.id)
+        session.add_all(created)
+        await session.commit()
+        statements.clear()
+        await session.delete(created[1])
+        await session.commit()
+        return _reservations(statements)
+
+    assert db_harness.run(scenario) == 0
+
+
+def test_failed_flush_does_not_leak_its_block(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        checklist = await _card(session)
+        session.expunge_all()
+        duplicate = CheckList(id=checklist.id, name="dup", owner_id=checklist.owner_id)
+        session.add(duplicate)
+        with pytest.raises(IntegrityError):
+            await session.flush()
+        await session.rollback()
+        renamed = CheckList(name="next", owner_id=checklist.owner_id)
+        session.add(renamed)
+        await session.commit()
+        return checklist.server_seq, renamed.server_seq
+
+    first, second = db_harness.run(scenario)
+    # The sequence allocator's values are gone with the failed flush too: a
+    # nextval is never rolled back.
+    assert second == first + (2 if uses_sequence_allocator() else 1)
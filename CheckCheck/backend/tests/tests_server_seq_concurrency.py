@@ -24,30 +24,56 @@ its cursor past a seq whose row had not yet committed — that row would be stra
 forever, and its id would be missing from what the walk delivered. The final
 assertion catches exactly that.
 
-Note the deadlock-retry expectation documented on ``_allocate_server_seq``: under
+Note the deadlock-retry expectation documented on ``_reserve_server_seqs``: under
 this kind of load Postgres may abort a transaction with a deadlock error (a 5xx
 the outbox would replay). The idempotent write endpoints make that self-healing;
 here we retry a create once on a transient 5xx so the burst still lands every row.
+
+The same walk must hold with ``SYNC_SEQ_ALLOCATOR=sequence``, where seqs commit
+out of order and the cursor is the visible high-water mark instead (see
+``model/_base_model.py``); ``./run_backend_tests_with_postgres.sh`` runs this
+module a second time with it. The walk runs once with plain pulls and once with
+paged pulls (``limit``), whose last page must not hand out a cursor past a seq
+that committed behind the walk. The allocator's in-flight locks have an advisory
+key space of their own: advisory locks some other client holds on the database
+must not hold the cursor back.
 """
 
+import asyncio
+import os
 import threading
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
+import asyncpg
 import pytest
 import requests
 
 from utils import req, get_access_token, get_server_base_url
 
 
-def _changes(since: int, session: requests.Session, timeout: float = 15.0) -> Dict:
+PAGE_LIMIT = 5
+
+
+def _changes(
+    since: int,
+    session: requests.Session,
+    timeout: float = 15.0,
+    limit: Optional[int] = None,
+    page: Optional[str] = None,
+) -> Dict:
     """Direct GET /api/changes with an explicit timeout, so a request that hangs
     under load surfaces as an error rather than stalling the reader forever."""
+    params = {"since": since}
+    if limit is not None:
+        params["limit"] = limit
+    if page is not None:
+        params["page"] = page
     r = session.get(
         f"{get_server_base_url()}/api/changes",
-        params={"since": since},
+        params=params,
         headers={"Authorization": f"Bearer {get_access_token()}"},
         timeout=timeout,
     )
@@ -78,7 +104,8 @@ def _create_item(cl_id: str, item_id: str) -> None:
             raise
 
 
-def test_parallel_writes_are_never_skipped_by_the_cursor(request):
+@pytest.mark.parametrize("paged", [False, True], ids=["pulls", "paged"])
+def test_parallel_writes_are_never_skipped_by_the_cursor(request, paged):
     if request.config.getoption("--db") != "postgres":
         pytest.skip(
             "the server_seq commit-order guarantee is only at risk under true "
@@ -110,9 +137,16 @@ def test_parallel_writes_are_never_skipped_by_the_cursor(request):
         with requests.Session() as session:
             try:
                 while True:
-                    delta = _changes(cursor, session)
+                    limit = PAGE_LIMIT if paged else None
+                    delta = _changes(cursor, session, limit=limit)
                     for it in delta["items"]:
                         delivered.add(it["id"])
+                    while delta.get("has_more"):
+                        delta = _changes(
+                            cursor, session, limit=limit, page=delta["next_page"]
+                        )
+                        for it in delta["items"]:
+                            delivered.add(it["id"])
                     nc = delta["next_cursor"]
                     if nc > cursor:
                         cursor = nc
@@ -173,3 +207,35 @@ def test_parallel_writes_are_never_skipped_by_the_cursor(request):
     )
 
     req(f"api/checklist/{cl_id}", "delete")
+
+
+def test_unrelated_advisory_locks_do_not_hold_the_cursor_back(request):
+    if request.config.getoption("--db") != "postgres":
+        pytest.skip("advisory locks are a Postgres feature")
+
+    cl_id = req("api/checklist", "post", b={"name": "seq-advisory-locks"})["id"]
+    item_id = str(uuid.uuid4())
+
+    def write_and_pull():
+        since = _cursor()
+        _create_item(cl_id, item_id)
+        with requests.Session() as session:
+            return since, _changes(since, session)
+
+    async def with_foreign_locks():
+        # Another client's locks, in both key forms, held across the write.
+        conn = await asyncpg.connect(
+            os.environ["SQL_DATABASE_URL"].replace("+asyncpg", "")
+        )
+        try:
+            await conn.execute("SELECT pg_advisory_lock(1), pg_advisory_lock(17, 42)")
+            return await asyncio.to_thread(write_and_pull)
+        finally:
+            await conn.close()
+
+    since, delta = asyncio.run(with_foreign_locks())
+    assert not delta["full_resync"]
+    assert item_id in {it["id"] for it in delta["items"]}
+    assert delta["next_cursor"] > since
+
+    req(f"api/checklist/{cl_id}", "delete")
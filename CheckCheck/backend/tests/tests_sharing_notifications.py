@@ -238,6 +238,29 @@ def test_mark_all_read_clears_unread_count():
     assert _notifications(target_token, unread_only=True) == []
 
 
+def test_next_page_header_is_readable_cross_origin():
+    """The feed's continuation token is a response header, which a browser only
+    lets a cross-origin client (the separately served web UI) read when CORS
+    exposes it."""
+    target_token = _make_user_token("noti-cors-target")
+    target_id = _user_id(target_token)
+    for name in ("NotiCors1", "NotiCors2"):
+        _share(_create_checklist(name), target_id, "edit")
+
+    r = requests.get(
+        f"{get_server_base_url()}/api/user/me/notifications",
+        params={"limit": 1},
+        headers={
+            "Authorization": f"Bearer {target_token}",
+            "Origin": server_config.get_server_url().rstrip("/"),
+        },
+    )
+    r.raise_for_status()
+    assert r.headers.get("X-Next-Page")
+    exposed = r.headers.get("Access-Control-Expose-Headers", "")
+    assert "x-next-page" in [h.strip().lower() for h in exposed.split(",")]
+
+
 # ── public link first open → owner notification (once) ────────────────────────
 
 
@@ -0,0 +1,62 @@
+"""Unit tests for request coalescing (``api/single_flight.py``), the helper
+behind identical concurrent ``GET /api/changes`` pulls sharing one computation.
+
+Pure in-process, like ``tests_sync_client_registry.py``.
+"""
+
+import asyncio
+
+import pytest
+
+from checkcheckserver.api.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation_per_key():
+    async def scenario():
+        flight = SingleFlight()
+        runs = []
+        release = asyncio.Event()
+
+        async def compute(value):
+            runs.append(value)
+            await release.wait()
+            return value
+
+        calls = [
+            asyncio.ensure_future(flight.do(key, lambda key=key: compute(key)))
+            for key in ("a", "a", "a", "b")
+        ]
+        await asyncio.sleep(0)
+        in_flight = len(flight)
+        release.set()
+        results = await asyncio.gather(*calls)
+        # Finished: the next call computes afresh.
+        again = await flight.do("a", lambda: compute("a"))
+        return runs, in_flight, results, again, flight.stats()
+
+    runs, in_flight, results, again, stats = asyncio.run(scenario())
+    assert runs == ["a", "b", "a"] and in_flight == 2
+    assert results == ["a", "a", "a", "b"] and again == "a"
+    assert stats == {"in_flight": 0, "computed": 3, "shared": 2}
+
+
+def test_failure_reaches_every_caller_and_a_cancelled_caller_does_not_cancel_it():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise ValueError("boom")
+
+        first = asyncio.ensure_future(flight.do("k", compute))
+        second = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(ValueError):
+            await second
+        return first.cancelled(), len(flight)
+
+    assert asyncio.run(scenario()) == (True, 0)
@@ -0,0 +1,129 @@
+"""In-process tests for the checklist audience cache (``db/sync_audience.py``).
+
+Same harness as ``tests_sync_outbox.py``: a private database of the suite's
+backend (the ``db_harness`` fixture in conftest.py), no live server. Asserted
+here:
+
+* repeated deliveries for one checklist load its audience once;
+* committing a collaborator change (ORM write) or a revoked link (Core DELETE)
+  invalidates the cached audience;
+* cached public tokens stop matching once their ``expires_at`` passes;
+* a load that raced an invalidation is not cached.
+"""
+
+import datetime
+import uuid
+
+from checkcheckserver.db import sync_audience, sync_outbox
+from checkcheckserver.db.checklist_public_share import CheckListPublicShareCRUD
+from checkcheckserver.db.sync_audience import CachedAudience, ChecklistAudienceCache
+from checkcheckserver.db.sync_outbox import enqueue_sync_notification
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.checklist_public_share import CheckListPublicShare
+from checkcheckserver.model.sync_notifications import SyncNotification
+
+from tests_sync_outbox import _add_users, _delivery
+
+
+def _fresh_cache(monkeypatch) -> ChecklistAudienceCache:
+    cache = ChecklistAudienceCache(max_entries=100)
+    monkeypatch.setattr(sync_audience, "audience_cache", cache)
+    monkeypatch.setattr(sync_outbox, "audience_cache", cache)
+    return cache
+
+
+async def _notify(session, delivered, cl_id):
+    enqueue_sync_notification(
+        session, SyncNotification(cl_id=cl_id, upd_prop="item_state")
+    )
+    await session.commit()
+    return (await delivered())[-1]
+
+
+def test_audience_is_loaded_once_and_invalidated_on_share_change(
+    db_harness, monkeypatch
+):
+    cache = _fresh_cache(monkeypatch)
+    owner_id, guest_id = uuid.uuid4(), uuid.uuid4()
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id, guest_id)
+        checklist = CheckList(name="c", owner_id=owner_id)
+        session.add(checklist)
+        await session.commit()
+
+        async with _delivery(session) as delivered:
+            statements.clear()
+            first = await _notify(session, delivered, checklist.id)
+            second = await _notify(session, delivered, checklist.id)
+            loads_before_share = sum(
+                "FROM checklist_collaborator" in s for s in statements
+            )
+
+            session.add(
+                CheckListCollaborator(
+                    checklist_id=checklist.id,
+                    user_id=guest_id,
+                    status=ShareStatus.accepted,
+                )
+            )
+            await session.commit()
+            shared = await _notify(session, delivered, checklist.id)
+            return first, second, loads_before_share, shared
+
+    first, second, loads_before_share, shared = db_harness.run(scenario)
+    assert loads_before_share == 1
+    assert first.target_user_ids == second.target_user_ids == [str(owner_id)]
+    assert set(shared.target_user_ids) == {str(owner_id), str(guest_id)}
+    assert cache.stats()["hits"] >= 1 and cache.stats()["invalidations"] == 1
+
+
+def test_revoked_public_link_is_invalidated(db_harness, monkeypatch):
+    _fresh_cache(monkeypatch)
+    owner_id = uuid.uuid4()
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id)
+        checklist = CheckList(name="c", owner_id=owner_id)
+        session.add(checklist)
+        await session.flush()
+        link = CheckListPublicShare(
+            checklist_id=checklist.id, token="tok", created_by=owner_id
+        )
+        session.add(link)
+        await session.commit()
+        async with _delivery(session) as delivered:
+            before = await _notify(session, delivered, checklist.id)
+            # Core DELETE: not visible to the flush, marked by the CRUD method.
+            await CheckListPublicShareCRUD(session).delete(link.id)
+            after = await _notify(session, delivered, checklist.id)
+            return before, after
+
+    before, after = db_harness.run(scenario)
+    assert before.target_tokens == ["tok"]
+    assert after.target_tokens == []
+
+
+def test_cached_tokens_expire_and_stale_loads_are_dropped():
+    now = datetime.datetime(2026, 1, 1, 12, 0)
+    audience = CachedAudience(
+        (uuid.uuid4(),),
+        (("forever", None), ("soon", now + datetime.timedelta(minutes=1))),
+    )
+    assert audience.active_tokens(now) == ["forever", "soon"]
+    assert audience.active_tokens(now + datetime.timedelta(minutes=2)) == ["forever"]
+
+    cache = ChecklistAudienceCache(max_entries=1)
+    cl_id = uuid.uuid4()
+    generation = cache.generation
+    cache.invalidate([uuid.uuid4()])
+    cache.put(cl_id, audience, generation)
+    assert cache.get(cl_id) is None
+
+    cache.put(cl_id, audience, cache.generation)
+    cache.put(uuid.uuid4(), audience, cache.generation)  # evicts the LRU entry
+    assert cache.get(cl_id) is None and len(cache) == 1
@@ -0,0 +1,329 @@
+"""Unit tests for the SSE fan-out registry (``api/sync_clients.py``).
+
+Pure in-process: the registry has no DB or HTTP dependency, so routing, the
+per-client coalescing/backpressure, the ``Last-Event-ID`` replay and the
+keepalive heartbeat are asserted directly against the same objects the Postgres
+LISTEN callback and the SQLite drain feed. The last test drives the SSE response
+class with a fake ASGI receive channel.
+"""
+
+import asyncio
+import uuid
+
+from checkcheckserver.api.routes.routes_sync_notification import (
+    SyncEventStreamResponse,
+)
+from checkcheckserver.api.sync_clients import (
+    RESYNC_FRAME,
+    SyncClient,
+    SyncClientQueue,
+    SyncClientRegistry,
+    coalesce_key,
+)
+
+
+class _User:
+    def __init__(self):
+        self.id = uuid.uuid4()
+
+
+class _Anonymous:
+    id = None
+
+    def __init__(self, token: str):
+        self.token = token
+
+
+def test_targets_route_by_user_id_and_token():
+    registry = SyncClientRegistry()
+    alice, bob = _User(), _User()
+    alice_tab1 = registry.add(SyncClient(alice))
+    alice_tab2 = registry.add(SyncClient(alice))
+    bob_client = registry.add(SyncClient(bob))
+    visitor = registry.add(SyncClient(_Anonymous("tok-1")))
+    registry.add(SyncClient(_Anonymous("tok-2")))
+
+    # Target ids may arrive as UUIDs (SQLite drain) or strings (pg payload).
+    assert set(registry.targets([alice.id], [])) == {alice_tab1, alice_tab2}
+    assert set(registry.targets([str(bob.id)], ["tok-1"])) == {bob_client, visitor}
+    assert registry.targets([str(uuid.uuid4())], ["unknown"]) == []
+    assert len(registry) == 5
+
+
+def test_client_matched_twice_is_delivered_once():
+    registry = SyncClientRegistry()
+    user = _User()
+    user.token = "tok"  # a principal that carries both keys
+    client = registry.add(SyncClient(user))
+    assert registry.targets([str(user.id)], ["tok"]) == [client]
+
+
+def test_remove_is_idempotent_and_drops_empty_buckets():
+    registry = SyncClientRegistry()
+    user = _User()
+    client = registry.add(SyncClient(user))
+    visitor = registry.add(SyncClient(_Anonymous("tok")))
+
+    registry.remove(client)
+    registry.remove(client)
+    registry.remove(visitor)
+
+    assert len(registry) == 0
+    assert registry.targets([str(user.id)], ["tok"]) == []
+    assert registry._by_user_id == {} and registry._by_token == {}
+
+
+def _frame(n: int) -> str:
+    return f"data: {n}\n\n"
+
+
+async def _drain(queue) -> list:
+    frames = []
+    while (frame := await queue.get(timeout=0.1)) is not None:
+        frames.append(frame)
+    return frames
+
+
+def test_queue_coalesces_pokes_and_entity_events():
+    async def scenario():
+        queue = SyncClientQueue(max_pending=10)
+        cl, cli = uuid.uuid4(), uuid.uuid4()
+        queue.put("poke-5", coalesce_key(cl, None, "changes_available"), 5)
+        queue.put("text-a", coalesce_key(cl, cli, "item_text"))
+        queue.put("poke-7", coalesce_key(uuid.uuid4(), None, "changes_available"), 7)
+        # A late poke with a lower seq must not replace the newer one.
+        queue.put("poke-6", coalesce_key(cl, None, "changes_available"), 6)
+        queue.put("text-b", coalesce_key(cl, cli, "item_text"))
+        queue.close()
+        return await _drain(queue)
+
+    assert asyncio.run(scenario()) == ["poke-7", "text-b"]
+
+
+def test_overflowing_client_is_closed_with_resync():
+    async def scenario():
+        registry = SyncClientRegistry()
+        user = _User()
+        client = registry.add(SyncClient(user, max_pending=3))
+        for n in range(4):
+            registry.publish(_frame(n), (n,), [str(user.id)])
+        assert registry.stats()["overflow_disconnects"] == 1
+        # Later events are refused; the stream ends after the resync frame.
+        assert registry.publish(_frame(99), (99,), [str(user.id)]) == 0
+        return await _drain(client.queue), client.queue
+
+    frames, queue = asyncio.run(scenario())
+    assert frames == [RESYNC_FRAME]
+    assert queue.overflowed and queue.pending_bytes == 0
+
+
+def _event_id(frame: str) -> str:
+    first_line = frame.split("\n", 1)[0]
+    assert first_line.startswith("id: ")
+    return first_line[len("id: ") :]
+
+
+async def _drain_open(queue, n: int) -> list:
+    return [await queue.get(timeout=0.1) for _ in range(n)]
+
+
+def test_published_frames_carry_seq_and_event_number_ids():
+    async def scenario():
+        registry = SyncClientRegistry(replay_size=10)
+        user = _User()
+        client = registry.add(SyncClient(user))
+        registry.publish(_frame(1), (1,), [str(user.id)], server_seq=7)
+        registry.publish(_frame(2), (2,), [str(user.id)])
+        return await _drain_open(client.queue, 2)
+
+    first, second = asyncio.run(scenario())
+    seq1, no1 = _event_id(first).split("-")
+    seq2, no2 = _event_id(second).split("-")
+    # The entity event after the poke inherits the highest seq seen so far.
+    assert (seq1, seq2) == ("7", "7") and int(no2) == int(no1) + 1
+    assert first.endswith(_frame(1))
+
+
+def test_resume_replays_only_missed_frames_for_that_principal():
+    async def scenario():
+        registry = SyncClientRegistry(replay_size=10)
+        alice, bob = _User(), _User()
+        tab = registry.add(SyncClient(alice))
+        registry.publish(_frame(1), (1,), [str(alice.id)])
+        (seen,) = await _drain_open(tab.queue, 1)
+        registry.remove(tab)
+
+        # While alice is away: one frame for her, one for bob, one for a link.
+        registry.publish(_frame(2), (2,), [str(alice.id)])
+        registry.publish(_frame(3), (3,), [str(bob.id)])
+        registry.publish(_frame(4), (4,), [], ["tok"])
+
+        back = registry.add(SyncClient(alice))
+        assert registry.resume(back, _event_id(seen))
+        back.queue.close()
+        return await _drain(back.queue), registry.stats()
+
+    frames, stats = asyncio.run(scenario())
+    assert [f.endswith(_frame(2)) for f in frames] == [True]
+    assert stats["resumed_streams"] == 1 and stats["resume_misses"] == 0
+
+
+def test_aged_out_or_foreign_id_gets_resync():
+    async def scenario():
+        registry = SyncClientRegistry(replay_size=2)
+        user = _User()
+        tab = registry.add(SyncClient(user))
+        registry.publish(_frame(1), (1,), [str(user.id)])
+        (seen,) = await _drain_open(tab.queue, 1)
+        registry.remove(tab)
+        for n in range(2, 5):  # evicts frame 2, which the client never saw
+            registry.publish(_frame(n), (n,), [str(user.id)])
+
+        results = []
+        for last_event_id in (_event_id(seen), "3-12", "garbage"):
+            back = registry.add(SyncClient(user))
+            results.append(registry.resume(back, last_event_id))
+            back.queue.close()
+            results.append(await _drain(back.queue))
+            registry.remove(back)
+        return results
+
+    assert asyncio.run(scenario()) == [
+        False,
+        [RESYNC_FRAME],
+        False,
+        [RESYNC_FRAME],
+        False,
+        [RESYNC_FRAME],
+    ]
+
+
+def test_keepalive_id_resumes_an_idle_client_and_reset_invalidates_it():
+    async def scenario():
+        registry = SyncClientRegistry(replay_size=2)
+        idle, busy = _User(), _User()
+        for n in range(5):  # traffic for someone else wraps the ring
+            registry.publish(_frame(n), (n,), [str(busy.id)])
+        keepalive = registry.keepalive_frame()
+        assert keepalive.startswith(": keepalive\n")
+
+        back = registry.add(SyncClient(idle))
+        resumed = registry.resume(back, keepalive.split("id: ")[1].strip())
+
+        registry.replay.reset()
+        again = registry.add(SyncClient(idle))
+        after_reset = registry.resume(again, keepalive.split("id: ")[1].strip())
+        return resumed, after_reset
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_announce_gap_keeps_streams_open_with_a_resync_poke():
+    async def scenario():
+        registry = SyncClientRegistry(replay_size=10)
+        user = _User()
+        tab = registry.add(SyncClient(user))
+        visitor = registry.add(SyncClient(_Anonymous("tok")))
+        registry.publish(_frame(1), None, [str(user.id)], [], server_seq=4)
+        before_gap = (await tab.queue.get(timeout=0.1)).split("\n")[0][4:]
+
+        delivered = registry.announce_gap("data: poke\n\n", server_seq=9)
+        frames = {
+            "tab": await _drain_open(tab.queue, 2),
+            "visitor": await _drain_open(visitor.queue, 2),
+        }
+        late = registry.add(SyncClient(user))
+        resumed = registry.resume(late, before_gap)
+        return delivered, frames, resumed, registry
+
+    delivered, frames, resumed, registry = asyncio.run(scenario())
+    assert delivered == 2
+    for got in frames.values():
+        assert got[0] == RESYNC_FRAME
+        assert got[1] == f"id: {registry.replay.last_event_id()}\ndata: poke\n\n"
+    assert registry.replay.last_event_id().startswith("9-")
+    assert not any(c.queue.closed for c in registry)
+    # An id from before the gap no longer resumes.
+    assert resumed is False
+
+
+def test_heartbeat_keeps_only_idle_clients_alive():
+    async def scenario():
+        registry = SyncClientRegistry(keepalive_interval=30)
+        heartbeat = registry.heartbeat
+        start = heartbeat._origin
+        clients = {}
+        for name in ("idle", "busy", "gone"):
+            client = SyncClient(_User())
+            client.queue.last_activity = start
+            clients[name] = registry.add(client)
+        registry.remove(clients["gone"])
+        clients["busy"].queue.last_activity = start + 20  # sent a frame
+
+        first = heartbeat.advance(start + 30.5)
+        pending_after_first = {name: len(c.queue) for name, c in clients.items()}
+        second = heartbeat.advance(start + 50.5)
+        return first, pending_after_first, second, clients
+
+    first, pending, second, clients = asyncio.run(scenario())
+    assert first == 1 and pending == {"idle": 1, "busy": 0, "gone": 0}
+    # The busy client is due one interval after its last frame; the idle one
+    # still has its keepalive unsent, so it is not sent another.
+    assert second == 1 and len(clients["busy"].queue) == 1
+    assert len(clients["idle"].queue) == 1
+
+
+def test_event_stream_response_ends_on_disconnect():
+    async def scenario():
+        finished = []
+        disconnected = asyncio.Event()
+
+        async def stream():
+            try:
+                yield "data: 1\n\n"
+                await asyncio.Event().wait()  # an idle client: nothing to send
+            finally:
+                finished.append(True)
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+            if message.get("body"):
+                disconnected.set()
+
+        response = SyncEventStreamResponse(stream())
+        await asyncio.wait_for(response({"type": "http"}, receive, send), 2)
+        return finished, sent
+
+    finished, sent = asyncio.run(scenario())
+    assert finished == [True]
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.body"]
+
+
+def test_coalescing_window_sends_the_first_frame_at_once_and_merges_the_burst():
+    async def scenario():
+        registry = SyncClientRegistry(coalesce_window=0.05)
+        user = _User()
+        client = registry.add(SyncClient(user))
+        window, to = registry.coalescing, [str(user.id)]
+        cl, cli = uuid.uuid4(), uuid.uuid4()
+        window.publish(cl, "state-1", coalesce_key(cl, cli, "item_state"), to)
+        sent_at_once = len(client.queue)
+        for n in range(2, 6):
+            window.publish(cl, f"state-{n}", coalesce_key(cl, cli, "item_state"), to)
+            poke_key = coalesce_key(cl, None, "changes_available")
+            window.publish(cl, f"poke-{n}", poke_key, to, server_seq=n)
+        held_back = len(client.queue)
+        frames = [await client.queue.get(timeout=1) for _ in range(3)]
+        await asyncio.sleep(0.15)  # an empty window closes
+        return sent_at_once, held_back, frames, registry.stats(), window._held
+
+    sent_at_once, held_back, frames, stats, still_open = asyncio.run(scenario())
+    assert sent_at_once == held_back == 1
+    assert [f.split("\n", 1)[1] for f in frames] == ["state-1", "state-5", "poke-5"]
+    assert stats["coalesced_frames"] == 6 and still_open == {}
@@ -0,0 +1,76 @@
+"""Recovery of the SSE streams from a lost Postgres LISTEN connection.
+
+The Postgres backend feeds every SSE client from one shared LISTEN connection.
+When it drops, the streams stay open; once LISTEN is back each connected client
+is sent the ``resync`` event and a ``changes_available`` poke carrying the
+current ``server_seq`` (see docs/SYNC_PROTOCOL.md §9d). This test kills the
+LISTEN backend from outside and asserts exactly that on a live stream.
+
+Postgres only: SQLite has no LISTEN connection.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from utils import req, get_server_base_url, get_access_token
+
+
+def _terminate_listen_backend() -> int:
+    import asyncpg
+
+    async def terminate():
+        dsn = os.environ["SQL_DATABASE_URL"].replace("+asyncpg", "")
+        conn = await asyncpg.connect(dsn)
+        try:
+            return await conn.fetchval(
+                "SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity "
+                "WHERE query LIKE 'LISTEN %checkcheck_sync%'"
+            )
+        finally:
+            await conn.close()
+
+    return asyncio.run(terminate())
+
+
+def test_lost_listen_keeps_streams_open_and_pokes_them(request):
+    if request.config.getoption("--db") != "postgres":
+        pytest.skip("the shared LISTEN connection is a Postgres feature")
+
+    cursor = req("api/changes", q={"since": 0, "limit": 1})["next_cursor"]
+    resp = requests.get(
+        f"{get_server_base_url()}/api/sync",
+        headers={"Authorization": f"Bearer {get_access_token()}"},
+        stream=True,
+        timeout=(5, 20),
+    )
+    try:
+        # Give the stream a beat to register itself before the connection drops.
+        time.sleep(1.0)
+        assert _terminate_listen_backend() == 1
+
+        event, resynced, poke = None, False, None
+        deadline = time.time() + 20
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:") :].strip()
+                resynced = resynced or event == "resync"
+            elif line.startswith("data:") and event is None:
+                noti = json.loads(line[len("data:") :])
+                if noti.get("upd_prop") == "changes_available":
+                    poke = noti
+                    break
+            elif not line:
+                event = None
+            if time.time() > deadline:
+                break
+    finally:
+        resp.close()
+
+    assert resynced, "the stream received no resync event after LISTEN came back"
+    assert poke is not None, "the stream received no poke after LISTEN came back"
+    assert poke["server_seq"] >= cursor
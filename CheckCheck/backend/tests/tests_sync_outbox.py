@@ -0,0 +1,293 @@
+"""In-process tests for the request-scoped sync notification outbox
+(``db/sync_outbox.py``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py): on SQLite the outbox rows land in
+``sync_notification``, on Postgres the events are read back from ``NOTIFY``.
+Asserted here:
+
+* nothing is delivered until the session commits, and then in the same commit;
+* a batch resolves each checklist's audience once and emits one
+  ``changes_available`` poke per recipient set, not one per event;
+* a rollback discards whatever was pending;
+* a route that raises after its data commit has announced that commit with
+  it, and announces nothing of the write it had under way;
+* an event enqueued after the request's last commit is not delivered, and the
+  request's session raises;
+* the Postgres ``NOTIFY`` envelope stays under 8000 bytes for a card shared
+  with a 2,000-member group (its events spill into ``sync_notification``).
+"""
+
+import asyncio
+import contextlib
+import json
+import uuid
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.config import DbBackend
+from checkcheckserver.db import _session, sync_outbox
+from checkcheckserver.db._session import get_async_session
+from checkcheckserver.db.sync_outbox import (
+    PG_SYNC_CHANNEL,
+    SYNC_OUTBOX_KEY,
+    decode_pg_payload,
+    enqueue_sync_notification,
+)
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.sync_notifications import SyncNotification
+from checkcheckserver.model.user import User
+
+
+async def _add_users(session: AsyncSession, *user_ids: uuid.UUID):
+    session.add_all(
+        User(id=user_id, user_name=f"outbox-{user_id}") for user_id in user_ids
+    )
+    await session.flush()
+
+
+async def _stored(session: AsyncSession):
+    res = await session.exec(select(SyncNotification).order_by(SyncNotification.id))
+    return list(res.all())
+
+
+@contextlib.asynccontextmanager
+async def _delivery(session: AsyncSession):
+    """Yields a coroutine function returning what the commits so far delivered,
+    read the way the backend's listener reads it: the ``sync_notification``
+    rows on SQLite, the ``NOTIFY`` payloads (spills loaded by ``ref``) on
+    Postgres."""
+    if sync_outbox.config.db_backend != DbBackend.POSTGRES:
+        yield lambda: _stored(session)
+        return
+
+    import asyncpg
+
+    url = session.bind.url.render_as_string(hide_password=False)
+    conn = await asyncpg.connect(url.replace("+asyncpg", ""))
+    payloads = []
+    await conn.add_listener(
+        PG_SYNC_CHANNEL, lambda conn, pid, channel, payload: payloads.append(payload)
+    )
+
+    async def delivered():
+        # A round trip on the listening connection picks up every notification
+        # committed before it; the callbacks run on the next loop iteration.
+        await conn.execute("SELECT 1")
+        await asyncio.sleep(0.05)
+        notis = []
+        for payload in payloads:
+            data = json.loads(payload)
+            if "audience_changed" in data:
+                continue
+            noti = decode_pg_payload(data)
+            if noti is None:
+                res = await session.exec(
+                    select(SyncNotification).where(SyncNotification.id == data["ref"])
+                )
+                noti = res.one()
+            notis.append(noti)
+        return notis
+
+    try:
+        yield delivered
+    finally:
+        await conn.close()
+
+
+def test_batch_resolves_audience_once_and_pokes_once(db_harness):
+    owner_id = uuid.uuid4()
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id)
+        checklist = CheckList(name="c", owner_id=owner_id)
+        session.add(checklist)
+        await session.commit()
+
+        async with _delivery(session) as delivered:
+            for upd_prop in ("item_text", "item_state", "item_text"):
+                enqueue_sync_notification(
+                    session,
+                    SyncNotification(cl_id=checklist.id, cli_id=None, upd_prop=upd_prop),
+                )
+            assert await delivered() == []
+
+            statements.clear()
+            await session.commit()
+            audience_selects = [
+                s for s in statements if "FROM checklist_collaborator" in s
+            ]
+            return checklist.server_seq, await delivered(), audience_selects
+
+    card_seq, delivered, audience_selects = db_harness.run(scenario)
+    assert len(audience_selects) == 1
+    # The duplicate item_text event is dropped; one poke closes the batch.
+    assert [n.upd_prop for n in delivered] == [
+        "item_text",
+        "item_state",
+        "changes_available",
+    ]
+    assert all(n.target_user_ids == [str(owner_id)] for n in delivered)
+    # The poke carries the seq of the last committed write: the card's.
+    assert delivered[-1].server_seq == card_seq
+
+
+def test_rollback_discards_pending(db_harness):
+    owner_id = uuid.uuid4()
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id)
+        await session.commit()
+        async with _delivery(session) as delivered:
+            checklist = CheckList(name="c", owner_id=owner_id)
+            session.add(checklist)
+            await session.flush()
+            enqueue_sync_notification(
+                session,
+                SyncNotification(cl_id=checklist.id, upd_prop="checklist_created"),
+            )
+            await session.rollback()
+            await session.commit()
+            return await delivered()
+
+    assert db_harness.run(scenario) == []
+
+
+def test_route_failing_after_its_commit_keeps_what_it_announced(
+    db_harness, monkeypatch
+):
+    owner_id = uuid.uuid4()
+    app = FastAPI()
+
+    @app.post("/checklists")
+    async def create_two_checklists(session: AsyncSession = Depends(get_async_session)):
+        # A write that notifies ahead of its commit...
+        landed = CheckList(name="landed", owner_id=owner_id)
+        session.add(landed)
+        enqueue_sync_notification(
+            session, SyncNotification(cl_id=landed.id, upd_prop="checklist_created")
+        )
+        await session.commit()
+        # ...then a second write fails before its commit.
+        failed = CheckList(name="failed", owner_id=owner_id)
+        session.add(failed)
+        await session.flush()
+        enqueue_sync_notification(
+            session, SyncNotification(cl_id=failed.id, upd_prop="checklist_created")
+        )
+        raise RuntimeError("failed after the first commit")
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id)
+        await session.commit()
+        monkeypatch.setattr(_session, "db_engine", session.bind)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with _delivery(session) as delivered:
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+                response = await c.post("/checklists")
+            names = (await session.exec(select(CheckList.name))).all()
+            return response.status_code, names, await delivered()
+
+    status_code, names, delivered = db_harness.run(scenario)
+    assert status_code == 500
+    assert names == ["landed"]
+    assert [n.upd_prop for n in delivered] == ["checklist_created", "changes_available"]
+    assert delivered[-1].server_seq >= 1
+
+
+def test_enqueue_after_the_last_commit_raises(db_harness, monkeypatch):
+    owner_id = uuid.uuid4()
+    app = FastAPI()
+
+    @app.post("/checklists")
+    async def create_checklist(session: AsyncSession = Depends(get_async_session)):
+        checklist = CheckList(name="late", owner_id=owner_id)
+        session.add(checklist)
+        await session.commit()
+        enqueue_sync_notification(
+            session, SyncNotification(cl_id=checklist.id, upd_prop="checklist_created")
+        )
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id)
+        await session.commit()
+        monkeypatch.setattr(_session, "db_engine", session.bind)
+        transport = httpx.ASGITransport(app=app)
+        async with _delivery(session) as delivered:
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+                with pytest.raises(RuntimeError, match="checklist_created"):
+                    await c.post("/checklists")
+            return await delivered()
+
+    assert db_harness.run(scenario) == []
+
+
+def test_large_group_share_spills_out_of_the_notify_payload(db_harness):
+    owner_id = uuid.uuid4()
+    members = [uuid.uuid4() for _ in range(2000)]
+
+    async def scenario(session, statements):
+        await _add_users(session, owner_id, *members)
+        group_card = CheckList(name="group", owner_id=owner_id)
+        own_card = CheckList(name="own", owner_id=owner_id)
+        session.add_all([group_card, own_card])
+        await session.flush()
+        session.add_all(
+            CheckListCollaborator(
+                checklist_id=group_card.id,
+                user_id=member,
+                status=ShareStatus.accepted,
+            )
+            for member in members
+        )
+        await session.commit()
+
+        for cl_id in (group_card.id, own_card.id):
+            enqueue_sync_notification(
+                session, SyncNotification(cl_id=cl_id, upd_prop="item_text")
+            )
+
+        def encode_for_postgres(sync_session):
+            pending = sync_session.info.pop(SYNC_OUTBOX_KEY)
+            events = sync_outbox._collect_events(sync_session, pending)
+            return sync_outbox._pg_event_payloads(sync_session, events)
+
+        payloads = await session.run_sync(encode_for_postgres)
+        await session.commit()
+
+        decoded = []
+        for payload in payloads:
+            data = json.loads(payload)
+            noti = decode_pg_payload(data)
+            if noti is None:  # spilled: what the listener loads instead
+                res = await session.exec(
+                    select(SyncNotification).where(SyncNotification.id == data["ref"])
+                )
+                noti = res.one()
+            decoded.append((noti.cl_id, noti.upd_prop, noti.target_user_ids, data))
+        return group_card.id, own_card.id, payloads, decoded
+
+    group_id, own_id, payloads, decoded = db_harness.run(scenario)
+    assert all(len(p.encode()) < 8000 for p in payloads)
+    everyone = {str(owner_id)} | {str(m) for m in members}
+    for cl_id, upd_prop, target_user_ids, data in decoded:
+        if cl_id == group_id:
+            assert "ref" in data and set(target_user_ids) == everyone
+        else:
+            # The common small case stays inline.
+            assert "ref" not in data and target_user_ids == [str(owner_id)]
+    assert sorted((cl_id == group_id, p) for cl_id, p, _, _ in decoded) == [
+        (False, "changes_available"),
+        (False, "item_text"),
+        (True, "changes_available"),
+        (True, "item_text"),
+    ]
@@ -0,0 +1,78 @@
+"""In-process tests for the per-user sync watermarks (``db/sync_watermark.py``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* a write on a shared card raises the watermark of the owner and of every
+  accepted collaborator to the write's seq, and no one else's;
+* the watermark rows are upserted in user id order, so two transactions bumping
+  overlapping audiences lock them in the same order.
+"""
+
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.db import sync_watermark  # noqa: F401  (its session hooks)
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_collaborator import (
+    CheckListCollaborator,
+    ShareStatus,
+)
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.sync_watermark import SyncUserWatermark
+from checkcheckserver.model.user import User
+
+
+def test_shared_write_bumps_the_audience_in_user_id_order(db_harness):
+    owner_id = uuid.uuid4()
+    guest_ids = [uuid.uuid4() for _ in range(3)]
+    pending_id, stranger_id = uuid.uuid4(), uuid.uuid4()
+
+    async def scenario(session: AsyncSession, statements):
+        session.add_all(
+            User(id=user_id, user_name=f"watermark-{n}")
+            for n, user_id in enumerate(
+                [owner_id, *guest_ids, pending_id, stranger_id]
+            )
+        )
+        await session.flush()
+        checklist = CheckList(name="shared", owner_id=owner_id)
+        session.add_all([checklist, CheckList(name="unrelated", owner_id=stranger_id)])
+        await session.flush()
+        session.add_all(
+            CheckListCollaborator(checklist_id=checklist.id, user_id=guest_id)
+            for guest_id in guest_ids
+        )
+        session.add(
+            CheckListCollaborator(
+                checklist_id=checklist.id,
+                user_id=pending_id,
+                status=ShareStatus.pending,
+            )
+        )
+        await session.commit()
+        await session.execute(text("DELETE FROM sync_user_watermark"))
+        await session.commit()
+
+        statements.clear()
+        item = CheckListItem(checklist_id=checklist.id, text="milk")
+        session.add(item)
+        await session.commit()
+        upserts = [s for s in statements if "INTO sync_user_watermark" in s]
+        watermarks = await session.execute(
+            select(SyncUserWatermark.user_id, SyncUserWatermark.server_seq)
+        )
+        return item.server_seq, upserts, dict(watermarks.all())
+
+    seq, upserts, watermarks = db_harness.run(scenario)
+    # The transaction's top seq: the item's, or a row stamped after it.
+    assert set(watermarks) == {owner_id, *guest_ids}
+    assert len(set(watermarks.values())) == 1 and watermarks[owner_id] >= seq
+    assert len(upserts) == 1
+    upsert = " ".join(upserts[0].split())
+    assert upsert.index("ORDER BY") < upsert.index("ON CONFLICT")
@@ -0,0 +1,163 @@
+"""In-process tests for tombstone garbage collection (``db/tombstone_gc.py``).
+
+Runs in-process against a private database of the suite's backend (the
+``db_harness`` fixture in conftest.py), so the Postgres pass covers the Postgres
+statements. Asserted here:
+
+* expired tombstones go with the rows they mask (item state/position, a card's
+  items, positions, label links, item counter, search documents and access-log
+  rows); live rows and tombstones still inside the retention window stay;
+* the cursor floor is raised to the highest removed tombstone seq, so the delta
+  feed answers older cursors with ``full_resync``;
+* a run reports what it reclaimed, and a repeated run finds nothing.
+"""
+
+import datetime
+import os
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import checkcheckserver.model._tables  # noqa: F401  (register every table)
+from checkcheckserver.api.routes.routes_changes import _needs_full_resync
+from checkcheckserver.config import DbBackend
+from checkcheckserver.db import search
+from checkcheckserver.db.sync_watermark import SyncCursorState
+from checkcheckserver.db.tombstone_gc import collect_tombstones
+from checkcheckserver.model._base_model import naive_utc_now
+from checkcheckserver.model.checklist import CheckList
+from checkcheckserver.model.checklist_item import CheckListItem
+from checkcheckserver.model.checklist_item_position import CheckListItemPosition
+from checkcheckserver.model.checklist_item_state import CheckListItemState
+from checkcheckserver.model.checklist_label import CheckListLabel
+from checkcheckserver.model.checklist_position import CheckListPosition
+from checkcheckserver.model.label import Label
+from checkcheckserver.model.sync_access_log import SyncAccessLog
+from checkcheckserver.model.user import User
+
+RETENTION = datetime.timedelta(days=90)
+
+
+def _item(session, checklist_id, text="item"):
+    item = CheckListItem(checklist_id=checklist_id, text=text)
+    session.add(item)
+    session.add(CheckListItemState(checklist_item_id=item.id, checked=False))
+    session.add(
+        CheckListItemPosition(checklist_item_id=item.id, index=1.0, indentation=0)
+    )
+    return item
+
+
+async def _tombstone(session, obj, deleted_at):
+    obj.deleted_at = deleted_at
+    session.add(obj)
+    await session.commit()
+    return obj.server_seq
+
+
+async def _count(session, table) -> int:
+    return (await session.execute(select(func.count()).select_from(table))).scalar()
+
+
+def test_expired_tombstones_are_removed_and_the_cursor_floor_raised(db_harness):
+    async def scenario(session: AsyncSession, statements):
+        expired = naive_utc_now() - RETENTION - datetime.timedelta(days=1)
+        owner = User(user_name="gc-owner")
+        session.add(owner)
+        await session.flush()
+        owner_id = owner.id
+        live = CheckList(name="live", owner_id=owner_id)
+        doomed = CheckList(name="doomed", owner_id=owner_id)
+        label, doomed_label = (
+            Label(owner_id=owner_id, display_name=name) for name in ("keep", "gone")
+        )
+        session.add_all([live, doomed, label, doomed_label])
+        await session.flush()
+        live_item = _item(session, live.id)
+        old_item = _item(session, live.id)
+        recent_item = _item(session, live.id)
+        # Enough text that dropping the card frees whole pages. Postgres would
+        # compress a repeated character away; on SQLite random text would
+        # instead grow the FTS5 index by what its deletes free.
+        for _ in range(50):
+            if db_harness.backend == DbBackend.POSTGRES:
+                filler = os.urandom(1000).hex()
+            else:
+                filler = "x" * 2000
+            _item(session, doomed.id, text=filler)
+        session.add(
+            CheckListPosition(checklist_id=doomed.id, user_id=owner_id, index=1.0)
+        )
+        session.add_all(
+            [
+                CheckListLabel(
+                    checklist_id=doomed.id, label_id=label.id, user_id=owner_id
+                ),
+                CheckListLabel(
+                    checklist_id=live.id, label_id=doomed_label.id, user_id=owner_id
+                ),
+                SyncAccessLog(user_id=owner_id, checklist_id=live.id, server_seq=1),
+            ]
+        )
+        await session.commit()
+
+        floor = max(
+            [
+                await _tombstone(session, old_item, expired),
+                await _tombstone(session, doomed, expired),
+                await _tombstone(session, doomed_label, expired),
+            ]
+        )
+        await _tombstone(session, recent_item, naive_utc_now())
+        session.add(
+            SyncAccessLog(
+                user_id=owner_id, checklist_id=live.id, server_seq=floor + 100
+            )
+        )
+        await session.commit()
+
+        report = await collect_tombstones(session, naive_utc_now() - RETENTION)
+        again = await collect_tombstones(session, naive_utc_now() - RETENTION)
+        remaining_items = set((await session.exec(select(CheckListItem.id))).all())
+        remaining = {
+            table.__tablename__: await _count(session, table)
+            for table in (CheckListItemState, CheckListItemPosition, CheckList, Label)
+        }
+        return report, again, floor, remaining_items, remaining, (
+            live_item.id,
+            recent_item.id,
+        )
+
+    report, again, floor, remaining_items, remaining, kept = db_harness.run(scenario)
+    expected_rows = {
+        "checklist_item_state": 51,
+        "checklist_item_pos": 51,
+        "checklist_item": 51,
+        "checklist_label": 2,
+        "checklist_position": 1,
+        "checklist_item_counter": 1,
+        "sync_access_log": 1,
+        "checklist": 1,
+        "label": 1,
+    }
+    if db_harness.backend == DbBackend.SQLITE and search.fts5_available():
+        # The card's document and its 50 items'.
+        expected_rows["checklist_search"] = 51
+    assert report.rows == expected_rows
+    assert report.reclaimed_bytes > 50 * 2000
+    assert report.min_cursor == floor
+    assert remaining_items == set(kept)
+    assert remaining == {
+        "checklist_item_state": 2,
+        "checklist_item_pos": 2,
+        "checklist": 1,
+        "label": 1,
+    }
+    assert again.rows == {} and again.min_cursor == floor
+
+    # The delta feed answers a cursor that predates the removed deletes with a
+    # full resync, and one that has seen them with a normal delta.
+    state = SyncCursorState(server_seq=floor + 1, min_cursor=floor, watermark=None)
+    assert _needs_full_resync(floor - 1, state)
+    assert not _needs_full_resync(floor, state)
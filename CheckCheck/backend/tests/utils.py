@@ -417,3 +417,11 @@ def random_past_date(
         min_date = today - datetime.timedelta(days=730)
     delta_days = (today - min_date).days
     return min_date + datetime.timedelta(days=random_gen.randint(0, delta_days))
+
+
+def route_request():
+    """A bare GET request, for calling a route function in-process (see the
+    ``db_harness`` fixture)."""
+    from starlette.requests import Request
+
+    return Request({"type": "http", "method": "GET", "headers": []})
@@ -49,6 +49,10 @@ export const useSync = createSharedComposable(() => {
   // do) and again on every automatic reconnect (events fired while we were
   // disconnected are lost → reconcile the store).
   let hasOpened = false;
+  // Id of the last SSE frame received (§9d). A stream we rebuild ourselves hands
+  // it back so the server replays what we missed instead of us pulling; when it
+  // can't, it opens the stream with a `resync` event.
+  let lastEventId: string | null = null;
 
   // Self-managed reconnect on a capped backoff. The browser's own EventSource
   // retry only covers network-level drops and clean stream ends; when the stream
@@ -82,11 +86,14 @@ export const useSync = createSharedComposable(() => {
       // Tear down the dead stream and rebuild it. `connect()` no-ops if a stream
       // already exists, so `disconnect()` first guarantees a fresh EventSource.
       // Preserve `hasOpened` across the rebuild: we *had* a live connection before
-      // the outage, so the next `onopen` must run the reconcile delta-pull (catch
-      // up on everything that changed while the server was down), not treat this
-      // as a fresh initial load.
+      // the outage, so the next `onopen` must catch up on everything that changed
+      // while the server was down, not treat this as a fresh initial load. Keep
+      // `lastEventId` too, so the rebuilt stream resumes where this one stopped
+      // (§9d) instead of pulling.
       const wasOpened = hasOpened;
+      const resumeFrom = lastEventId;
       disconnect();
+      lastEventId = resumeFrom;
       connect();
       hasOpened = wasOpened;
     }, delay);
@@ -112,13 +119,29 @@ export const useSync = createSharedComposable(() => {
     checkListStore.fetchCounts();
   }
 
+  // Events fired while we were disconnected are gone; reconcile. Flag-on
+  // (WI-10): a single delta pull catches up everything the poke would have
+  // triggered — no full board refetch. Flag-off keeps the legacy resync.
+  function catchUp() {
+    if (isLocalFirstEnabled()) {
+      void applyDelta(pinia);
+      return;
+    }
+    checkListStore.resync();
+    checkListStore.fetchCounts();
+  }
+
   function connect() {
     if (es) return;
     hasOpened = false;
     if (typeof document !== "undefined") {
       document.addEventListener("visibilitychange", onVisible);
     }
-    es = new EventSource("/api/sync");
+    es = new EventSource(
+      lastEventId === null
+        ? "/api/sync"
+        : `/api/sync?last_event_id=${encodeURIComponent(lastEventId)}`
+    );
     es.onopen = () => {
       // A live stream means our manual-reconnect backoff can reset to its floor.
       clearReconnect();
@@ -132,19 +155,23 @@ export const useSync = createSharedComposable(() => {
         hasOpened = true;
         return;
       }
-      // Events fired while we were disconnected are gone; reconcile. Flag-on
-      // (WI-10): a single delta pull catches up everything the poke would have
-      // triggered — no full board refetch. Flag-off keeps the legacy resync.
-      if (isLocalFirstEnabled()) {
-        console.info("[sync] SSE reconnected — pulling delta");
-        void applyDelta(pinia);
+      if (lastEventId !== null) {
+        // Resumed: the server replays the frames we missed, or sends `resync`
+        // if it no longer has them — nothing to pull here.
+        console.info("[sync] SSE reconnected — resuming");
         return;
       }
-      console.info("[sync] SSE reconnected — resyncing store");
-      checkListStore.resync();
-      checkListStore.fetchCounts();
+      console.info("[sync] SSE reconnected — catching up");
+      catchUp();
     };
+    es.addEventListener("resync", () => {
+      // The server could not replay what we missed (or dropped us for falling
+      // behind, §9c) — pull once.
+      console.info("[sync] SSE resync requested — catching up");
+      catchUp();
+    });
     es.onmessage = (event: MessageEvent) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
       try {
         handle(JSON.parse(event.data) as SyncNotificationType);
       } catch (e) {
@@ -180,6 +207,7 @@ export const useSync = createSharedComposable(() => {
     es?.close();
     es = null;
     hasOpened = false;
+    lastEventId = null;
     if (typeof document !== "undefined") {
       document.removeEventListener("visibilitychange", onVisible);
     }
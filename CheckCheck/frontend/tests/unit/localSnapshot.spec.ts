@@ -167,30 +167,18 @@ describe("applyDelta poke-skip", () => {
   });
 });
 
-// ── `known=` assembly (§7) ────────────────────────────────────────────────────
+// ── No `known=` list (§7) ─────────────────────────────────────────────────────
 
-describe("applyDelta known= assembly", () => {
-  it("sends every cached card id EXCEPT those with a queued create", async () => {
+describe("applyDelta revocations", () => {
+  it("never sends the cached card ids — the server tracks access losses itself", async () => {
     h.checkListStore.checkLists = [CL("a"), CL("b"), CL("c")];
-    h.outbox.queuedCreateIds.mockImplementation((t: string) =>
-      t === "checklist" ? new Set(["b"]) : new Set()
-    );
     h.checkapi.mockResolvedValue(delta({ next_cursor: 1 }));
 
     await applyDelta(PINIA);
 
-    const [, opts] = h.checkapi.mock.calls[0]!;
-    // "b" is an offline-created card the server doesn't know yet — excluded so it
-    // isn't reported back as revoked and deleted from under us.
-    expect((opts as any).query.known).toBe("a,c");
-    expect((opts as any).query.since).toBe(0);
-  });
-
-  it("omits the known param entirely when no cards are cached", async () => {
-    h.checkapi.mockResolvedValue(delta());
-    await applyDelta(PINIA);
     const [, opts] = h.checkapi.mock.calls[0]!;
     expect((opts as any).query.known).toBeUndefined();
+    expect((opts as any).query.since).toBe(0);
   });
 });
 
@@ -211,6 +199,24 @@ describe("applyDelta cursor walk", () => {
     expect(h.checkListStore.checkLists.map((c) => c.id)).toEqual(["x"]);
   });
 
+  it("follows next_page and persists the cursor only after the last page", async () => {
+    await writeCursor(3);
+    h.checkapi
+      .mockResolvedValueOnce(delta({ checklists: [CL("x")], next_cursor: 3, has_more: true, next_page: "p1" }))
+      .mockResolvedValueOnce(delta({ items: [ITEM("i", "x")], next_cursor: 12 }))
+      .mockResolvedValueOnce(delta({ next_cursor: 12 })); // empty → stop
+
+    await applyDelta(PINIA);
+
+    const queries = h.checkapi.mock.calls.map((c) => (c[1] as any).query);
+    expect(queries[0]).toMatchObject({ since: 3, limit: expect.any(Number) });
+    // The second request continues the paging instead of restarting the cursor.
+    expect(queries[1].page).toBe("p1");
+    expect(queries[1].since).toBeUndefined();
+    expect(queries[2].since).toBe(12);
+    expect(await readCursor()).toBe(12);
+  });
+
   it("stops (one call) when the first delta is already empty", async () => {
     h.checkapi.mockResolvedValue(delta({ next_cursor: 0 }));
     await applyDelta(PINIA);
@@ -25,6 +25,7 @@ class MockEventSource {
   onopen: (() => void) | null = null;
   onerror: (() => void) | null = null;
   onmessage: ((e: any) => void) | null = null;
+  listeners: Record<string, ((e: any) => void)[]> = {};
 
   constructor(url: string) {
     this.url = url;
@@ -33,6 +34,9 @@ class MockEventSource {
   close() {
     this.readyState = MockEventSource.CLOSED;
   }
+  addEventListener(type: string, fn: (e: any) => void) {
+    (this.listeners[type] ??= []).push(fn);
+  }
   // ── test helpers ──
   /** Simulate the stream opening (server reachable). */
   emitOpen() {
@@ -50,6 +54,15 @@ class MockEventSource {
     this.onerror?.();
   }
 
+  /** Simulate a plain `message` frame carrying an SSE `id:`. */
+  emitMessage(data: object, lastEventId: string) {
+    this.onmessage?.({ data: JSON.stringify(data), lastEventId });
+  }
+  /** Simulate a named event (e.g. the server's `resync`). */
+  emitNamed(type: string) {
+    for (const fn of this.listeners[type] ?? []) fn({ data: "{}" });
+  }
+
   static get latest() {
     return this.instances[this.instances.length - 1]!;
   }
@@ -178,3 +191,40 @@ describe("useSync SSE self-managed reconnect", () => {
     expect(MockEventSource.instances.length).toBe(count);
   });
 });
+
+describe("useSync SSE resume (Last-Event-ID)", () => {
+  it("rebuilds the stream from its last event id and skips the reconnect pull", async () => {
+    const { connect } = await loadFresh();
+
+    connect();
+    MockEventSource.latest.emitOpen();
+    MockEventSource.latest.emitMessage(
+      { cl_id: "c1", cli_id: null, upd_prop: "share_added" },
+      "42-1001"
+    );
+    MockEventSource.latest.emitErrorClosed();
+    vi.advanceTimersByTime(1000);
+
+    expect(MockEventSource.latest.url).toBe("/api/sync?last_event_id=42-1001");
+    MockEventSource.latest.emitOpen();
+    // The server replays what we missed — no catch-up pull of our own.
+    expect(applyDelta).not.toHaveBeenCalled();
+  });
+
+  it("pulls when the server answers the resume with a resync event", async () => {
+    const { connect } = await loadFresh();
+
+    connect();
+    MockEventSource.latest.emitOpen();
+    MockEventSource.latest.emitMessage(
+      { cl_id: "c1", cli_id: null, upd_prop: "share_added" },
+      "42-1001"
+    );
+    MockEventSource.latest.emitErrorClosed();
+    vi.advanceTimersByTime(1000);
+    MockEventSource.latest.emitOpen();
+
+    MockEventSource.latest.emitNamed("resync");
+    expect(applyDelta).toHaveBeenCalledTimes(1);
+  });
+});
@@ -384,6 +384,10 @@ async function rebuildFromFull(pinia: Pinia, res: ChangesResponseType): Promise<
   void checkListStore.fetchCounts();
 }
 
+// Rows per GET /api/changes response (§3 "Pagination"): a large delta, e.g. a
+// fresh device's bootstrap, arrives as several bounded pages.
+const PULL_PAGE_SIZE = 500;
+
 /**
  * One cursor-walk: pull from the persisted cursor and apply until the delta is
  * empty. Returns whether the pull reached the server and converged — `false`
@@ -399,24 +403,22 @@ async function pullAndApply(pinia: Pinia, opts?: { sinceSeq?: number }): Promise
   // ahead of our cursor we are already caught up — no request needed.
   if (opts?.sinceSeq != null && opts.sinceSeq <= since) return true;
 
-  // No server-side pagination today (§3), but walk the cursor to empty so a
-  // mid-pull commit (delivered again next pull) still converges. Bounded so a
-  // write storm can't spin forever.
-  for (let page = 0; page < 20; page++) {
-    // Report cached checklist ids so the server can compute revocations (§7) —
-    // but never a card whose `create` op is still queued in the outbox: the
-    // server doesn't know it yet, so it would come back in
-    // `removed_checklist_ids` and we would delete our own optimistic card.
-    const pendingCreates = useOutbox().queuedCreateIds("checklist");
-    const known = checkListStore.checkLists
-      .map((c) => c.id)
-      .filter((id) => !pendingCreates.has(id))
-      .join(",");
+  // Follow `next_page` through a paged delta (§3), then walk the cursor to empty
+  // so a mid-pull commit (delivered again next pull) still converges. The walk
+  // is bounded so a write storm can't spin forever; paging always ends.
+  let pageToken: string | null = null;
+  let walks = 0;
+  while (walks < 20) {
+    // No `known=` list: the server reports revocations from its own access log
+    // (§7), so a large board doesn't turn into a huge query string.
     let res: ChangesResponseType;
     try {
       res = (await $checkapi("/api/changes", {
         method: "get",
-        query: { since, ...(known ? { known } : {}) },
+        query: {
+          ...(pageToken ? { page: pageToken } : { since }),
+          limit: PULL_PAGE_SIZE,
+        },
         // We own the outcome (best-effort background pull) — no generic toast.
         skipErrorToast: true,
       })) as ChangesResponseType;
@@ -452,6 +454,14 @@ async function pullAndApply(pinia: Pinia, opts?: { sinceSeq?: number }): Promise
       (clId) => !itemStore.checklistWasFullLoadedOnce[clId]
     );
     if (previewTouched.length) schedulePreviewCountsRefresh(pinia, previewTouched);
+    // Mid-paging the cursor stays where it was: the removals and the new cursor
+    // only come with the last page.
+    if (res.has_more && res.next_page) {
+      pageToken = res.next_page;
+      continue;
+    }
+    pageToken = null;
+    walks++;
     await writeCursor(res.next_cursor);
 
     // Converged: the delta is empty and the cursor didn't advance past where we
@@ -45,4 +45,14 @@ if [ "$HAS_SELECTION" -eq 0 ]; then
             tests/tests_sharing_invites.py \
             tests/tests_sharing_groups.py \
             tests/tests_shared_position_orphan.py
+
+    # Third pass — the server_seq allocator is a server-side setting too. Run the
+    # cursor-correctness modules again with the Postgres sequence allocator.
+    echo "=== sequence-allocator pass (SYNC_SEQ_ALLOCATOR=sequence) ==="
+    SYNC_SEQ_ALLOCATOR=sequence \
+        python -m pytest --db=postgres \
+            tests/tests_server_seq_concurrency.py \
+            tests/tests_server_seq_blocks.py \
+            tests/tests_changes.py \
+            tests/tests_convergence.py
 fi